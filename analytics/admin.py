@@ -0,0 +1,12 @@
+from django.contrib import admin
+
+from .models import InstructorDailyStat
+
+
+@admin.register(InstructorDailyStat)
+class InstructorDailyStatAdmin(admin.ModelAdmin):
+    list_display = ("day", "instructor", "course", "enrollments", "completions", "revenue", "reviews")
+    list_filter = ("day",)
+    search_fields = ("course__title", "instructor__email")
+    raw_id_fields = ("instructor", "course")
+    date_hierarchy = "day"
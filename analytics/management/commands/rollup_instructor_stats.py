@@ -0,0 +1,35 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from analytics.services import first_activity_day, rollup_instructor_stats, rollup_pending
+
+
+class Command(BaseCommand):
+    help = (
+        "Alimente analytics.InstructorDailyStat. Sans option : incrémental (comme la tâche beat). "
+        "--days N : recalcule les N derniers jours ; --full : reconstruit tout l'historique."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, help="Recalculer les N derniers jours")
+        parser.add_argument("--full", action="store_true", help="Depuis la première activité")
+        parser.add_argument("--course", type=int, action="append", dest="courses",
+                            help="Limiter à un ou plusieurs cours (répétable)")
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+        if options["full"]:
+            start = first_activity_day() or today
+        elif options["days"]:
+            start = today - timedelta(days=max(1, options["days"]) - 1)
+        elif options["courses"]:
+            start = first_activity_day() or today
+        else:
+            n = rollup_pending()
+            self.stdout.write(self.style.SUCCESS(f"✅ Rollup incrémental : {n} lignes"))
+            return
+
+        n = rollup_instructor_stats(start, today, course_ids=options["courses"])
+        self.stdout.write(self.style.SUCCESS(f"✅ Rollup {start} → {today} : {n} lignes"))
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from django.conf import settings
+from django.db import models
+
+
+class InstructorDailyStat(models.Model):
+    """
+    Rollup formateur × cours × jour, alimenté par la tâche Celery beat analytics.tasks
+    (cf. analytics/services.py). Les KPIs formateur (7j / 30j / 90j) lisent cette table
+    au lieu de compter les inscriptions / commandes / avis.
+    """
+    instructor = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE,
+                                   related_name="daily_stats")
+    course = models.ForeignKey("catalog.Course", on_delete=models.CASCADE, related_name="daily_stats")
+    day = models.DateField()
+
+    enrollments = models.PositiveIntegerField(default=0)
+    completions = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)  # devise du cours
+    reviews = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    # estimation : positions de lecture des leçons touchées ce jour-là (pas de journal de visionnage)
+    watch_seconds = models.PositiveBigIntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["course", "day"], name="instructor_daily_stat_course_day_uniq"),
+        ]
+        indexes = [
+            # KPIs : WHERE instructor=? AND day >= ?
+            models.Index(fields=["instructor", "day"], name="instructor_daily_stat_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.instructor_id} • {self.course_id} • {self.day}"
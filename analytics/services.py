@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import BigIntegerField, Count, DecimalField, Q, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from catalog.models import Course
+from commerce.models import Order, OrderItem
+from enrollments.models import Enrollment, LessonProgress
+from reviews.models import Review
+from .models import InstructorDailyStat
+
+METRICS = ("enrollments", "completions", "revenue", "reviews", "rating_sum", "watch_seconds")
+
+# la tâche périodique repart de la dernière journée agrégée moins REWIND_DAYS
+# (écritures tardives : paiement confirmé le lendemain, complétion recalculée...)
+REWIND_DAYS = 2
+
+
+def _day_range(field: str, start: date, end: date) -> Q:
+    """[start, end] en jours locaux -> bornes datetime (index-friendly, pas de TruncDate dans le WHERE)."""
+    tz = timezone.get_current_timezone()
+    lo = timezone.make_aware(datetime.combine(start, time.min), tz)
+    hi = timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min), tz)
+    return Q(**{f"{field}__gte": lo, f"{field}__lt": hi})
+
+
+def _collect(start: date, end: date, course_ids=None) -> dict:
+    """-> {(course_id, day): {metric: valeur}} ; une requête GROUP BY par source."""
+    def scoped(qs, course_field="course_id"):
+        return qs.filter(**{f"{course_field}__in": course_ids}) if course_ids is not None else qs
+
+    sources = [
+        (
+            scoped(Enrollment.objects.filter(_day_range("enrolled_at", start, end)))
+            .values("course_id", d=TruncDate("enrolled_at")).annotate(enrollments=Count("id")),
+            "course_id",
+        ),
+        (
+            scoped(Enrollment.objects.filter(_day_range("completed_at", start, end),
+                                             status=Enrollment.Status.COMPLETED))
+            .values("course_id", d=TruncDate("completed_at")).annotate(completions=Count("id")),
+            "course_id",
+        ),
+        (
+            scoped(OrderItem.objects.filter(
+                _day_range("order__paid_at", start, end),
+                order__status=Order.Status.PAID, item_type=OrderItem.ItemType.COURSE, course__isnull=False,
+            ))
+            .values("course_id", d=TruncDate("order__paid_at")).annotate(revenue=Sum("line_total")),
+            "course_id",
+        ),
+        (
+            scoped(Review.objects.filter(_day_range("created_at", start, end)))
+            .values("course_id", d=TruncDate("created_at")).annotate(reviews=Count("id"), rating_sum=Sum("rating")),
+            "course_id",
+        ),
+        (
+            scoped(LessonProgress.objects.filter(_day_range("updated_at", start, end)), "enrollment__course_id")
+            .values("enrollment__course_id", d=TruncDate("updated_at"))
+            .annotate(watch_seconds=Sum("last_position_sec")),
+            "enrollment__course_id",
+        ),
+    ]
+
+    out = {}
+    for qs, course_field in sources:
+        for row in qs.order_by():
+            key = (row.pop(course_field), row.pop("d"))
+            out.setdefault(key, {}).update({k: v or 0 for k, v in row.items()})
+    return out
+
+
+def rollup_instructor_stats(start: date, end: date | None = None, course_ids=None) -> int:
+    """
+    Recalcule (set-based, idempotent) les lignes InstructorDailyStat de [start, end].
+    Les lignes de la période qui n'ont plus d'activité sont supprimées.
+    """
+    end = end or timezone.localdate()
+    if course_ids is not None:
+        course_ids = list(course_ids)
+
+    rows = _collect(start, end, course_ids)
+    instructors = dict(Course.objects.filter(id__in={cid for cid, _ in rows}).values_list("id", "instructor_id"))
+
+    objs = [
+        InstructorDailyStat(instructor_id=instructors[cid], course_id=cid, day=day, **metrics)
+        for (cid, day), metrics in rows.items()
+        if instructors.get(cid)  # cours supprimé entre-temps
+    ]
+
+    with transaction.atomic():
+        stale = InstructorDailyStat.objects.filter(day__gte=start, day__lte=end)
+        if course_ids is not None:
+            stale = stale.filter(course_id__in=course_ids)
+        stale.delete()
+        InstructorDailyStat.objects.bulk_create(objs, batch_size=1000)
+    return len(objs)
+
+
+def first_activity_day() -> date | None:
+    firsts = [
+        Enrollment.objects.order_by("enrolled_at").values_list("enrolled_at", flat=True).first(),
+        Order.objects.filter(status=Order.Status.PAID, paid_at__isnull=False)
+        .order_by("paid_at").values_list("paid_at", flat=True).first(),
+        Review.objects.order_by("created_at").values_list("created_at", flat=True).first(),
+    ]
+    firsts = [timezone.localdate(d) for d in firsts if d]
+    return min(firsts) if firsts else None
+
+
+def rollup_pending(rewind_days: int = REWIND_DAYS) -> int:
+    """
+    Incrémental : de la dernière journée agrégée (moins rewind_days) à aujourd'hui.
+    Table vide -> reconstruction depuis la première activité.
+    """
+    last = InstructorDailyStat.objects.order_by("-day").values_list("day", flat=True).first()
+    start = last - timedelta(days=rewind_days) if last else first_activity_day()
+    if start is None:
+        return 0
+    return rollup_instructor_stats(start, timezone.localdate())
+
+
+# ------------------------------------------------------------------
+# Lecture (KPIs formateur)
+# ------------------------------------------------------------------
+def instructor_totals(instructor, since: date, month_start: date | None = None) -> dict:
+    """Cumuls tous temps + depuis `since` (+ revenu du mois) en une requête sur la table de rollup."""
+    month_start = month_start or timezone.localdate().replace(day=1)
+    money = DecimalField(max_digits=14, decimal_places=2)
+    recent, month = Q(day__gte=since), Q(day__gte=month_start)
+
+    def total(metric, **extra):
+        output = money if metric == "revenue" else BigIntegerField()
+        zero = Decimal("0") if metric == "revenue" else 0
+        return Coalesce(Sum(metric, **extra), Value(zero), output_field=output)
+
+    aggregates = {}
+    for metric in METRICS:
+        aggregates[f"{metric}_total"] = total(metric)
+        aggregates[f"{metric}_recent"] = total(metric, filter=recent)
+    aggregates["revenue_month"] = total("revenue", filter=month)
+    return InstructorDailyStat.objects.filter(instructor=instructor).aggregate(**aggregates)
@@ -0,0 +1,9 @@
+from celery import shared_task
+
+from .services import REWIND_DAYS, rollup_pending
+
+
+@shared_task(name="analytics.rollup_instructor_stats", ignore_result=True)
+def rollup_instructor_stats(rewind_days: int = REWIND_DAYS) -> int:
+    """Celery beat : rollup incrémental formateur × cours × jour."""
+    return rollup_pending(rewind_days=rewind_days)
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.27 on 2026-10-19 05:37
+
+import uuid
+
+from django.db import migrations, models
+
+
+def fill_keys(apps, schema_editor):
+    # AddField évalue le défaut une seule fois : une clé par quiz existant
+    Quiz = apps.get_model("assessments", "Quiz")
+    batch = []
+    for pk in Quiz.objects.values_list("id", flat=True).iterator(chunk_size=5000):
+        batch.append(Quiz(id=pk, key=uuid.uuid4()))
+        if len(batch) >= 5000:
+            Quiz.objects.bulk_update(batch, ["key"])
+            batch = []
+    if batch:
+        Quiz.objects.bulk_update(batch, ["key"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("assessments", "0003_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="quiz",
+            name="key",
+            field=models.UUIDField(default=uuid.uuid4, editable=False),
+        ),
+        migrations.RunPython(fill_keys, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="quiz",
+            constraint=models.UniqueConstraint(
+                fields=("course", "key"), name="quiz_course_key_uniq"
+            ),
+        ),
+    ]
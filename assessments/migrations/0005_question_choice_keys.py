@@ -0,0 +1,48 @@
+# Generated by Django 4.2.27 on 2026-10-19 09:12
+
+import uuid
+
+from django.db import migrations, models
+
+
+def fill_keys(apps, schema_editor):
+    # AddField évalue le défaut une seule fois : une clé par ligne existante (cf. 0004)
+    for name in ("Question", "Choice"):
+        model = apps.get_model("assessments", name)
+        batch = []
+        for pk in model.objects.values_list("id", flat=True).iterator(chunk_size=5000):
+            batch.append(model(id=pk, key=uuid.uuid4()))
+            if len(batch) >= 5000:
+                model.objects.bulk_update(batch, ["key"])
+                batch = []
+        if batch:
+            model.objects.bulk_update(batch, ["key"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("assessments", "0004_quiz_key"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="question",
+            name="key",
+            field=models.UUIDField(default=uuid.uuid4, editable=False),
+        ),
+        migrations.AddField(
+            model_name="choice",
+            name="key",
+            field=models.UUIDField(default=uuid.uuid4, editable=False),
+        ),
+        migrations.RunPython(fill_keys, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="question",
+            constraint=models.UniqueConstraint(fields=("quiz", "key"), name="question_quiz_key_uniq"),
+        ),
+        migrations.AddConstraint(
+            model_name="choice",
+            constraint=models.UniqueConstraint(fields=("question", "key"), name="choice_question_key_uniq"),
+        ),
+    ]
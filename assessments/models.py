@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import uuid
+
 from django.db import models
 
 # Create your models here.
@@ -16,6 +18,13 @@ class Quiz(models.Model):
 
     passing_score = models.PositiveIntegerField(default=70)  # %
     max_attempts = models.PositiveIntegerField(default=3)
+    # clé stable (bundles d'export / import, cf. catalog/bundles.py) : survit aux renommages
+    key = models.UUIDField(default=uuid.uuid4, editable=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["course", "key"], name="quiz_course_key_uniq"),
+        ]
 
     def __str__(self):
         return self.title
@@ -25,15 +34,26 @@ class Question(models.Model):
     quiz = models.ForeignKey("assessments.Quiz", on_delete=models.CASCADE, related_name="questions")
     prompt = models.TextField()
     order = models.PositiveIntegerField(default=1)
+    # clé stable (cf. Quiz.key) : order vaut souvent 1 pour toutes les questions (admin)
+    key = models.UUIDField(default=uuid.uuid4, editable=False)
 
     class Meta:
         ordering = ["order"]
+        constraints = [
+            models.UniqueConstraint(fields=["quiz", "key"], name="question_quiz_key_uniq"),
+        ]
 
 
 class Choice(models.Model):
     question = models.ForeignKey("assessments.Question", on_delete=models.CASCADE, related_name="choices")
     text = models.CharField(max_length=500)
     is_correct = models.BooleanField(default=False)
+    key = models.UUIDField(default=uuid.uuid4, editable=False)  # cf. Question.key (textes en double)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["question", "key"], name="choice_question_key_uniq"),
+        ]
 
 
 class Attempt(models.Model):
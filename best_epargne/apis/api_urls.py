@@ -11,8 +11,12 @@ from best_epargne.apis.views import CategoryViewSet, CourseViewSet, InstructorCo
     LearnerCourseDetailView, LearnerCourseProgressView, LearnerNotificationsView, LearnerPaymentsView, \
     LearnerProgressView, LearnerExploreCoursesView, LearnerEnrollView, LearnerCourseOutlineView, LearnerContinueView, \
     LearnerLessonStateView, LearnerLessonProgressUpdateView, LearnerSetCurrentLessonView, LearnerCoursePlayerDataView, \
-    LearnerMediaSignedGetView
+    LearnerMediaSignedGetView, CourseReviewsView, LearnerDashboardView, InstructorBalanceView, CheckoutView, \
+    InstructorCourseReorderView, InstructorCourseBatchView, \
+    InstructorCourseCloneView, CompanyCourseCloneView, LearnerOfflinePackageView, \
+    LearnerProgressSyncView, LearnerCourseChangesView, LearnerLessonNavView
 # from catalog.api.views import CourseViewSet, CategoryViewSet
+from best_epargne.apis.streams import user_event_stream
 from enrollments.api import EnrollmentViewSet, LessonProgressViewSet
 from organizations.api import CompanyMembersViewSet
 
@@ -25,13 +29,16 @@ router.register("company/members", CompanyMembersViewSet, basename="company-memb
 
 urlpatterns = [
     path("apis/", include(router.urls)),
+    path("courses/<int:course_id>/reviews/", CourseReviewsView.as_view(), name="api_course_reviews"),
 
     # --- Instructor dashboard ---
     path("instructor/me/", InstructorMeView.as_view(), name="api_instructor_me"),
     path("instructor/kpis/", InstructorKpisView.as_view(), name="api_instructor_kpis"),
     path("instructor/reviews/", InstructorReviewsView.as_view(), name="api_instructor_reviews"),
     path("instructor/payouts/", InstructorPayoutsView.as_view(), name="api_instructor_payouts"),
+    path("instructor/balance/", InstructorBalanceView.as_view(), name="api_instructor_balance"),
     path("instructor/notifications/", InstructorNotificationsView.as_view(), name="api_instructor_notifications"),
+    path("instructor/events/", user_event_stream, name="api_instructor_events"),
     path(
         "instructor/courses/",
         CourseViewSet.as_view({"get": "my_courses"}),
@@ -54,6 +61,13 @@ urlpatterns = [
     path("instructor/courses/<int:course_id>/", InstructorCourseDetailView.as_view()),
     path("instructor/courses/<int:course_id>/publish/", InstructorCoursePublishView.as_view()),
     path("instructor/courses/<int:course_id>/archive/", InstructorCourseArchiveView.as_view()),
+    path("instructor/courses/<int:course_id>/reorder/", InstructorCourseReorderView.as_view(),
+         name="api_instructor_course_reorder"),
+    path("instructor/courses/<int:course_id>/batch/", InstructorCourseBatchView.as_view(),
+         name="api_instructor_course_batch"),
+    path("instructor/courses/<int:course_id>/clone/", InstructorCourseCloneView.as_view(),
+         name="api_instructor_course_clone"),
+    path("company/courses/<int:course_id>/clone/", CompanyCourseCloneView.as_view(), name="api_company_course_clone"),
 
     # --- Builder: sections ---
     path("instructor/courses/<int:course_id>/sections/", InstructorSectionListView.as_view()),
@@ -74,10 +88,12 @@ urlpatterns = [
          InstructorLessonDeleteView.as_view(),
         name="api_instructor_lesson_delete"),
 
+    path("learner/dashboard/", LearnerDashboardView.as_view(), name="api_learner_dashboard"),
     path("learner/me/", LearnerMeView.as_view(), name="api_learner_me"),
     path("learner/kpis/", LearnerKpisView.as_view(), name="api_learner_kpis"),
     path("learner/enrollments/", LearnerEnrollmentsView.as_view(), name="api_learner_enrollments"),
     path("learner/progress/", LearnerProgressView.as_view(), name="api_learner_progress"),
+    path("learner/progress/sync/", LearnerProgressSyncView.as_view(), name="api_learner_progress_sync"),
 
     path("learner/courses/<int:course_id>/", LearnerCourseDetailView.as_view(), name="api_learner_course_detail"),
     path("learner/courses/<int:course_id>/progress/", LearnerCourseProgressView.as_view(),
@@ -88,15 +104,23 @@ urlpatterns = [
          name="api_learner_media_signed"),
 
     path("learner/notifications/", LearnerNotificationsView.as_view(), name="api_learner_notifications"),
+    path("learner/events/", user_event_stream, name="api_learner_events"),
     path("learner/payments/", LearnerPaymentsView.as_view(), name="api_learner_payments"),
+    path("checkout/", CheckoutView.as_view(), name="api_checkout"),
 
     path("learner/courses/", LearnerExploreCoursesView.as_view(), name="api_learner_courses_explore"),
     path("learner/courses/<int:course_id>/enroll/", LearnerEnrollView.as_view(), name="api_learner_enroll"),
 
     path("learner/courses/<int:course_id>/outline/", LearnerCourseOutlineView.as_view(), name="api_learner_course_outline"),
     path("learner/courses/<int:course_id>/continue/", LearnerContinueView.as_view(), name="api_learner_continue"),
+    path("learner/courses/<int:course_id>/offline/", LearnerOfflinePackageView.as_view(),
+         name="api_learner_offline_package"),
+    path("learner/courses/<int:course_id>/changes/", LearnerCourseChangesView.as_view(),
+         name="api_learner_course_changes"),
 
     path("learner/courses/<int:course_id>/lessons/<int:lesson_id>/state/", LearnerLessonStateView.as_view(), name="api_learner_lesson_state"),
+    path("learner/courses/<int:course_id>/lessons/<int:lesson_id>/nav/", LearnerLessonNavView.as_view(),
+         name="api_learner_lesson_nav"),
     path("learner/courses/<int:course_id>/lessons/<int:lesson_id>/progress/", LearnerLessonProgressUpdateView.as_view(), name="api_learner_lesson_progress_update"),
     path("learner/courses/<int:course_id>/set-current/", LearnerSetCurrentLessonView.as_view(), name="api_learner_set_current"),
 
@@ -0,0 +1,250 @@
+"""
+Builder formateur : lot d'opérations sur un cours en une requête.
+
+POST /api/instructor/courses/<id>/batch/
+{"operations": [
+    {"op": "section.create", "ref": "s1", "title": "Intro", "after": 0},
+    {"op": "lesson.create", "ref": "l1", "section": "s1", "title": "Bienvenue", "lesson_type": "TEXT"},
+    {"op": "lesson.update", "id": 42, "title": "Nouveau titre", "duration_sec": 300},
+    {"op": "section.delete", "id": 7}
+]}
+
+- `ref` : id temporaire côté client, utilisable dans les opérations suivantes (section, id, after) ;
+- `after` : null = en fin, 0 = en tête, id ou ref = juste après (cf. catalog/ranking.py) ;
+- propriété du cours vérifiée une fois ; sections et leçons lues en deux requêtes ;
+- une transaction, cours verrouillé (select_for_update) avant la lecture de l'état ;
+- tout est validé en mémoire avant écriture : bulk_create (sections puis leçons), bulk_update,
+  delete en masse ; clé trop longue (MAX_LENGTH) -> clés du parent redistribuées dans le lot ;
+- réponse : correspondance ref -> id et version du sommaire (ETag) après écriture.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+
+from django.db import transaction
+
+from catalog.models import Course, CourseSection, Lesson
+from catalog.changes import LESSON, SECTION, UPSERT, record_changes
+from catalog.ranking import MAX_LENGTH, key_between, spread
+from catalog.versioning import bump_course, versions
+
+MAX_OPERATIONS = 500
+SECTION_FIELDS = ("title",)
+LESSON_FIELDS = ("title", "lesson_type", "is_preview", "duration_sec", "video_url", "content")
+LESSON_TYPES = set(Lesson.LessonType.values)
+
+
+class BatchError(ValueError):
+    def __init__(self, index: int, message: str):
+        super().__init__(message)
+        self.index = index
+
+
+def _clean(model_fields, op: dict, index: int) -> dict:
+    values = {f: op[f] for f in model_fields if f in op}
+    if "title" in values:
+        values["title"] = str(values["title"] or "").strip()[:200]
+        if not values["title"]:
+            raise BatchError(index, "title vide.")
+    if "lesson_type" in values and values["lesson_type"] not in LESSON_TYPES:
+        raise BatchError(index, f"lesson_type inconnu : {values['lesson_type']}.")
+    if "duration_sec" in values:
+        try:
+            values["duration_sec"] = max(0, int(values["duration_sec"] or 0))
+        except (TypeError, ValueError):
+            raise BatchError(index, "duration_sec : entier attendu.")
+    if "is_preview" in values:
+        values["is_preview"] = values["is_preview"] in (True, 1, "1", "true", "True")
+    for f in ("video_url", "content"):
+        if f in values:
+            values[f] = str(values[f] or "")
+    return values
+
+
+class _Batch:
+    """
+    État du cours en mémoire. Les objets créés n'ont pas encore de pk : ils sont suivis par
+    identité (id()), jamais hachés comme instances de modèle.
+    """
+
+    def __init__(self, course: Course):
+        self.course = course
+        self.sections = {s.id: s for s in CourseSection.objects.filter(course=course).only("id", "rank", "order")}
+        self.lessons = {
+            l.id: l for l in Lesson.objects.filter(section__course=course).only("id", "section_id", "rank", "order")
+        }
+        self.parent = {}  # id(leçon) -> section
+        self.children = defaultdict(list)  # id(section) -> leçons
+        for lesson in self.lessons.values():
+            section = self.sections[lesson.section_id]
+            self.parent[id(lesson)] = section
+            self.children[id(section)].append(lesson)
+        self.refs = {}  # ref -> objet créé
+        self.created_sections, self.created_lessons = [], []
+        self.updated = {}  # id(objet) -> (objet, {champ: valeur})
+        self.deleted = set()  # id(objet)
+
+    def _alive(self, obj) -> bool:
+        if id(obj) in self.deleted:
+            return False
+        return not isinstance(obj, Lesson) or id(self.parent[id(obj)]) not in self.deleted
+
+    # --- résolution id / ref
+    def _section(self, key, index):
+        obj = self.refs.get(key) if isinstance(key, str) else self.sections.get(key)
+        if not isinstance(obj, CourseSection) or not self._alive(obj):
+            raise BatchError(index, f"section inconnue : {key}.")
+        return obj
+
+    def _lesson(self, key, index):
+        obj = self.refs.get(key) if isinstance(key, str) else self.lessons.get(key)
+        if not isinstance(obj, Lesson) or not self._alive(obj):
+            raise BatchError(index, f"leçon inconnue : {key}.")
+        return obj
+
+    def _live_sections(self) -> list:
+        return [s for s in list(self.sections.values()) + self.created_sections if self._alive(s)]
+
+    def _live_lessons(self, section) -> list:
+        return [l for l in self.children[id(section)] if self._alive(l)]
+
+    def _rank_after(self, siblings: list, after, resolve, index) -> str:
+        rank = self._key_after(siblings, after, resolve, index)
+        if len(rank) > MAX_LENGTH:
+            # insertions répétées au même endroit : clés redistribuées (cf. ranking.respread)
+            for obj, key in zip(sorted(siblings, key=lambda o: o.rank), spread(len(siblings))):
+                self._update(obj, {"rank": key})
+            rank = self._key_after(siblings, after, resolve, index)
+        return rank
+
+    def _key_after(self, siblings: list, after, resolve, index) -> str:
+        ordered = sorted(siblings, key=lambda o: o.rank)
+        if after in (None, ""):
+            return key_between(ordered[-1].rank if ordered else None, None)
+        if after == 0:
+            return key_between(None, ordered[0].rank if ordered else None)
+        prev = resolve(after, index)
+        pos = next((i for i, o in enumerate(ordered) if o is prev), None)
+        if pos is None:
+            raise BatchError(index, f"after : {after} n'est pas dans ce parent.")
+        return key_between(prev.rank, ordered[pos + 1].rank if pos + 1 < len(ordered) else None)
+
+    def _register(self, obj, op, index):
+        ref = op.get("ref")
+        if ref is not None:
+            if not isinstance(ref, str) or ref in self.refs:
+                raise BatchError(index, "ref : chaîne unique attendue.")
+            self.refs[ref] = obj
+
+    def _update(self, obj, values: dict):
+        for field, value in values.items():
+            setattr(obj, field, value)
+        if obj.pk:  # objet créé dans le lot : écrit tel quel par bulk_create
+            self.updated.setdefault(id(obj), (obj, {}))[1].update(values)
+
+    # --- opérations
+    def apply(self, index: int, op: dict):
+        kind = op.get("op")
+        if kind == "section.create":
+            values = _clean(SECTION_FIELDS, op, index)
+            if "title" not in values:
+                raise BatchError(index, "title requis.")
+            rank = self._rank_after(self._live_sections(), op.get("after"), self._section, index)
+            section = CourseSection(course=self.course, rank=rank, **values)
+            self.created_sections.append(section)
+            self._register(section, op, index)
+
+        elif kind == "lesson.create":
+            section = self._section(op.get("section"), index)
+            values = _clean(LESSON_FIELDS, op, index)
+            if "title" not in values:
+                raise BatchError(index, "title requis.")
+            rank = self._rank_after(self._live_lessons(section), op.get("after"), self._lesson, index)
+            lesson = Lesson(rank=rank, **values)
+            self.parent[id(lesson)] = section
+            self.children[id(section)].append(lesson)
+            self.created_lessons.append(lesson)
+            self._register(lesson, op, index)
+
+        elif kind == "section.update":
+            self._update(self._section(op.get("id"), index), _clean(SECTION_FIELDS, op, index))
+
+        elif kind == "lesson.update":
+            self._update(self._lesson(op.get("id"), index), _clean(LESSON_FIELDS, op, index))
+
+        elif kind == "section.delete":
+            self.deleted.add(id(self._section(op.get("id"), index)))
+
+        elif kind == "lesson.delete":
+            self.deleted.add(id(self._lesson(op.get("id"), index)))
+
+        else:
+            raise BatchError(index, f"op inconnue : {kind}.")
+
+    # --- écriture
+    def _renumber(self, items: list) -> None:
+        """Numéros affichés 1..n par ordre de clé (objets existants : seulement s'ils changent)."""
+        for n, obj in enumerate(sorted(items, key=lambda o: o.rank), start=1):
+            if obj.order != n:
+                obj.order = n
+                if obj.pk:
+                    self.updated.setdefault(id(obj), (obj, {}))[1]["order"] = n
+
+    def save(self) -> dict:
+        sections = self._live_sections()
+        self._renumber(sections)
+        for section in sections:
+            self._renumber(self._live_lessons(section))
+
+        deleted_sections = [s.id for s in self.sections.values() if id(s) in self.deleted]
+        deleted_lessons = [
+            l.id for l in self.lessons.values() if id(l) in self.deleted and id(self.parent[id(l)]) not in self.deleted
+        ]
+        if deleted_lessons:
+            Lesson.objects.filter(id__in=deleted_lessons).delete()
+        if deleted_sections:
+            CourseSection.objects.filter(id__in=deleted_sections).delete()  # leçons en cascade
+
+        CourseSection.objects.bulk_create([s for s in self.created_sections if self._alive(s)])
+        new_lessons = [l for l in self.created_lessons if self._alive(l)]
+        for lesson in new_lessons:
+            lesson.section_id = self.parent[id(lesson)].id  # pk connu après le bulk_create des sections
+        Lesson.objects.bulk_create(new_lessons)
+
+        groups = defaultdict(list)
+        for obj, values in self.updated.values():
+            if self._alive(obj):
+                groups[(type(obj), tuple(sorted(values)))].append(obj)
+        updated = sum(model.objects.bulk_update(objs, list(fields)) for (model, fields), objs in groups.items())
+        # suppressions : journalisées par les signaux post_delete
+        written = new_lessons + [s for s in self.created_sections if s.pk]
+        written += [obj for objs in groups.values() for obj in objs]
+        record_changes(self.course.id, [
+            (SECTION if isinstance(obj, CourseSection) else LESSON, obj.pk, UPSERT) for obj in written
+        ])
+
+        bump_course(self.course.id, catalog=False)  # bulk_* : pas de signaux (après COMMIT)
+        return {
+            "ids": {ref: obj.id for ref, obj in self.refs.items() if obj.pk},
+            "created": len(new_lessons) + len([s for s in self.created_sections if s.pk]),
+            "updated": updated,
+            "deleted": len(deleted_sections) + len(deleted_lessons),
+        }
+
+
+def apply_batch(course: Course, operations) -> dict:
+    if not isinstance(operations, list) or not operations:
+        raise BatchError(-1, "operations : liste non vide attendue.")
+    if len(operations) > MAX_OPERATIONS:
+        raise BatchError(-1, f"{MAX_OPERATIONS} opérations maximum par lot.")
+    with transaction.atomic():
+        # ✅ verrou avant lecture : un ajout / réordonnancement concurrent ne peut pas produire
+        # des clés en double (contrainte différée -> échec au COMMIT)
+        Course.objects.select_for_update().filter(id=course.id).first()
+        batch = _Batch(course)
+        for index, op in enumerate(operations):
+            if not isinstance(op, dict):
+                raise BatchError(index, "objet attendu.")
+            batch.apply(index, op)
+        result = batch.save()
+    return {**result, "version": versions(course_id=course.id)[0]}  # bumpée au COMMIT
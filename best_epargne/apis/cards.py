@@ -0,0 +1,305 @@
+"""
+Sérialisation rapide des cartes de cours (listes explore / related).
+
+Travaille sur des lignes `values()` en une seule passe : pas d'instances modèle, pas de
+try/except par champ, URL de détail et libellés de choix précalculés une fois.
+Sortie identique à `_course_to_dict` (cartes apprenant) et à `PublicCourseSerializer`
+(explore public) — vérifiée par `python manage.py bench_course_cards`.
+
+`?fields=` / `?view=card` (cf. fieldsets.py) réduit à la fois les colonnes lues et les clés renvoyées.
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+
+from django.core.files.storage import default_storage
+from django.urls import NoReverseMatch, get_script_prefix, reverse
+from django.utils import timezone
+from django.utils.encoding import filepath_to_uri
+from rest_framework.settings import api_settings
+
+from catalog.models import Course
+from reviews.services import rating_annotations
+
+from .fieldsets import ALL, Fieldset
+
+# colonnes lues par les cartes apprenant (→ course_cards)
+CARD_FIELDS = (
+    "id", "title", "subtitle", "description",
+    "course_type", "pricing_type", "price", "currency", "status",
+    "thumbnail", "preview_video_url",
+    "published_at", "created_at", "updated_at",
+    "category__name",
+    "instructor_id", "instructor__full_name", "instructor__email",
+)
+
+# colonnes lues par les cartes publiques (→ public_course_cards)
+PUBLIC_CARD_FIELDS = (
+    "id", "title", "slug", "subtitle", "description",
+    "category__name", "category__slug",
+    "course_type", "pricing_type", "price", "currency", "status",
+    "published_at", "company_only", "thumbnail", "preview_video_url",
+)
+
+# clé de sortie -> colonnes nécessaires (clé absente = colonne du même nom)
+CARD_SOURCES = {
+    "course_type_label": ("course_type",),
+    "pricing_type_label": ("pricing_type",),
+    "thumbnail_url": ("thumbnail",),
+    "published_at": ("published_at", "created_at"),
+    "category_name": ("category__name",),
+    "instructor": ("instructor_id", "instructor__full_name", "instructor__email"),
+    "instructor_name": ("instructor__full_name", "instructor__email"),
+    "instructor_initials": ("instructor__full_name", "instructor__email"),
+    "rating": ("rating_avg",),
+}
+PUBLIC_CARD_SOURCES = {
+    "course_type_label": ("course_type",),
+    "pricing_type_label": ("pricing_type",),
+    "thumbnail_url": ("thumbnail",),
+    "is_popular": ("published_at",),
+    "color_gradient": ("pricing_type",),
+    "icon": ("course_type",),
+    "detail_url": ("slug",),
+    "preview_url": ("slug",),
+    "enroll_url": ("slug",),
+}
+
+# ?view=card : ce qu'affiche une carte (pas de description, pas de clés dupliquées)
+CARD_VIEWS = {
+    "card": (
+        "id", "title", "subtitle", "course_type", "course_type_label", "pricing_type", "pricing_type_label",
+        "price", "currency", "price_period", "thumbnail_url", "detail_url", "continue_url", "published_at",
+        "category_name", "instructor_name", "instructor_initials", "rating", "rating_count", "enrolled_count",
+        "is_enrolled",
+    ),
+    "detail": None,
+}
+PUBLIC_CARD_VIEWS = {
+    "card": (
+        "id", "title", "slug", "subtitle", "category_name", "course_type", "course_type_label", "pricing_type",
+        "pricing_type_label", "price", "currency", "price_period", "published_at", "thumbnail_url", "level",
+        "level_label", "duration", "enrolled_count", "rating", "is_popular", "color_gradient", "icon",
+        "instructor_name", "instructor_initials", "detail_url",
+    ),
+    "detail": None,
+}
+
+_RATING_COLUMNS = ("rating_avg", "rating_count")
+
+COURSE_TYPE_LABELS = {value: str(label) for value, label in Course.CourseType.choices}
+PRICING_TYPE_LABELS = {value: str(label) for value, label in Course.PricingType.choices}
+
+COURSE_TYPE_ICONS = {
+    Course.CourseType.CERTIFIANTE: "fas fa-certificate",
+    Course.CourseType.PROFESSIONNELLE: "fas fa-briefcase",
+    Course.CourseType.ACADEMIQUE: "fas fa-graduation-cap",
+    Course.CourseType.INTERNE: "fas fa-building",
+}
+PRICING_GRADIENTS = {
+    Course.PricingType.FREE: "from-green-600 to-green-500",
+    Course.PricingType.HYBRID: "from-yellow-600 to-yellow-500",
+}
+
+_PRICE_PLACES = Course._meta.get_field("price").decimal_places
+_ID_PLACEHOLDER = 2147483647
+_MEDIA_PROBE = "__card_probe__"
+
+
+def _initials(name: str) -> str:
+    name = (name or "").strip()
+    if not name:
+        return "F"
+    parts = [p for p in name.split() if p]
+    if len(parts) == 1:
+        return parts[0][:2].upper()
+    return (parts[0][0] + parts[1][0]).upper()
+
+
+@lru_cache(maxsize=8)
+def _detail_url_template(script_prefix: str) -> str:
+    # reverse() une seule fois par préfixe de script, puis format() par carte
+    try:
+        url = reverse("course_detail", args=[_ID_PLACEHOLDER])
+    except NoReverseMatch:
+        return "/courses/{}/"
+    return url.replace(str(_ID_PLACEHOLDER), "{}")
+
+
+@lru_cache(maxsize=1)
+def _media_base():
+    """
+    Préfixe public des médias quand l'URL ne dépend que du nom de fichier
+    (MinIO derrière AWS_S3_CUSTOM_DOMAIN, sans signature). None -> storage.url() par fichier.
+    """
+    if getattr(default_storage, "querystring_auth", False):
+        return None
+    try:
+        url = default_storage.url(_MEDIA_PROBE)
+    except Exception:
+        return None
+    return url[:-len(_MEDIA_PROBE)] if url.endswith(_MEDIA_PROBE) else None
+
+
+def media_url(name):
+    if not name:
+        return None
+    base = _media_base()
+    if base is not None:
+        return base + filepath_to_uri(name)
+    try:
+        return default_storage.url(name)
+    except Exception:
+        return None
+
+
+def card_values(qs, fieldset: Fieldset = ALL):
+    """Lignes values() pour course_cards : seules les colonnes (et agrégats de notes) demandés."""
+    columns = fieldset.columns(CARD_SOURCES, CARD_FIELDS + _RATING_COLUMNS)
+    ratings = {k: v for k, v in rating_annotations().items() if k in columns}
+    return qs.values(*[c for c in columns if c not in ratings], **ratings)
+
+
+def public_card_values(qs, fieldset: Fieldset = ALL):
+    return qs.values(*fieldset.columns(PUBLIC_CARD_SOURCES, PUBLIC_CARD_FIELDS))
+
+
+def course_cards(rows, enrolled=None, fieldset: Fieldset = ALL) -> list:
+    """
+    Cartes apprenant (même format que `_course_to_dict`).
+    rows: itérable de dicts `card_values(...)` / `values(*CARD_FIELDS)` (+ rating_avg / rating_count / enrolled_count)
+    enrolled: {course_id: enrolled_at} des inscriptions de l'utilisateur
+    fieldset: clés à renvoyer (colonnes absentes des lignes -> valeurs par défaut)
+    """
+    enrolled = enrolled or {}
+    detail = _detail_url_template(get_script_prefix())
+    type_labels = COURSE_TYPE_LABELS
+    pricing_labels = PRICING_TYPE_LABELS
+
+    out = []
+    append = out.append
+    for r in rows:
+        get = r.get
+        cid = r["id"]
+        url = detail.format(cid)
+        course_type = get("course_type")
+        pricing_type = get("pricing_type")
+        published_at = get("published_at") or get("created_at")
+        updated_at = get("updated_at")
+        name = get("instructor__full_name") or get("instructor__email") or "Formateur"
+        rating_avg = get("rating_avg")
+        is_enrolled = cid in enrolled
+        enrolled_at = enrolled.get(cid)
+
+        append({
+            "id": cid,
+            "title": get("title") or "",
+            "subtitle": get("subtitle") or "",
+            "description": get("description") or "",
+            "course_type": course_type,
+            "course_type_label": type_labels.get(course_type, course_type),
+            "pricing_type": pricing_type or "PAID",
+            "pricing_type_label": pricing_labels.get(pricing_type, pricing_type),
+            "price": get("price") or 0,
+            "currency": get("currency") or "XOF",
+            "status": get("status"),
+            "thumbnail_url": media_url(get("thumbnail")) or "",
+            "preview_video_url": get("preview_video_url") or "",
+
+            "detail_url": url,
+            "preview_url": url,
+            "enroll_url": url,
+            "continue_url": url if is_enrolled else None,
+
+            "published_at": published_at.isoformat() if published_at else None,
+            "updated_at": updated_at.isoformat() if updated_at else None,
+            "price_period": "cours",
+
+            "category_name": get("category__name") or "",
+
+            "instructor": {
+                "id": get("instructor_id"),
+                "full_name": name,
+            },
+            "instructor_name": name,
+            "instructor_initials": _initials(name),
+
+            "rating_avg": rating_avg,
+            "rating_count": get("rating_count"),
+            "rating": rating_avg,
+
+            "enrolled_count": get("enrolled_count") or 0,
+
+            "is_enrolled": is_enrolled,
+            "enrolled_at": enrolled_at.isoformat() if enrolled_at else None,
+        })
+    return fieldset.trim_all(out)
+
+
+def public_course_cards(rows, fieldset: Fieldset = ALL) -> list:
+    """
+    Cartes publiques (même format que `PublicCourseSerializer`, rendu DRF des décimaux/dates inclus).
+    rows: itérable de dicts `public_card_values(...)` / `values(*PUBLIC_CARD_FIELDS)`
+    """
+    tz = timezone.get_current_timezone()
+    coerce_price = api_settings.COERCE_DECIMAL_TO_STRING
+    price_format = f".{_PRICE_PLACES}f"
+    type_labels = COURSE_TYPE_LABELS
+    pricing_labels = PRICING_TYPE_LABELS
+
+    out = []
+    append = out.append
+    for r in rows:
+        get = r.get
+        slug = get("slug")
+        course_type = get("course_type")
+        pricing_type = get("pricing_type")
+        price = get("price")
+        published_at = get("published_at")
+        if published_at is not None:
+            # même rendu que serializers.DateTimeField (fuseau courant, "Z" pour UTC)
+            published_at = timezone.localtime(published_at, tz).isoformat()
+            if published_at.endswith("+00:00"):
+                published_at = published_at[:-6] + "Z"
+
+        append({
+            "id": r["id"],
+            "title": get("title"),
+            "slug": slug,
+            "subtitle": get("subtitle"),
+            "description": get("description"),
+            "category_name": get("category__name"),
+            "category_slug": get("category__slug"),
+            "course_type": course_type,
+            "course_type_label": type_labels.get(course_type, course_type),
+            "pricing_type": pricing_type,
+            "pricing_type_label": pricing_labels.get(pricing_type, pricing_type),
+            "price": format(price, price_format) if coerce_price and price is not None else price,
+            "currency": get("currency"),
+            "price_period": "cours",
+            "status": get("status"),
+            "published_at": published_at,
+            "company_only": get("company_only"),
+            "thumbnail_url": media_url(get("thumbnail")),
+            "preview_video_url": get("preview_video_url"),
+
+            # valeurs par défaut attendues par le front (absentes du modèle)
+            "level": "beginner",
+            "level_label": "Débutant",
+            "level_color": "green",
+            "duration": "—",
+            "enrolled_count": 0,
+            "rating": 0.0,
+            "is_popular": published_at is not None,
+            "color_gradient": PRICING_GRADIENTS.get(pricing_type, "from-blue-600 to-blue-500"),
+            "icon": COURSE_TYPE_ICONS.get(course_type, "fas fa-book-open"),
+
+            # ⚠️ User n'a ni get_full_name ni username : le serializer renvoie toujours "Formateur"
+            "instructor_name": "Formateur",
+            "instructor_initials": "F",
+
+            "detail_url": f"/courses/{slug}/",
+            "preview_url": f"/courses/{slug}/",
+            "enroll_url": f"/courses/{slug}/enroll/",
+        })
+    return fieldset.trim_all(out)
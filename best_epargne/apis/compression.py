@@ -0,0 +1,93 @@
+"""
+Compression négociée (brotli / gzip) des réponses JSON au-delà d'un seuil.
+
+Whitenoise ne couvre que les fichiers statiques. Brotli est optionnel (paquet `Brotli`) :
+sans lui, gzip seul. Comme GZipMiddleware, un ETag fort devient faible une fois compressé.
+"""
+from __future__ import annotations
+
+import gzip
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except Exception:  # pragma: no cover
+    brotli = None
+
+
+def _accepted(header: str) -> dict:
+    """'br;q=1.0, gzip;q=0.8, *;q=0' -> {"br": 1.0, "gzip": 0.8, "*": 0.0}"""
+    out = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        out[name] = q
+    return out
+
+
+def negotiate(header: str):
+    accepted = _accepted(header or "")
+    if not accepted:
+        return None
+    star = accepted.get("*", 0.0)
+    br = accepted.get("br", star) if brotli is not None else 0.0
+    gz = accepted.get("gzip", star)
+    if br > 0 and br >= gz:
+        return "br"
+    if gz > 0:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=getattr(settings, "API_BROTLI_QUALITY", 5))
+    return gzip.compress(body, compresslevel=getattr(settings, "API_GZIP_LEVEL", 6), mtime=0)
+
+
+class JSONCompressionMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (
+            not getattr(settings, "API_COMPRESSION_ENABLED", True)
+            or response.streaming
+            or response.status_code != 200
+            or response.has_header("Content-Encoding")
+            or not response.get("Content-Type", "").startswith("application/json")
+        ):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        body = response.content
+        if len(body) < getattr(settings, "API_COMPRESSION_MIN_BYTES", 1024):
+            return response
+
+        encoding = negotiate(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if encoding is None:
+            return response
+
+        compressed = compress(body, encoding)
+        if len(compressed) >= len(body):
+            return response
+
+        response.content = compressed
+        response["Content-Length"] = str(len(compressed))
+        response["Content-Encoding"] = encoding
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        return response
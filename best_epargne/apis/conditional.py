@@ -0,0 +1,91 @@
+"""
+Requêtes conditionnelles (ETag / If-None-Match) pour les vues APIView.
+
+L'ETag est calculé AVANT la vue à partir de versions de contenu (catalog/versioning.py) :
+un If-None-Match correspondant renvoie 304 sans requête métier ni sérialisation JSON.
+"""
+from __future__ import annotations
+
+import hashlib
+from functools import wraps
+
+from django.http import HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags, quote_etag
+
+from catalog.versioning import versions
+
+
+def make_etag(*parts) -> str:
+    raw = "|".join(str(p) for p in parts)
+    return quote_etag(hashlib.sha1(raw.encode()).hexdigest()[:32])
+
+
+def _matches(etag: str, if_none_match: str) -> bool:
+    # comparaison faible (RFC 9110) : W/"x" (réponse recompressée) correspond à "x"
+    etags = parse_etags(if_none_match)
+    if "*" in etags:
+        return True
+    strip = etag.removeprefix("W/")
+    return any(e.removeprefix("W/") == strip for e in etags)
+
+
+def conditional(parts_func, private: bool = True):
+    """
+    Décorateur de get() / list() / retrieve().
+    parts_func(request, *args, **kwargs) -> composants de version (None = pas d'ETag).
+    Le chemin et la query string sont toujours inclus.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(view, request, *args, **kwargs):
+            parts = parts_func(request, *args, **kwargs)
+            if parts is None:
+                return method(view, request, *args, **kwargs)
+
+            etag = make_etag(request.path, request.META.get("QUERY_STRING", ""), *parts)
+            if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+            if if_none_match and _matches(etag, if_none_match):
+                response = HttpResponseNotModified()
+            else:
+                response = method(view, request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+
+            response["ETag"] = etag
+            # ✅ le navigateur garde la réponse mais revalide à chaque fois
+            patch_cache_control(response, no_cache=True, **({"private": True} if private else {"public": True}))
+            return response
+        return wrapper
+    return decorator
+
+
+# ------------------------------------------------------------------
+# Composants de version usuels (cf. catalog/versioning.py)
+# ------------------------------------------------------------------
+def catalog_parts(request, *args, **kwargs):
+    """Listes publiques : génération du catalogue."""
+    return versions(catalog=True)
+
+
+def learner_catalog_parts(request, *args, **kwargs):
+    """Listes apprenant (is_enrolled) : catalogue + inscriptions de l'utilisateur."""
+    user_id = request.user.id
+    return [user_id, *versions(catalog=True, user_id=user_id)]
+
+
+def course_parts(request, course_id=None, pk=None, **kwargs):
+    """Détail d'un cours : catalogue (catégorie, notes) + cours."""
+    return versions(catalog=True, course_id=course_id if course_id is not None else pk)
+
+
+def learner_course_parts(request, course_id=None, **kwargs):
+    """Détail apprenant : catalogue + cours + inscriptions de l'utilisateur."""
+    user_id = request.user.id
+    return [user_id, *versions(catalog=True, course_id=course_id, user_id=user_id)]
+
+
+def learner_outline_parts(request, course_id=None, **kwargs):
+    """Sommaire / lecteur : programme du cours + progression de l'utilisateur (pas le catalogue)."""
+    user_id = request.user.id
+    return [user_id, *versions(course_id=course_id, user_id=user_id)]
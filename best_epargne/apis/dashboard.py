@@ -0,0 +1,298 @@
+"""
+Tableau de bord apprenant : sections me / kpis / enrollments / notifications / payments.
+
+Les vues /api/learner/<section>/ et l'agrégat /api/learner/dashboard/ utilisent les mêmes
+builders (mêmes formes JSON). L'agrégat :
+- lit les inscriptions une seule fois (kpis + liste des cours),
+- met chaque section en cache avec son TTL (LEARNER_DASHBOARD_TTLS), clé versionnée
+  par catalog/versioning.py quand la section dépend des inscriptions / du catalogue,
+- lance les requêtes indépendantes en parallèle (LEARNER_DASHBOARD_WORKERS threads).
+
+⚠️ chaque thread du pool a sa propre connexion DB, gardée entre les jobs pendant
+LEARNER_DASHBOARD_CONN_MAX_AGE secondes. Le CONN_MAX_AGE global reste à 0 : sous ASGI, le code
+synchrone de chaque requête tourne dans un thread neuf et une connexion persistante n'y serait
+jamais réutilisée (ticket Django #33497).
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, connection
+from django.db.models import Avg, Q, Sum
+from django.utils import timezone
+
+from catalog.models import Notification, Payment
+from catalog.versioning import versions
+from enrollments.models import Enrollment, LessonProgress
+from reviews.models import Review
+
+from .cards import media_url
+
+logger = logging.getLogger(__name__)
+
+SECTIONS = ("me", "kpis", "enrollments", "notifications", "payments")
+
+DEFAULT_TTLS = {"me": 0, "kpis": 300, "enrollments": 300, "notifications": 15, "payments": 60}
+
+# colonnes lues pour la liste des cours (et les kpis)
+ENROLLMENT_COLUMNS = (
+    "id", "user_id", "course_id", "status", "enrolled_at",
+    "course__id", "course__title", "course__subtitle", "course__thumbnail", "course__status",
+    "course__pricing_type", "course__price", "course__currency",
+)
+COMPLETED_STATUSES = ("COMPLETED", "DONE")
+
+
+def range_to_days(r: str) -> int:
+    r = (r or "30d").lower().strip()
+    return {"7d": 7, "30d": 30, "90d": 90}.get(r, 30)
+
+
+# ------------------------------------------------------------------
+# Requêtes (indépendantes -> parallélisables)
+# ------------------------------------------------------------------
+def enrollment_rows(user, q: str = "") -> list:
+    qs = Enrollment.objects.filter(user=user).select_related("course").only(*ENROLLMENT_COLUMNS).order_by("-id")
+    if q:
+        qs = qs.filter(
+            Q(course__title__icontains=q) |
+            Q(course__subtitle__icontains=q) |
+            Q(course__description__icontains=q)
+        )
+    return list(qs)
+
+
+def progress_stats(user) -> dict:
+    return LessonProgress.objects.filter(enrollment__user=user).aggregate(
+        avg=Avg("progress_percent"), seconds=Sum("last_position_sec"),
+    )
+
+
+def avg_rating_given(user):
+    return Review.objects.filter(user=user).aggregate(a=Avg("rating"))["a"]
+
+
+# ------------------------------------------------------------------
+# Sections (formes JSON des endpoints /api/learner/<section>/)
+# ------------------------------------------------------------------
+def me_section(user) -> dict:
+    return {
+        "id": user.id,
+        "email": getattr(user, "email", "") or "",
+        "full_name": getattr(user, "full_name", "") or getattr(user, "get_full_name", lambda: "")() or "",
+        "phone": getattr(user, "phone", "") or "",
+        "role": getattr(user, "role", None),
+        "is_staff": bool(getattr(user, "is_staff", False)),
+    }
+
+
+def kpis_section(enrollments: list, progress: dict, rating_avg_given, days: int) -> dict:
+    since = timezone.now() - timedelta(days=days)
+    return {
+        "range": f"{days}d",
+        "enrollments": {
+            "total": len(enrollments),
+            "recent": sum(1 for e in enrollments if e.enrolled_at and e.enrolled_at >= since),
+            "completed": sum(1 for e in enrollments if e.status in COMPLETED_STATUSES),
+        },
+        "progress": {
+            "avg_percent": progress.get("avg"),  # ex: 63.4
+            "hours_watched_est": int((progress.get("seconds") or 0) / 3600),
+        },
+        "reviews": {
+            "avg_rating_given": rating_avg_given,
+        },
+    }
+
+
+def enrollments_section(enrollments: list, status: str = "", limit: int = 100) -> dict:
+    if status:
+        enrollments = [e for e in enrollments if e.status == status]
+
+    results = []
+    for e in enrollments[:limit]:
+        c = e.course
+        results.append({
+            "enrollment_id": e.id,
+            "course": {
+                "id": c.id,
+                "title": c.title or "",
+                "subtitle": c.subtitle or "",
+                "thumbnail_url": media_url(c.thumbnail.name if c.thumbnail else None),
+                "status": c.status,
+                "pricing_type": c.pricing_type,
+                "price": c.price,
+                "currency": c.currency or "XOF",
+            },
+            "status": e.status,
+            "progress_percent": None,  # ✅ progression détaillée : /api/learner/courses/<id>/progress/
+            "created_at": e.enrolled_at,
+        })
+    return {"count": len(enrollments), "results": results}
+
+
+def notifications_section(user, limit: int = 50) -> dict:
+    qs = Notification.objects.filter(user=user).order_by("-created_at")
+    rows = qs.values("id", "title", "body", "created_at", "is_read")[:limit]
+    results = [{
+        "id": n["id"],
+        "title": n["title"] or "",
+        "body": n["body"] or "",
+        "time": n["created_at"],
+        "is_read": bool(n["is_read"]),
+    } for n in rows]
+    return {"count": qs.count() if len(results) >= limit else len(results), "results": results}
+
+
+def payments_section(user, limit: int = 100) -> dict:
+    qs = Payment.objects.filter(user=user).order_by("-created_at")
+    rows = qs.values("id", "reference", "created_at", "amount", "currency", "status")[:limit]
+    results = [{
+        "id": p["id"],
+        "ref": p["reference"] or str(p["id"]),
+        "date": p["created_at"],
+        "amount": p["amount"],
+        "currency": p["currency"] or "XOF",
+        "status": p["status"],
+        "status_label": p["status"],
+    } for p in rows]
+    return {"count": qs.count() if len(results) >= limit else len(results), "results": results}
+
+
+# ------------------------------------------------------------------
+# Agrégat
+# ------------------------------------------------------------------
+_executor = None
+
+
+def _pool():
+    global _executor
+    workers = int(getattr(settings, "LEARNER_DASHBOARD_WORKERS", 4))
+    if workers <= 0:
+        return None
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="learner-dashboard")
+    return _executor
+
+
+def _in_thread(fn):
+    # threads du pool durables : la connexion du thread est réutilisée d'un job à l'autre
+    if connection.connection is not None and not connection.is_usable():
+        connection.close()  # serveur redémarré, connexion coupée...
+    if connection.connection is None:
+        connection.ensure_connection()
+        connection.close_at = time.monotonic() + int(getattr(settings, "LEARNER_DASHBOARD_CONN_MAX_AGE", 60))
+    try:
+        return fn()
+    finally:
+        close_old_connections()  # fermée si erreur ou au-delà de close_at
+
+
+def run_jobs(jobs: dict) -> dict:
+    """{nom: callable} -> {nom: (résultat, exception)} ; le premier job tourne dans le thread courant."""
+    if not jobs:
+        return {}
+    names = list(jobs)
+    pool = _pool()
+    futures = {}
+    if pool is not None:
+        futures = {name: pool.submit(_in_thread, jobs[name]) for name in names[1:]}
+
+    out = {}
+    for name in names:
+        try:
+            out[name] = (futures[name].result() if name in futures else jobs[name](), None)
+        except Exception as exc:
+            out[name] = (None, exc)
+    return out
+
+
+def _ttl(section: str) -> int:
+    ttls = {**DEFAULT_TTLS, **getattr(settings, "LEARNER_DASHBOARD_TTLS", {})}
+    return int(ttls.get(section) or 0)
+
+
+def _cache_key(section: str, user_id, params: tuple) -> str:
+    if section in ("kpis", "payments"):
+        params += tuple(versions(user_id=user_id))
+    elif section == "enrollments":
+        params += tuple(versions(catalog=True, user_id=user_id))
+    digest = hashlib.sha1(repr(params).encode()).hexdigest()[:16]
+    return f"bestep:dash:{section}:{user_id}:{digest}"
+
+
+def build_dashboard(user, sections=SECTIONS, days: int = 30, q: str = "", status: str = "",
+                    limits: dict | None = None) -> dict:
+    """
+    -> {"me": {...}, "kpis": {...}, ...} (+ "errors": [sections] si une section a échoué).
+    Les sections en cache ne déclenchent aucune requête.
+    """
+    limits = {"enrollments": 100, "notifications": 50, "payments": 100, **(limits or {})}
+    params = {
+        "kpis": (days,),
+        "enrollments": (q, status, limits["enrollments"]),
+        "notifications": (limits["notifications"],),
+        "payments": (limits["payments"],),
+    }
+
+    keys = {s: _cache_key(s, user.id, params[s]) for s in sections if s in params and _ttl(s)}
+    found = cache.get_many(list(keys.values())) if keys else {}
+    data = {s: found[k] for s, k in keys.items() if k in found}
+    if "me" in sections:
+        data["me"] = me_section(user)  # request.user déjà chargé : rien à lire
+    missing = [s for s in sections if s not in data]
+
+    # ✅ une seule lecture des inscriptions si kpis et liste sont à calculer (sans recherche q)
+    jobs = {}
+    if "kpis" in missing or ("enrollments" in missing and not q):
+        jobs["enrollment_rows"] = lambda: enrollment_rows(user)
+    if "enrollments" in missing and q:
+        jobs["enrollment_search"] = lambda: enrollment_rows(user, q)
+    if "kpis" in missing:
+        jobs["progress"] = lambda: progress_stats(user)
+        jobs["rating"] = lambda: avg_rating_given(user)
+    if "notifications" in missing:
+        jobs["notifications"] = lambda: notifications_section(user, limits["notifications"])
+    if "payments" in missing:
+        jobs["payments"] = lambda: payments_section(user, limits["payments"])
+    results = run_jobs(jobs)
+
+    def result(*names):
+        for name in names:
+            value, exc = results[name]
+            if exc is not None:
+                raise exc
+        return [results[name][0] for name in names]
+
+    builders = {
+        "kpis": lambda: kpis_section(*result("enrollment_rows", "progress", "rating"), days),
+        "enrollments": lambda: enrollments_section(
+            *result("enrollment_search" if q else "enrollment_rows"), status, limits["enrollments"]),
+        "notifications": lambda: result("notifications")[0],
+        "payments": lambda: result("payments")[0],
+    }
+
+    errors, to_cache = [], {}
+    for section in missing:
+        try:
+            data[section] = builders[section]()
+        except Exception:
+            logger.exception("learner dashboard: section %s en échec", section)
+            errors.append(section)
+            continue
+        if section in keys:
+            to_cache[section] = data[section]
+
+    for section, value in to_cache.items():
+        cache.set(keys[section], value, _ttl(section))
+
+    out = {s: data[s] for s in sections if s in data}
+    if errors:
+        out["errors"] = errors
+    return out
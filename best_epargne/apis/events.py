@@ -0,0 +1,85 @@
+"""
+Évènements temps réel (notifications, inscriptions, certificats).
+
+Les producteurs (signaux, services) publient sur un canal Redis pub/sub par utilisateur ;
+la vue SSE (`best_epargne.apis.streams`) s'abonne à ce canal et pousse les messages au navigateur.
+"""
+from __future__ import annotations
+
+import json
+import logging
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+EVENT_NOTIFICATION = "notification"
+EVENT_ENROLLMENT = "enrollment"
+EVENT_CERTIFICATE_READY = "certificate_ready"
+
+
+def user_channel(user_id) -> str:
+    prefix = getattr(settings, "EVENTS_CHANNEL_PREFIX", "bestep:events:user")
+    return f"{prefix}:{user_id}"
+
+
+def redis_url() -> str:
+    return getattr(settings, "REDIS_URL", None) or settings.CACHES["default"]["LOCATION"]
+
+
+def encode_event(event: str, data: dict) -> str:
+    return json.dumps({"event": event, "data": data}, cls=DjangoJSONEncoder, ensure_ascii=False)
+
+
+def _publish_now(user_id, message: str) -> None:
+    try:
+        from django_redis import get_redis_connection
+        get_redis_connection("default").publish(user_channel(user_id), message)
+    except Exception:
+        # le temps réel est un confort : ne jamais casser l'écriture métier
+        logger.warning("SSE publish failed for user=%s", user_id, exc_info=True)
+
+
+def publish_user_event(user_id, event: str, data: dict) -> None:
+    """
+    Publie un évènement pour un utilisateur, après COMMIT de la transaction courante
+    (évite de notifier une ligne qui sera rollback).
+    """
+    if not user_id:
+        return
+    message = encode_event(event, data)
+    transaction.on_commit(lambda: _publish_now(user_id, message))
+
+
+# ---------- payloads (mêmes formes que les endpoints REST) ----------
+def notification_payload(n) -> dict:
+    return {
+        "id": n.id,
+        "title": n.title or "",
+        "body": n.body or "",
+        "level": n.level,
+        "action_url": n.action_url or "",
+        "time": n.created_at,
+        "is_read": bool(n.is_read),
+    }
+
+
+def enrollment_payload(e) -> dict:
+    return {
+        "enrollment_id": e.id,
+        "course_id": e.course_id,
+        "status": e.status,
+        "enrolled_at": e.enrolled_at,
+    }
+
+
+def certificate_payload(cert) -> dict:
+    return {
+        "certificate_id": cert.id,
+        "course_id": cert.course_id,
+        "serial": cert.serial,
+        "score_percent": cert.score_percent,
+        "issued_at": cert.issued_at,
+    }
@@ -0,0 +1,91 @@
+"""
+Sparse fieldsets : `?fields=a,b,c` ou `?view=card|detail`.
+
+La sélection pilote à la fois la requête (colonnes values()/only() : les gros textes ne
+sont jamais lus s'ils ne sont pas demandés) et la sortie (clés retirées).
+Sans paramètre : réponse complète, inchangée (compat front actuel).
+"""
+from __future__ import annotations
+
+
+class Fieldset:
+    """
+    keys: ensemble des clés de sortie demandées, None = toutes.
+    explicit: un paramètre fields/view a été fourni (-> on peut retirer les clés compat dupliquées).
+    """
+
+    def __init__(self, keys=None, explicit: bool = False):
+        self.keys = frozenset(keys) if keys is not None else None
+        self.explicit = explicit
+
+    def __contains__(self, key) -> bool:
+        return self.keys is None or key in self.keys
+
+    def wants_any(self, *keys) -> bool:
+        return self.keys is None or not self.keys.isdisjoint(keys)
+
+    def trim(self, item: dict) -> dict:
+        if self.keys is None:
+            return item
+        return {k: v for k, v in item.items() if k in self.keys}
+
+    def trim_all(self, items) -> list:
+        if self.keys is None:
+            return list(items)
+        keys = self.keys
+        return [{k: v for k, v in item.items() if k in keys} for item in items]
+
+    def columns(self, sources: dict, base) -> list:
+        """
+        Colonnes à lire pour produire les clés demandées.
+        sources: {clé de sortie: (colonnes...)} ; une clé absente de `sources` est lue telle quelle
+        si elle fait partie de `base`, sinon elle est calculée sans colonne.
+        """
+        if self.keys is None:
+            return list(base)
+        base = tuple(base)
+        wanted = {"id"}
+        for key in self.keys:
+            if key in sources:
+                wanted.update(sources[key])
+            elif key in base:
+                wanted.add(key)
+        return [c for c in base if c in wanted]
+
+
+ALL = Fieldset()
+
+
+def parse_fieldset(request, views: dict, default: str = "detail") -> Fieldset:
+    """
+    views: {"card": (clés...), "detail": None}  (None = toutes les clés)
+    `fields=` l'emporte sur `view=` ; les clés inconnues sont ignorées, `id` est toujours renvoyé.
+    """
+    params = getattr(request, "query_params", None) or request.GET
+    raw_fields = (params.get("fields") or "").strip()
+    view = (params.get("view") or "").strip().lower()
+
+    if raw_fields:
+        keys = {k.strip() for k in raw_fields.split(",") if k.strip()}
+        keys.add("id")
+        return Fieldset(keys, explicit=True)
+
+    if view in views:
+        return Fieldset(views[view], explicit=True)
+    return Fieldset(views.get(default), explicit=False)
+
+
+class SparseFieldsMixin:
+    """
+    Serializer : retire les champs (lecture) absents de context["fieldset"].
+    Les champs write_only restent : les écritures ne sont pas concernées.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fieldset = self.context.get("fieldset")
+        if fieldset is None or fieldset.keys is None:
+            return
+        for name in list(self.fields):
+            if name not in fieldset.keys and not self.fields[name].write_only:
+                self.fields.pop(name)
@@ -0,0 +1,89 @@
+"""
+Clés d'idempotence (en-tête Idempotency-Key) pour les POST des APIView.
+
+Clé cache = utilisateur + méthode + chemin (route résolue, ids compris) + Idempotency-Key.
+- 1re requête : exécutée sous verrou (cache.add), réponse conservée IDEMPOTENCY_TTL secondes ;
+- reprise : réponse rejouée en une lecture cache (en-tête Idempotent-Replayed: true) ;
+- doublon simultané : 409 immédiat + Retry-After (jamais d'attente : sous ASGI, les vues sync
+  partagent un thread par worker), la reprise rejoue ensuite la 1re réponse ;
+- même clé, autre contenu : 422.
+Les réponses 5xx, 409 et 429 ne sont pas conservées (le client peut réessayer avec la même clé).
+Sans en-tête, la vue s'exécute normalement.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+
+HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+LOCK_TTL = 30
+NOT_STORED = {status.HTTP_409_CONFLICT, status.HTTP_429_TOO_MANY_REQUESTS}
+KEPT_HEADERS = ("Location", "ETag")
+
+
+def fingerprint(data) -> str:
+    if hasattr(data, "lists"):  # QueryDict (form / multipart)
+        data = {k: v for k, v in data.lists()}
+    return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _cache_key(request, key: str) -> str:
+    raw = f"{request.user.pk}|{request.method}|{request.path}|{key}"
+    return f"bestep:idem:{hashlib.sha256(raw.encode()).hexdigest()[:40]}"
+
+
+def _replay(stored: dict, body: str) -> Response:
+    if stored["fingerprint"] != body:
+        return Response({"detail": f"{HEADER} déjà utilisée avec un autre contenu."},
+                        status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+    response = Response(stored["data"], status=stored["status"])
+    for name, value in stored["headers"].items():
+        response[name] = value
+    response[REPLAYED_HEADER] = "true"
+    return response
+
+
+def idempotent(method):
+    """Décorateur de post() : rejoue la première réponse pour une même Idempotency-Key."""
+    @wraps(method)
+    def wrapper(view, request, *args, **kwargs):
+        key = (request.headers.get(HEADER) or "").strip()[:255]
+        if not key or not request.user.is_authenticated:
+            return method(view, request, *args, **kwargs)
+
+        cache_key, body = _cache_key(request, key), fingerprint(request.data)
+        stored = cache.get(cache_key)
+        if stored is not None:
+            return _replay(stored, body)
+
+        lock_key = f"{cache_key}:lock"
+        if not cache.add(lock_key, 1, timeout=LOCK_TTL):
+            response = Response({"detail": "Requête identique en cours de traitement."},
+                                status=status.HTTP_409_CONFLICT)
+            response["Retry-After"] = str(getattr(settings, "IDEMPOTENCY_RETRY_AFTER", 1))
+            return response
+
+        try:
+            stored = cache.get(cache_key)  # 1re requête terminée entre la lecture et le verrou
+            if stored is not None:
+                return _replay(stored, body)
+            response = method(view, request, *args, **kwargs)
+            if response.status_code < 500 and response.status_code not in NOT_STORED:
+                cache.set(cache_key, {
+                    "fingerprint": body,
+                    "status": response.status_code,
+                    "data": response.data,
+                    "headers": {h: response[h] for h in KEPT_HEADERS if response.has_header(h)},
+                }, timeout=getattr(settings, "IDEMPOTENCY_TTL", 24 * 3600))
+            return response
+        finally:
+            cache.delete(lock_key)
+
+    return wrapper
@@ -0,0 +1,56 @@
+"""
+Pagination keyset (curseur opaque) : coût constant quelle que soit la profondeur,
+contrairement à OFFSET qui relit toutes les lignes précédentes.
+"""
+from __future__ import annotations
+
+import base64
+from datetime import datetime
+
+from django.db.models import Q
+
+
+def encode_cursor(dt: datetime, pk) -> str:
+    raw = f"{dt.isoformat()}|{pk}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """
+    -> (datetime, pk) ou None si curseur absent / invalide.
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        dt_raw, pk_raw = base64.urlsafe_b64decode(padded.encode()).decode().rsplit("|", 1)
+        return datetime.fromisoformat(dt_raw), int(pk_raw)
+    except Exception:
+        return None
+
+
+def keyset_page(qs, cursor: str, limit: int, field: str = "created_at"):
+    """
+    Page décroissante sur (field, id). `qs` ne doit pas être déjà trié.
+    -> (items, next_cursor)
+    """
+    pos = decode_cursor(cursor)
+    if pos:
+        dt, pk = pos
+        qs = qs.filter(Q(**{f"{field}__lt": dt}) | Q(**{field: dt, "id__lt": pk}))
+
+    items = list(qs.order_by(f"-{field}", "-id")[:limit + 1])
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        next_cursor = encode_cursor(getattr(last, field), last.id)
+    return items, next_cursor
+
+
+def parse_limit(raw, default: int = 20, maximum: int = 100) -> int:
+    try:
+        limit = int(raw or default)
+    except (TypeError, ValueError):
+        limit = default
+    return max(1, min(limit, maximum))
@@ -0,0 +1,62 @@
+"""
+Renderer / parser JSON basés sur orjson.
+
+Même sortie que le JSONRenderer DRF (datetime ISO avec "Z" pour UTC, Decimal -> float,
+UUID -> str, \\u2028/\\u2029 échappés) ; datetime/UUID/date sont encodés nativement en C,
+le reste passe par l'encodeur DRF. Repli automatique sur l'implémentation DRF si orjson
+est absent, si une indentation est demandée (API navigable) ou si orjson refuse la donnée.
+"""
+from __future__ import annotations
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except Exception:  # pragma: no cover
+    orjson = None
+
+_OPTIONS = (orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS) if orjson is not None else 0
+_default = JSONEncoder().default  # Decimal, Promise, timedelta, QuerySet, générateurs...
+
+
+class ORJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if (
+            orjson is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=_default, option=_OPTIONS)
+        except (orjson.JSONEncodeError, TypeError):
+            # entiers > 64 bits, clés non sérialisables... -> encodeur DRF
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # ✅ comme DRF : sortie sous-ensemble strict de JavaScript
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
+
+
+class ORJSONParser(JSONParser):
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower().replace("-", "") != "utf8":
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError("JSON parse error - %s" % str(exc))
@@ -2,6 +2,7 @@ from django.utils.timesince import timesince
 from rest_framework import serializers
 from catalog.models import Course, CourseSection, Lesson, Category, MediaAsset
 from commerce.models import OrderItem
+from .fieldsets import SparseFieldsMixin
 
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -61,7 +62,7 @@ class CourseSectionSerializer(serializers.ModelSerializer):
         fields = ["id", "title", "order", "lessons"]
 
 
-class CourseSerializer(serializers.ModelSerializer):
+class CourseSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     category = CategorySerializer(read_only=True)
 
     thumbnail_url = serializers.SerializerMethodField()
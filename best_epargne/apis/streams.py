@@ -0,0 +1,98 @@
+"""
+GET /api/learner/events/ et /api/instructor/events/
+-> flux Server-Sent Events (text/event-stream), servi par l'application ASGI.
+
+Une connexion inactive ne coûte qu'un abonnement Redis + une coroutine : pas de worker bloqué,
+contrairement au polling des dashboards.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+
+from .events import redis_url, user_channel
+
+try:
+    import redis.asyncio as aioredis
+except Exception:  # pragma: no cover
+    aioredis = None
+
+_pool = None
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        _pool = aioredis.ConnectionPool.from_url(redis_url())
+    return _pool
+
+
+@sync_to_async
+def _authenticated_user_id(request):
+    u = request.user
+    return u.id if u.is_authenticated else None
+
+
+def _sse(event: str, data: str, event_id=None) -> str:
+    out = ""
+    if event_id is not None:
+        out += f"id: {event_id}\n"
+    out += f"event: {event}\n"
+    for line in data.splitlines() or [""]:
+        out += f"data: {line}\n"
+    return out + "\n"
+
+
+async def _event_iter(user_id):
+    heartbeat = getattr(settings, "EVENTS_HEARTBEAT_SECONDS", 20)
+    # ✅ durée de vie bornée : le navigateur se reconnecte (retry), aucune coroutine orpheline
+    max_age = getattr(settings, "EVENTS_STREAM_MAX_SECONDS", 300)
+
+    client = aioredis.Redis(connection_pool=_get_pool())
+    pubsub = client.pubsub()
+    await pubsub.subscribe(user_channel(user_id))
+    try:
+        yield f"retry: {getattr(settings, 'EVENTS_RETRY_MS', 5000)}\n\n"
+        deadline = time.monotonic() + max_age
+        seq = 0
+        while time.monotonic() < deadline:
+            msg = await pubsub.get_message(ignore_subscribe_messages=True, timeout=heartbeat)
+            if msg is None:
+                yield ": ping\n\n"
+                continue
+            raw = msg["data"]
+            if isinstance(raw, bytes):
+                raw = raw.decode("utf-8")
+            try:
+                event = json.loads(raw).get("event") or "message"
+            except ValueError:
+                continue
+            seq += 1
+            yield _sse(event, raw, event_id=seq)
+    except asyncio.CancelledError:
+        raise
+    finally:
+        try:
+            await pubsub.unsubscribe()
+            await pubsub.aclose()
+        except Exception:
+            pass
+
+
+async def user_event_stream(request):
+    if aioredis is None:
+        return JsonResponse({"detail": "Temps réel indisponible."}, status=503)
+
+    user_id = await _authenticated_user_id(request)
+    if not user_id:
+        return JsonResponse({"detail": "Authentification requise."}, status=401)
+
+    response = StreamingHttpResponse(_event_iter(user_id), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # nginx/traefik: pas de bufferisation
+    return response
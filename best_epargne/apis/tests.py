@@ -0,0 +1,89 @@
+from types import SimpleNamespace
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory, force_authenticate
+from rest_framework.views import APIView
+
+from . import idempotency
+from .idempotency import REPLAYED_HEADER, idempotent
+
+User = get_user_model()
+
+
+class _CreateView(APIView):
+    calls = 0
+
+    @idempotent
+    def post(self, request):
+        type(self).calls += 1
+        return Response({"id": type(self).calls}, status=status.HTTP_201_CREATED)
+
+
+class _LateCache:
+    """cache.get manqué une fois : la 1re requête se termine entre la lecture et le verrou."""
+
+    def __init__(self):
+        self.missed = False
+
+    def __getattr__(self, name):
+        return getattr(cache, name)
+
+    def get(self, key, default=None):
+        if not self.missed:
+            self.missed = True
+            return default
+        return cache.get(key, default)
+
+
+class IdempotencyTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        _CreateView.calls = 0
+        self.user = User.objects.create_user("buyer@example.com", "x")
+
+    def _post(self, data, key="cle-1"):
+        request = APIRequestFactory().post("/api/orders/", data, format="json", **{"HTTP_IDEMPOTENCY_KEY": key})
+        force_authenticate(request, user=self.user)
+        return _CreateView.as_view()(request)
+
+    def _lock_key(self, key="cle-1"):
+        request = SimpleNamespace(user=self.user, method="POST", path="/api/orders/")
+        return f"{idempotency._cache_key(request, key)}:lock"
+
+    def test_retry_replays_first_response(self):
+        first, retry = self._post({"course": 1}), self._post({"course": 1})
+        self.assertEqual((retry.status_code, retry.data), (first.status_code, first.data))
+        self.assertEqual(retry[REPLAYED_HEADER], "true")
+        self.assertEqual(_CreateView.calls, 1)
+
+    def test_concurrent_duplicate_gets_409(self):
+        cache.add(self._lock_key(), 1)  # 1re requête en cours
+        response = self._post({"course": 1})
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertTrue(response.has_header("Retry-After"))
+        self.assertEqual(_CreateView.calls, 0)
+
+    def test_same_key_other_body_gets_422(self):
+        self._post({"course": 1})
+        self.assertEqual(self._post({"course": 2}).status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(_CreateView.calls, 1)
+
+    def test_response_stored_before_lock_is_replayed(self):
+        self._post({"course": 1})
+        with mock.patch.object(idempotency, "cache", _LateCache()):
+            response = self._post({"course": 1})
+        self.assertEqual(response[REPLAYED_HEADER], "true")
+        self.assertEqual(_CreateView.calls, 1)
+        self.assertTrue(cache.add(self._lock_key(), 1))  # verrou relâché
+
+    def test_without_header_view_runs_every_time(self):
+        request = APIRequestFactory().post("/api/orders/", {}, format="json")
+        force_authenticate(request, user=self.user)
+        _CreateView.as_view()(request)
+        _CreateView.as_view()(request)
+        self.assertEqual(_CreateView.calls, 2)
@@ -1,7 +1,6 @@
 import uuid
 from datetime import timedelta
 
-import boto3
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.db import transaction, IntegrityError
@@ -10,19 +9,36 @@ from django.urls import reverse
 from django.utils import timezone
 from rest_framework import status
 from rest_framework.exceptions import ValidationError
-from rest_framework.renderers import JSONRenderer
 from rest_framework.views import APIView
 from rest_framework.viewsets import ModelViewSet, ReadOnlyModelViewSet
-from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
+from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated, AllowAny
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Q, Count, Max, Sum, Avg
-from botocore.client import Config
-
-from catalog.models import Course, Category, CourseSection, Lesson, MediaAsset, Payment
-from .permissions import IsInstructor
+from django.contrib.postgres.search import SearchQuery
+from django.db.models import Q, Count, Sum, Avg, Prefetch
+
+from analytics.services import instructor_totals
+from catalog import changes, cloning, offline
+from catalog.models import Course, Category, CourseSection, Lesson, MediaAsset
+from catalog.navigation import navigation
+from catalog.ranking import insert_position, reorder_course
+from catalog.storage import s3_client
+from catalog.tasks import clone_course_task
+from commerce import checkout
+from commerce.models import InstructorBalance, InstructorPayout
+from enrollments.sync import SyncError, course_totals, sync_progress
+from organizations.models import CompanyMember
+from . import builder, dashboard
+from .cards import CARD_VIEWS, _initials, card_values, course_cards
+from .conditional import catalog_parts, conditional, course_parts, learner_catalog_parts, learner_course_parts, \
+    learner_outline_parts
+from .fieldsets import ALL, parse_fieldset
+from .idempotency import idempotent
+from .pagination import keyset_page, parse_limit
+from .permissions import IsCompanyAdmin, IsInstructor
+from .renderers import ORJSONRenderer
 from .serializers import CourseSerializer, CategorySerializer, CourseSectionSerializer, LessonSerializer, \
-    MediaUploadInitSerializer, MediaUploadFinalizeSerializer, MediaAssetListSerializer
+    MediaUploadInitSerializer, MediaUploadFinalizeSerializer, MediaAssetListSerializer, CheckoutCreateSerializer
 
 
 # from compte.api.permissions import IsInstructor
@@ -33,12 +49,61 @@ class CategoryViewSet(ReadOnlyModelViewSet):
     serializer_class = CategorySerializer
 
 
+def _course_list_parts(request, *args, **kwargs):
+    # le SUPERADMIN voit aussi les brouillons / cours internes
+    return [request.user.is_authenticated and request.user.role == "SUPERADMIN", *catalog_parts(request)]
+
+
 class CourseViewSet(ModelViewSet):
+    """
+    GET /api/apis/courses/?fields=a,b,c | ?view=card|detail
+    """
     serializer_class = CourseSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
 
+    # ?view=card : colonnes d'une carte catalogue (pas de description ni de médias imbriqués)
+    views = {
+        "card": (
+            "id", "title", "slug", "subtitle", "course_type", "pricing_type", "price", "currency",
+            "status", "published_at", "thumbnail_url", "category", "instructor_name",
+        ),
+        "detail": None,
+    }
+    # champ du serializer -> colonnes (only) ; les relations sont suivies en select_related
+    sources = {
+        "thumbnail": ("thumbnail",),
+        "thumbnail_url": ("thumbnail",),
+        "category": ("category",),
+        "instructor_name": ("instructor__full_name",),
+        "preview_media_asset": ("preview_media_asset",),
+        "updated_at_human": ("updated_at",),
+    }
+    relations = ("category", "instructor", "preview_media_asset")
+
+    def get_fieldset(self):
+        if self.request.method != "GET":
+            return ALL
+        if not hasattr(self, "_fieldset"):
+            self._fieldset = parse_fieldset(self.request, self.views)
+        return self._fieldset
+
+    def get_serializer_context(self):
+        ctx = super().get_serializer_context()
+        ctx["fieldset"] = self.get_fieldset()
+        return ctx
+
+    def _sparse(self, qs):
+        fieldset = self.get_fieldset()
+        if fieldset.keys is None:
+            return qs.select_related(*self.relations)
+        base = [f.name for f in Course._meta.concrete_fields] + ["instructor__full_name"]
+        columns = fieldset.columns(self.sources, base)
+        related = [r for r in self.relations if any(c == r or c.startswith(r + "__") for c in columns)]
+        return qs.only(*columns).select_related(*related)
+
     def get_queryset(self):
-        qs = Course.objects.select_related("category", "instructor").prefetch_related("sections__lessons")
+        # ✅ plus de prefetch sections__lessons : CourseSerializer n'expose pas le programme
+        qs = self._sparse(Course.objects.all())
         if self.request.method in ("GET", "HEAD", "OPTIONS"):
             # public: seulement cours publiés (hors internes)
             if not self.request.user.is_authenticated or self.request.user.role != "SUPERADMIN":
@@ -49,6 +114,14 @@ class CourseViewSet(ModelViewSet):
             qs = qs.filter(Q(title__icontains=q) | Q(subtitle__icontains=q) | Q(description__icontains=q))
         return qs.order_by("-published_at", "-created_at")
 
+    @conditional(_course_list_parts)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @conditional(course_parts)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
     def perform_create(self, serializer):
         # formateur crée son cours
         serializer.save(instructor=self.request.user)
@@ -56,13 +129,12 @@ class CourseViewSet(ModelViewSet):
     @action(detail=False, methods=["get"], permission_classes=[IsAuthenticated, IsInstructor], url_path="my")
     def my_courses(self, request):
         qs = (
-            Course.objects.filter(instructor=request.user)
-            .select_related("category", "instructor")
-            .prefetch_related("sections__lessons")
+            self._sparse(Course.objects.filter(instructor=request.user))
             .annotate(
                 sections_count=Count("sections", distinct=True),
                 lessons_count=Count("sections__lessons", distinct=True),
                 enrolled_count=Count("enrollments", distinct=True),  # requires related_name="enrollments"
+                **rating_annotations(),  # ✅ agrégats maintenus (reviews.CourseRatingStats)
             )
             .order_by("-updated_at", "-created_at")
         )
@@ -83,13 +155,14 @@ class CourseViewSet(ModelViewSet):
         if course_type:
             qs = qs.filter(course_type=course_type)
 
-        # TODO: rating_avg, rating_count, completion_rate (si tu as des modèles review/progress)
+        # TODO: completion_rate (si tu as des modèles progress)
         # Pour ne pas casser, on renvoie defaults si pas dispo:
-        data = CourseSerializer(qs, many=True, context={"request": request}).data
+        fieldset = self.get_fieldset()
+        data = CourseSerializer(qs, many=True, context={"request": request, "fieldset": fieldset}).data
         for c in data:
-            c.setdefault("rating_avg", None)
-            c.setdefault("rating_count", 0)
-            c.setdefault("completion_rate", 0)
+            for key, default in (("rating_avg", None), ("rating_count", 0), ("completion_rate", 0)):
+                if key in fieldset:
+                    c.setdefault(key, default)
         return Response(data)
 
 
@@ -113,18 +186,13 @@ except Exception:  # pragma: no cover
     LessonProgress = None
 
 try:
-    # Exemple: payments/models.py
-    from catalog.models import Payout  # adapte si tu as un app payments
-except Exception:  # pragma: no cover
-    Payout = None
-
-try:
-    from reviews.models import Review  # adapte si tu as un app reviews
+    from reviews.models import Review, CourseRatingStats, REVIEW_SEARCH_CONFIG, review_search_vector
+    from reviews.services import rating_annotations
 except Exception:  # pragma: no cover
     Review = None
 
 try:
-    from notifications.models import Notification  # adapte si tu as un app notifications
+    from catalog.models import Notification
 except Exception:  # pragma: no cover
     Notification = None
 
@@ -164,55 +232,73 @@ def _range_to_days(r: str) -> int:
 
 
 class InstructorKpisView(APIView):
+    """
+    GET /api/instructor/kpis/?range=7d|30d|90d
+    Activité lue dans le rollup analytics.InstructorDailyStat (celery beat), pas sur les inscriptions.
+    """
     permission_classes = [IsAuthenticated, IsInstructor]
 
     def get(self, request):
         u = request.user
         days = _range_to_days(request.query_params.get("range", "30d"))
-        since = timezone.now() - timedelta(days=days)
-
-        courses_qs = Course.objects.filter(instructor=u)
+        since = timezone.localdate() - timedelta(days=days - 1)
+
+        # ✅ une seule requête pour les compteurs de cours
+        courses = Course.objects.filter(instructor=u).aggregate(
+            total=Count("id"),
+            published=Count("id", filter=Q(status=Course.Status.PUBLISHED)),
+            review=Count("id", filter=Q(status=Course.Status.REVIEW)),
+            draft=Count("id", filter=Q(status=Course.Status.DRAFT)),
+        )
+        stats = instructor_totals(u, since)
 
-        # ✅ KPIs fiables (ne cassent pas)
-        total_courses = courses_qs.count()
-        published_courses = courses_qs.filter(status=Course.Status.PUBLISHED).count()
-        review_courses = courses_qs.filter(status=Course.Status.REVIEW).count()
-        draft_courses = courses_qs.filter(status=Course.Status.DRAFT).count()
-
-        # ✅ Enrollments (si modèle dispo ET relation existe)
-        enrolled_total = 0
-        enrolled_recent = 0
-        try:
-            # suppose related_name="enrollments" sur Enrollment.course FK
-            enrolled_total = courses_qs.aggregate(c=Count("enrollments"))["c"] or 0
-            enrolled_recent = Course.objects.filter(
-                instructor=u,
-                enrollments__created_at__gte=since
-            ).aggregate(c=Count("enrollments"))["c"] or 0
-        except Exception:
-            # pas de modèle, pas de related_name, pas de created_at => on ne casse pas
-            enrolled_total = 0
-            enrolled_recent = 0
+        rating_avg = None
+        if stats["reviews_total"]:
+            rating_avg = round(stats["rating_sum_total"] / stats["reviews_total"], 2)
+        completion_avg = None
+        if stats["enrollments_total"]:
+            completion_avg = round(100 * stats["completions_total"] / stats["enrollments_total"])
 
         return Response({
             "range": f"{days}d",
-            "courses": {
-                "total": total_courses,
-                "published": published_courses,
-                "review": review_courses,
-                "draft": draft_courses,
-            },
+            "courses": courses,
             "enrollments": {
-                "total": enrolled_total,
-                "recent": enrolled_recent,
+                "total": stats["enrollments_total"],
+                "recent": stats["enrollments_recent"],
+            },
+            "completions": {
+                "total": stats["completions_total"],
+                "recent": stats["completions_recent"],
+            },
+            "revenue": {
+                "total": stats["revenue_total"],
+                "recent": stats["revenue_recent"],
+                "month": stats["revenue_month"],
             },
+            "reviews": {
+                "total": stats["reviews_total"],
+                "recent": stats["reviews_recent"],
+                "avg_rating": rating_avg,
+            },
+            "watch_hours_est": {
+                "total": int(stats["watch_seconds_total"] / 3600),
+                "recent": int(stats["watch_seconds_recent"] / 3600),
+            },
+            # clés lues par le dashboard formateur (instructor_dash.html)
+            "courses_count": courses["total"],
+            "enrolled_total": stats["enrollments_total"],
+            "revenue_month": stats["revenue_month"],
+            "rating_avg": rating_avg,
+            "completion_avg": completion_avg,
         })
 
 
 class InstructorReviewsView(APIView):
     """
-    Renvoie les avis liés aux cours du formateur.
-    Si tu n'as pas de modèle Review => []
+    Renvoie les avis liés aux cours du formateur (pagination keyset: ?cursor=&limit=).
+    Recherche ?q= : titre du cours ou texte de l'avis (index plein texte sur Review.comment).
+    count : nombre total d'avis du formateur ; avec ?q=, nombre total d'avis correspondants
+    (toutes pages confondues, pas la taille de la page).
     """
     permission_classes = [IsAuthenticated, IsInstructor]
 
@@ -222,59 +308,140 @@ class InstructorReviewsView(APIView):
 
         u = request.user
         q = (request.query_params.get("q") or "").strip()
-        limit = int(request.query_params.get("limit") or 50)
+        limit = parse_limit(request.query_params.get("limit"), default=50, maximum=200)
 
-        qs = Review.objects.filter(course__instructor=u).select_related("course").order_by("-created_at")
+        qs = Review.objects.filter(course__instructor=u).select_related("course", "user")
 
         if q:
-            qs = qs.filter(
-                Q(course__title__icontains=q) |
-                Q(user_name__icontains=q) |
-                Q(text__icontains=q)
+            # ✅ cours du formateur (petit ensemble) résolus d'abord, puis FTS indexé sur comment
+            course_ids = list(Course.objects.filter(instructor=u, title__icontains=q).values_list("id", flat=True))
+            qs = qs.alias(search=review_search_vector()).filter(
+                Q(course_id__in=course_ids) |
+                Q(search=SearchQuery(q, config=REVIEW_SEARCH_CONFIG, search_type="websearch"))
             )
 
+        items, next_cursor = keyset_page(qs, request.query_params.get("cursor"), limit)
+
         data = []
-        for r in qs[:limit]:
+        for r in items:
             data.append({
                 "id": r.id,
                 "course_id": r.course_id,
-                "course_title": getattr(r.course, "title", ""),
-                "user_name": getattr(r, "user_name", None) or getattr(getattr(r, "user", None), "full_name", "") or "—",
-                "rating": float(getattr(r, "rating", 0) or 0),
-                "text": getattr(r, "text", "") or "",
-                "created_at": getattr(r, "created_at", None),
+                "course_title": r.course.title,
+                "user_name": r.user.full_name or r.user.email or "—",
+                "rating": float(r.rating or 0),
+                "text": r.comment or "",
+                "created_at": r.created_at,
             })
 
-        return Response({"count": qs.count(), "results": data})
+        if q:
+            count = qs.count()  # mêmes filtres indexés que la page
+        else:
+            # ✅ total lu dans les agrégats (pas de COUNT(*) sur les reviews)
+            count = CourseRatingStats.objects.filter(course__instructor=u).aggregate(
+                c=Sum("rating_count"))["c"] or 0
+
+        return Response({"count": count, "results": data, "next_cursor": next_cursor})
+
+
+class CourseReviewsView(APIView):
+    """
+    GET /api/courses/<course_id>/reviews/?cursor=&limit=
+    -> agrégats (moyenne, total, histogramme 1..5) + avis les plus récents (keyset)
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request, course_id: int):
+        course = get_object_or_404(Course, id=course_id, status=Course.Status.PUBLISHED)
+        limit = parse_limit(request.query_params.get("limit"), default=20, maximum=100)
+
+        stats = CourseRatingStats.objects.filter(course=course).first()
+        items, next_cursor = keyset_page(
+            Review.objects.filter(course=course).select_related("user"),
+            request.query_params.get("cursor"),
+            limit,
+        )
+
+        return Response({
+            "course_id": course.id,
+            "rating": {
+                "avg": stats.rating_avg if stats else None,
+                "count": stats.rating_count if stats else 0,
+                "histogram": stats.histogram if stats else {str(i): 0 for i in range(1, 6)},
+            },
+            "results": [
+                {
+                    "id": r.id,
+                    "user_name": r.user.full_name or "—",
+                    "rating": r.rating,
+                    "comment": r.comment or "",
+                    "created_at": r.created_at,
+                }
+                for r in items
+            ],
+            "next_cursor": next_cursor,
+        })
 
 
 class InstructorPayoutsView(APIView):
     """
-    Renvoie l'historique de paiements formateur.
-    Si pas de modèle Payout => []
+    Historique des versements formateur (commerce.InstructorPayout, cf. commerce/payouts.py).
+    GET /api/instructor/payouts/?limit=50
     """
     permission_classes = [IsAuthenticated, IsInstructor]
 
     def get(self, request):
-        if Payout is None:
-            return Response({"count": 0, "results": []})
-
         u = request.user
-        limit = int(request.query_params.get("limit") or 50)
+        limit = parse_limit(request.query_params.get("limit"), default=50, maximum=200)
 
-        qs = Payout.objects.filter(instructor=u).order_by("-created_at")
+        labels = dict(InstructorPayout.Status.choices)
+        qs = InstructorPayout.objects.filter(instructor=u).order_by("-created_at", "-id")
         data = []
         for p in qs[:limit]:
             data.append({
                 "id": p.id,
-                "ref": getattr(p, "reference", "") or getattr(p, "ref", "") or "",
-                "amount": str(getattr(p, "amount", 0) or 0),
-                "currency": getattr(p, "currency", "XOF"),
-                "status": getattr(p, "status", "PENDING"),
-                "created_at": getattr(p, "created_at", None),
+                "ref": p.reference,
+                "amount": str(p.amount),
+                "currency": p.currency,
+                "status": p.status,
+                "status_label": labels.get(p.status, p.status),
+                "period_end": p.period_end,
+                "created_at": p.created_at,
+                "date": timezone.localdate(p.created_at),
+                "paid_at": p.paid_at,
             })
 
-        return Response({"count": qs.count(), "results": data})
+        count = len(data) if len(data) < limit else qs.count()
+        return Response({"count": count, "results": data})
+
+
+class InstructorBalanceView(APIView):
+    """
+    Solde formateur (lecture O(1) de commerce.InstructorBalance) + derniers gains par cours.
+    GET /api/instructor/balance/
+    """
+    permission_classes = [IsAuthenticated, IsInstructor]
+
+    def get(self, request):
+        u = request.user
+        balances = [
+            {
+                "currency": b.currency,
+                "balance": str(b.balance),
+                "earned_total": str(b.earned_total),
+                "paid_out_total": str(b.paid_out_total),
+                "last_period": b.last_period,
+                "updated_at": b.updated_at,
+            }
+            for b in InstructorBalance.objects.filter(instructor=u).order_by("currency")
+        ]
+        pending = InstructorPayout.objects.filter(instructor=u, status=InstructorPayout.Status.PENDING).values(
+            "currency").annotate(total=Sum("amount")).order_by("currency")
+
+        return Response({
+            "results": balances,
+            "pending_payouts": [{"currency": p["currency"], "amount": f"{p['total']:.2f}"} for p in pending],
+        })
 
 
 class InstructorNotificationsView(APIView):
@@ -341,7 +508,7 @@ class InstructorSectionListView(APIView):
 
     def get(self, request, course_id):
         course = _course_owned(course_id, request.user)
-        qs = CourseSection.objects.filter(course=course).order_by("order")
+        qs = CourseSection.objects.filter(course=course).order_by("rank", "id")
         data = CourseSectionSerializer(qs, many=True, context={"request": request}).data
         # include lessons_count
         for item, obj in zip(data, qs):
@@ -349,19 +516,131 @@ class InstructorSectionListView(APIView):
         return Response(data)
 
 
+def _after_id(request):
+    raw = request.data.get("after_id")
+    if raw in (None, ""):
+        return None
+    try:
+        return int(raw)
+    except (TypeError, ValueError):
+        raise ValidationError({"after_id": "Entier attendu (0 = en tête)."})
+
+
 class InstructorSectionCreateView(APIView):
     permission_classes = [IsAuthenticated, IsInstructor]
 
+    """
+    POST /api/instructor/courses/<course_id>/sections/create/
+    Payload: {"title": "...", "after_id": null}  (null = en fin, 0 = en tête, id = après cette section)
+    """
+
+    @idempotent
     def post(self, request, course_id):
         course = _course_owned(course_id, request.user)
         title = request.data.get("title", "").strip()
         if not title:
             return Response({"detail": "title is required"}, status=400)
-        max_order = CourseSection.objects.filter(course=course).aggregate(m=Max("order"))["m"] or 0
-        section = CourseSection.objects.create(course=course, title=title, order=max_order + 1)
+        after_id = _after_id(request)
+        with transaction.atomic():
+            # ✅ verrou sur le cours : deux insertions simultanées ne calculent pas la même clé
+            Course.objects.select_for_update().filter(id=course.id).first()
+            try:
+                rank, order = insert_position(CourseSection.objects.filter(course=course), after_id)
+            except CourseSection.DoesNotExist:
+                return Response({"detail": "after_id: section inconnue."}, status=400)
+            section = CourseSection.objects.create(course=course, title=title, rank=rank, order=order)
         return Response(CourseSectionSerializer(section).data, status=status.HTTP_201_CREATED)
 
 
+class InstructorCourseReorderView(APIView):
+    """
+    Ordre complet du cours en une écriture (glisser-déposer du builder).
+    POST /api/instructor/courses/<course_id>/reorder/
+    Payload: {"sections": [{"id": 12, "lessons": [40, 41]}, {"id": 13, "lessons": [42]}]}
+    """
+    permission_classes = [IsAuthenticated, IsInstructor]
+
+    def post(self, request, course_id):
+        course = _course_owned(course_id, request.user)
+        layout = request.data.get("sections")
+        if not isinstance(layout, list) or not all(isinstance(s, dict) and "id" in s for s in layout):
+            raise ValidationError({"sections": "Liste [{id, lessons: [ids]}] attendue."})
+        try:
+            reorder_course(course, layout)
+        except (TypeError, ValueError) as e:
+            return Response({"detail": str(e)}, status=400)
+        return Response({"ok": True})
+
+
+class InstructorCourseBatchView(APIView):
+    """
+    Lot d'opérations du builder (sections / leçons) appliqué en une transaction.
+    POST /api/instructor/courses/<course_id>/batch/
+    Payload et réponse : cf. best_epargne/apis/builder.py
+    """
+    permission_classes = [IsAuthenticated, IsInstructor]
+
+    @idempotent
+    def post(self, request, course_id):
+        course = _course_owned(course_id, request.user)
+        try:
+            result = builder.apply_batch(course, request.data.get("operations"))
+        except builder.BatchError as e:
+            return Response({"detail": str(e), "index": e.index}, status=400)
+        return Response({"ok": True, **result})
+
+
+def _clone_response(request, source: Course, **options):
+    """Petit cours : copie immédiate (201) ; au-delà de CLONE_SYNC_MAX_LESSONS : tâche Celery (202)."""
+    title = str(request.data.get("title") or "")
+    if cloning.runs_async(source.id):
+        clone_course_task.delay(source.id, request.user.id, title, **options)
+        return Response({"async": True, "detail": "Copie en cours, vous serez notifié à la fin."}, status=202)
+    course = cloning.clone_course(source.id, title=title, **options)
+    return Response({"async": False, "id": course.id, "slug": course.slug, "title": course.title}, status=201)
+
+
+class InstructorCourseCloneView(APIView):
+    """
+    Nouvelle édition d'un cours du formateur (brouillon : sections, leçons, quiz ; médias partagés).
+    POST /api/instructor/courses/<course_id>/clone/
+    Payload: {"title": "Mon cours — édition 2027"}   (optionnel)
+    """
+    permission_classes = [IsAuthenticated, IsInstructor]
+
+    @idempotent
+    def post(self, request, course_id):
+        return _clone_response(request, _course_owned(course_id, request.user))
+
+
+class CompanyCourseCloneView(APIView):
+    """
+    Copie interne d'un cours publié pour une entreprise (company_only=True, brouillon),
+    appartenant à l'administrateur qui la demande (modifiable depuis son espace).
+    POST /api/company/courses/<course_id>/clone/
+    Payload: {"company_id": 3, "title": ""}
+    """
+    permission_classes = [IsAuthenticated, IsCompanyAdmin]
+
+    @idempotent
+    def post(self, request, course_id):
+        try:
+            company_id = int(request.data.get("company_id"))
+        except (TypeError, ValueError):
+            company_id = 0
+        if company_id <= 0:
+            raise ValidationError({"company_id": "Identifiant d'entreprise requis."})
+        if request.user.role != User.Role.SUPERADMIN and not CompanyMember.objects.filter(
+            user=request.user, company_id=company_id, company_role=CompanyMember.CompanyRole.ADMIN,
+        ).exists():
+            return Response({"detail": "Vous n'administrez pas cette entreprise."}, status=403)
+        source = get_object_or_404(
+            Course.objects.filter(Q(company_only=False) | Q(company_id=company_id)),
+            id=course_id, status=Course.Status.PUBLISHED,
+        )
+        return _clone_response(request, source, company_id=company_id, instructor_id=request.user.id)
+
+
 class InstructorSectionUpdateView(APIView):
     permission_classes = [IsAuthenticated, IsInstructor]
 
@@ -391,13 +670,18 @@ class InstructorLessonListView(APIView):
     def get(self, request, course_id, section_id):
         course = _course_owned(course_id, request.user)
         section = get_object_or_404(CourseSection, id=section_id, course=course)
-        qs = Lesson.objects.filter(section=section).order_by("order")
+        qs = Lesson.objects.filter(section=section).order_by("rank", "id")
         return Response(LessonSerializer(qs, many=True, context={"request": request}).data)
 
 
 class InstructorLessonCreateView(APIView):
     permission_classes = [IsAuthenticated, IsInstructor]
 
+    """
+    POST /api/instructor/courses/<course_id>/sections/<section_id>/lessons/create/
+    Payload: {"title": "...", "lesson_type": "VIDEO", "after_id": null}  (cf. création de section)
+    """
+
     def post(self, request, course_id, section_id):
         course = _course_owned(course_id, request.user)
         section = get_object_or_404(CourseSection, id=section_id, course=course)
@@ -407,8 +691,15 @@ class InstructorLessonCreateView(APIView):
         if not title:
             return Response({"detail": "title is required"}, status=400)
 
-        max_order = Lesson.objects.filter(section=section).aggregate(m=Max("order"))["m"] or 0
-        lesson = Lesson.objects.create(section=section, title=title, lesson_type=lesson_type, order=max_order + 1)
+        after_id = _after_id(request)
+        with transaction.atomic():
+            Course.objects.select_for_update().filter(id=course.id).first()
+            try:
+                rank, order = insert_position(Lesson.objects.filter(section=section), after_id)
+            except Lesson.DoesNotExist:
+                return Response({"detail": "after_id: leçon inconnue."}, status=400)
+            lesson = Lesson.objects.create(section=section, title=title, lesson_type=lesson_type,
+                                           rank=rank, order=order)
         return Response(LessonSerializer(lesson).data, status=201)
 
 
@@ -438,18 +729,6 @@ class InstructorLessonDeleteView(APIView):
         return Response({"ok": True})
 
 
-def s3_client():
-    return boto3.client(
-        "s3",
-        endpoint_url=getattr(settings, "MINIO_ENDPOINT_URL", None),
-        aws_access_key_id=getattr(settings, "MINIO_ACCESS_KEY", None),
-        aws_secret_access_key=getattr(settings, "MINIO_SECRET_KEY", None),
-        region_name=getattr(settings, "MINIO_REGION", "us-east-1"),
-        config=Config(signature_version="s3v4"),
-        verify=getattr(settings, "MINIO_SECURE", False),
-    )
-
-
 def build_object_key(user_id: int, kind: str, filename: str) -> str:
     prefix = getattr(settings, "MINIO_UPLOAD_PREFIX", "instructors")
     ext = ""
@@ -508,6 +787,7 @@ class MediaUploadFinalizeView(APIView):
     """
     permission_classes = [IsAuthenticated, IsInstructor]
 
+    @idempotent
     @transaction.atomic
     def post(self, request):
         ser = MediaUploadFinalizeSerializer(data=request.data)
@@ -634,102 +914,28 @@ def _range_to_days(r: str) -> int:
 
 class LearnerBaseAPIView(APIView):
     permission_classes = [IsAuthenticated]
-    renderer_classes = [JSONRenderer]  # ✅ évite TemplateDoesNotExist (browsable api)
+    renderer_classes = [ORJSONRenderer]  # ✅ évite TemplateDoesNotExist (browsable api)
 
 
 # ---------- /api/learner/me/ ----------
 class LearnerMeView(LearnerBaseAPIView):
     def get(self, request):
-        u = request.user
-        return Response({
-            "id": u.id,
-            "email": getattr(u, "email", "") or "",
-            "full_name": getattr(u, "full_name", "") or getattr(u, "get_full_name", lambda: "")() or "",
-            "phone": getattr(u, "phone", "") or "",
-            "role": getattr(u, "role", None),
-            "is_staff": bool(getattr(u, "is_staff", False)),
-        })
+        return Response(dashboard.me_section(request.user))
 
 
 # ---------- /api/learner/kpis/ ----------
 class LearnerKpisView(LearnerBaseAPIView):
     """
     KPIs apprenant (inscriptions, progression, cours complétés, note moyenne donnée, etc.)
+    GET /api/learner/kpis/?range=7d|30d|90d
     """
 
     def get(self, request):
-        days = _range_to_days(request.query_params.get("range", "30d"))
-        since = timezone.now() - timedelta(days=days)
+        days = dashboard.range_to_days(request.query_params.get("range", "30d"))
         u = request.user
-
-        # defaults safe
-        enrolled_total = 0
-        enrolled_recent = 0
-        completed_total = 0
-        progress_avg = None
-        hours_watched = 0  # si tu as duration/sec dans progress
-
-        if Enrollment is not None:
-            try:
-                # hypothèse: Enrollment(user, course, created_at, status/progress...)
-                base = Enrollment.objects.filter(user=u)
-
-                enrolled_total = base.count()
-                try:
-                    enrolled_recent = base.filter(created_at__gte=since).count()
-                except Exception:
-                    enrolled_recent = 0
-
-                # "completed"
-                # - si tu as un champ status="COMPLETED" ou progress_percent=100
-                try:
-                    completed_total = base.filter(status__in=["COMPLETED", "DONE"]).count()
-                except Exception:
-                    try:
-                        completed_total = base.filter(progress_percent__gte=100).count()
-                    except Exception:
-                        completed_total = 0
-            except Exception:
-                pass
-
-        if LessonProgress is not None:
-            try:
-                # hypothèse: LessonProgress(user, lesson, percent or is_completed, watched_seconds)
-                qs = LessonProgress.objects.filter(user=u)
-                # moyenne % si champ percent existe
-                try:
-                    progress_avg = qs.aggregate(a=Avg("percent"))["a"]
-                except Exception:
-                    progress_avg = None
-                try:
-                    hours_watched = int((qs.aggregate(s=Count("watched_seconds"))["s"] or 0) / 3600)
-                except Exception:
-                    hours_watched = 0
-            except Exception:
-                pass
-
-        rating_avg_given = None
-        if Review is not None:
-            try:
-                rating_avg_given = Review.objects.filter(user=u).aggregate(a=Avg("rating"))["a"]
-            except Exception:
-                rating_avg_given = None
-
-        return Response({
-            "range": f"{days}d",
-            "enrollments": {
-                "total": enrolled_total,
-                "recent": enrolled_recent,
-                "completed": completed_total,
-            },
-            "progress": {
-                "avg_percent": progress_avg,  # ex: 63.4
-                "hours_watched_est": hours_watched,
-            },
-            "reviews": {
-                "avg_rating_given": rating_avg_given,
-            }
-        })
+        return Response(dashboard.kpis_section(
+            dashboard.enrollment_rows(u), dashboard.progress_stats(u), dashboard.avg_rating_given(u), days,
+        ))
 
 
 # ---------- /api/learner/enrollments/ ----------
@@ -744,61 +950,12 @@ class LearnerEnrollmentsView(LearnerBaseAPIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        u = request.user
         q = (request.query_params.get("q") or "").strip()
         status_param = (request.query_params.get("status") or "").strip()
         limit = int(request.query_params.get("limit") or 100)
+        return Response(dashboard.enrollments_section(dashboard.enrollment_rows(request.user, q), status_param, limit))
 
-        if Enrollment is None or Course is None:
-            return Response({"count": 0, "results": []})
-
-        qs = Enrollment.objects.filter(user=u).select_related("course").order_by("-id")
-
-        if status_param:
-            try:
-                qs = qs.filter(status=status_param)
-            except Exception:
-                pass
-
-        if q:
-            try:
-                qs = qs.filter(
-                    Q(course__title__icontains=q) |
-                    Q(course__subtitle__icontains=q) |
-                    Q(course__description__icontains=q)
-                )
-            except Exception:
-                pass
-
-        results = []
-        for e in qs[:limit]:
-            c = getattr(e, "course", None)
-            if not c:
-                continue
-
-            thumb = getattr(c, "thumbnail_url", None)
-            if not thumb and getattr(c, "thumbnail", None):
-                thumb = getattr(getattr(c, "thumbnail", None), "url", None)
-
-            results.append({
-                "enrollment_id": e.id,
-                "course": {
-                    "id": c.id,
-                    "title": getattr(c, "title", "") or "",
-                    "subtitle": getattr(c, "subtitle", "") or "",
-                    "thumbnail_url": thumb,
-                    "status": getattr(c, "status", None),
-                    "pricing_type": getattr(c, "pricing_type", None),
-                    "price": getattr(c, "price", None),
-                    "currency": getattr(c, "currency", "XOF"),
-                },
-                "status": getattr(e, "status", None),
-                "progress_percent": getattr(e, "progress_percent", None),
-                "created_at": getattr(e, "created_at", None),
-            })
-
-        return Response({"count": qs.count(), "results": results})
-
+    @idempotent
     def post(self, request):
         if Enrollment is None or Course is None:
             return Response(
@@ -959,56 +1116,70 @@ class LearnerCourseProgressView(APIView):
 # ---------- /api/learner/notifications/ ----------
 class LearnerNotificationsView(LearnerBaseAPIView):
     def get(self, request):
-        if Notification is None:
-            return Response({"count": 0, "results": []})
-
-        u = request.user
         limit = int(request.query_params.get("limit") or 50)
-
-        try:
-            qs = Notification.objects.filter(user=u).order_by("-created_at")
-        except Exception:
-            # si ton Notification n'a pas user, adapte ici
-            return Response({"count": 0, "results": []})
-
-        results = []
-        for n in qs[:limit]:
-            results.append({
-                "id": n.id,
-                "title": getattr(n, "title", "") or "",
-                "body": getattr(n, "body", "") or getattr(n, "message", "") or "",
-                "time": getattr(n, "created_at", None),
-                "is_read": bool(getattr(n, "is_read", False)),
-            })
-        return Response({"count": qs.count(), "results": results})
+        return Response(dashboard.notifications_section(request.user, limit))
 
 
 # ---------- /api/learner/payments/ (optionnel) ----------
 class LearnerPaymentsView(LearnerBaseAPIView):
     def get(self, request):
-        if Payment is None:
-            return Response({"count": 0, "results": []})
-
-        u = request.user
         limit = int(request.query_params.get("limit") or 100)
+        return Response(dashboard.payments_section(request.user, limit))
 
-        try:
-            qs = Payment.objects.filter(user=u).order_by("-created_at")
-        except Exception:
-            return Response({"count": 0, "results": []})
 
-        results = []
-        for p in qs[:limit]:
-            results.append({
-                "id": p.id,
-                "ref": getattr(p, "ref", None) or getattr(p, "reference", None) or str(p.id),
-                "date": getattr(p, "created_at", None),
-                "amount": getattr(p, "amount", None),
-                "currency": getattr(p, "currency", "XOF"),
-                "status": getattr(p, "status", None),
-                "status_label": getattr(p, "status_label", None) or getattr(p, "status", None),
-            })
-        return Response({"count": qs.count(), "results": results})
+# ---------- /api/learner/dashboard/ ----------
+class LearnerDashboardView(LearnerBaseAPIView):
+    """
+    Agrégat du tableau de bord apprenant (remplace 5 allers-retours au chargement).
+    GET /api/learner/dashboard/?sections=me,kpis,enrollments,notifications,payments
+        &range=30d&q=&status=&enrollments_limit=100&notifications_limit=50&payments_limit=100
+    Chaque section a la forme de son endpoint /api/learner/<section>/.
+    """
+
+    def get(self, request):
+        params = request.query_params
+        requested = [s.strip() for s in (params.get("sections") or "").split(",") if s.strip()]
+        sections = [s for s in dashboard.SECTIONS if s in requested] if requested else list(dashboard.SECTIONS)
+        if not sections:
+            raise ValidationError({"sections": f"Sections possibles : {', '.join(dashboard.SECTIONS)}."})
+
+        limits = {}
+        for name in ("enrollments", "notifications", "payments"):
+            raw = params.get(f"{name}_limit")
+            if raw:
+                try:
+                    limits[name] = max(1, min(int(raw), 500))
+                except ValueError:
+                    raise ValidationError({f"{name}_limit": "Entier attendu."})
+
+        return Response(dashboard.build_dashboard(
+            request.user,
+            sections=sections,
+            days=dashboard.range_to_days(params.get("range", "30d")),
+            q=(params.get("q") or "").strip(),
+            status=(params.get("status") or "").strip(),
+            limits=limits,
+        ))
+
+
+# ---------- /api/checkout/ ----------
+class CheckoutView(LearnerBaseAPIView):
+    """
+    Crée la commande et sa transaction PSP.
+    POST /api/checkout/  (en-tête Idempotency-Key conseillé)
+    Payload: {"provider": "cinetpay", "currency": "XOF", "coupon_code": "", "company_id": null,
+              "items": [{"item_type": "COURSE", "course_id": 12}, {"item_type": "COMPANY_SEATS", "course_id": 3, "seats_qty": 10}]}
+    """
+
+    @idempotent
+    def post(self, request):
+        ser = CheckoutCreateSerializer(data=request.data)
+        ser.is_valid(raise_exception=True)
+        try:
+            order, items, tx = checkout.create_checkout(request.user, ser.validated_data)
+        except checkout.CheckoutError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(checkout.checkout_payload(order, items, tx), status=status.HTTP_201_CREATED)
 
 
 class LearnerProgressView(APIView):
@@ -1259,15 +1430,6 @@ def _safe_get(obj, attr, default=""):
 #         "is_enrolled": bool(is_enrolled),
 #         "enrolled_at": enrolled_at,
 #     }
-def _initials(name: str) -> str:
-    name = (name or "").strip()
-    if not name:
-        return "F"
-    parts = [p for p in name.split() if p]
-    if len(parts) == 1:
-        return parts[0][:2].upper()
-    return (parts[0][0] + parts[1][0]).upper()
-
 def _iso(dt):
     if not dt:
         return None
@@ -1428,44 +1590,72 @@ def ensure_lesson_progress(enrollment, course):
             )
             for lid in missing
         ], ignore_conflicts=True)
+# ?fields= / ?view=card|detail des leçons du lecteur et du sommaire
+PLAYER_LESSON_VIEWS = {"card": ("id", "title", "lesson_type", "completed"), "detail": None}
+OUTLINE_LESSON_VIEWS = {"card": ("id", "title", "type", "is_completed", "percent"), "detail": None}
+
+
+def _sections_with_lessons(course):
+    """
+    Sections ordonnées + leçons préchargées (triées en SQL -> pas de requête par section).
+    Colonnes courtes uniquement : content / file / video_url ne sont jamais lus ici.
+    """
+    lessons = (
+        Lesson.objects.only("id", "section", "title", "order", "lesson_type", "duration_sec", "is_preview")
+        .order_by("rank", "id")
+    )
+    return list(
+        CourseSection.objects.filter(course=course)
+        .only("id", "title", "order", "course")
+        .prefetch_related(Prefetch("lessons", queryset=lessons))
+        .order_by("rank", "id")
+    )
+
+
 class LearnerCoursePlayerDataView(APIView):
+    """
+    GET /api/learner/player/<course_id>/?fields=a,b,c | ?view=card|detail (clés des leçons)
+    """
     permission_classes = [IsAuthenticated]
 
+    @conditional(learner_outline_parts)
     def get(self, request, course_id: int):
-        course = get_object_or_404(Course, id=course_id)
+        course = get_object_or_404(Course.objects.only("id", "title"), id=course_id)
         enrollment = _get_enrollment(request.user, course)
         if not enrollment:
             return Response({"detail": "Inscription requise."}, status=status.HTTP_403_FORBIDDEN)
 
-        # sections + lessons
-        sections = CourseSection.objects.filter(course=course).prefetch_related("lessons").order_by("order")
-        lessons_qs = Lesson.objects.filter(section__course=course).select_related("section").order_by("section__order", "order")
+        # sections + lessons (ordre section__rank, rank)
+        fieldset = parse_fieldset(request, PLAYER_LESSON_VIEWS)
+        sections = _sections_with_lessons(course)
+        lessons = [l for s in sections for l in s.lessons.all()]
 
         # progress map
-        lesson_ids = list(lessons_qs.values_list("id", flat=True))
+        lesson_ids = [l.id for l in lessons]
         ensure_lesson_progress(enrollment, course)
 
         prog = {
             p.lesson_id: p
             for p in LessonProgress.objects.filter(enrollment=enrollment, lesson_id__in=lesson_ids)
+            .only("lesson_id", "completed", "progress_percent")
         }
 
-        # current lesson = la première non complétée, sinon la dernière
+        # current lesson = la première non complétée, sinon la première
         current_lesson = None
-        for l in lessons_qs:
+        for l in lessons:
             p = prog.get(l.id)
             if p and not p.completed:
                 current_lesson = l
                 break
-        if current_lesson is None:
-            current_lesson = lessons_qs.first()
+        if current_lesson is None and lessons:
+            current_lesson = lessons[0]
 
         payload_sections = []
         for s in sections:
             s_lessons = []
-            for l in s.lessons.all().order_by("order"):
+            for l in s.lessons.all():
                 p = prog.get(l.id)
-                s_lessons.append({
+                s_lessons.append(fieldset.trim({
                     "id": l.id,
                     "title": l.title,
                     "lesson_type": l.lesson_type,
@@ -1473,7 +1663,7 @@ class LearnerCoursePlayerDataView(APIView):
                     "is_preview": bool(l.is_preview),
                     "progress_percent": int((p.progress_percent if p else 0) or 0),
                     "completed": bool(p.completed) if p else False,
-                })
+                }))
 
             payload_sections.append({
                 "id": s.id,
@@ -1487,7 +1677,7 @@ class LearnerCoursePlayerDataView(APIView):
             "current_lesson_id": current_lesson.id if current_lesson else None,
             "sections": payload_sections
         })
-    
+
 class LearnerMediaSignedGetView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -1513,6 +1703,32 @@ class LearnerMediaSignedGetView(APIView):
             ExpiresIn=60 * 10,
         )
         return Response({"url": url})
+class LearnerOfflinePackageView(LearnerBaseAPIView):
+    """
+    Paquet ZIP hors ligne du cours (sommaire, textes, documents ; vidéos avec ?video=1).
+    GET /api/learner/courses/<course_id>/offline/?video=0|1
+    -> 200 {"status": "ready", "url", "size", "version"} : URL présignée, reprise par en-tête Range
+    -> 202 {"status": "building"} : construction lancée, redemander plus tard
+    """
+
+    def get(self, request, course_id: int):
+        course = get_object_or_404(Course.objects.only("id", "slug"), id=course_id)
+        if not Enrollment.objects.filter(user=request.user, course=course).exists():
+            return Response({"detail": "Inscription requise."}, status=status.HTTP_403_FORBIDDEN)
+
+        video = request.query_params.get("video") in ("1", "true")
+        state = offline.request_package(course.id, video)
+        if state is None:
+            return Response({"status": "building"}, status=status.HTTP_202_ACCEPTED)
+        return Response({
+            "status": "ready",
+            "url": offline.package_url(state, f"{course.slug}.zip"),
+            "size": state["size"],
+            "version": state["version"],
+            "built_at": state["built_at"],
+        })
+
+
 class LearnerExploreCoursesView(APIView):
     """
     GET /api/learner/courses/
@@ -1521,12 +1737,14 @@ class LearnerExploreCoursesView(APIView):
     - type: course_type
     - pricing: pricing_type (FREE/PAID/HYBRID)
     - mine=1 -> renvoie seulement les cours où l'apprenant est inscrit
+    Champs: fields=a,b,c ou view=card|detail (défaut: detail)
     Pagination:
     - limit (default 20)
     - offset (default 0)
     """
     permission_classes = [IsAuthenticated]
 
+    @conditional(learner_catalog_parts)
     def get(self, request):
         q = (request.query_params.get("q") or "").strip()
         course_type = (request.query_params.get("type") or "").strip()
@@ -1558,24 +1776,17 @@ class LearnerExploreCoursesView(APIView):
 
         enrolled_map = {}
         if Enrollment is not None:
-            enroll_qs = Enrollment.objects.filter(user=request.user)
-            enrolled_map = {e.course_id: e for e in enroll_qs}
+            # {course_id: enrolled_at}
+            enrolled_map = dict(Enrollment.objects.filter(user=request.user).values_list("course_id", "enrolled_at"))
 
             if mine:
                 qs = qs.filter(id__in=enrolled_map.keys())
 
         total = qs.count()
-        items = list(qs.order_by("-updated_at")[offset:offset + limit])
-
-        results = []
-        for c in items:
-            e = enrolled_map.get(c.id)
-            results.append(_course_to_dict(
-                c,
-                request=request,
-                is_enrolled=bool(e),
-                enrolled_at=getattr(e, "created_at", None) if e else None
-            ))
+        # ✅ lignes values() + cartes compilées (cf. cards.py) ; ?fields= / ?view=card -> colonnes et clés réduites
+        fieldset = parse_fieldset(request, CARD_VIEWS)
+        rows = card_values(qs.order_by("-updated_at"), fieldset)[offset:offset + limit]
+        results = course_cards(rows, enrolled=enrolled_map, fieldset=fieldset)
 
         return Response({
             "count": total,
@@ -1591,6 +1802,7 @@ class LearnerCourseDetailView(APIView):
     """
     permission_classes = [IsAuthenticated]
 
+    @conditional(learner_course_parts)
     def get(self, request, course_id: int):
         try:
             course = Course.objects.select_related("instructor").get(id=course_id)
@@ -1624,6 +1836,7 @@ class LearnerEnrollView(APIView):
     """
     permission_classes = [IsAuthenticated]
 
+    @idempotent
     def post(self, request, course_id: int):
         user = request.user
 
@@ -1693,21 +1906,6 @@ def _get_enrollment(user, course) -> Enrollment:
     return Enrollment.objects.filter(user=user, course=course).first()
 
 
-def _get_first_lesson(course: Course):
-    return Lesson.objects.filter(section__course=course).order_by("section__order", "order", "id").first()
-
-
-def _get_next_lesson(course: Course, current: Lesson):
-    qs = Lesson.objects.filter(section__course=course).order_by("section__order", "order", "id")
-    ids = list(qs.values_list("id", flat=True))
-    if current.id not in ids:
-        return ids[0] if ids else None
-    idx = ids.index(current.id)
-    if idx + 1 < len(ids):
-        return Lesson.objects.get(id=ids[idx + 1])
-    return None
-
-
 def _course_is_published(course: Course) -> bool:
     try:
         return course.status == Course.Status.PUBLISHED
@@ -1723,11 +1921,13 @@ class LearnerCourseOutlineView(APIView):
     """
     GET /api/learner/courses/<course_id>/outline/
     -> sections + lessons + progress per lesson + % global
+    ?fields=a,b,c | ?view=card|detail -> clés des leçons
     """
     permission_classes = [IsAuthenticated]
 
+    @conditional(learner_outline_parts)
     def get(self, request, course_id: int):
-        course = get_object_or_404(Course, id=course_id)
+        course = get_object_or_404(Course.objects.only("id", "title", "status"), id=course_id)
         if not _course_is_published(course):
             return Response({"detail": "Cours non disponible."}, status=status.HTTP_403_FORBIDDEN)
 
@@ -1735,31 +1935,29 @@ class LearnerCourseOutlineView(APIView):
         if not enrollment:
             return Response({"detail": "Vous n'êtes pas inscrit à ce cours."}, status=status.HTTP_403_FORBIDDEN)
 
-        lessons_qs = (
-            Lesson.objects
-            .filter(section__course=course)
-            .select_related("section")
-            .order_by("section__order", "order", "id")
-        )
+        fieldset = parse_fieldset(request, OUTLINE_LESSON_VIEWS)
+        sections = _sections_with_lessons(course)
+        lesson_ids = [l.id for s in sections for l in s.lessons.all()]
 
         # ✅ progress by enrollment
-        progress_qs = LessonProgress.objects.filter(enrollment=enrollment, lesson__in=lessons_qs)
+        progress_qs = (
+            LessonProgress.objects.filter(enrollment=enrollment, lesson_id__in=lesson_ids)
+            .only("lesson_id", "completed", "progress_percent")
+        )
         progress_map = {p.lesson_id: p for p in progress_qs}
 
-        total_lessons = lessons_qs.count()
+        total_lessons = len(lesson_ids)
         completed_lessons = sum(1 for p in progress_map.values() if p.completed)
 
         percent_global = round((completed_lessons / total_lessons) * 100) if total_lessons else 0
 
         # group by sections
-        sections = CourseSection.objects.filter(course=course).prefetch_related("lessons").order_by("order", "id")
-
         out_sections = []
         for s in sections:
             out_lessons = []
-            for l in s.lessons.all().order_by("order", "id"):
+            for l in s.lessons.all():
                 p = progress_map.get(l.id)
-                out_lessons.append({
+                out_lessons.append(fieldset.trim({
                     "id": l.id,
                     "title": l.title,
                     "type": getattr(l, "lesson_type", None),
@@ -1767,11 +1965,11 @@ class LearnerCourseOutlineView(APIView):
                     "is_completed": bool(p.completed) if p else False,
                     "percent": int(float(p.progress_percent)) if p else 0,
                     "can_open": True,
-                })
+                }))
             out_sections.append({"id": s.id, "title": s.title, "lessons": out_lessons})
 
         # current lesson fallback
-        first_lesson_id = lessons_qs.first().id if total_lessons else None
+        first_lesson_id = lesson_ids[0] if lesson_ids else None
         current_id = getattr(enrollment, "current_lesson_id", None) or first_lesson_id
 
         return Response({
@@ -1786,49 +1984,90 @@ class LearnerCourseOutlineView(APIView):
         })
 
 
+class LearnerCourseChangesView(LearnerBaseAPIView):
+    """
+    Sommaire incrémental pour le cache local du lecteur.
+    GET /api/learner/courses/<course_id>/changes/?since=<version>&content=1
+    -> {"version", "full", "course", "sections", "lessons", "removed": {"sections", "lessons"}}
+    full=true : remplacer le cache (since absent, journal purgé, import) ; cf. catalog/changes.py
+    """
+
+    def get(self, request, course_id: int):
+        course = get_object_or_404(Course.objects.only("id", "status"), id=course_id)
+        if not _course_is_published(course):
+            return Response({"detail": "Cours non disponible."}, status=status.HTTP_403_FORBIDDEN)
+        if not Enrollment.objects.filter(user=request.user, course=course).exists():
+            return Response({"detail": "Vous n'êtes pas inscrit à ce cours."}, status=status.HTTP_403_FORBIDDEN)
+        content = request.query_params.get("content") in ("1", "true")
+        return Response(changes.course_delta(course, request.query_params.get("since"), content=content))
+
+
 class LearnerContinueView(APIView):
     """
     GET /api/learner/courses/<course_id>/continue/
     -> renvoie la leçon à ouvrir (current_lesson ou première non terminée)
+    Ordre des leçons : index de navigation en cache (catalog/navigation.py) ; une requête pour les
+    leçons terminées, seulement si current_lesson est absente.
     """
     permission_classes = [IsAuthenticated]
 
     def get(self, request, course_id: int):
-        course = get_object_or_404(Course, id=course_id)
+        course = get_object_or_404(Course.objects.only("id", "status", "content_version"), id=course_id)
         if not _course_is_published(course):
             return Response({"detail": "Cours non disponible."}, status=status.HTTP_403_FORBIDDEN)
 
-        enrollment = _get_enrollment(request.user, course)
+        enrollment = (
+            Enrollment.objects.filter(user=request.user, course=course)
+            .only("id", "user_id", "course_id", "current_lesson_id", "status").first()
+        )
         if not enrollment:
             return Response({"detail": "Vous n'êtes pas inscrit à ce cours."}, status=status.HTTP_403_FORBIDDEN)
 
-        lessons = Lesson.objects.filter(section__course=course).order_by("section__order", "order", "id")
-        if not lessons.exists():
+        nav = navigation(course)
+        if not len(nav):
             return Response({"detail": "Cours vide (aucune leçon)."}, status=status.HTTP_404_NOT_FOUND)
 
-        # 1) current_lesson si existe
-        if enrollment.current_lesson_id:
-            lesson = Lesson.objects.filter(id=enrollment.current_lesson_id, section__course=course).first()
-            if lesson:
-                return Response({"lesson_id": lesson.id})
+        # 1) current_lesson si elle appartient (encore) au cours
+        if enrollment.current_lesson_id in nav:
+            return Response({"lesson_id": enrollment.current_lesson_id})
 
         # 2) première leçon non terminée
-        completed_ids = set(
-            LessonProgress.objects.filter(user=request.user, course=course, is_completed=True).values_list("lesson_id",
-                                                                                                           flat=True)
-        )
-        for l in lessons:
-            if l.id not in completed_ids:
-                enrollment.current_lesson = l
-                enrollment.save(update_fields=["current_lesson", "updated_at"])
-                return Response({"lesson_id": l.id})
+        completed_ids = LessonProgress.objects.filter(enrollment=enrollment, completed=True) \
+            .values_list("lesson_id", flat=True)
+        lesson_id = nav.first_incomplete(completed_ids)
+        if lesson_id is not None:
+            enrollment.current_lesson_id = lesson_id
+            enrollment.save(update_fields=["current_lesson", "updated_at"])
+            return Response({"lesson_id": lesson_id})
 
         # 3) sinon dernière leçon (cours terminé)
-        last = lessons.last()
-        enrollment.current_lesson = last
+        enrollment.current_lesson_id = nav.last()
         enrollment.status = Enrollment.Status.COMPLETED
         enrollment.save(update_fields=["current_lesson", "status", "updated_at"])
-        return Response({"lesson_id": last.id, "course_completed": True})
+        return Response({"lesson_id": enrollment.current_lesson_id, "course_completed": True})
+
+
+class LearnerLessonNavView(LearnerBaseAPIView):
+    """
+    Leçons voisines (boutons précédent / suivant du lecteur), sans charger le sommaire.
+    GET /api/learner/courses/<course_id>/lessons/<lesson_id>/nav/
+    -> {"lesson_id", "position", "total", "prev_lesson_id", "next_lesson_id"}
+    """
+
+    def get(self, request, course_id: int, lesson_id: int):
+        course = get_object_or_404(Course.objects.only("id", "content_version"), id=course_id)
+        if not Enrollment.objects.filter(user=request.user, course=course).exists():
+            return Response({"detail": "Inscription requise."}, status=status.HTTP_403_FORBIDDEN)
+        nav = navigation(course)
+        if lesson_id not in nav:
+            return Response({"detail": "Leçon introuvable dans ce cours."}, status=status.HTTP_404_NOT_FOUND)
+        return Response({
+            "lesson_id": lesson_id,
+            "position": nav.pos[lesson_id] + 1,
+            "total": len(nav),
+            "prev_lesson_id": nav.prev(lesson_id),
+            "next_lesson_id": nav.next(lesson_id),
+        })
 
 
 class LearnerLessonStateView(APIView):
@@ -1891,6 +2130,7 @@ class LearnerLessonProgressUpdateView(APIView):
         if last_pos is not None:
             try:
                 lp.last_position_sec = max(0, int(last_pos))
+                lp.position_client_ts = timezone.now()  # cf. enrollments/sync.py (position la plus récente)
             except Exception:
                 pass
 
@@ -1899,14 +2139,8 @@ class LearnerLessonProgressUpdateView(APIView):
 
         lp.save()
 
-        # recalcul rapide cours
-        lessons_ids = Lesson.objects.filter(section__course=course).values_list("id", flat=True)
-        lp_qs = LessonProgress.objects.filter(enrollment=enrollment, lesson_id__in=lessons_ids)
-
-        completed_lessons = lp_qs.filter(completed=True).count()
-        total_lessons = lp_qs.count()  # ou count lessons
-        avg_percent = lp_qs.aggregate(a=Avg("progress_percent"))["a"] or 0
-        course_percent = int(round(avg_percent))
+        # recalcul rapide cours (même formule que la synchro hors ligne)
+        course_progress = course_totals({course.id: enrollment})[0]
 
         return Response({
             "ok": True,
@@ -1916,15 +2150,28 @@ class LearnerLessonProgressUpdateView(APIView):
                 "is_completed": bool(lp.completed),
                 "last_position_seconds": lp.last_position_sec
             },
-            "course_progress": {
-                "course_id": course.id,
-                "progress_percent": course_percent,
-                "completed_lessons": completed_lessons,
-                "total_lessons": total_lessons
-            }
+            "course_progress": course_progress
         })
 
 
+class LearnerProgressSyncView(LearnerBaseAPIView):
+    """
+    Progression enregistrée hors ligne, en un lot (tous cours confondus).
+    POST /api/learner/progress/sync/
+    Payload: {"since": "<token>", "events": [{"lesson_id": 12, "percent": 80, "position": 312,
+              "completed": false, "client_ts": "2026-03-02T08:15:00Z"}, ...]}
+    -> {"token", "applied", "rejected": [lesson_id], "progress": [...] (delta depuis since), "courses": [...]}
+    Règles de fusion : cf. enrollments/sync.py
+    """
+
+    def post(self, request):
+        try:
+            result = sync_progress(request.user, request.data.get("events") or [], request.data.get("since"))
+        except SyncError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result)
+
+
 class LearnerSetCurrentLessonView(APIView):
     """
     POST /api/learner/courses/<course_id>/set-current/
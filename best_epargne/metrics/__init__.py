@@ -0,0 +1,4 @@
+"""
+Instrumentation applicative (SQL, S3/MinIO, cache) par route, exposée sur /metrics
+au format Prometheus. Voir METRICS_* dans les settings.
+"""
@@ -0,0 +1,78 @@
+"""
+CLIENT_CLASS django-redis instrumenté : durée par opération (toujours) et, pour les
+requêtes échantillonnées, compteurs par route (ops, hits, misses).
+"""
+from __future__ import annotations
+
+import time
+
+from django_redis.client import DefaultClient
+
+from .middleware import current
+from .registry import registry
+
+_MISS = object()
+
+
+def _timed(op: str, elapsed: float) -> None:
+    registry.observe("bestep_cache_duration_seconds", {"op": op}, elapsed)
+    state = current()
+    if state is not None and state.sampled:
+        state.cache_ops[op] += 1
+
+
+class InstrumentedClient(DefaultClient):
+    def get(self, key, default=None, version=None, client=None):
+        t0 = time.perf_counter()
+        value = super().get(key, default=_MISS, version=version, client=client)
+        _timed("get", time.perf_counter() - t0)
+
+        state = current()
+        if state is not None and state.sampled:
+            if value is _MISS:
+                state.cache_misses += 1
+            else:
+                state.cache_hits += 1
+        return default if value is _MISS else value
+
+    def set(self, *args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return super().set(*args, **kwargs)
+        finally:
+            _timed("set", time.perf_counter() - t0)
+
+    def delete(self, *args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return super().delete(*args, **kwargs)
+        finally:
+            _timed("delete", time.perf_counter() - t0)
+
+    def get_many(self, *args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return super().get_many(*args, **kwargs)
+        finally:
+            _timed("get_many", time.perf_counter() - t0)
+
+    def set_many(self, *args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return super().set_many(*args, **kwargs)
+        finally:
+            _timed("set_many", time.perf_counter() - t0)
+
+    def delete_many(self, *args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return super().delete_many(*args, **kwargs)
+        finally:
+            _timed("delete_many", time.perf_counter() - t0)
+
+    def incr(self, *args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return super().incr(*args, **kwargs)
+        finally:
+            _timed("incr", time.perf_counter() - t0)
@@ -0,0 +1,133 @@
+"""
+Middleware d'instrumentation par route (url_name résolu).
+
+- toujours : nombre de requêtes et histogramme de latence (coût négligeable)
+- en mode échantillonné (METRICS_SAMPLE_RATE) : SQL via connection.execute_wrapper
+  (nombre, temps, lignes, détection N+1 par forme SQL répétée) et opérations cache
+- appels S3 : toujours mesurés (cf. best_epargne.metrics.s3), rattachés à la route courante
+"""
+from __future__ import annotations
+
+import contextvars
+import logging
+import random
+import re
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection
+
+from .registry import registry
+
+logger = logging.getLogger(__name__)
+
+_IN_LIST = re.compile(r"IN \((?:%s, )*%s\)")
+_NUMBER = re.compile(r"\b\d+\b")
+
+
+def sql_shape(sql: str) -> str:
+    """
+    Forme normalisée : listes IN et littéraux numériques (LIMIT/OFFSET) repliés.
+    """
+    return _NUMBER.sub("?", _IN_LIST.sub("IN (…)", sql))
+
+
+class RequestMetrics:
+    __slots__ = ("sampled", "queries", "db_time", "rows", "shapes", "cache_ops", "cache_hits", "cache_misses", "s3_ops")
+
+    def __init__(self, sampled: bool):
+        self.sampled = sampled
+        self.queries = 0
+        self.db_time = 0.0
+        self.rows = 0
+        self.shapes = Counter()
+        self.cache_ops = Counter()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.s3_ops = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        # connection.execute_wrapper
+        t0 = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - t0
+            self.queries += 1
+            self.shapes[sql_shape(sql)] += 1
+            rowcount = getattr(context.get("cursor"), "rowcount", -1)
+            if rowcount and rowcount > 0:
+                self.rows += rowcount
+
+
+_current: contextvars.ContextVar = contextvars.ContextVar("bestep_request_metrics", default=None)
+
+
+def current() -> RequestMetrics | None:
+    return _current.get()
+
+
+def route_label(request) -> str:
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unmatched"
+    return match.url_name or match.route or match.view_name
+
+
+class MetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not getattr(settings, "METRICS_ENABLED", True):
+            return self.get_response(request)
+
+        sampled = random.random() < getattr(settings, "METRICS_SAMPLE_RATE", 0.1)
+        state = RequestMetrics(sampled)
+        token = _current.set(state)
+        t0 = time.perf_counter()
+        try:
+            if sampled:
+                with connection.execute_wrapper(state):
+                    response = self.get_response(request)
+            else:
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+
+        self._record(request, response, state, time.perf_counter() - t0)
+        if registry.flush_due():
+            registry.flush()
+        return response
+
+    def _record(self, request, response, state: RequestMetrics, elapsed: float) -> None:
+        route = route_label(request)
+        labels = {"route": route}
+        registry.inc("bestep_http_requests_total", {**labels, "method": request.method, "status": response.status_code})
+        registry.observe("bestep_http_request_duration_seconds", labels, elapsed)
+
+        for op, n in state.s3_ops.items():
+            registry.inc("bestep_s3_requests_total", {**labels, "operation": op}, n)
+
+        if not state.sampled:
+            return
+
+        registry.inc("bestep_http_sampled_requests_total", labels)
+        registry.inc("bestep_db_queries_total", labels, state.queries)
+        registry.inc("bestep_db_rows_total", labels, state.rows)
+        registry.observe("bestep_db_queries_per_request", labels, state.queries)
+        registry.observe("bestep_db_time_per_request_seconds", labels, state.db_time)
+
+        threshold = getattr(settings, "METRICS_N_PLUS_ONE_THRESHOLD", 5)
+        for shape, n in state.shapes.items():
+            if n >= threshold:
+                registry.inc("bestep_db_n_plus_one_total", labels)
+                logger.warning("N+1 on %s: %d× %s", route, n, shape[:300])
+
+        for op, n in state.cache_ops.items():
+            registry.inc("bestep_cache_ops_total", {**labels, "op": op}, n)
+        if state.cache_hits:
+            registry.inc("bestep_cache_hits_total", labels, state.cache_hits)
+        if state.cache_misses:
+            registry.inc("bestep_cache_misses_total", labels, state.cache_misses)
@@ -0,0 +1,303 @@
+"""
+Profilage des requêtes lentes, à la demande.
+
+Déclenchement :
+- en-tête `X-Profile-Token` signé (manage.py profile_token) : profil conservé quelle que soit la durée
+- ou échantillon PROFILING_SAMPLE_RATE : profil conservé seulement au-delà de PROFILING_THRESHOLD_MS
+
+Capture : cProfile (top fonctions, nombre d'appels), arbre d'appels par échantillonnage de piles,
+chronologie SQL.
+Stockage : tampon circulaire Redis (LPUSH + LTRIM) des PROFILING_BUFFER_SIZE derniers profils,
+consultable depuis le tableau de bord admin.
+"""
+from __future__ import annotations
+
+import cProfile
+import json
+import logging
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+from django.conf import settings
+from django.core import signing
+from django.db import connection
+from django.utils import timezone
+
+from .middleware import route_label
+
+logger = logging.getLogger(__name__)
+
+HEADER = "X-Profile-Token"
+_SALT = "bestep.profiling"
+MAX_SQL_ENTRIES = 500
+TOP_FUNCTIONS = 40
+TREE_MAX_DEPTH = 80
+TREE_MIN_SHARE = 0.01  # élague les branches < 1% du temps total
+
+
+def make_token(issued_by: str = "admin") -> str:
+    return signing.TimestampSigner(salt=_SALT).sign(issued_by)
+
+
+def token_is_valid(token: str) -> bool:
+    if not token:
+        return False
+    try:
+        signing.TimestampSigner(salt=_SALT).unsign(token, max_age=getattr(settings, "PROFILING_TOKEN_MAX_AGE", 3600))
+        return True
+    except signing.BadSignature:
+        return False
+
+
+class SqlTimeline:
+    def __init__(self, t0: float):
+        self.t0 = t0
+        self.entries = []
+        self.count = 0
+        self.total = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.count += 1
+            self.total += elapsed
+            if len(self.entries) < MAX_SQL_ENTRIES:
+                self.entries.append({
+                    "at_ms": round((start - self.t0) * 1000, 2),
+                    "ms": round(elapsed * 1000, 2),
+                    "sql": sql[:1000],
+                    "many": many,
+                })
+
+
+# ------------------------------------------------------------------
+# pstats -> structures JSON
+# ------------------------------------------------------------------
+def _label(func) -> str:
+    filename, line, name = func
+    if filename == "~":
+        return name  # fonctions C
+    parts = filename.replace("\\", "/").split("/")
+    if "site-packages" in parts:
+        parts = parts[parts.index("site-packages") + 1:]
+    else:
+        parts = parts[-3:]
+    return f"{'/'.join(parts)}:{line}({name})"
+
+
+def _top_functions(stats: dict) -> list:
+    rows = [
+        {"func": _label(func), "ncalls": nc, "tottime_ms": round(tt * 1000, 2), "cumtime_ms": round(ct * 1000, 2)}
+        for func, (cc, nc, tt, ct, callers) in stats.items()
+    ]
+    rows.sort(key=lambda r: r["cumtime_ms"], reverse=True)
+    return rows[:TOP_FUNCTIONS]
+
+
+class StackSampler(threading.Thread):
+    """
+    Échantillonneur de piles (façon pyinstrument) : lit périodiquement la frame courante
+    du thread de la requête. Donne un vrai arbre d'appels, là où le graphe cProfile agrège
+    les appels par fonction (chaîne de middlewares récursive, etc.).
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(daemon=True, name="profiling-sampler")
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = Counter()
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                frame = frame.f_back
+            if stack:
+                self.samples[tuple(reversed(stack))] += 1
+
+    def stop(self):
+        self._done.set()
+        self.join(timeout=1)
+
+
+def _call_tree(samples: Counter, total_ms: float):
+    n = sum(samples.values())
+    if not n:
+        return None
+
+    # préfixe commun (serveur WSGI/ASGI + middlewares au-dessus du profileur) retiré
+    stacks = list(samples)
+    prefix = 0
+    shortest = min(len(st) for st in stacks)
+    while prefix < shortest - 1 and all(st[prefix] == stacks[0][prefix] for st in stacks):
+        prefix += 1
+
+    root = {"children": {}, "n": 0}
+    for stack, count in samples.items():
+        node = root
+        node["n"] += count
+        for func in stack[prefix:prefix + TREE_MAX_DEPTH]:
+            node = node["children"].setdefault(func, {"children": {}, "n": 0})
+            node["n"] += count
+
+    min_n = n * TREE_MIN_SHARE
+    rows = [{"depth": 0, "func": "requête", "samples": n, "cumtime_ms": round(total_ms, 2), "hidden": 0}]
+
+    def walk(node, depth):
+        # -> lignes à plat (pré-ordre) : rendu sans récursion de templates
+        for func, child in sorted(node["children"].items(), key=lambda kv: kv[1]["n"], reverse=True):
+            if child["n"] < min_n:
+                continue
+            # frames de bibliothèques « traversantes » (un seul appelé, même poids) repliées
+            hidden = 0
+            while (
+                "site-packages" in func[0]
+                and len(child["children"]) == 1
+                and next(iter(child["children"].values()))["n"] == child["n"]
+            ):
+                func, child = next(iter(child["children"].items()))
+                hidden += 1
+            rows.append({
+                "depth": depth,
+                "func": _label(func),
+                "samples": child["n"],
+                "cumtime_ms": round(total_ms * child["n"] / n, 2),
+                "hidden": hidden,
+            })
+            walk(child, depth + 1)
+
+    walk(root, 1)
+    return rows
+
+
+# ------------------------------------------------------------------
+# Tampon circulaire
+# ------------------------------------------------------------------
+def _redis():
+    from django_redis import get_redis_connection
+    return get_redis_connection("default")
+
+
+def _buffer_key() -> str:
+    return getattr(settings, "PROFILING_REDIS_KEY", "bestep:profiles")
+
+
+def store_profile(entry: dict) -> None:
+    size = getattr(settings, "PROFILING_BUFFER_SIZE", 50)
+    try:
+        pipe = _redis().pipeline()
+        pipe.lpush(_buffer_key(), json.dumps(entry, default=str))
+        pipe.ltrim(_buffer_key(), 0, size - 1)
+        pipe.execute()
+    except Exception:
+        logger.warning("profile store failed", exc_info=True)
+
+
+def _load_all() -> list:
+    try:
+        raw = _redis().lrange(_buffer_key(), 0, -1)
+    except Exception:
+        logger.warning("profile load failed", exc_info=True)
+        return []
+    out = []
+    for item in raw:
+        try:
+            out.append(json.loads(item))
+        except ValueError:
+            continue
+    return out
+
+
+def recent_profiles(limit: int = 50) -> list:
+    summary_keys = ("id", "at", "method", "path", "route", "status", "user_id", "duration_ms", "sql_count",
+                    "sql_ms", "forced")
+    return [{k: p.get(k) for k in summary_keys} for p in _load_all()[:limit]]
+
+
+def get_profile(profile_id: str):
+    for p in _load_all():
+        if p.get("id") == profile_id:
+            return p
+    return None
+
+
+# ------------------------------------------------------------------
+# Middleware
+# ------------------------------------------------------------------
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not getattr(settings, "PROFILING_ENABLED", True):
+            return self.get_response(request)
+
+        forced = token_is_valid(request.headers.get(HEADER, ""))
+        if not forced and random.random() >= getattr(settings, "PROFILING_SAMPLE_RATE", 0.0):
+            return self.get_response(request)
+
+        t0 = time.perf_counter()
+        timeline = SqlTimeline(t0)
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # un autre profileur est déjà actif sur ce thread : on ne profile pas
+            return self.get_response(request)
+        sampler = StackSampler(threading.get_ident(), getattr(settings, "PROFILING_SAMPLE_INTERVAL_MS", 1) / 1000)
+        sampler.start()
+        try:
+            with connection.execute_wrapper(timeline):
+                response = self.get_response(request)
+        finally:
+            profiler.disable()
+            sampler.stop()
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+
+        threshold = getattr(settings, "PROFILING_THRESHOLD_MS", 500)
+        if getattr(response, "streaming", False) or (not forced and elapsed_ms < threshold):
+            return response
+
+        try:
+            self._save(request, response, profiler, sampler, timeline, elapsed_ms, forced)
+        except Exception:
+            logger.warning("profile capture failed", exc_info=True)
+
+        if forced:
+            response["X-Profile-Duration-Ms"] = f"{elapsed_ms:.1f}"
+        return response
+
+    def _save(self, request, response, profiler, sampler, timeline, elapsed_ms, forced):
+        stats = pstats.Stats(profiler).stats
+        user = getattr(request, "user", None)
+        entry = {
+            "id": uuid.uuid4().hex,
+            "at": timezone.now().isoformat(),
+            "pid": os.getpid(),
+            "method": request.method,
+            "path": request.get_full_path()[:500],
+            "route": route_label(request),
+            "status": response.status_code,
+            "user_id": user.id if user is not None and user.is_authenticated else None,
+            "duration_ms": round(elapsed_ms, 1),
+            "sql_count": timeline.count,
+            "sql_ms": round(timeline.total * 1000, 1),
+            "forced": forced,
+            "top": _top_functions(stats),
+            "tree": _call_tree(sampler.samples, elapsed_ms),
+            "sql": timeline.entries,
+        }
+        store_profile(entry)
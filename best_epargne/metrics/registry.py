@@ -0,0 +1,163 @@
+"""
+Registre de métriques en mémoire (par processus), vidé périodiquement dans un hash Redis
+partagé par tous les workers ; /metrics relit ce hash et l'expose au format texte Prometheus.
+"""
+from __future__ import annotations
+
+import logging
+import re
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+# nom -> (type, aide, buckets)
+METRICS = {
+    "bestep_http_requests_total": ("counter", "Requêtes HTTP par route/méthode/statut", None),
+    "bestep_http_request_duration_seconds": ("histogram", "Durée des requêtes HTTP", LATENCY_BUCKETS),
+    "bestep_http_sampled_requests_total": ("counter", "Requêtes instrumentées en détail (échantillon)", None),
+    "bestep_db_queries_total": ("counter", "Requêtes SQL (requêtes échantillonnées)", None),
+    "bestep_db_rows_total": ("counter", "Lignes renvoyées/affectées (requêtes échantillonnées)", None),
+    "bestep_db_queries_per_request": ("histogram", "Requêtes SQL par requête HTTP", COUNT_BUCKETS),
+    "bestep_db_time_per_request_seconds": ("histogram", "Temps SQL cumulé par requête HTTP", LATENCY_BUCKETS),
+    "bestep_db_n_plus_one_total": ("counter", "Formes SQL répétées au-delà du seuil N+1", None),
+    "bestep_s3_requests_total": ("counter", "Appels S3/MinIO par opération", None),
+    "bestep_s3_errors_total": ("counter", "Appels S3/MinIO en erreur", None),
+    "bestep_s3_duration_seconds": ("histogram", "Durée des appels S3/MinIO", LATENCY_BUCKETS),
+    "bestep_cache_ops_total": ("counter", "Opérations cache par type", None),
+    "bestep_cache_hits_total": ("counter", "Cache hits (get)", None),
+    "bestep_cache_misses_total": ("counter", "Cache misses (get)", None),
+    "bestep_cache_duration_seconds": ("histogram", "Durée des opérations cache", FAST_BUCKETS),
+}
+
+
+def _escape(v) -> str:
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def sample_key(name: str, labels: dict) -> str:
+    if not labels:
+        return name
+    inner = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+    return f"{name}{{{inner}}}"
+
+
+def _fmt_le(le) -> str:
+    return repr(float(le)) if le != "+Inf" else le
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values = defaultdict(float)
+        self._last_flush = time.monotonic()
+
+    def inc(self, name: str, labels: dict, value: float = 1.0) -> None:
+        key = sample_key(name, labels)
+        with self._lock:
+            self._values[key] += value
+
+    def observe(self, name: str, labels: dict, value: float) -> None:
+        buckets = METRICS[name][2]
+        keys = [sample_key(f"{name}_bucket", {**labels, "le": _fmt_le(le)}) for le in buckets if value <= le]
+        keys.append(sample_key(f"{name}_bucket", {**labels, "le": "+Inf"}))
+        with self._lock:
+            for k in keys:  # buckets cumulatifs
+                self._values[k] += 1
+            self._values[sample_key(f"{name}_sum", labels)] += value
+            self._values[sample_key(f"{name}_count", labels)] += 1
+
+    def drain(self) -> dict:
+        with self._lock:
+            values, self._values = self._values, defaultdict(float)
+            self._last_flush = time.monotonic()
+        return values
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self._values)
+
+    def flush_due(self) -> bool:
+        return time.monotonic() - self._last_flush >= getattr(settings, "METRICS_FLUSH_SECONDS", 10)
+
+    def flush(self) -> None:
+        values = self.drain()
+        if not values:
+            return
+        try:
+            from django_redis import get_redis_connection
+            pipe = get_redis_connection("default").pipeline(transaction=False)
+            key = redis_key()
+            for field, v in values.items():
+                pipe.hincrbyfloat(key, field, v)
+            pipe.execute()
+        except Exception:
+            # on remet les valeurs : elles repartiront au prochain flush
+            logger.warning("metrics flush failed", exc_info=True)
+            with self._lock:
+                for field, v in values.items():
+                    self._values[field] += v
+
+
+registry = Registry()
+
+
+def redis_key() -> str:
+    return getattr(settings, "METRICS_REDIS_KEY", "bestep:metrics")
+
+
+def collect() -> dict:
+    """
+    Valeurs agrégées de tous les workers (Redis), à défaut celles du processus courant.
+    """
+    registry.flush()
+    try:
+        from django_redis import get_redis_connection
+        raw = get_redis_connection("default").hgetall(redis_key())
+        return {k.decode(): float(v) for k, v in raw.items()}
+    except Exception:
+        logger.warning("metrics collect failed, exposing local values", exc_info=True)
+        return registry.snapshot()
+
+
+def _family(sample: str) -> str:
+    name = sample.split("{", 1)[0]
+    for suffix in ("_bucket", "_sum", "_count"):
+        base = name[: -len(suffix)]
+        if name.endswith(suffix) and METRICS.get(base, ("",))[0] == "histogram":
+            return base
+    return name
+
+
+_LE = re.compile(r',?le="([^"]+)"')
+
+
+def _sort_key(sample: str):
+    # buckets dans l'ordre croissant de `le` (+Inf en dernier)
+    m = _LE.search(sample)
+    if not m:
+        return sample, 0.0
+    le = m.group(1)
+    return _LE.sub("", sample), float("inf") if le == "+Inf" else float(le)
+
+
+def render(values: dict) -> str:
+    by_family = defaultdict(list)
+    for sample, v in values.items():
+        by_family[_family(sample)].append((sample, v))
+
+    lines = []
+    for family in sorted(by_family):
+        kind, help_text, _ = METRICS.get(family, ("untyped", "", None))
+        lines.append(f"# HELP {family} {help_text}")
+        lines.append(f"# TYPE {family} {kind}")
+        for sample, v in sorted(by_family[family], key=lambda sv: _sort_key(sv[0])):
+            lines.append(f"{sample} {int(v) if v.is_integer() else repr(v)}")
+    return "\n".join(lines) + "\n"
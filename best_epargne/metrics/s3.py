@@ -0,0 +1,67 @@
+"""
+Instrumentation des clients boto3 (MinIO) : évènements botocore pour les appels réseau
+(head_object, put_object, ...) + enveloppe de generate_presigned_url (calcul local).
+"""
+from __future__ import annotations
+
+import time
+
+from .middleware import current
+from .registry import registry
+
+_T0 = "_bestep_metrics_t0"
+
+
+def _record(operation: str, elapsed: float, error: bool = False) -> None:
+    labels = {"operation": operation}
+    registry.observe("bestep_s3_duration_seconds", labels, elapsed)
+    if error:
+        registry.inc("bestep_s3_errors_total", labels)
+
+    state = current()
+    if state is not None:
+        state.s3_ops[operation] += 1  # rattaché à la route en fin de requête
+    else:
+        registry.inc("bestep_s3_requests_total", {"route": "-", **labels})
+
+
+def _before_call(model=None, context=None, **kwargs):
+    if context is not None:
+        context[_T0] = time.perf_counter()
+
+
+def _after_call(http_response=None, model=None, context=None, **kwargs):
+    t0 = (context or {}).pop(_T0, None)
+    if t0 is not None:
+        status = getattr(http_response, "status_code", 200)
+        _record(model.name, time.perf_counter() - t0, error=status >= 300)
+
+
+def _after_call_error(exception=None, context=None, **kwargs):
+    t0 = (context or {}).pop(_T0, None)
+    if t0 is not None:
+        # l'évènement ne porte pas le modèle : l'opération est dans le nom de l'évènement
+        operation = (kwargs.get("event_name") or "").rsplit(".", 1)[-1] or "unknown"
+        _record(operation, time.perf_counter() - t0, error=True)
+
+
+def instrument_s3_client(client):
+    events = client.meta.events
+    events.register("before-call.s3", _before_call)
+    events.register("after-call.s3", _after_call)
+    events.register("after-call-error.s3", _after_call_error)
+
+    presign = client.generate_presigned_url
+
+    def generate_presigned_url(*args, **kwargs):
+        t0 = time.perf_counter()
+        ok = False
+        try:
+            url = presign(*args, **kwargs)
+            ok = True
+            return url
+        finally:
+            _record("generate_presigned_url", time.perf_counter() - t0, error=not ok)
+
+    client.generate_presigned_url = generate_presigned_url
+    return client
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+from .registry import collect, render
+
+
+def _authorized(request) -> bool:
+    token = getattr(settings, "METRICS_TOKEN", "")
+    auth = request.headers.get("Authorization", "")
+    if token and auth.startswith("Bearer ") and hmac.compare_digest(auth[7:].strip(), token):
+        return True
+    user = getattr(request, "user", None)
+    return bool(user and user.is_authenticated and user.is_staff)
+
+
+def metrics_view(request):
+    """
+    GET /metrics
+    -> format texte Prometheus (Bearer METRICS_TOKEN ou session staff)
+    """
+    if not _authorized(request):
+        return HttpResponseForbidden("forbidden")
+    return HttpResponse(render(collect()), content_type="text/plain; version=0.0.4; charset=utf-8")
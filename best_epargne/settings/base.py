@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 import os
 from pathlib import Path
 
+from celery.schedules import crontab
 from django.contrib import staticfiles
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -53,9 +54,14 @@ INSTALLED_APPS = [
     'enrollments',
     'reviews',
     'formations',
+    'analytics',
+    'ledger',
 ]
 
 MIDDLEWARE = [
+    "best_epargne.metrics.middleware.MetricsMiddleware",  # ✅ en premier : mesure toute la chaîne
+    "best_epargne.metrics.profiling.ProfilingMiddleware",
+    "best_epargne.apis.compression.JSONCompressionMiddleware",  # ✅ gzip/brotli des réponses JSON
     'django.middleware.security.SecurityMiddleware',
     "whitenoise.middleware.WhiteNoiseMiddleware",
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -105,8 +111,49 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.AllowAny",
     ],
+    # ✅ JSON via orjson (même format que le JSONRenderer DRF, cf. best_epargne/apis/renderers.py)
+    "DEFAULT_RENDERER_CLASSES": [
+        "best_epargne.apis.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "best_epargne.apis.renderers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
 }
 
+# ✅ compression des réponses JSON (cf. best_epargne/apis/compression.py)
+API_COMPRESSION_ENABLED = os.getenv("API_COMPRESSION_ENABLED", "1") == "1"
+API_COMPRESSION_MIN_BYTES = 1024
+API_GZIP_LEVEL = 6
+API_BROTLI_QUALITY = 5
+
+# ✅ tableau de bord apprenant agrégé (cf. best_epargne/apis/dashboard.py)
+LEARNER_DASHBOARD_WORKERS = int(os.getenv("LEARNER_DASHBOARD_WORKERS", "4"))  # 0 = séquentiel
+LEARNER_DASHBOARD_CONN_MAX_AGE = 60  # connexion gardée par thread du pool (CONN_MAX_AGE reste à 0 : ASGI)
+LEARNER_DASHBOARD_TTLS = {"me": 0, "kpis": 300, "enrollments": 300, "notifications": 15, "payments": 60}
+
+# ✅ checkout (cf. commerce/checkout.py) : snapshot de prix par cours, invalidé à chaque Course.save
+CHECKOUT_PRICE_TTL = 3600
+CHECKOUT_COUPON_HOLD = 2 * 3600  # coupon réservé par une commande PENDING, rendu ensuite
+
+# ✅ Idempotency-Key sur les POST (cf. best_epargne/apis/idempotency.py)
+IDEMPOTENCY_TTL = 24 * 3600
+IDEMPOTENCY_RETRY_AFTER = 1  # doublon simultané : 409 + Retry-After (secondes)
+
+# ✅ copie de cours (cf. catalog/cloning.py) : au-delà, tâche Celery catalog.clone_course
+CLONE_SYNC_MAX_LESSONS = int(os.getenv("CLONE_SYNC_MAX_LESSONS", "200"))
+
+# ✅ paquets hors ligne (cf. catalog/offline.py) : ZIP par cours et par version, servi par URL présignée
+OFFLINE_PACKAGE_PREFIX = "offline"
+OFFLINE_MAX_MEDIA_BYTES = int(os.getenv("OFFLINE_MAX_MEDIA_BYTES", str(80 * 1024 * 1024)))  # audio / vidéo incluses
+OFFLINE_URL_TTL = 3600
+
+# ✅ synchronisation incrémentale du contenu (cf. catalog/changes.py) : au-delà, le client recharge tout
+COURSE_CHANGES_RETENTION_DAYS = 90
+NAVIGATION_CACHE_TTL = 24 * 3600  # index de navigation par cours (clé versionnée, cf. catalog/navigation.py)
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 AUTHENTICATION_BACKENDS = (
@@ -168,10 +215,36 @@ CACHES = {
         "BACKEND": "django_redis.cache.RedisCache",
         "LOCATION": os.environ.get("REDIS_URL", "redis://127.0.0.1:6379/1"),
         "OPTIONS": {
-            "CLIENT_CLASS": "django_redis.client.DefaultClient",
+            "CLIENT_CLASS": "best_epargne.metrics.cache.InstrumentedClient",
         },
     }
 }
+# -------------
+# Temps réel (SSE via Redis pub/sub, servi en ASGI)
+# -------------
+EVENTS_CHANNEL_PREFIX = "bestep:events:user"
+EVENTS_HEARTBEAT_SECONDS = 20
+EVENTS_STREAM_MAX_SECONDS = 300
+EVENTS_RETRY_MS = 5000
+
+# -------------
+# Métriques (/metrics, format Prometheus)
+# -------------
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") == "1"
+METRICS_SAMPLE_RATE = float(os.environ.get("METRICS_SAMPLE_RATE", "0.1"))  # détail SQL/cache sur 10% des requêtes
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+METRICS_FLUSH_SECONDS = 10
+METRICS_N_PLUS_ONE_THRESHOLD = 5
+METRICS_REDIS_KEY = "bestep:metrics"
+
+# Profilage à la demande (X-Profile-Token signé, ou échantillon)
+PROFILING_ENABLED = True
+PROFILING_SAMPLE_RATE = float(os.environ.get("PROFILING_SAMPLE_RATE", "0"))
+PROFILING_THRESHOLD_MS = int(os.environ.get("PROFILING_THRESHOLD_MS", "500"))
+PROFILING_BUFFER_SIZE = 50
+PROFILING_TOKEN_MAX_AGE = 3600
+PROFILING_REDIS_KEY = "bestep:profiles"
+
 # Connexion par email uniquement
 ACCOUNT_LOGIN_METHODS = {"email"}
 ACCOUNT_SIGNUP_FIELDS = ["email*", "first_name", "last_name", "password1*", "password2*"]
@@ -224,6 +297,50 @@ CELERY_TIMEZONE = TIME_ZONE
 # Pour django_celery_results
 CELERY_RESULT_EXTENDED = True
 
+# ✅ tâches périodiques (celery beat)
+CELERY_BEAT_SCHEDULE = {
+    # rollup formateur × cours × jour (KPIs dashboard formateur)
+    "analytics-instructor-rollup": {
+        "task": "analytics.rollup_instructor_stats",
+        "schedule": 15 * 60,
+    },
+    # gains formateurs des journées closes, puis versements mensuels
+    "commerce-instructor-earnings": {
+        "task": "commerce.compute_instructor_earnings",
+        "schedule": crontab(minute=15, hour="*/6"),
+    },
+    "commerce-instructor-payouts": {
+        "task": "commerce.create_instructor_payouts",
+        "schedule": crontab(minute=30, hour=6, day_of_month=1),
+    },
+    # rapprochement Payment / Order / PaymentTransaction (reconcile_payments)
+    "commerce-expire-coupon-reservations": {
+        "task": "commerce.expire_coupon_reservations",
+        "schedule": 15 * 60,
+    },
+    "commerce-reconcile-payments": {
+        "task": "commerce.reconcile_payments",
+        "schedule": crontab(minute=45, hour=2),
+    },
+    # clés d'ordre sections / leçons allongées par les insertions (catalog/ranking.py)
+    "catalog-rebalance-ranks": {
+        "task": "catalog.rebalance_ranks",
+        "schedule": crontab(minute=40),
+    },
+    # journal des modifications de cours (synchronisation incrémentale) : purge quotidienne
+    "catalog-prune-course-changes": {
+        "task": "catalog.prune_course_changes",
+        "schedule": crontab(hour=4, minute=10),
+    },
+    # grand livre : snapshot de solde de chaque compte à minuit
+    "ledger-balance-snapshots": {
+        "task": "ledger.take_balance_snapshots",
+        "schedule": crontab(minute=20, hour=0),
+    },
+}
+INSTRUCTOR_PAYOUT_MINIMUM = os.getenv("INSTRUCTOR_PAYOUT_MINIMUM", "5000")  # même devise que le solde
+RECONCILE_AUTO_HEAL = os.getenv("RECONCILE_AUTO_HEAL", "0") == "1"  # crée les inscriptions manquantes
+
 # settings.py
 AWS_ACCESS_KEY_ID = os.getenv("MINIO_ACCESS_KEY", "")
 AWS_SECRET_ACCESS_KEY = os.getenv("MINIO_SECRET_KEY", "")
@@ -19,8 +19,9 @@ from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path, include
 
+from best_epargne.metrics.views import metrics_view
 from formations.views import UserLoginView, InstructorDashboard, StudentDashboard, \
-    OrganisationDashboard, AdminDashboard, LearnerExploreView, LearnerCoursePlayerView, HomeView, RizView
+    OrganisationDashboard, AdminDashboard, AdminProfileDetailView, LearnerExploreView, LearnerCoursePlayerView, HomeView, RizView
 
 urlpatterns = [
                   path('admin/', admin.site.urls),
@@ -28,6 +29,7 @@ urlpatterns = [
 
                   # marketplace
                   path("api/", include("best_epargne.apis.api_urls")),  # marketplace
+                  path("metrics", metrics_view, name="metrics"),  # Prometheus
                   path("catalog/", include("catalog.urls")),  # marketplace
                   path("learn/", include("enrollments.urls")),  # player
                   path("company/", include("organizations.urls")),
@@ -45,6 +47,8 @@ urlpatterns = [
 
                   path("dashboard/business/", OrganisationDashboard.as_view(), name="business_dashboard"),
                   path("dashboard/admin/", AdminDashboard.as_view(), name="admin_dashboard"),
+                  path("dashboard/admin/profiles/<str:profile_id>/", AdminProfileDetailView.as_view(),
+                       name="admin_profile_detail"),
                   path("", HomeView.as_view(), name="home"),
 
               ] + static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
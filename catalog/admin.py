@@ -1,5 +1,8 @@
 from django.contrib import admin
+from .changes import COURSE, UPSERT, record_changes
+from .cloning import clone_course
 from .models import Category, Course, CourseSection, Lesson
+from .versioning import bump_course
 
 
 @admin.register(Category)
@@ -13,14 +16,16 @@ class LessonInline(admin.TabularInline):
     model = Lesson
     extra = 0
     fields = ("order", "title", "lesson_type", "is_preview", "duration_sec", "video_url", "file")
-    ordering = ("order",)
+    readonly_fields = ("order",)  # ordre : glisser-déposer du builder (rank)
+    ordering = ("rank", "id")
 
 
 class CourseSectionInline(admin.TabularInline):
     model = CourseSection
     extra = 0
     fields = ("order", "title")
-    ordering = ("order",)
+    readonly_fields = ("order",)
+    ordering = ("rank", "id")
     show_change_link = True
 
 
@@ -29,7 +34,7 @@ class CourseSectionAdmin(admin.ModelAdmin):
     list_display = ("title", "course", "order")
     list_filter = ("course",)
     search_fields = ("title", "course__title")
-    ordering = ("course", "order")
+    ordering = ("course", "rank")
     inlines = [LessonInline]
 
 
@@ -38,7 +43,7 @@ class LessonAdmin(admin.ModelAdmin):
     list_display = ("title", "section", "lesson_type", "order", "is_preview", "duration_sec")
     list_filter = ("lesson_type", "is_preview")
     search_fields = ("title", "section__title", "section__course__title")
-    ordering = ("section__course", "section__order", "order")
+    ordering = ("section__course", "section__rank", "rank")
 
 
 @admin.register(Course)
@@ -51,16 +56,28 @@ class CourseAdmin(admin.ModelAdmin):
     readonly_fields = ("published_at", "created_at", "updated_at")
     prepopulated_fields = {"slug": ("title",)}
     inlines = [CourseSectionInline]
-    actions = ("mark_review", "mark_published", "mark_archived")
+    actions = ("mark_review", "mark_published", "mark_archived", "duplicate")
+
+    def _set_status(self, queryset, status):
+        ids = list(queryset.values_list("id", flat=True))
+        queryset.update(status=status)
+        for course_id in ids:  # update() ne déclenche pas les signaux -> versions ETag, journal
+            bump_course(course_id)
+            record_changes(course_id, [(COURSE, course_id, UPSERT)])
 
     @admin.action(description="Mettre en validation")
     def mark_review(self, request, queryset):
-        queryset.update(status=Course.Status.REVIEW)
+        self._set_status(queryset, Course.Status.REVIEW)
 
     @admin.action(description="Publier")
     def mark_published(self, request, queryset):
-        queryset.update(status=Course.Status.PUBLISHED)
+        self._set_status(queryset, Course.Status.PUBLISHED)
 
     @admin.action(description="Archiver")
     def mark_archived(self, request, queryset):
-        queryset.update(status=Course.Status.ARCHIVED)
+        self._set_status(queryset, Course.Status.ARCHIVED)
+
+    @admin.action(description="Dupliquer (brouillon, médias partagés)")
+    def duplicate(self, request, queryset):
+        for course_id in queryset.values_list("id", flat=True):
+            clone_course(course_id)
@@ -0,0 +1,437 @@
+"""
+Bundle d'export / import de cours (JSONL, une ligne = un enregistrement).
+
+    {"type": "bundle", "format": "bestep-course-bundle", "version": 1, "exported_at": "...", "media": true}
+    {"type": "certificate_template", "name": "...", "background": "certificates/templates/x.png", ...}
+    {"type": "category", "slug": "finance", "name": "Finance"}
+    {"type": "media", "object_key": "media/...", "kind": "video", "owner": "prof@...", ...}
+    {"type": "course", "slug": "...", "instructor": "prof@...", "category": "finance", ...,
+     "sections": [{"rank": "h", "title": "...", "lessons": [{"rank": "h", "media": "media/...", ...}]}],
+     "quizzes": [{"key": "<uuid>", "title": "...", "lesson": ["h", "h"],
+                  "questions": [{"key": "<uuid>", "order": 1, ..., "choices": [{"key": "<uuid>", ...}]}]}]}
+
+- writer (iter_bundle) : cours lus par lots de CHUNK_SIZE (6 requêtes par lot), un cours par ligne ;
+- reader (read_bundle) : générateur ligne à ligne, version vérifiée sur l'en-tête ;
+- importer (import_bundle) : lots de CHUNK_SIZE cours, une transaction par lot ; cours upsertés par slug,
+  sections / leçons par clé d'ordre (rank), quiz / questions / choix par clé stable (key) ;
+  catégories par slug, modèles de certificat par nom, médias par object_key.
+⚠️ Ce qui n'est plus dans le bundle n'est supprimé qu'avec prune=True (--prune) : la suppression emporte
+  en cascade progression et tentatives de quiz de l'environnement cible.
+⚠️ Fichiers et objets MinIO : seules les références (chemins, object_key) voyagent, pas le contenu.
+⚠️ Entreprise (company) non exportée : propre à chaque environnement.
+"""
+from __future__ import annotations
+
+import json
+import uuid
+from collections import Counter, defaultdict
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from assessments.models import Choice, Question, Quiz
+from certifications.models import CertificateTemplate
+from .changes import COURSE, RESET, record_changes
+from .models import Category, Course, CourseSection, Lesson, MediaAsset
+from .versioning import bump_catalog, bump_course
+
+FORMAT = "bestep-course-bundle"
+VERSION = 2  # 2 : clés des questions / choix (bundle v1 : rapprochement par position)
+CHUNK_SIZE = 100
+
+COURSE_FIELDS = (
+    "title", "subtitle", "description", "course_type", "pricing_type", "price", "currency", "status",
+    "published_at", "company_only", "thumbnail", "preview_video_url",
+)
+SECTION_FIELDS = ("rank", "order", "title")
+LESSON_FIELDS = ("rank", "order", "title", "lesson_type", "is_preview", "duration_sec", "content", "video_url", "file")
+QUIZ_FIELDS = ("key", "title", "passing_score", "max_attempts")
+QUESTION_FIELDS = ("key", "order", "prompt")
+CHOICE_FIELDS = ("key", "text", "is_correct")
+MEDIA_FIELDS = ("kind", "title", "content_type", "size", "duration_seconds")
+TEMPLATE_FIELDS = ("background", "signature_name", "signature_title")
+
+
+class BundleError(ValueError):
+    pass
+
+
+def _chunks(iterable, size: int):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# ------------------------------------------------------------------
+# Export
+# ------------------------------------------------------------------
+def _course_records(course_ids: list, media: bool, seen: dict):
+    """Un lot de cours -> enregistrements (catégories / médias avant le cours qui les utilise)."""
+    sections, lessons = {}, {}
+    for row in CourseSection.objects.filter(course_id__in=course_ids).order_by("rank", "id") \
+            .values("id", "course_id", *SECTION_FIELDS):
+        sections[row.pop("id")] = row
+        row["lessons"] = []
+    for row in Lesson.objects.filter(section__course_id__in=course_ids).order_by("rank", "id").values(
+        "id", "section_id", *LESSON_FIELDS, "media_asset__object_key", "media_asset__owner__email",
+        *(f"media_asset__{f}" for f in MEDIA_FIELDS),
+    ):
+        lesson_id, section = row.pop("id"), sections[row.pop("section_id")]
+        lessons[lesson_id] = (section["rank"], row["rank"])
+        section["lessons"].append(row)
+
+    quizzes, questions = {}, {}
+    for row in Quiz.objects.filter(course_id__in=course_ids).order_by("id").values("id", "course_id", "lesson_id",
+                                                                                   *QUIZ_FIELDS):
+        row["lesson"] = lessons.get(row.pop("lesson_id"))
+        row["questions"] = []
+        quizzes[row.pop("id")] = row
+    for row in Question.objects.filter(quiz__course_id__in=course_ids).order_by("order", "id") \
+            .values("id", "quiz_id", *QUESTION_FIELDS):
+        row["choices"] = []
+        quizzes[row.pop("quiz_id")]["questions"].append(row)
+        questions[row.pop("id")] = row
+    for row in Choice.objects.filter(question__quiz__course_id__in=course_ids).order_by("id") \
+            .values("question_id", *CHOICE_FIELDS):
+        questions[row.pop("question_id")]["choices"].append(row)
+
+    by_course = {cid: {"sections": [], "quizzes": []} for cid in course_ids}
+    for section in sections.values():
+        by_course[section.pop("course_id")]["sections"].append(section)
+    for quiz in quizzes.values():
+        by_course[quiz.pop("course_id")]["quizzes"].append(quiz)
+
+    courses = Course.objects.filter(id__in=course_ids).order_by("id").values(
+        "id", "slug", *COURSE_FIELDS, "instructor__email", "category__slug", "category__name",
+        "preview_media_asset__object_key", "preview_media_asset__owner__email",
+        *(f"preview_media_asset__{f}" for f in MEDIA_FIELDS),
+    )
+    for row in courses:
+        if row["category__slug"] and row["category__slug"] not in seen["categories"]:
+            seen["categories"].add(row["category__slug"])
+            yield {"type": "category", "slug": row["category__slug"], "name": row["category__name"]}
+
+        media_rows = [(row, "preview_media_asset__")] + [
+            (lesson, "media_asset__") for s in by_course[row["id"]]["sections"] for lesson in s["lessons"]
+        ]
+        for item, prefix in media_rows:
+            key = item.pop(f"{prefix}object_key")
+            values = {f: item.pop(f"{prefix}{f}") for f in MEDIA_FIELDS}
+            owner = item.pop(f"{prefix}owner__email")
+            item["media" if prefix == "media_asset__" else "preview_media"] = key if media else None
+            if media and key and key not in seen["media"]:
+                seen["media"].add(key)
+                yield {"type": "media", "object_key": key, "owner": owner, **values}
+
+        yield {
+            "type": "course",
+            "slug": row["slug"],
+            **{f: row[f] for f in COURSE_FIELDS},
+            "instructor": row["instructor__email"],
+            "category": row["category__slug"],
+            "preview_media": row["preview_media"],
+            **by_course[row["id"]],
+        }
+
+
+def iter_bundle(courses=None, *, media: bool = True, chunk_size: int = CHUNK_SIZE):
+    """
+    Générateur d'enregistrements pour `courses` (queryset, défaut : tous les cours).
+    media=False : références MediaAsset omises (lessons[].media = null).
+    """
+    yield {"type": "bundle", "format": FORMAT, "version": VERSION, "exported_at": timezone.now(), "media": media}
+    for row in CertificateTemplate.objects.order_by("name").values("name", *TEMPLATE_FIELDS).iterator():
+        yield {"type": "certificate_template", **row}
+
+    seen = {"categories": set(), "media": set()}
+    ids = (courses if courses is not None else Course.objects.all()).order_by("id").values_list("id", flat=True)
+    for chunk in _chunks(ids.iterator(chunk_size=chunk_size), chunk_size):
+        yield from _course_records(chunk, media, seen)
+
+
+def write_bundle(records, fp) -> int:
+    """Écrit les enregistrements en JSONL dans `fp` (texte) -> nombre de lignes."""
+    n = 0
+    for record in records:
+        fp.write(json.dumps(record, ensure_ascii=False, default=str))
+        fp.write("\n")
+        n += 1
+    return n
+
+
+def read_bundle(fp):
+    """Générateur d'enregistrements ; l'en-tête (1re ligne) est vérifié puis omis."""
+    header = None
+    for lineno, line in enumerate(fp, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            raise BundleError(f"ligne {lineno} : JSON invalide ({e}).")
+        if header is None:
+            if record.get("type") != "bundle" or record.get("format") != FORMAT:
+                raise BundleError("En-tête de bundle absent ou format inconnu.")
+            if int(record.get("version") or 0) > VERSION:
+                raise BundleError(f"Version {record['version']} non supportée (max {VERSION}).")
+            header = record
+            continue
+        if "type" not in record:
+            raise BundleError(f"ligne {lineno} : champ type manquant.")
+        yield record
+    if header is None:
+        raise BundleError("Bundle vide.")
+
+
+# ------------------------------------------------------------------
+# Import
+# ------------------------------------------------------------------
+def _uuid(value, where: str):
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        raise BundleError(f"{where} : clé invalide ({value}).")
+
+
+def _sync(model, parent_field: str, parent_ids, rows: list, key: tuple, fields: list, prune: bool = False) -> dict:
+    """
+    Upsert des enfants de `parent_ids` par clé naturelle ; prune=True : les enfants absents de `rows`
+    sont supprimés (sinon conservés). -> {clé: id}
+    """
+    existing = {
+        tuple(r[f] for f in key): r["id"]
+        for r in model.objects.filter(**{f"{parent_field}__in": parent_ids}).values("id", *key)
+    }
+    created, updated = [], []
+    for row in rows:
+        obj = model(**row)
+        obj.pk = existing.pop(tuple(row[f] for f in key), None)
+        (updated if obj.pk else created).append(obj)
+    if prune and existing:
+        model.objects.filter(id__in=existing.values()).delete()
+    model.objects.bulk_create(created)
+    if updated:
+        model.objects.bulk_update(updated, fields)
+    return {tuple(getattr(obj, f) for f in key): obj.pk for obj in updated + created}
+
+
+class _Importer:
+    def __init__(self, instructor=None, chunk_size: int = CHUNK_SIZE, prune: bool = False):
+        self.default_instructor = instructor
+        self.chunk_size = chunk_size
+        self.prune = prune
+        self.counts = Counter()
+        self.categories, self.templates, self.media, self.courses = {}, {}, {}, []
+
+    def add(self, record: dict) -> None:
+        kind = record["type"]
+        if kind == "category":
+            self.categories[record["slug"]] = record["name"]
+        elif kind == "certificate_template":
+            self.templates[record["name"]] = {f: record.get(f) or "" for f in TEMPLATE_FIELDS}
+        elif kind == "media":
+            self.media[record["object_key"]] = record
+        elif kind == "course":
+            self.courses.append(record)
+            if len(self.courses) >= self.chunk_size:
+                self.flush()
+        else:
+            raise BundleError(f"type inconnu : {kind}.")
+
+    # --- références
+    def _users(self, emails) -> dict:
+        users = dict(get_user_model().objects.filter(email__in=set(emails) - {None}).values_list("email", "id"))
+        fallback = self.default_instructor.id if self.default_instructor else None
+        return {**{e: fallback for e in emails}, **users}
+
+    def _flush_categories(self) -> dict:
+        if self.categories:
+            known = set(Category.objects.filter(slug__in=self.categories).values_list("slug", flat=True))
+            Category.objects.bulk_create(
+                [Category(slug=s, name=n) for s, n in self.categories.items() if s not in known], ignore_conflicts=True,
+            )
+            self.counts["categories"] += len(self.categories)
+        slugs = {c["category"] for c in self.courses} - {None}
+        self.categories = {}
+        return dict(Category.objects.filter(slug__in=slugs).values_list("slug", "id"))
+
+    def _flush_templates(self) -> None:
+        if not self.templates:
+            return
+        existing = dict(CertificateTemplate.objects.filter(name__in=self.templates).values_list("name", "id"))
+        objs = [CertificateTemplate(id=existing.get(name), name=name, **values) for name, values in self.templates.items()]
+        CertificateTemplate.objects.bulk_create([o for o in objs if o.id is None])
+        CertificateTemplate.objects.bulk_update([o for o in objs if o.id is not None], list(TEMPLATE_FIELDS))
+        self.counts["certificate_templates"] += len(objs)
+        self.templates = {}
+
+    def _flush_media(self, users: dict) -> dict:
+        keys = {c["preview_media"] for c in self.courses} | {
+            lesson.get("media") for c in self.courses for s in c["sections"] for lesson in s["lessons"]
+        }
+        keys.discard(None)
+        found = dict(MediaAsset.objects.filter(object_key__in=keys).values_list("object_key", "id"))
+        new = []
+        for key in keys - set(found):
+            record = self.media.get(key)
+            owner = users.get(record.get("owner")) if record else None
+            if owner is None:
+                continue  # objet inconnu ici : leçon importée sans média
+            new.append(MediaAsset(object_key=key, owner_id=owner, **{f: record.get(f) for f in MEDIA_FIELDS}))
+        MediaAsset.objects.bulk_create(new, ignore_conflicts=True)
+        self.counts["media"] += len(new)
+        for key in keys:
+            self.media.pop(key, None)
+        return {**found, **{m.object_key: m.id for m in new}}
+
+    @staticmethod
+    def _quiz_keys(courses: list, by_slug: dict) -> None:
+        """q["key"] -> UUID ; bundle antérieur sans clé : quiz existant de même titre, sinon clé neuve."""
+        known = {
+            (course_id, title): key
+            for course_id, title, key in Quiz.objects.filter(course_id__in=by_slug.values())
+            .values_list("course_id", "title", "key")
+        }
+        for c in courses:
+            for q in c["quizzes"]:
+                if q.get("key"):
+                    q["key"] = _uuid(q["key"], f"{c['slug']} : quiz")
+                else:
+                    q["key"] = known.get((by_slug[c["slug"]], q["title"])) or uuid.uuid4()
+
+    @staticmethod
+    def _child_keys(model, parent_field: str, items: dict, order_by: tuple) -> None:
+        """
+        items : {parent_id: [enregistrement]} -> item["key"] en UUID. Bundle v1 sans clé : enfant
+        existant de même position (order_by, comme l'export), sinon clé neuve.
+        """
+        known = defaultdict(list)
+        for parent_id, key in model.objects.filter(**{f"{parent_field}__in": list(items)}) \
+                .order_by(parent_field, *order_by).values_list(parent_field, "key"):
+            known[parent_id].append(key)
+        for parent_id, rows in items.items():
+            keys = known[parent_id]
+            for i, item in enumerate(rows):
+                if item.get("key"):
+                    item["key"] = _uuid(item["key"], model._meta.verbose_name)
+                else:
+                    item["key"] = keys[i] if i < len(keys) else uuid.uuid4()
+
+    # --- cours
+    def flush(self) -> None:
+        if not self.courses:
+            self._flush_categories()
+            self._flush_templates()
+            return
+        courses, course_ids = self.courses, []
+        with transaction.atomic():
+            users = self._users([c.get("instructor") for c in courses] + [m.get("owner") for m in self.media.values()])
+            categories = self._flush_categories()
+            self._flush_templates()
+            media = self._flush_media(users)
+
+            existing = dict(Course.objects.filter(slug__in=[c["slug"] for c in courses]).values_list("slug", "id"))
+            objs = []
+            for c in courses:
+                if users.get(c.get("instructor")) is None:
+                    raise BundleError(f"{c['slug']} : formateur {c.get('instructor')} introuvable (cf. --instructor).")
+                values = {f: c.get(f) for f in COURSE_FIELDS if f in c}
+                values["price"] = Decimal(str(values.get("price") or 0))
+                values["published_at"] = parse_datetime(values["published_at"]) if values.get("published_at") else None
+                values["thumbnail"] = values.get("thumbnail") or ""
+                objs.append(Course(
+                    id=existing.get(c["slug"]), slug=c["slug"], instructor_id=users[c["instructor"]],
+                    category_id=categories.get(c.get("category")), preview_media_asset_id=media.get(c.get("preview_media")),
+                    updated_at=timezone.now(), **values,
+                ))
+            Course.objects.bulk_create([o for o in objs if o.id is None])
+            Course.objects.bulk_update(
+                [o for o in objs if existing.get(o.slug)],
+                [*COURSE_FIELDS, "instructor", "category", "preview_media_asset", "updated_at"],
+            )
+            course_ids = [o.id for o in objs]
+            self.counts["courses_created"] += len(objs) - len(existing)
+            self.counts["courses_updated"] += len(existing)
+
+            by_slug = {o.slug: o.id for o in objs}
+            sections = _sync(CourseSection, "course_id", course_ids, [
+                {"course_id": by_slug[c["slug"]], **{f: s[f] for f in SECTION_FIELDS}}
+                for c in courses for s in c["sections"]
+            ], ("course_id", "rank"), ["order", "title"], self.prune)
+            lessons = _sync(Lesson, "section__course_id", course_ids, [
+                {
+                    "section_id": sections[(by_slug[c["slug"]], s["rank"])],
+                    **{f: lesson.get(f) for f in LESSON_FIELDS},
+                    **{f: lesson.get(f) or "" for f in ("content", "video_url", "file")},
+                    "media_asset_id": media.get(lesson.get("media")),
+                }
+                for c in courses for s in c["sections"] for lesson in s["lessons"]
+            ], ("section_id", "rank"), [f for f in LESSON_FIELDS if f != "rank"] + ["media_asset"], self.prune)
+
+            def lesson_id(course, ref):
+                if not ref:
+                    return None
+                section = sections.get((by_slug[course["slug"]], ref[0]))
+                return lessons.get((section, ref[1]))
+
+            self._quiz_keys(courses, by_slug)
+            rows = [
+                {"course_id": by_slug[c["slug"]], "lesson_id": lesson_id(c, q.get("lesson")),
+                 **{f: q[f] for f in QUIZ_FIELDS}}
+                for c in courses for q in c["quizzes"]
+            ]
+            # Quiz.lesson est un OneToOne : leçons libérées avant réattribution (quiz conservés, échanges)
+            Quiz.objects.filter(course_id__in=course_ids, lesson_id__in={r["lesson_id"] for r in rows} - {None}) \
+                .update(lesson=None)
+            quizzes = _sync(Quiz, "course_id", course_ids, rows, ("course_id", "key"),
+                            ["lesson", "title", "passing_score", "max_attempts"], self.prune)
+            by_quiz = {quizzes[(by_slug[c["slug"]], q["key"])]: q["questions"] for c in courses for q in c["quizzes"]}
+            self._child_keys(Question, "quiz_id", by_quiz, ("order", "id"))
+            questions = _sync(Question, "quiz__course_id", course_ids, [
+                {"quiz_id": quiz_id, **{f: qu[f] for f in QUESTION_FIELDS}}
+                for quiz_id, rows in by_quiz.items() for qu in rows
+            ], ("quiz_id", "key"), ["order", "prompt"], self.prune)
+            by_question = {
+                questions[(quiz_id, qu["key"])]: qu["choices"] for quiz_id, rows in by_quiz.items() for qu in rows
+            }
+            self._child_keys(Choice, "question_id", by_question, ("id",))
+            _sync(Choice, "question__quiz__course_id", course_ids, [
+                {"question_id": question_id, **{f: ch[f] for f in CHOICE_FIELDS}}
+                for question_id, rows in by_question.items() for ch in rows
+            ], ("question_id", "key"), ["text", "is_correct"], self.prune)
+            for cid in course_ids:  # lecteurs : resynchronisation complète (catalog/changes.py)
+                record_changes(cid, [(COURSE, cid, RESET)])
+            self.counts["sections"] += len(sections)
+            self.counts["lessons"] += len(lessons)
+            self.counts["quizzes"] += len(quizzes)
+
+            def bump(ids=tuple(course_ids)):  # bulk_* : pas de signaux (versions ETag, snapshot de prix)
+                from commerce.checkout import invalidate_price
+                for cid in ids:
+                    bump_course(cid, catalog=False)
+                    invalidate_price(cid)
+                bump_catalog()
+
+            transaction.on_commit(bump)
+        self.courses = []
+
+
+def import_bundle(records, *, instructor=None, chunk_size: int = CHUNK_SIZE, prune: bool = False) -> Counter:
+    """
+    Importe les enregistrements de read_bundle() par lots de `chunk_size` cours.
+    instructor : formateur utilisé quand l'email du bundle n'existe pas dans cet environnement.
+    prune : supprime sections / leçons / quiz / questions / choix absents du bundle (cf. en-tête).
+    """
+    importer = _Importer(instructor, max(1, chunk_size), prune)
+    for record in records:
+        importer.add(record)
+    importer.flush()
+    return importer.counts
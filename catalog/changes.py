@@ -0,0 +1,128 @@
+"""
+Synchronisation incrémentale du contenu d'un cours (lecteur avec cache local).
+
+- Course.content_version : séquence croissante par cours, incrémentée en UPDATE ... + 1 (verrou de
+  ligne jusqu'au COMMIT : les numéros suivent l'ordre des commits) ;
+- CourseChange : (seq, kind, object_id, op) écrits dans la même transaction que la modification ;
+- sources : signaux (admin, vues unitaires, suppressions), builder / réordonnancement / rééquilibrage
+  (bulk_*), import de bundles (op RESET : le client recharge tout) ;
+- course_delta(since) : sections et leçons ajoutées / modifiées / supprimées depuis `since` ; full=True
+  quand since vaut 0, qu'un RESET est passé ou que le journal a été purgé (trou dans la séquence).
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Course, CourseChange, CourseSection, Lesson
+
+COURSE, SECTION, LESSON = CourseChange.Kind.COURSE, CourseChange.Kind.SECTION, CourseChange.Kind.LESSON
+UPSERT, DELETE, RESET = CourseChange.Op.UPSERT, CourseChange.Op.DELETE, CourseChange.Op.RESET
+
+SECTION_FIELDS = ("id", "title", "order", "rank")
+LESSON_FIELDS = ("id", "section_id", "title", "order", "rank", "lesson_type", "duration_sec", "is_preview",
+                 "video_url", "media_asset_id")
+
+
+def record_changes(course_id, changes) -> int | None:
+    """changes : itérable de (kind, object_id, op) -> nouvelle version du cours (None si rien / cours absent)."""
+    changes = list(dict.fromkeys(changes))
+    if course_id is None or not changes:
+        return None
+    with transaction.atomic():
+        if not Course.objects.filter(id=course_id).update(content_version=F("content_version") + 1):
+            return None
+        seq = Course.objects.filter(id=course_id).values_list("content_version", flat=True).get()
+        now = timezone.now()  # même horodatage : une version est purgée entière ou pas du tout
+        CourseChange.objects.bulk_create([
+            CourseChange(course_id=course_id, seq=seq, kind=kind, object_id=object_id, op=op, created_at=now)
+            for kind, object_id, op in changes
+        ])
+    return seq
+
+
+def record_many(kind: str, rows, op: str = UPSERT) -> None:
+    """rows : (object_id, course_id) de plusieurs cours -> une version par cours."""
+    by_course = defaultdict(list)
+    for object_id, course_id in rows:
+        by_course[course_id].append((kind, object_id, op))
+    for course_id, changes in by_course.items():
+        record_changes(course_id, changes)
+
+
+def record_siblings(model, ids: list) -> None:
+    """Frères et sœurs renumérotés (insert_position, rebalance) : même cours par construction."""
+    if not ids:
+        return
+    if model is CourseSection:
+        kind, course_id = SECTION, CourseSection.objects.filter(id=ids[0]).values_list("course_id", flat=True).first()
+    else:
+        kind, course_id = LESSON, Lesson.objects.filter(id=ids[0]).values_list("section__course_id", flat=True).first()
+    record_changes(course_id, [(kind, pk, UPSERT) for pk in ids])
+
+
+def course_delta(course: Course, since, content: bool = False) -> dict:
+    """Delta du sommaire depuis la version `since` du client ; content=True : Lesson.content inclus."""
+    version = Course.objects.filter(id=course.id).values_list("content_version", flat=True).get()
+    try:
+        since = int(since)
+    except (TypeError, ValueError):
+        since = 0
+    fields = LESSON_FIELDS + (("content",) if content else ())
+    out = {"version": version, "full": False, "course": None, "sections": [], "lessons": [],
+           "removed": {"sections": [], "lessons": []}}
+    if since > 0 and since == version:
+        return out
+
+    changes = list(
+        CourseChange.objects.filter(course_id=course.id, seq__gt=since, seq__lte=version)
+        .order_by("seq").values_list("seq", "kind", "object_id", "op")
+    ) if since > 0 else []
+    if since <= 0 or not changes or changes[0][0] != since + 1 or any(c[3] == RESET for c in changes):
+        out["full"] = True
+        out["course"] = _course_payload(course.id)
+        out["sections"] = list(CourseSection.objects.filter(course_id=course.id).order_by("rank", "id")
+                               .values(*SECTION_FIELDS))
+        out["lessons"] = list(Lesson.objects.filter(section__course_id=course.id)
+                              .order_by("section__rank", "rank", "id").values(*fields))
+        return out
+
+    latest = {}  # (kind, id) -> op de la dernière modification
+    for _, kind, object_id, op in changes:
+        latest[(kind, object_id)] = op
+    ids = defaultdict(set)
+    for (kind, object_id), op in latest.items():
+        ids[kind, op].add(object_id)
+
+    if ids[COURSE, UPSERT]:
+        out["course"] = _course_payload(course.id)
+    if ids[SECTION, UPSERT]:
+        out["sections"] = list(CourseSection.objects.filter(course_id=course.id, id__in=ids[SECTION, UPSERT])
+                               .order_by("rank", "id").values(*SECTION_FIELDS))
+    if ids[LESSON, UPSERT]:
+        out["lessons"] = list(Lesson.objects.filter(section__course_id=course.id, id__in=ids[LESSON, UPSERT])
+                              .order_by("section__rank", "rank", "id").values(*fields))
+    # modifié puis supprimé (ou déplacé vers un autre cours) : absent des lignes lues -> supprimé
+    found_sections = {s["id"] for s in out["sections"]}
+    found_lessons = {l["id"] for l in out["lessons"]}
+    out["removed"]["sections"] = sorted(ids[SECTION, DELETE] | (ids[SECTION, UPSERT] - found_sections))
+    out["removed"]["lessons"] = sorted(ids[LESSON, DELETE] | (ids[LESSON, UPSERT] - found_lessons))
+    return out
+
+
+def _course_payload(course_id) -> dict:
+    return Course.objects.filter(id=course_id).values(
+        "id", "slug", "title", "subtitle", "description", "status", "preview_video_url", "preview_media_asset_id",
+    ).get()
+
+
+def prune_changes() -> int:
+    """Purge du journal au-delà de COURSE_CHANGES_RETENTION_DAYS (les clients concernés rechargent tout)."""
+    days = getattr(settings, "COURSE_CHANGES_RETENTION_DAYS", 90)
+    deleted, _ = CourseChange.objects.filter(created_at__lt=timezone.now() - timedelta(days=days)).delete()
+    return deleted
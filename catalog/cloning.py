@@ -0,0 +1,106 @@
+"""
+Copie profonde d'un cours : nouvelle édition (formateur) ou copie entreprise (company_only).
+
+Cours -> sections -> leçons -> quiz -> questions -> choix, un niveau à la fois :
+- lecture par values() (pas d'instances source), écriture par bulk_create, par lots de CHUNK_SIZE ;
+- clés étrangères remappées en mémoire (ancien id -> nouvel id, pk renvoyés par bulk_create) ;
+- médias partagés : MediaAsset, fichiers (thumbnail, file) et URLs vidéo référencés, jamais copiés ;
+- ~2 requêtes par niveau et par lot, quelle que soit la taille du cours ;
+- au-delà de CLONE_SYNC_MAX_LESSONS leçons : tâche Celery catalog.clone_course (cf. tasks.py).
+"""
+from __future__ import annotations
+
+from django.conf import settings
+from django.db import transaction
+
+from assessments.models import Choice, Question, Quiz
+from .models import Course, CourseSection, Lesson, Notification
+from .versioning import bump_course
+
+CHUNK_SIZE = 1000
+COURSE_EXCLUDED = ("id", "slug", "status", "published_at", "content_version", "created_at", "updated_at")
+
+
+def _fields(model, exclude=()) -> list:
+    """Colonnes copiées (attname : *_id pour les FK, pas de jointure)."""
+    return [f.attname for f in model._meta.concrete_fields if f.attname not in ("id", *exclude)]
+
+
+def _copy(model, queryset, remap: dict, chunk_size: int = CHUNK_SIZE) -> dict:
+    """
+    Copie les lignes de `queryset` ; remap = {attname: {ancien_id: nouvel_id}}.
+    -> {ancien_id: nouvel_id}
+    """
+    fields = _fields(model)
+    mapping, rows = {}, queryset.order_by("id").values("id", *fields).iterator(chunk_size=chunk_size)
+
+    def flush(batch):
+        objs = []
+        for row in batch:
+            for attname, ids in remap.items():
+                if row[attname] is not None:
+                    row[attname] = ids.get(row[attname])  # hors du cours copié (quiz.lesson) -> NULL
+            objs.append(model(**{f: row[f] for f in fields}))
+        created = model.objects.bulk_create(objs)
+        mapping.update(zip((row["id"] for row in batch), (obj.pk for obj in created)))
+
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= chunk_size:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+    return mapping
+
+
+def clone_course(course_id, *, title: str = "", instructor_id=None, company_id=None) -> Course:
+    """
+    Copie complète du cours `course_id`, en brouillon.
+    company_id -> copie interne de l'entreprise (company_only=True) ;
+    instructor_id -> propriétaire de la copie (défaut : formateur du cours source).
+    """
+    values = Course.objects.filter(id=course_id).values(*_fields(Course, COURSE_EXCLUDED)).get()
+    with transaction.atomic():
+        course = Course(**values)
+        course.title = (title or "").strip()[:200] or f"{values['title']} (copie)"[:200]
+        course.status = Course.Status.DRAFT
+        if instructor_id:
+            course.instructor_id = instructor_id
+        if company_id:
+            course.company_id, course.company_only = company_id, True
+        course.save()  # slug unique + signaux (versions, prix)
+
+        sections = _copy(CourseSection, CourseSection.objects.filter(course_id=course_id),
+                         {"course_id": {course_id: course.id}})
+        lessons = _copy(Lesson, Lesson.objects.filter(section__course_id=course_id), {"section_id": sections})
+        quizzes = _copy(Quiz, Quiz.objects.filter(course_id=course_id),
+                        {"course_id": {course_id: course.id}, "lesson_id": lessons})
+        questions = _copy(Question, Question.objects.filter(quiz__course_id=course_id), {"quiz_id": quizzes})
+        _copy(Choice, Choice.objects.filter(question__quiz__course_id=course_id), {"question_id": questions})
+        transaction.on_commit(lambda: bump_course(course.id))  # bulk_create : pas de signaux
+    return course
+
+
+def lesson_count(course_id) -> int:
+    return Lesson.objects.filter(section__course_id=course_id).count()
+
+
+def runs_async(course_id) -> bool:
+    return lesson_count(course_id) > getattr(settings, "CLONE_SYNC_MAX_LESSONS", 200)
+
+
+def notify_cloned(user_id, course: Course | None, source_title: str = "") -> None:
+    """Fin d'une copie asynchrone : notification (poussée en SSE par catalog/signals.py)."""
+    if course is None:
+        Notification.objects.create(
+            user_id=user_id, title="Copie de cours échouée", level=Notification.Level.DANGER,
+            body=f"La copie de « {source_title} » n'a pas pu être créée.",
+        )
+        return
+    Notification.objects.create(
+        user_id=user_id, title="Copie de cours prête", level=Notification.Level.SUCCESS,
+        body=f"« {course.title} » est disponible en brouillon.",
+        action_url="/dashboard/instructor/",
+    )
@@ -0,0 +1,45 @@
+import gzip
+import sys
+
+from django.core.management.base import BaseCommand
+
+from catalog.bundles import CHUNK_SIZE, iter_bundle, write_bundle
+from catalog.models import Course
+
+
+class Command(BaseCommand):
+    help = (
+        "Exporte des cours (sections, leçons, quiz, modèles de certificat, références médias) "
+        "en bundle JSONL ; .gz compressé. Sans --slug / --status : tout le catalogue."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", help="Fichier .jsonl / .jsonl.gz, ou - pour la sortie standard")
+        parser.add_argument("--slug", action="append", dest="slugs", help="Cours à exporter (répétable)")
+        parser.add_argument("--status", action="append", dest="statuses", choices=Course.Status.values)
+        parser.add_argument("--no-media", action="store_true", help="Sans références MediaAsset")
+        parser.add_argument("--chunk", type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        courses = Course.objects.all()
+        if options["slugs"]:
+            courses = courses.filter(slug__in=options["slugs"])
+        if options["statuses"]:
+            courses = courses.filter(status__in=options["statuses"])
+
+        path = options["output"]
+        if path == "-":
+            out = sys.stdout
+        elif path.endswith(".gz"):
+            out = gzip.open(path, "wt", encoding="utf-8")
+        else:
+            out = open(path, "w", encoding="utf-8")
+        try:
+            n = write_bundle(
+                iter_bundle(courses, media=not options["no_media"], chunk_size=max(1, options["chunk"])), out,
+            )
+        finally:
+            if out is not sys.stdout:
+                out.close()
+        if out is not sys.stdout:
+            self.stdout.write(self.style.SUCCESS(f"✅ {n} enregistrement(s) -> {path}"))
@@ -0,0 +1,50 @@
+import gzip
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from catalog.bundles import CHUNK_SIZE, BundleError, import_bundle, read_bundle
+
+
+class Command(BaseCommand):
+    help = (
+        "Importe un bundle JSONL (export_courses) : upsert des cours par slug, par lots, "
+        "une transaction par lot. Idempotent. Sans --prune, rien n'est supprimé."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("input", help="Fichier .jsonl / .jsonl.gz, ou - pour l'entrée standard")
+        parser.add_argument("--instructor", help="Email du formateur si celui du bundle n'existe pas ici")
+        parser.add_argument("--chunk", type=int, default=CHUNK_SIZE)
+        parser.add_argument(
+            "--prune", action="store_true",
+            help="Supprime sections, leçons et quiz absents du bundle (progression et tentatives en cascade)",
+        )
+
+    def handle(self, *args, **options):
+        instructor = None
+        if options["instructor"]:
+            instructor = get_user_model().objects.filter(email=options["instructor"]).first()
+            if instructor is None:
+                raise CommandError(f"Utilisateur introuvable : {options['instructor']}")
+
+        path = options["input"]
+        if path == "-":
+            fp = sys.stdin
+        elif path.endswith(".gz"):
+            fp = gzip.open(path, "rt", encoding="utf-8")
+        else:
+            fp = open(path, encoding="utf-8")
+        try:
+            counts = import_bundle(read_bundle(fp), instructor=instructor, chunk_size=options["chunk"],
+                                   prune=options["prune"])
+        except BundleError as e:
+            raise CommandError(str(e))
+        finally:
+            if fp is not sys.stdin:
+                fp.close()
+
+        for kind, n in sorted(counts.items()):
+            self.stdout.write(f"{kind} : {n}")
+        self.stdout.write(self.style.SUCCESS("✅ Import terminé"))
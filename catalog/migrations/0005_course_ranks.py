@@ -0,0 +1,101 @@
+# Generated by Django 4.2.27 on 2026-10-19 05:07
+
+from itertools import groupby
+
+from django.db import migrations, models
+
+DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+BASE = len(DIGITS)
+
+
+def spread(n: int) -> list:
+    # copie figée de catalog.ranking.spread (au moment de la migration) : n clés équidistantes
+    if n <= 0:
+        return []
+    width = 1
+    while BASE ** width <= n:
+        width += 1
+    width += 1
+    span = BASE ** width
+    keys = []
+    for i in range(1, n + 1):
+        value, digits = span * i // (n + 1), []
+        for _ in range(width):
+            value, d = divmod(value, BASE)
+            digits.append(DIGITS[d])
+        keys.append("".join(reversed(digits)).rstrip("0"))
+    return keys
+
+
+def _fill(model, parent: str):
+    rows = model.objects.order_by(parent, "order", "id").values_list("id", parent).iterator(chunk_size=5000)
+    batch = []
+    for _, group in groupby(rows, key=lambda r: r[1]):
+        ids = [r[0] for r in group]
+        batch += [model(id=pk, rank=key) for pk, key in zip(ids, spread(len(ids)))]
+        if len(batch) >= 5000:
+            model.objects.bulk_update(batch, ["rank"])
+            batch = []
+    if batch:
+        model.objects.bulk_update(batch, ["rank"])
+
+
+def fill_ranks(apps, schema_editor):
+    # ordre actuel (order, id) -> clés équidistantes par cours / par section
+    _fill(apps.get_model("catalog", "CourseSection"), "course_id")
+    _fill(apps.get_model("catalog", "Lesson"), "section_id")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0004_payment_notification"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="coursesection",
+            options={"ordering": ["rank", "id"]},
+        ),
+        migrations.AlterModelOptions(
+            name="lesson",
+            options={"ordering": ["section__rank", "rank", "id"]},
+        ),
+        migrations.RemoveIndex(
+            model_name="coursesection",
+            name="catalog_cou_course__443d70_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="lesson",
+            name="catalog_les_section_eb5100_idx",
+        ),
+        migrations.AlterUniqueTogether(
+            name="coursesection",
+            unique_together=set(),
+        ),
+        migrations.AlterUniqueTogether(
+            name="lesson",
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name="coursesection",
+            name="rank",
+            field=models.CharField(default="", max_length=64),
+        ),
+        migrations.AddField(
+            model_name="lesson",
+            name="rank",
+            field=models.CharField(default="", max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name="coursesection",
+            index=models.Index(
+                fields=["course", "rank"], name="course_section_rank_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="lesson",
+            index=models.Index(fields=["section", "rank"], name="lesson_rank_idx"),
+        ),
+        migrations.RunPython(fill_ranks, migrations.RunPython.noop),
+    ]
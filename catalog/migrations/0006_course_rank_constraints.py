@@ -0,0 +1,30 @@
+from django.db import migrations, models
+import django.db.models.constraints
+
+
+class Migration(migrations.Migration):
+    # contraintes dans une migration séparée : pas d'ALTER TABLE après les UPDATE de 0005
+    # dans la même transaction (PostgreSQL : "pending trigger events")
+
+    dependencies = [
+        ("catalog", "0005_course_ranks"),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name="coursesection",
+            constraint=models.UniqueConstraint(
+                deferrable=django.db.models.constraints.Deferrable["DEFERRED"],
+                fields=("course", "rank"),
+                name="course_section_rank_uniq",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="lesson",
+            constraint=models.UniqueConstraint(
+                deferrable=django.db.models.constraints.Deferrable["DEFERRED"],
+                fields=("section", "rank"),
+                name="lesson_rank_uniq",
+            ),
+        ),
+    ]
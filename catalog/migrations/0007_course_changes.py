@@ -0,0 +1,77 @@
+# Generated by Django 4.2.27 on 2026-10-19 05:19
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0006_course_rank_constraints"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="course",
+            name="content_version",
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.CreateModel(
+            name="CourseChange",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("seq", models.PositiveBigIntegerField()),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("course", "Cours"),
+                            ("section", "Section"),
+                            ("lesson", "Leçon"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("object_id", models.PositiveBigIntegerField()),
+                (
+                    "op",
+                    models.CharField(
+                        choices=[
+                            ("upsert", "Ajout / modification"),
+                            ("delete", "Suppression"),
+                            ("reset", "Resynchronisation complète"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "course",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="changes",
+                        to="catalog.course",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["course", "seq"], name="course_change_seq_idx"
+                    ),
+                    models.Index(
+                        fields=["created_at"], name="course_change_created_idx"
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -81,6 +81,8 @@ class Course(models.Model):
         related_name="course_previews",
         help_text="Preview vidéo (MinIO) affichée en page cours."
     )
+    # séquence de modifications du contenu (cf. catalog/changes.py) : jamais écrite par save()
+    content_version = models.PositiveBigIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -109,6 +111,11 @@ class Course(models.Model):
         if self.status == self.Status.PUBLISHED and self.published_at is None:
             self.published_at = timezone.now()
 
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            # instance chargée avant une modification concurrente : ne pas réécrire la séquence
+            kwargs["update_fields"] = [
+                f.name for f in self._meta.concrete_fields if not f.primary_key and f.name != "content_version"
+            ]
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -118,12 +125,23 @@ class Course(models.Model):
 class CourseSection(models.Model):
     course = models.ForeignKey("catalog.Course", on_delete=models.CASCADE, related_name="sections")
     title = models.CharField(max_length=200)
-    order = models.PositiveIntegerField(default=1)
+    order = models.PositiveIntegerField(default=1)  # numéro affiché (1..n) ; l'ordre réel est `rank`
+    rank = models.CharField(max_length=64, default="")  # clé lexicographique : cf. catalog/ranking.py
 
     class Meta:
-        unique_together = ("course", "order")
-        ordering = ["order"]
-        indexes = [models.Index(fields=["course", "order"])]
+        ordering = ["rank", "id"]
+        constraints = [
+            # différée : un réordonnancement complet (bulk_update) permute les clés sans collision
+            models.UniqueConstraint(fields=["course", "rank"], name="course_section_rank_uniq",
+                                    deferrable=models.Deferrable.DEFERRED),
+        ]
+        indexes = [models.Index(fields=["course", "rank"], name="course_section_rank_idx")]
+
+    def save(self, *args, **kwargs):
+        if not self.rank:  # création hors builder (admin, shell) : en fin de cours
+            from .ranking import insert_position
+            self.rank, self.order = insert_position(CourseSection.objects.filter(course_id=self.course_id))
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.course.title} — {self.order}. {self.title}"
@@ -172,7 +190,8 @@ class Lesson(models.Model):
 
     section = models.ForeignKey("catalog.CourseSection", on_delete=models.CASCADE, related_name="lessons")
     title = models.CharField(max_length=200)
-    order = models.PositiveIntegerField(default=1)
+    order = models.PositiveIntegerField(default=1)  # numéro affiché dans la section
+    rank = models.CharField(max_length=64, default="")  # clé lexicographique dans la section
 
     lesson_type = models.CharField(max_length=10, choices=LessonType.choices, default=LessonType.VIDEO)
     is_preview = models.BooleanField(default=False)  # pour HYBRID / marketing
@@ -198,9 +217,18 @@ class Lesson(models.Model):
     )
 
     class Meta:
-        unique_together = ("section", "order")
-        ordering = ["section__order", "order"]
-        indexes = [models.Index(fields=["section", "order"])]
+        ordering = ["section__rank", "rank", "id"]
+        constraints = [
+            models.UniqueConstraint(fields=["section", "rank"], name="lesson_rank_uniq",
+                                    deferrable=models.Deferrable.DEFERRED),
+        ]
+        indexes = [models.Index(fields=["section", "rank"], name="lesson_rank_idx")]
+
+    def save(self, *args, **kwargs):
+        if not self.rank:  # création hors builder : en fin de section
+            from .ranking import insert_position
+            self.rank, self.order = insert_position(Lesson.objects.filter(section_id=self.section_id))
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.section.course.title} — {self.section.order}.{self.order} {self.title}"
@@ -286,4 +314,34 @@ class Notification(models.Model):
         ]
 
     def __str__(self):
-        return f"{self.user_id} • {self.title}"
\ No newline at end of file
+        return f"{self.user_id} • {self.title}"
+
+
+class CourseChange(models.Model):
+    """Journal des modifications d'un cours : synchronisation incrémentale (cf. catalog/changes.py)."""
+
+    class Kind(models.TextChoices):
+        COURSE = "course", "Cours"
+        SECTION = "section", "Section"
+        LESSON = "lesson", "Leçon"
+
+    class Op(models.TextChoices):
+        UPSERT = "upsert", "Ajout / modification"
+        DELETE = "delete", "Suppression"
+        RESET = "reset", "Resynchronisation complète"
+
+    course = models.ForeignKey("catalog.Course", on_delete=models.CASCADE, related_name="changes")
+    seq = models.PositiveBigIntegerField()  # Course.content_version après la modification
+    kind = models.CharField(max_length=10, choices=Kind.choices)
+    object_id = models.PositiveBigIntegerField()
+    op = models.CharField(max_length=10, choices=Op.choices)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["course", "seq"], name="course_change_seq_idx"),
+            models.Index(fields=["created_at"], name="course_change_created_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.course_id}#{self.seq} {self.op} {self.kind} {self.object_id}"
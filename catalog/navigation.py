@@ -0,0 +1,67 @@
+"""
+Index de navigation d'un cours : ids des leçons dans l'ordre de lecture (section__rank, rank)
++ position de chaque id, en cache par version de contenu (Course.content_version, cf. changes.py).
+
+- suivante / précédente / première / dernière : O(1) ;
+- première leçon non terminée : O(k log k) sur les k leçons terminées (pas de parcours du cours) ;
+- une requête SQL seulement quand la version change (clé de cache versionnée : jamais périmée).
+"""
+from __future__ import annotations
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Lesson
+
+
+class Navigation:
+    __slots__ = ("ids", "pos")
+
+    def __init__(self, ids: list, pos: dict):
+        self.ids, self.pos = ids, pos
+
+    def __contains__(self, lesson_id) -> bool:
+        return lesson_id in self.pos
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def first(self):
+        return self.ids[0] if self.ids else None
+
+    def last(self):
+        return self.ids[-1] if self.ids else None
+
+    def next(self, lesson_id):
+        i = self.pos.get(lesson_id)
+        return self.ids[i + 1] if i is not None and i + 1 < len(self.ids) else None
+
+    def prev(self, lesson_id):
+        i = self.pos.get(lesson_id)
+        return self.ids[i - 1] if i else None
+
+    def first_incomplete(self, completed_ids):
+        """Première leçon absente de `completed_ids` ; None si tout est terminé."""
+        done = sorted(self.pos[i] for i in set(completed_ids) if i in self.pos)
+        for expected, position in enumerate(done):
+            if position != expected:
+                return self.ids[expected]
+        return self.ids[len(done)] if len(done) < len(self.ids) else None
+
+
+def _key(course_id, version) -> str:
+    return f"bestep:nav:{course_id}:{version}"
+
+
+def navigation(course) -> Navigation:
+    """`course` : instance avec id et content_version (Course.objects.only(..., "content_version"))."""
+    key = _key(course.id, course.content_version)
+    cached = cache.get(key)
+    if cached is None:
+        ids = list(
+            Lesson.objects.filter(section__course_id=course.id).order_by("section__rank", "rank", "id")
+            .values_list("id", flat=True)
+        )
+        cached = (ids, {lesson_id: i for i, lesson_id in enumerate(ids)})
+        cache.set(key, cached, timeout=getattr(settings, "NAVIGATION_CACHE_TTL", 24 * 3600))
+    return Navigation(*cached)
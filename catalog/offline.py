@@ -0,0 +1,232 @@
+"""
+Paquets hors ligne : un ZIP par cours (et par version de contenu) pour les connexions intermittentes.
+
+    outline.json            sommaire (sections, leçons, chemins des fichiers du paquet)
+    lessons/<id>.html       Lesson.content
+    files/<id>-<nom>        Lesson.file (documents)
+    media/<id>-<nom>        MediaAsset : documents ; audio / vidéo seulement avec video=True
+
+- construit par la tâche Celery catalog.build_offline_package : chaque objet MinIO est lu par blocs
+  (iter_chunks) et écrit dans le ZIP, lui-même envoyé en multipart upload -> mémoire ≈ une part ;
+- clé MinIO = cours + Course.content_version (cf. changes.py) : seule une modification du contenu
+  invalide le paquet (pas les avis, notes, inscriptions) ;
+- servi par URL présignée : MinIO gère Range / 206, le téléchargement reprend là où il s'est arrêté ;
+  l'ancien ZIP n'est supprimé qu'après expiration des URL déjà émises (OFFLINE_URL_TTL) ;
+- objet MinIO absent (Lesson.file périmé, média supprimé) : ignoré et listé dans outline.json
+  ("missing") ; un échec de construction libère le verrou (nouvelle tentative à la demande suivante).
+⚠️ Pas de transcodage : "vidéo basse définition" = vidéos sous OFFLINE_MAX_MEDIA_BYTES uniquement.
+"""
+from __future__ import annotations
+
+import io
+import json
+import os
+import zipfile
+
+from botocore.exceptions import ClientError
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import Course, CourseSection, Lesson, MediaAsset
+from .storage import s3_client
+
+FORMAT_VERSION = 1
+PART_SIZE = 8 * 1024 * 1024  # parts multipart >= 5 Mo (sauf la dernière)
+READ_CHUNK = 1024 * 1024
+BUILD_LOCK_TTL = 30 * 60
+RETIRE_MARGIN = 5 * 60  # horloges / téléchargements démarrés juste avant la bascule
+
+
+def _bucket() -> str:
+    return getattr(settings, "MINIO_BUCKET", None) or settings.AWS_STORAGE_BUCKET_NAME
+
+
+def _state_key(course_id, video: bool) -> str:
+    return f"bestep:offline:{course_id}:{int(video)}"
+
+
+def _content_version(course_id) -> int:
+    return Course.objects.filter(id=course_id).values_list("content_version", flat=True).get()
+
+
+def _url_ttl() -> int:
+    return getattr(settings, "OFFLINE_URL_TTL", 3600)
+
+
+def _build_lock(course_id, video: bool, version) -> str:
+    return f"{_state_key(course_id, video)}:build:{version}"
+
+
+def _object_key(course_id, version, video: bool) -> str:
+    prefix = getattr(settings, "OFFLINE_PACKAGE_PREFIX", "offline")
+    return f"{prefix}/{course_id}/{version}{'-video' if video else ''}.zip"
+
+
+class _MultipartWriter(io.RawIOBase):
+    """Flux en écriture seule vers un multipart upload (zipfile ajoute lui-même tell())."""
+
+    def __init__(self, client, bucket: str, key: str):
+        self.client, self.bucket, self.key = client, bucket, key
+        self.upload_id = client.create_multipart_upload(
+            Bucket=bucket, Key=key, ContentType="application/zip",
+        )["UploadId"]
+        self.buffer, self.parts, self.size = bytearray(), [], 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.buffer += data
+        self.size += len(data)
+        if len(self.buffer) >= PART_SIZE:
+            self._upload_part()
+        return len(data)
+
+    def _upload_part(self) -> None:
+        number = len(self.parts) + 1
+        etag = self.client.upload_part(
+            Bucket=self.bucket, Key=self.key, UploadId=self.upload_id, PartNumber=number, Body=bytes(self.buffer),
+        )["ETag"]
+        self.parts.append({"ETag": etag, "PartNumber": number})
+        self.buffer.clear()
+
+    def complete(self) -> None:
+        if self.buffer or not self.parts:
+            self._upload_part()
+        self.client.complete_multipart_upload(
+            Bucket=self.bucket, Key=self.key, UploadId=self.upload_id, MultipartUpload={"Parts": self.parts},
+        )
+
+    def abort(self) -> None:
+        self.client.abort_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=self.upload_id)
+
+
+def _entry(name: str, stored: bool = False) -> zipfile.ZipInfo:
+    info = zipfile.ZipInfo(name, date_time=timezone.localtime().timetuple()[:6])
+    info.compress_type = zipfile.ZIP_STORED if stored else zipfile.ZIP_DEFLATED  # médias déjà compressés
+    return info
+
+
+def _copy_object(client, zf: zipfile.ZipFile, bucket: str, key: str, name: str) -> bool:
+    """False si l'objet n'existe plus (rien n'est écrit dans le ZIP)."""
+    try:
+        body = client.get_object(Bucket=bucket, Key=key)["Body"]
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("NoSuchKey", "404", "NotFound"):
+            return False
+        raise
+    try:
+        with zf.open(_entry(name, stored=True), "w", force_zip64=True) as dst:
+            for chunk in body.iter_chunks(READ_CHUNK):
+                dst.write(chunk)
+    finally:
+        body.close()
+    return True
+
+
+def _included(asset: dict, video: bool) -> bool:
+    if asset["kind"] == MediaAsset.Kind.DOC:
+        return True
+    return video and asset["size"] <= getattr(settings, "OFFLINE_MAX_MEDIA_BYTES", 80 * 1024 * 1024)
+
+
+def build_package(course_id, video: bool = False) -> dict:
+    """Construit et envoie le ZIP de la version courante du cours -> état (cf. package_state)."""
+    version = _content_version(course_id)
+    try:
+        return _build(course_id, version, video)
+    except BaseException:
+        cache.delete(_build_lock(course_id, video, version))  # sinon 202 "en cours" jusqu'à BUILD_LOCK_TTL
+        raise
+
+
+def _build(course_id, version, video: bool) -> dict:
+    course = Course.objects.values("id", "slug", "title", "subtitle", "description").get(id=course_id)
+    sections = list(CourseSection.objects.filter(course_id=course_id).order_by("rank", "id")
+                    .values("id", "title", "order"))
+    lessons = (  # curseur : jamais tout le texte du cours en mémoire
+        Lesson.objects.filter(section__course_id=course_id).order_by("rank", "id")
+        .values("id", "section_id", "title", "order", "lesson_type", "duration_sec", "video_url", "file", "content",
+                "media_asset__object_key", "media_asset__kind", "media_asset__size", "media_asset__content_type")
+        .iterator(chunk_size=50)
+    )
+
+    client, bucket, key = s3_client(), _bucket(), _object_key(course_id, version, video)
+    out = _MultipartWriter(client, bucket, key)
+    try:
+        with zipfile.ZipFile(out, "w") as zf:
+            by_section, missing = {s["id"]: {**s, "lessons": []} for s in sections}, []
+            for row in lessons:
+                item = {f: row[f] for f in ("id", "title", "order", "lesson_type", "duration_sec", "video_url")}
+                if row["content"]:
+                    item["content"] = f"lessons/{row['id']}.html"
+                    zf.writestr(_entry(item["content"]), row["content"])
+                if row["file"]:
+                    name = f"files/{row['id']}-{os.path.basename(row['file'])}"
+                    if _copy_object(client, zf, settings.AWS_STORAGE_BUCKET_NAME, row["file"], name):
+                        item["file"] = name
+                    else:
+                        missing.append({"lesson_id": row["id"], "kind": "file", "key": row["file"]})
+                asset = {f: row[f"media_asset__{f}"] for f in ("object_key", "kind", "size", "content_type")}
+                if asset["object_key"] and _included(asset, video):
+                    name = f"media/{row['id']}-{os.path.basename(asset['object_key'])}"
+                    if _copy_object(client, zf, bucket, asset["object_key"], name):
+                        item["media"], item["media_type"] = name, asset["content_type"]
+                    else:
+                        missing.append({"lesson_id": row["id"], "kind": "media", "key": asset["object_key"]})
+                by_section[row["section_id"]]["lessons"].append(item)
+
+            outline = {
+                "format": FORMAT_VERSION, "version": version, "built_at": timezone.now().isoformat(),
+                "course": course, "sections": list(by_section.values()), "missing": missing,
+            }
+            zf.writestr(_entry("outline.json"), json.dumps(outline, ensure_ascii=False))
+        out.complete()
+    except BaseException:
+        out.abort()
+        raise
+
+    state = {"version": version, "key": key, "size": out.size, "built_at": outline["built_at"]}
+    previous = cache.get(_state_key(course_id, video))
+    cache.set(_state_key(course_id, video), state, timeout=None)
+    if previous and previous["key"] != key:
+        # ⚠️ Version périmée, mais des URL présignées peuvent encore la servir (reprise par Range)
+        from .tasks import delete_offline_object
+        delete_offline_object.apply_async((previous["key"],), countdown=_url_ttl() + RETIRE_MARGIN)
+    return state
+
+
+def delete_object(key: str) -> None:
+    s3_client().delete_object(Bucket=_bucket(), Key=key)
+
+
+def package_state(course_id, video: bool = False) -> dict | None:
+    """Paquet de la version courante, ou None (absent / périmé)."""
+    state = cache.get(_state_key(course_id, video))
+    if state and state["version"] == _content_version(course_id):
+        return state
+    return None
+
+
+def request_package(course_id, video: bool = False) -> dict | None:
+    """État si prêt ; sinon lance la construction (une seule par version) et renvoie None."""
+    state = package_state(course_id, video)
+    if state is not None:
+        return state
+    version = _content_version(course_id)
+    if cache.add(_build_lock(course_id, video, version), 1, timeout=BUILD_LOCK_TTL):
+        from .tasks import build_offline_package
+        build_offline_package.delay(course_id, video)
+    return None
+
+
+def package_url(state: dict, filename: str) -> str:
+    return s3_client().generate_presigned_url(
+        ClientMethod="get_object",
+        Params={
+            "Bucket": _bucket(), "Key": state["key"],
+            "ResponseContentDisposition": f'attachment; filename="{filename}"',
+        },
+        ExpiresIn=_url_ttl(),
+    )
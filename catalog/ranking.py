@@ -0,0 +1,191 @@
+"""
+Clés d'ordre lexicographiques (fractional indexing) pour sections et leçons.
+
+Une clé est la partie fractionnaire d'un nombre en base 36 : "h" = 0.h, "h8" = 0.h8.
+- key_between(a, b) : clé strictement entre deux voisines -> insertion au milieu en O(1),
+  aucune autre ligne n'est renumérotée ;
+- spread(n) : n clés équidistantes de longueur fixe (création, réordonnancement complet,
+  rééquilibrage) ;
+- les clés s'allongent au fil des insertions au même endroit : au-delà de REBALANCE_LENGTH,
+  la tâche catalog.rebalance_ranks redistribue les clés du parent ; une clé qui dépasserait
+  MAX_LENGTH (taille de la colonne rank) déclenche le rééquilibrage immédiatement.
+
+⚠️ Alphabet [0-9a-z] uniquement : même ordre en ASCII et sous toute collation PostgreSQL
+(en_US, fr_FR...), donc ORDER BY rank == tri Python. Une clé ne finit jamais par "0".
+"""
+from __future__ import annotations
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Length
+
+from .changes import LESSON, SECTION, UPSERT, record_changes, record_siblings
+from .models import Course, CourseSection, Lesson
+from .versioning import bump_course
+
+DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+BASE = len(DIGITS)
+REBALANCE_LENGTH = 12
+MAX_LENGTH = 64
+
+
+def _midpoint(a: str, b: str | None) -> str:
+    """Clé entre a et b (a < b, b=None -> 1.0) ; a et b sans "0" final."""
+    if b is not None:
+        # préfixe commun (a complété par des "0")
+        n = 0
+        while n < len(b) and (a[n] if n < len(a) else "0") == b[n]:
+            n += 1
+        if n:
+            return b[:n] + _midpoint(a[n:], b[n:])
+
+    lo = DIGITS.index(a[0]) if a else 0
+    hi = DIGITS.index(b[0]) if b is not None else BASE
+    if hi - lo > 1:
+        return DIGITS[(lo + hi) // 2]
+    # chiffres consécutifs
+    if b is not None and len(b) > 1:
+        return b[0]
+    return DIGITS[lo] + _midpoint(a[1:], None)
+
+
+def key_between(a: str | None = None, b: str | None = None) -> str:
+    """Clé strictement entre a et b ; None = borne ouverte (début / fin)."""
+    a = a or ""
+    if b is not None and a >= b:
+        raise ValueError(f"clés non ordonnées : {a!r} >= {b!r}")
+    # ajout en fin / en tête (cas courants) : pas d'un chiffre plutôt que milieu,
+    # la clé s'allonge d'un caractère toutes les ~35 insertions au lieu de ~5
+    if b is None and a:
+        for i in range(len(a) + 1):
+            d = DIGITS.index(a[i]) if i < len(a) else 0
+            if d + 1 < BASE:
+                return a[:i] + DIGITS[d + 1]
+    if not a and b is not None:
+        i = len(b) - len(b.lstrip("0"))  # premier chiffre non nul (une clé ne finit jamais par "0")
+        if DIGITS.index(b[i]) >= 2:
+            return b[:i] + DIGITS[DIGITS.index(b[i]) - 1]
+    return _midpoint(a, b)
+
+
+def spread(n: int) -> list:
+    """n clés croissantes équidistantes, de longueur fixe (≈ BASE clés libres entre deux)."""
+    if n <= 0:
+        return []
+    width = 1
+    while BASE ** width <= n:
+        width += 1
+    width += 1  # marge pour les insertions futures
+    span = BASE ** width
+    keys = []
+    for i in range(1, n + 1):
+        value, digits = span * i // (n + 1), []
+        for _ in range(width):
+            value, d = divmod(value, BASE)
+            digits.append(DIGITS[d])
+        keys.append("".join(reversed(digits)).rstrip("0"))
+    return keys
+
+
+# ------------------------------------------------------------------
+# Base de données
+# ------------------------------------------------------------------
+def insert_position(siblings, after_id=None) -> tuple:
+    """
+    Clé + numéro affiché d'un nouvel élément parmi `siblings` (queryset du parent, verrouillé par
+    l'appelant). after_id=None -> en fin ; 0 -> en tête ; sinon juste après cet élément.
+    Les numéros affichés suivants sont décalés en un UPDATE (et journalisés : catalog/changes.py).
+    """
+    rank, order = _position(siblings, after_id)
+    if len(rank) > MAX_LENGTH:
+        # ~300 insertions au même endroit avant la tâche horaire : rééquilibrage sur place
+        respread(siblings)
+        rank, order = _position(siblings, after_id)
+    return rank, order
+
+
+def _position(siblings, after_id) -> tuple:
+    if after_id is None:
+        last = siblings.order_by("-rank").values_list("rank", "order").first()
+        return (key_between(last[0], None), last[1] + 1) if last else (spread(1)[0], 1)
+
+    if after_id == 0:
+        prev_rank, order = None, 1
+        following = siblings
+    else:
+        prev_rank, prev_order = siblings.filter(id=after_id).values_list("rank", "order").get()
+        order = prev_order + 1
+        following = siblings.filter(rank__gt=prev_rank)
+    shifted = list(following.order_by("rank").values_list("id", "rank"))
+    following.update(order=F("order") + 1)
+    record_siblings(siblings.model, [pk for pk, _ in shifted])  # numéros affichés décalés
+    return key_between(prev_rank, shifted[0][1] if shifted else None), order
+
+
+def reorder_course(course, layout: list) -> None:
+    """
+    Applique l'ordre complet d'un cours : [{"id": section_id, "lessons": [lesson_id, ...]}, ...].
+    Toutes les sections et leçons du cours doivent y figurer une fois (les leçons peuvent changer
+    de section). Deux bulk_update ; contraintes d'unicité différées jusqu'au COMMIT.
+    """
+    section_ids = [int(s["id"]) for s in layout]
+    lesson_ids = [int(lid) for s in layout for lid in s.get("lessons") or []]
+
+    with transaction.atomic():
+        Course.objects.select_for_update().filter(id=course.id).first()
+        current_sections = set(CourseSection.objects.filter(course=course).values_list("id", flat=True))
+        current_lessons = set(Lesson.objects.filter(section__course=course).values_list("id", flat=True))
+        if len(section_ids) != len(set(section_ids)) or set(section_ids) != current_sections:
+            raise ValueError("La liste doit contenir chaque section du cours une fois.")
+        if len(lesson_ids) != len(set(lesson_ids)) or set(lesson_ids) != current_lessons:
+            raise ValueError("La liste doit contenir chaque leçon du cours une fois.")
+
+        sections, lessons = [], []
+        for n, (item, key) in enumerate(zip(layout, spread(len(layout))), start=1):
+            sid = int(item["id"])
+            sections.append(CourseSection(id=sid, rank=key, order=n))
+            ids = [int(lid) for lid in item.get("lessons") or []]
+            lessons += [
+                Lesson(id=lid, section_id=sid, rank=k, order=m)
+                for m, (lid, k) in enumerate(zip(ids, spread(len(ids))), start=1)
+            ]
+        CourseSection.objects.bulk_update(sections, ["rank", "order"])
+        Lesson.objects.bulk_update(lessons, ["section", "rank", "order"])
+        record_changes(course.id, [(SECTION, pk, UPSERT) for pk in section_ids]
+                       + [(LESSON, pk, UPSERT) for pk in lesson_ids])
+        transaction.on_commit(lambda: bump_course(course.id, catalog=False))  # bulk_update : pas de signaux
+
+
+def rebalance(model, parent_field: str, parent_id) -> int:
+    """Redistribue les clés (et renumérote) des enfants d'un parent -> lignes modifiées."""
+    return respread(model.objects.filter(**{parent_field: parent_id}))
+
+
+def respread(siblings) -> int:
+    """Clés équidistantes (spread) + numéros 1..n pour les lignes de `siblings`, ordre conservé."""
+    model = siblings.model
+    with transaction.atomic():
+        ids = list(siblings.select_for_update().order_by("rank", "id").values_list("id", flat=True))
+        model.objects.bulk_update(
+            [model(id=pk, rank=key, order=n) for n, (pk, key) in enumerate(zip(ids, spread(len(ids))), start=1)],
+            ["rank", "order"],
+        )
+        record_siblings(model, ids)
+    return len(ids)
+
+
+def rebalance_long_ranks() -> int:
+    """Parents dont une clé dépasse REBALANCE_LENGTH (insertions répétées au même endroit)."""
+    done = 0
+    for model, parent_field, course_field in (
+        (CourseSection, "course_id", "course_id"),
+        (Lesson, "section_id", "section__course_id"),
+    ):
+        parents = (
+            model.objects.annotate(n=Length("rank")).filter(n__gt=REBALANCE_LENGTH)
+            .values_list(parent_field, course_field).distinct()
+        )
+        for parent_id, course_id in list(parents):
+            done += rebalance(model, parent_field, parent_id)
+            bump_course(course_id, catalog=False)
+    return done
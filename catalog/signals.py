@@ -0,0 +1,109 @@
+from django.conf import settings
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from best_epargne.apis.events import EVENT_NOTIFICATION, notification_payload, publish_user_event
+from .changes import COURSE, DELETE, LESSON, SECTION, UPSERT, record_changes, record_many
+from .models import Category, Course, CourseSection, Lesson, MediaAsset, Notification
+from .versioning import bump_catalog, bump_course
+
+
+@receiver(post_save, sender=Notification, dispatch_uid="catalog_notification_sse")
+def push_new_notification(sender, instance, created, **kwargs):
+    if created:
+        publish_user_event(instance.user_id, EVENT_NOTIFICATION, notification_payload(instance))
+
+
+# ------------------------------------------------------------------
+# Versions de contenu (ETag) : cf. catalog/versioning.py
+# ------------------------------------------------------------------
+def _lesson_course_id(lesson):
+    section = lesson._state.fields_cache.get("section")
+    if section is not None:
+        return section.course_id
+    return CourseSection.objects.filter(id=lesson.section_id).values_list("course_id", flat=True).first()
+
+
+@receiver([post_save, post_delete], sender=Course, dispatch_uid="catalog_course_version")
+def course_changed(sender, instance, **kwargs):
+    bump_course(instance.id)
+
+
+@receiver([post_save, post_delete], sender=Category, dispatch_uid="catalog_category_version")
+def category_changed(sender, instance, **kwargs):
+    bump_catalog()
+
+
+@receiver([post_save, post_delete], sender=CourseSection, dispatch_uid="catalog_section_version")
+def section_changed(sender, instance, **kwargs):
+    bump_course(instance.course_id, catalog=False)
+
+
+@receiver([post_save, post_delete], sender=Lesson, dispatch_uid="catalog_lesson_version")
+def lesson_changed(sender, instance, **kwargs):
+    bump_course(_lesson_course_id(instance), catalog=False)
+
+
+# ------------------------------------------------------------------
+# Journal des modifications (synchronisation incrémentale) : cf. catalog/changes.py
+# ------------------------------------------------------------------
+def _course_deleted(kwargs) -> bool:
+    # suppression en cascade depuis le cours (instance ou queryset, ex. action admin) : journal supprimé
+    # avec lui ; ⚠️ une ligne insérée ici ferait échouer le DELETE du cours (clé étrangère)
+    origin = kwargs.get("origin")
+    return isinstance(origin, Course) or (isinstance(origin, QuerySet) and origin.model is Course)
+
+
+@receiver(post_save, sender=Course, dispatch_uid="catalog_course_changes")
+def course_logged(sender, instance, **kwargs):
+    record_changes(instance.id, [(COURSE, instance.id, UPSERT)])
+
+
+@receiver(post_save, sender=CourseSection, dispatch_uid="catalog_section_changes")
+def section_saved_logged(sender, instance, **kwargs):
+    record_changes(instance.course_id, [(SECTION, instance.id, UPSERT)])
+
+
+@receiver(post_delete, sender=CourseSection, dispatch_uid="catalog_section_delete_changes")
+def section_deleted_logged(sender, instance, **kwargs):
+    if not _course_deleted(kwargs):
+        record_changes(instance.course_id, [(SECTION, instance.id, DELETE)])
+
+
+@receiver(post_save, sender=Lesson, dispatch_uid="catalog_lesson_changes")
+def lesson_saved_logged(sender, instance, **kwargs):
+    record_changes(_lesson_course_id(instance), [(LESSON, instance.id, UPSERT)])
+
+
+@receiver(post_delete, sender=Lesson, dispatch_uid="catalog_lesson_delete_changes")
+def lesson_deleted_logged(sender, instance, **kwargs):
+    if not _course_deleted(kwargs):
+        record_changes(_lesson_course_id(instance), [(LESSON, instance.id, DELETE)])
+
+
+def _media_users(asset_id) -> None:
+    """Leçons et pages cours qui affichent ce média."""
+    record_many(LESSON, Lesson.objects.filter(media_asset_id=asset_id).values_list("id", "section__course_id"))
+    record_many(COURSE, Course.objects.filter(preview_media_asset_id=asset_id).values_list("id", "id"))
+
+
+@receiver(post_save, sender=MediaAsset, dispatch_uid="catalog_media_changes")
+def media_saved_logged(sender, instance, created, **kwargs):
+    if not created:
+        _media_users(instance.pk)
+
+
+@receiver(pre_delete, sender=MediaAsset, dispatch_uid="catalog_media_delete_changes")
+def media_deleted_logged(sender, instance, **kwargs):
+    _media_users(instance.pk)  # avant le SET_NULL des leçons
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL, dispatch_uid="catalog_instructor_version")
+def instructor_changed(sender, instance, created, update_fields=None, **kwargs):
+    # nom / email du formateur affichés sur les cartes (pas à chaque last_login)
+    if created or instance.role != instance.Role.INSTRUCTOR:
+        return
+    if update_fields is not None and not {"full_name", "email"} & set(update_fields):
+        return
+    bump_catalog()
@@ -0,0 +1,20 @@
+"""Client MinIO (S3) partagé : vues média, paquets hors ligne."""
+from __future__ import annotations
+
+import boto3
+from botocore.client import Config
+from django.conf import settings
+
+from best_epargne.metrics.s3 import instrument_s3_client
+
+
+def s3_client():
+    return instrument_s3_client(boto3.client(
+        "s3",
+        endpoint_url=getattr(settings, "MINIO_ENDPOINT_URL", None),
+        aws_access_key_id=getattr(settings, "MINIO_ACCESS_KEY", None),
+        aws_secret_access_key=getattr(settings, "MINIO_SECRET_KEY", None),
+        region_name=getattr(settings, "MINIO_REGION", "us-east-1"),
+        config=Config(signature_version="s3v4"),
+        verify=getattr(settings, "MINIO_SECURE", False),
+    ))
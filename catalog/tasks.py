@@ -0,0 +1,48 @@
+from celery import shared_task
+
+from .changes import prune_changes
+from .ranking import rebalance_long_ranks
+
+
+@shared_task(name="catalog.rebalance_ranks", ignore_result=True)
+def rebalance_ranks() -> int:
+    """Celery beat : redistribue les clés d'ordre trop longues (sections / leçons)."""
+    return rebalance_long_ranks()
+
+
+@shared_task(name="catalog.clone_course", ignore_result=True)
+def clone_course_task(course_id: int, user_id: int, title: str = "", instructor_id=None, company_id=None):
+    """Copie d'un gros cours (cf. cloning.py) ; résultat notifié au demandeur."""
+    from .cloning import clone_course, notify_cloned
+    from .models import Course
+
+    try:
+        course = clone_course(course_id, title=title, instructor_id=instructor_id, company_id=company_id)
+    except Exception:
+        source = Course.objects.filter(id=course_id).values_list("title", flat=True).first() or course_id
+        notify_cloned(user_id, None, source)
+        raise
+    notify_cloned(user_id, course)
+
+
+@shared_task(name="catalog.build_offline_package", ignore_result=True, acks_late=True)
+def build_offline_package(course_id: int, video: bool = False):
+    """Paquet ZIP hors ligne de la version courante du cours (cf. offline.py)."""
+    from .offline import build_package, package_state
+
+    if package_state(course_id, video) is None:  # doublon en file : déjà construit
+        build_package(course_id, video)
+
+
+@shared_task(name="catalog.delete_offline_object", ignore_result=True)
+def delete_offline_object(key: str):
+    """Suppression différée d'un ZIP hors ligne remplacé (URL présignées expirées)."""
+    from .offline import delete_object
+
+    delete_object(key)
+
+
+@shared_task(name="catalog.prune_course_changes", ignore_result=True)
+def prune_course_changes() -> int:
+    """Celery beat : purge du journal des modifications (cf. changes.py)."""
+    return prune_changes()
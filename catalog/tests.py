@@ -1,3 +1,163 @@
+import io
+import json
+import zipfile
+from unittest import mock
+
+from botocore.exceptions import ClientError
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase
 
-# Create your tests here.
+from assessments.models import Choice, Question, Quiz
+from . import offline
+from .bundles import import_bundle, iter_bundle, read_bundle, write_bundle
+from .models import Course, CourseChange, CourseSection, Lesson
+from .ranking import MAX_LENGTH, insert_position
+
+User = get_user_model()
+
+
+class CatalogTestCase(TestCase):
+    def setUp(self):
+        self.instructor = User.objects.create_user("prof@example.com", "x", role=User.Role.INSTRUCTOR)
+        self.course = Course.objects.create(title="Épargne", instructor=self.instructor)
+        self.section = CourseSection.objects.create(course=self.course, title="Introduction")
+
+
+class RankingTests(CatalogTestCase):
+    def test_repeated_middle_inserts_stay_within_rank_column(self):
+        first = Lesson.objects.create(section=self.section, title="Début")
+        last = Lesson.objects.create(section=self.section, title="Fin")
+        siblings = Lesson.objects.filter(section=self.section)
+        for i in range(400):  # toujours dans le même intervalle : la clé s'allonge à chaque fois
+            rank, order = insert_position(siblings, first.id)
+            Lesson.objects.create(section=self.section, title=f"L{i}", rank=rank, order=order)
+
+        ranks = list(siblings.order_by("rank").values_list("id", "rank", "order"))
+        self.assertLessEqual(max(len(r) for _, r, _ in ranks), MAX_LENGTH)
+        self.assertEqual([o for _, _, o in ranks], list(range(1, 403)))
+        self.assertEqual((ranks[0][0], ranks[-1][0]), (first.id, last.id))
+        self.assertEqual(len({r for _, r, _ in ranks}), 402)
+
+
+class CourseChangeTests(CatalogTestCase):
+    def test_queryset_delete_skips_change_log(self):
+        Lesson.objects.create(section=self.section, title="Leçon")
+        self.assertTrue(CourseChange.objects.filter(course=self.course).exists())
+        # action admin « supprimer la sélection » : origin est un queryset, pas une instance
+        Course.objects.filter(id=self.course.id).delete()
+        self.assertFalse(Course.objects.filter(id=self.course.id).exists())
+        self.assertFalse(CourseChange.objects.exists())
+
+    def test_section_delete_is_logged(self):
+        version = Course.objects.get(id=self.course.id).content_version
+        section_id = self.section.id
+        self.section.delete()
+        change = CourseChange.objects.filter(course=self.course).latest("seq")
+        self.assertEqual((change.object_id, change.op, change.seq), (section_id, CourseChange.Op.DELETE, version + 1))
+
+
+class BundleTests(CatalogTestCase):
+    def setUp(self):
+        super().setUp()
+        quiz = Quiz.objects.create(course=self.course, title="Quiz final")
+        for n in range(3):  # order laissé à 1, comme dans l'admin (QuestionInline)
+            question = Question.objects.create(quiz=quiz, prompt=f"Question {n}")
+            Choice.objects.create(question=question, text="Oui", is_correct=(n == 0))
+            Choice.objects.create(question=question, text="Oui", is_correct=(n != 0))  # textes en double
+            Choice.objects.create(question=question, text=f"Réponse {n}")
+
+    def _export(self) -> str:
+        buf = io.StringIO()
+        write_bundle(iter_bundle(Course.objects.filter(id=self.course.id)), buf)
+        return buf.getvalue()
+
+    def _import(self, text: str):
+        with self.captureOnCommitCallbacks(execute=True):
+            import_bundle(read_bundle(io.StringIO(text)))
+
+    def _quiz_tree(self):
+        return {
+            q.prompt: sorted((c.id, c.text, c.is_correct) for c in q.choices.all())
+            for q in Question.objects.filter(quiz__course__slug=self.course.slug).prefetch_related("choices")
+        }
+
+    def test_round_trip_keeps_questions_with_default_order(self):
+        before, bundle = self._quiz_tree(), self._export()
+        self._import(bundle)  # même environnement : tout est rapproché, rien n'est recréé
+        self.assertEqual(self._quiz_tree(), before)
+
+        Course.objects.filter(id=self.course.id).delete()
+        self._import(bundle)  # environnement vide : même arbre, nouveaux ids
+        tree = {p: sorted(row[1:] for row in rows) for p, rows in self._quiz_tree().items()}
+        self.assertEqual(tree, {p: sorted(row[1:] for row in rows) for p, rows in before.items()})
+
+    def test_v1_bundle_without_keys_matches_by_position(self):
+        before = self._quiz_tree()
+        lines = [json.loads(line) for line in self._export().splitlines()]
+        for record in lines:
+            for quiz in record.get("quizzes", []):
+                for question in quiz["questions"]:
+                    del question["key"]
+                    for choice in question["choices"]:
+                        del choice["key"]
+        self._import("\n".join(json.dumps(record) for record in lines))
+        self.assertEqual(self._quiz_tree(), before)
+
+
+class _Bucket:
+    """Client MinIO en mémoire : objets existants + multipart upload."""
+
+    def __init__(self, objects=None, fail_upload=False):
+        self.objects, self.parts, self.fail_upload = dict(objects or {}), {}, fail_upload
+
+    def get_object(self, Bucket, Key):
+        if Key not in self.objects:
+            raise ClientError({"Error": {"Code": "NoSuchKey"}}, "GetObject")
+        body = mock.Mock()
+        body.iter_chunks.return_value = [self.objects[Key]]
+        return {"Body": body}
+
+    def create_multipart_upload(self, Bucket, Key, **kwargs):
+        self.parts[Key] = []
+        return {"UploadId": Key}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        if self.fail_upload:
+            raise ClientError({"Error": {"Code": "SlowDown"}}, "UploadPart")
+        self.parts[Key].append(Body)
+        return {"ETag": str(PartNumber)}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        self.objects[Key] = b"".join(self.parts.pop(Key))
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.parts.pop(Key, None)
+
+
+class OfflinePackageTests(CatalogTestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        Lesson.objects.create(section=self.section, title="Fiche", file="lessons/fiche.pdf")
+        Lesson.objects.create(section=self.section, title="Ancienne fiche", file="lessons/supprimee.pdf")
+
+    def test_missing_object_is_skipped_and_listed(self):
+        client = _Bucket({"lessons/fiche.pdf": b"%PDF"})
+        with mock.patch.object(offline, "s3_client", return_value=client):
+            state = offline.build_package(self.course.id)
+        with zipfile.ZipFile(io.BytesIO(client.objects[state["key"]])) as zf:
+            outline = json.loads(zf.read("outline.json"))
+            self.assertEqual(len([n for n in zf.namelist() if n.startswith("files/")]), 1)
+        self.assertEqual([m["key"] for m in outline["missing"]], ["lessons/supprimee.pdf"])
+        self.assertEqual(offline.package_state(self.course.id), state)
+
+    def test_failed_build_releases_lock(self):
+        client = _Bucket({"lessons/fiche.pdf": b"%PDF", "lessons/supprimee.pdf": b"%PDF"}, fail_upload=True)
+        with mock.patch.object(offline, "s3_client", return_value=client), \
+                mock.patch("catalog.tasks.build_offline_package.delay") as delay:
+            self.assertIsNone(offline.request_package(self.course.id))
+            with self.assertRaises(ClientError):
+                offline.build_package(self.course.id)
+            self.assertIsNone(offline.request_package(self.course.id))  # nouvelle tentative possible
+        self.assertEqual(delay.call_count, 2)
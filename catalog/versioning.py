@@ -0,0 +1,81 @@
+"""
+Versions de contenu pour les ETag, lues dans le cache (aucune requête SQL) :
+
+- catalogue : toute écriture Course / Category / notes (listes explore, CourseViewSet)
+- cours     : le cours, ses sections et ses leçons (détail, sommaire, lecteur)
+- apprenant : inscriptions et progression de l'utilisateur (is_enrolled, % par leçon)
+
+Incrémentées par les signaux (catalog/enrollments/reviews). Une clé absente (cache vidé,
+éviction) repart d'un jeton neuf : un ancien ETag ne peut pas correspondre par hasard.
+Les écritures en masse qui contournent les signaux (update(), COPY) appellent bump_*().
+⚠️ Incrément après COMMIT (transaction.on_commit) : bumpée avant, une requête concurrente
+calculerait le nouvel ETag sur les anciennes lignes et le client garderait des 304 périmés.
+"""
+from __future__ import annotations
+
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+CATALOG_KEY = "bestep:v:catalog"
+
+
+def _course_key(course_id) -> str:
+    return f"bestep:v:course:{course_id}"
+
+
+def _learner_key(user_id) -> str:
+    return f"bestep:v:learner:{user_id}"
+
+
+def _read(keys: list) -> list:
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            token = time.time_ns()
+            cache.add(key, token, timeout=None)
+            found[key] = cache.get(key, token)
+    return [found[k] for k in keys]
+
+
+def _incr(key: str) -> None:
+    try:
+        cache.incr(key)
+    except ValueError:
+        # clé absente : un jeton neuf suffit à invalider les ETag existants
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def _bump(key: str) -> None:
+    # hors transaction : exécuté immédiatement ; rollback : jamais exécuté
+    transaction.on_commit(lambda: _incr(key))
+
+
+def versions(catalog: bool = False, course_id=None, user_id=None) -> list:
+    """Versions demandées, en un seul aller-retour cache (get_many)."""
+    keys = []
+    if catalog:
+        keys.append(CATALOG_KEY)
+    if course_id is not None:
+        keys.append(_course_key(course_id))
+    if user_id is not None:
+        keys.append(_learner_key(user_id))
+    return _read(keys) if keys else []
+
+
+def bump_catalog() -> None:
+    _bump(CATALOG_KEY)
+
+
+def bump_course(course_id, catalog: bool = True) -> None:
+    if course_id is None:
+        return
+    _bump(_course_key(course_id))
+    if catalog:
+        bump_catalog()
+
+
+def bump_learner(user_id) -> None:
+    if user_id is not None:
+        _bump(_learner_key(user_id))
@@ -2,7 +2,8 @@ from django.shortcuts import render
 
 # Create your views here.
 from django.views.generic import ListView, DetailView
-from django.db.models import Q, Avg, Count
+from django.db.models import Q
+from reviews.services import rating_annotations
 from .models import Course
 
 class CourseListView(ListView):
@@ -12,9 +13,11 @@ class CourseListView(ListView):
     paginate_by = 18
 
     def get_queryset(self):
+        # ✅ notes lues depuis reviews.CourseRatingStats (jointure 1-1, plus d'Avg/Count par page)
+        rating = rating_annotations()
         qs = Course.objects.filter(status=Course.Status.PUBLISHED, company_only=False)\
             .select_related("category", "instructor")\
-            .annotate(avg_rating=Avg("reviews__rating"), reviews_count=Count("reviews"))
+            .annotate(avg_rating=rating["rating_avg"], reviews_count=rating["rating_count"])
         q = self.request.GET.get("q")
         cat = self.request.GET.get("cat")
         ctype = self.request.GET.get("type")
@@ -9,6 +9,7 @@ from reportlab.lib.pagesizes import A4
 from reportlab.pdfgen import canvas
 
 from assessments.models import Quiz, Attempt
+from best_epargne.apis.events import EVENT_CERTIFICATE_READY, certificate_payload, publish_user_event
 from enrollments.models import Enrollment
 from .models import IssuedCertificate, CertificateTemplate
 
@@ -87,4 +88,7 @@ def issue_certificate_if_passed(user, course) -> IssuedCertificate | None:
         score=best_attempt.score_percent,
     )
     cert.pdf_file.save(f"certificate_{cert.serial}.pdf", ContentFile(pdf_bytes), save=True)
+
+    # ✅ PDF prêt -> push SSE (envoyé au commit)
+    publish_user_event(user.id, EVENT_CERTIFICATE_READY, certificate_payload(cert))
     return cert
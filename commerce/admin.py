@@ -3,7 +3,8 @@ from django.contrib import admin
 # Register your models here.
 from django.contrib import admin
 from .models import Coupon, Order, OrderItem, PaymentTransaction, CompanyLicense, CompanyAssignment, \
-    CompanyAssignmentTarget
+    CompanyAssignmentTarget, InstructorEarning, InstructorPayout, InstructorBalance
+from .payouts import cancel_payout, mark_payout_paid
 
 
 class OrderItemInline(admin.TabularInline):
@@ -60,3 +61,52 @@ class CompanyAssignmentAdmin(admin.ModelAdmin):
     list_filter = ("company",)
     search_fields = ("company__name", "course__title")
     inlines = [CompanyAssignmentTargetInline]
+
+
+@admin.register(InstructorEarning)
+class InstructorEarningAdmin(admin.ModelAdmin):
+    list_display = ("period", "instructor", "course", "sales_count", "gross", "payout_percent", "amount", "currency",
+                    "source")
+    list_filter = ("currency",)
+    search_fields = ("instructor__email", "course__title", "source")
+    date_hierarchy = "period"
+
+    # écritures immuables
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(InstructorPayout)
+class InstructorPayoutAdmin(admin.ModelAdmin):
+    list_display = ("reference", "instructor", "amount", "currency", "status", "period_end", "created_at", "paid_at")
+    list_filter = ("status", "currency")
+    search_fields = ("reference", "instructor__email")
+    readonly_fields = ("instructor", "reference", "amount", "currency", "status", "period_end", "created_at", "paid_at")
+    actions = ["mark_paid", "cancel"]
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.action(description="Marquer comme payé")
+    def mark_paid(self, request, queryset):
+        n = sum(mark_payout_paid(p) for p in queryset)
+        self.message_user(request, f"{n} versement(s) marqué(s) payé(s).")
+
+    @admin.action(description="Annuler (recrédite le solde)")
+    def cancel(self, request, queryset):
+        n = sum(cancel_payout(p) for p in queryset)
+        self.message_user(request, f"{n} versement(s) annulé(s).")
+
+
+@admin.register(InstructorBalance)
+class InstructorBalanceAdmin(admin.ModelAdmin):
+    list_display = ("instructor", "currency", "balance", "earned_total", "paid_out_total", "last_period", "updated_at")
+    list_filter = ("currency",)
+    search_fields = ("instructor__email",)
+    readonly_fields = ("instructor", "currency", "balance", "earned_total", "paid_out_total", "last_period")
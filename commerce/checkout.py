@@ -0,0 +1,210 @@
+"""
+Checkout : panier -> Order + OrderItem + PaymentTransaction.
+
+- Prix lus dans un snapshot par cours en cache (get_many), une seule requête pour les absents ;
+  invalidé à chaque Course.save / delete (commerce/signals.py).
+- Totaux calculés en mémoire (pas de recalc_order_totals ligne par ligne), lignes en bulk_create.
+- Coupon : used_count réservé à la création de la commande (UPDATE conditionnel : la limite
+  tient sous concurrence), rendu si la commande échoue / est annulée ou reste PENDING plus de
+  CHECKOUT_COUPON_HOLD secondes ; recompté si une commande rendue est finalement payée.
+- Reprises client (Idempotency-Key) : cf. best_epargne/apis/idempotency.py.
+"""
+from __future__ import annotations
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from catalog.models import Course
+from enrollments.models import Enrollment
+from organizations.models import CompanyMember
+from .models import Coupon, Order, OrderItem
+from .services import coupon_discount, create_transaction
+
+PRICE_FIELDS = ("id", "title", "price", "currency", "status", "pricing_type", "company_only")
+
+
+class CheckoutError(ValueError):
+    pass
+
+
+# ------------------------------------------------------------------
+# Snapshot de prix
+# ------------------------------------------------------------------
+def _price_key(course_id) -> str:
+    return f"bestep:price:{course_id}"
+
+
+def price_snapshots(course_ids) -> dict:
+    """-> {course_id: snapshot} ; cours inexistants absents."""
+    keys = {_price_key(cid): cid for cid in set(course_ids)}
+    found = cache.get_many(list(keys))
+    out = {keys[k]: v for k, v in found.items()}
+
+    missing = [cid for k, cid in keys.items() if k not in found]
+    if missing:
+        fresh = {}
+        for row in Course.objects.filter(id__in=missing).values(*PRICE_FIELDS):
+            row["price"] = str(row["price"])  # Decimal exact, sérialisable
+            out[row["id"]] = fresh[_price_key(row["id"])] = row
+        cache.set_many(fresh, timeout=getattr(settings, "CHECKOUT_PRICE_TTL", 3600))
+    return out
+
+
+def invalidate_price(course_id) -> None:
+    cache.delete(_price_key(course_id))
+
+
+# ------------------------------------------------------------------
+# Commande
+# ------------------------------------------------------------------
+def _available():
+    return Q(usage_limit__isnull=True) | Q(usage_limit__gt=F("used_count"))
+
+
+def _coupon(code: str, currency: str):
+    if not code:
+        return None
+    now = timezone.now()
+    coupon = Coupon.objects.filter(
+        Q(valid_from__isnull=True) | Q(valid_from__lte=now),
+        Q(valid_to__isnull=True) | Q(valid_to__gte=now),
+        _available(),
+        code__iexact=code.strip(), is_active=True,
+    ).first()
+    if coupon is None:
+        raise CheckoutError("Code promo invalide ou expiré.")
+    if coupon.amount_off and coupon.currency != currency:
+        raise CheckoutError("Code promo non valable dans cette devise.")
+    return coupon
+
+
+def _lines(user, items: list, currency: str, company_id) -> list:
+    """Items validés (CheckoutItemSerializer) -> [(item_type, course_id, seats, unit_price, line_total)]."""
+    prices = price_snapshots(it["course_id"] for it in items if it.get("course_id"))
+
+    seen, lines = set(), []
+    for it in items:
+        if not it.get("course_id"):
+            raise CheckoutError("course_id requis (les sièges entreprise portent sur un cours).")
+        course = prices.get(it["course_id"])
+        if course is None:
+            raise CheckoutError(f"Cours introuvable : {it.get('course_id')}.")
+        if course["status"] != Course.Status.PUBLISHED or course["company_only"]:
+            raise CheckoutError(f"Cours non disponible à l'achat : {course['title']}.")
+        if course["currency"] != currency:
+            raise CheckoutError(f"Devise du cours {course['title']} : {course['currency']}.")
+        price = Decimal(course["price"])
+
+        if it["item_type"] == OrderItem.ItemType.COMPANY_SEATS:
+            if not company_id:
+                raise CheckoutError("company_id requis pour des sièges entreprise.")
+            seats = it["seats_qty"]
+            lines.append((it["item_type"], course["id"], seats, price, price * seats))
+            continue
+
+        if course["id"] in seen:
+            continue
+        if course["pricing_type"] == Course.PricingType.FREE or not price:
+            raise CheckoutError(f"Cours gratuit : inscription directe ({course['title']}).")
+        seen.add(course["id"])
+        lines.append((it["item_type"], course["id"], 0, price, price))
+
+    if seen and Enrollment.objects.filter(user=user, course_id__in=seen).exists():
+        raise CheckoutError("Vous êtes déjà inscrit à l'un de ces cours.")
+    return lines
+
+
+def create_checkout(user, data: dict) -> tuple:
+    """CheckoutCreateSerializer.validated_data -> (Order, [OrderItem], PaymentTransaction)."""
+    currency = data.get("currency") or "XOF"
+    company_id = data.get("company_id")
+    if company_id and not CompanyMember.objects.filter(
+        user=user, company_id=company_id, company_role=CompanyMember.CompanyRole.ADMIN,
+    ).exists():
+        raise CheckoutError("Seul un administrateur de l'entreprise peut commander pour elle.")
+
+    lines = _lines(user, data["items"], currency, company_id)
+    if not lines:
+        raise CheckoutError("Panier vide.")
+    coupon = _coupon(data.get("coupon_code", ""), currency)
+
+    subtotal = sum((line[4] for line in lines), Decimal("0"))
+    discount = coupon_discount(coupon, subtotal)
+
+    with transaction.atomic():
+        if coupon is not None and not Coupon.objects.filter(_available(), id=coupon.id).update(
+            used_count=F("used_count") + 1,
+        ):
+            raise CheckoutError("Code promo épuisé.")
+        order = Order.objects.create(
+            user=user, company_id=company_id, currency=currency, coupon=coupon, coupon_reserved=coupon is not None,
+            subtotal=subtotal, discount_total=discount, total=max(Decimal("0"), subtotal - discount),
+        )
+        items = OrderItem.objects.bulk_create([
+            OrderItem(order=order, item_type=t, course_id=cid, seats_qty=seats, unit_price=unit, line_total=total)
+            for t, cid, seats, unit, total in lines
+        ])
+        tx = create_transaction(order, data["provider"], order.total)
+    return order, items, tx
+
+
+def release_coupon(order_id) -> bool:
+    """Réservation du coupon rendue (une seule fois par commande) -> True si rendue."""
+    with transaction.atomic():
+        order = Order.objects.select_for_update().filter(id=order_id, coupon_reserved=True).only("coupon_id").first()
+        if order is None:
+            return False
+        Order.objects.filter(id=order.id).update(coupon_reserved=False)
+        if order.coupon_id:
+            Coupon.objects.filter(id=order.coupon_id, used_count__gt=0).update(used_count=F("used_count") - 1)
+    return True
+
+
+def count_paid_coupon(order_id) -> bool:
+    """Commande payée après expiration de sa réservation : le coupon est consommé, limite ou non."""
+    with transaction.atomic():
+        if not Order.objects.filter(id=order_id, coupon_reserved=False, coupon__isnull=False).update(
+            coupon_reserved=True,
+        ):
+            return False
+        Coupon.objects.filter(order__id=order_id).update(used_count=F("used_count") + 1)
+    return True
+
+
+def expire_coupon_reservations(limit: int = 1000) -> int:
+    """Commandes PENDING abandonnées : coupons rendus (tâche Celery commerce.expire_coupon_reservations)."""
+    hold = int(getattr(settings, "CHECKOUT_COUPON_HOLD", 2 * 3600))
+    ids = Order.objects.filter(
+        status=Order.Status.PENDING, coupon_reserved=True, created_at__lt=timezone.now() - timedelta(seconds=hold),
+    ).values_list("id", flat=True)[:limit]
+    return sum(release_coupon(order_id) for order_id in list(ids))
+
+
+def _money(value) -> str:
+    return f"{value:.2f}"
+
+
+def checkout_payload(order: Order, items: list, tx) -> dict:
+    return {
+        "order_id": order.id,
+        "status": order.status,
+        "currency": order.currency,
+        "subtotal": _money(order.subtotal),
+        "discount_total": _money(order.discount_total),
+        "total": _money(order.total),
+        "items": [
+            {
+                "id": it.id, "item_type": it.item_type, "course_id": it.course_id, "seats_qty": it.seats_qty,
+                "unit_price": _money(it.unit_price), "line_total": _money(it.line_total),
+            }
+            for it in items
+        ],
+        "transaction": {"id": tx.id, "provider": tx.provider, "status": tx.status, "amount": _money(tx.amount)},
+    }
+
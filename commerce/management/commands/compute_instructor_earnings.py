@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from commerce.payouts import compute_earnings, create_payouts
+
+
+class Command(BaseCommand):
+    help = (
+        "Écrit les gains formateurs (InstructorEarning) des ventes non créditées des journées closes "
+        "et met à jour les soldes. --payouts : crée ensuite les versements."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--payouts", action="store_true", help="Créer les versements des soldes disponibles")
+
+    def handle(self, *args, **options):
+        n = compute_earnings()
+        self.stdout.write(self.style.SUCCESS(f"✅ {n} écritures de gains"))
+        if options["payouts"]:
+            payouts = create_payouts()
+            self.stdout.write(self.style.SUCCESS(f"✅ {len(payouts)} versements créés"))
@@ -0,0 +1,43 @@
+import csv
+import json
+
+from django.core.management.base import BaseCommand
+
+from commerce.reconciliation import CHUNK_SIZE, reconcile
+
+
+class Command(BaseCommand):
+    help = (
+        "Rapproche paiements catalogue, commandes et transactions PSP (flux triés, mémoire constante). "
+        "--heal : crée les inscriptions manquantes des achats payés."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--heal", action="store_true", help="Créer les inscriptions manquantes")
+        parser.add_argument("--chunk", type=int, default=CHUNK_SIZE)
+        parser.add_argument("--csv", dest="csv_path", help="Rapport des divergences (CSV) ; sinon sortie standard")
+        parser.add_argument("--quiet", action="store_true", help="Résumé seulement")
+
+    def handle(self, *args, **options):
+        out = open(options["csv_path"], "w", newline="", encoding="utf-8") if options["csv_path"] else None
+        try:
+            writer = csv.writer(out or self.stdout, lineterminator="\n")
+            if out or not options["quiet"]:
+                writer.writerow(["kind", "reference", "detail"])
+
+            def emit(d):
+                if out or not options["quiet"]:
+                    writer.writerow([d.kind, d.reference, json.dumps(d.detail, default=str)])
+
+            counts = reconcile(emit, heal=options["heal"], chunk_size=max(1, options["chunk"]))
+        finally:
+            if out:
+                out.close()
+
+        healed = counts.pop("healed", 0)
+        for kind, n in sorted(counts.items()):
+            self.stdout.write(f"{kind} : {n}")
+        if options["heal"]:
+            self.stdout.write(f"inscriptions créées : {healed}")
+        style = self.style.WARNING if counts else self.style.SUCCESS
+        self.stdout.write(style(f"{'⚠️' if counts else '✅'} {sum(counts.values())} divergence(s)"))
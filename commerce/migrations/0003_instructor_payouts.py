@@ -0,0 +1,166 @@
+# Generated by Django 4.2.27 on 2026-10-19 04:58
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0004_payment_notification"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("commerce", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="InstructorBalance",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("currency", models.CharField(default="XOF", max_length=8)),
+                (
+                    "earned_total",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                (
+                    "paid_out_total",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                (
+                    "balance",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                ("last_period", models.DateField(blank=True, null=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "instructor",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="balances",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="InstructorPayout",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("reference", models.CharField(max_length=40, unique=True)),
+                ("amount", models.DecimalField(decimal_places=2, max_digits=14)),
+                ("currency", models.CharField(default="XOF", max_length=8)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("PENDING", "En attente"),
+                            ("PAID", "Payé"),
+                            ("CANCELED", "Annulé"),
+                        ],
+                        default="PENDING",
+                        max_length=12,
+                    ),
+                ),
+                ("period_end", models.DateField()),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+                ("paid_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "instructor",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="payouts",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["instructor", "-created_at"],
+                        name="instructor_payout_created_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="InstructorEarning",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("period", models.DateField()),
+                ("currency", models.CharField(default="XOF", max_length=8)),
+                ("sales_count", models.PositiveIntegerField(default=0)),
+                (
+                    "gross",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                ("payout_percent", models.DecimalField(decimal_places=2, max_digits=5)),
+                (
+                    "amount",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "course",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="earnings",
+                        to="catalog.course",
+                    ),
+                ),
+                (
+                    "instructor",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="earnings",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["instructor", "-period"],
+                        name="instructor_earning_period_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="instructorearning",
+            constraint=models.UniqueConstraint(
+                fields=("course", "period", "currency"), name="instructor_earning_uniq"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="instructorbalance",
+            constraint=models.UniqueConstraint(
+                fields=("instructor", "currency"), name="instructor_balance_uniq"
+            ),
+        ),
+    ]
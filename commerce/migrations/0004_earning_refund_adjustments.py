@@ -0,0 +1,38 @@
+# Generated by Django 4.2.27 on 2026-10-19 05:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("commerce", "0003_instructor_payouts"),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name="instructorearning",
+            name="instructor_earning_uniq",
+        ),
+        migrations.AddField(
+            model_name="instructorearning",
+            name="source",
+            field=models.CharField(blank=True, default="", max_length=80),
+        ),
+        migrations.AddConstraint(
+            model_name="instructorearning",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("source", "")),
+                fields=("course", "period", "currency"),
+                name="instructor_earning_uniq",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="instructorearning",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("source", ""), _negated=True),
+                fields=("source", "course"),
+                name="instructor_earning_source_uniq",
+            ),
+        ),
+    ]
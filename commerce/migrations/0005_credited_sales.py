@@ -0,0 +1,65 @@
+# Generated by Django 4.2.27 on 2026-10-19 09:40
+
+from datetime import datetime, time, timedelta
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import Exists, Max, OuterRef
+from django.utils import timezone
+
+
+def mark_credited(apps, schema_editor):
+    # ventes déjà couvertes par les cumuls journaliers (jusqu'à la dernière journée écrite)
+    InstructorEarning = apps.get_model("commerce", "InstructorEarning")
+    CreditedSale = apps.get_model("commerce", "CreditedSale")
+    Order = apps.get_model("commerce", "Order")
+    OrderItem = apps.get_model("commerce", "OrderItem")
+    Payment = apps.get_model("catalog", "Payment")
+
+    last = InstructorEarning.objects.filter(source="").aggregate(m=Max("period"))["m"]
+    if last is None:
+        return
+    hi = timezone.make_aware(datetime.combine(last + timedelta(days=1), time.min), timezone.get_current_timezone())
+    sources = (
+        ("order", Order.objects.filter(
+            status__in=["PAID", "REFUNDED"], paid_at__lt=hi,
+        ).filter(Exists(OrderItem.objects.filter(order=OuterRef("id"), item_type="COURSE", course__isnull=False)))),
+        ("payment", Payment.objects.filter(
+            status__in=["PAID", "REFUNDED"], kind="COURSE", course_id__isnull=False, paid_at__lt=hi,
+        )),
+    )
+    for kind, qs in sources:
+        batch = []
+        for pk, paid_at in qs.values_list("id", "paid_at").iterator(chunk_size=5000):
+            batch.append(CreditedSale(kind=kind, object_id=pk, period=timezone.localdate(paid_at)))
+            if len(batch) >= 5000:
+                CreditedSale.objects.bulk_create(batch, ignore_conflicts=True)
+                batch = []
+        CreditedSale.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0004_payment_notification"),
+        ("commerce", "0004_earning_refund_adjustments"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CreditedSale",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("kind", models.CharField(choices=[("order", "Commande"), ("payment", "Paiement")], max_length=8)),
+                ("object_id", models.PositiveBigIntegerField()),
+                ("period", models.DateField()),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(fields=("kind", "object_id"), name="credited_sale_uniq"),
+                ],
+            },
+        ),
+        migrations.RunPython(mark_credited, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.27 on 2026-10-19 10:05
+
+from django.db import migrations, models
+
+
+def mark_reserved(apps, schema_editor):
+    # used_count déjà incrémenté au checkout pour ces commandes (échecs : jamais rendus jusqu'ici)
+    Order = apps.get_model("commerce", "Order")
+    Order.objects.filter(coupon__isnull=False).exclude(status__in=["DRAFT", "FAILED", "CANCELED"]) \
+        .update(coupon_reserved=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("commerce", "0005_credited_sales"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="order",
+            name="coupon_reserved",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(mark_reserved, migrations.RunPython.noop),
+    ]
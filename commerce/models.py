@@ -43,6 +43,8 @@ class Order(models.Model):
     total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
 
     coupon = models.ForeignKey("commerce.Coupon", on_delete=models.SET_NULL, null=True, blank=True)
+    # Coupon.used_count compté pour cette commande (réservé au checkout, rendu si échec / expiration)
+    coupon_reserved = models.BooleanField(default=False)
 
     created_at = models.DateTimeField(default=timezone.now)
     paid_at = models.DateTimeField(null=True, blank=True)
@@ -105,3 +107,114 @@ class CompanyAssignmentTarget(models.Model):
 
     class Meta:
         unique_together = ("assignment", "user")
+
+
+# ------------------------------------------------------------------
+# Revenus formateurs (cf. commerce/payouts.py)
+# ------------------------------------------------------------------
+class InstructorEarning(models.Model):
+    """
+    Écriture immuable : part formateur des ventes d'un cours sur une journée close.
+    payout_percent est figé au moment du calcul (un changement de commission ne réécrit pas l'historique).
+    Remboursement : écriture d'ajustement négative (source = "refund:order:42"), jamais de réécriture.
+    Ventes portées : cf. CreditedSale.
+    """
+    instructor = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.PROTECT, related_name="earnings")
+    course = models.ForeignKey("catalog.Course", on_delete=models.PROTECT, related_name="earnings")
+    period = models.DateField()  # journée des ventes (paid_at) ; ajustement : journée du remboursement
+    currency = models.CharField(max_length=8, default="XOF")
+    # "" = cumul journalier ; "late:..." = ventes créditées après le cumul de leur journée
+    source = models.CharField(max_length=80, blank=True, default="")
+
+    sales_count = models.PositiveIntegerField(default=0)
+    gross = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    payout_percent = models.DecimalField(max_digits=5, decimal_places=2)
+    amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)  # part formateur
+
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["course", "period", "currency"], condition=models.Q(source=""),
+                                    name="instructor_earning_uniq"),
+            models.UniqueConstraint(fields=["source", "course"], condition=~models.Q(source=""),
+                                    name="instructor_earning_source_uniq"),
+        ]
+        indexes = [
+            models.Index(fields=["instructor", "-period"], name="instructor_earning_period_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.instructor_id} • {self.course_id} • {self.period} • {self.amount}{self.currency}"
+
+
+class CreditedSale(models.Model):
+    """
+    Vente déjà portée par un InstructorEarning (commande commerce ou catalog.Payment) : le cumul
+    repart des ventes non créditées, pas d'un jour repère (vente validée tard, paid_at antidaté).
+    """
+    class Kind(models.TextChoices):
+        ORDER = "order", "Commande"
+        PAYMENT = "payment", "Paiement"
+
+    kind = models.CharField(max_length=8, choices=Kind.choices)
+    object_id = models.PositiveBigIntegerField()
+    period = models.DateField()  # journée de vente créditée
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["kind", "object_id"], name="credited_sale_uniq"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}:{self.object_id} • {self.period}"
+
+
+class InstructorPayout(models.Model):
+    class Status(models.TextChoices):
+        PENDING = "PENDING", "En attente"
+        PAID = "PAID", "Payé"
+        CANCELED = "CANCELED", "Annulé"
+
+    instructor = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.PROTECT, related_name="payouts")
+    reference = models.CharField(max_length=40, unique=True)  # ex: "PO-202610-000042"
+    amount = models.DecimalField(max_digits=14, decimal_places=2)
+    currency = models.CharField(max_length=8, default="XOF")
+    status = models.CharField(max_length=12, choices=Status.choices, default=Status.PENDING)
+
+    period_end = models.DateField()  # gains jusqu'à cette journée incluse
+    created_at = models.DateTimeField(default=timezone.now)
+    paid_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["instructor", "-created_at"], name="instructor_payout_created_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.reference} • {self.instructor_id} • {self.amount}{self.currency} • {self.status}"
+
+
+class InstructorBalance(models.Model):
+    """
+    Solde courant par formateur et devise, mis à jour avec chaque écriture (gain / versement)
+    dans la même transaction : lecture O(1) au lieu de sommer l'historique.
+    """
+    instructor = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="balances")
+    currency = models.CharField(max_length=8, default="XOF")
+
+    earned_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    paid_out_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)  # versements non annulés
+    balance = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    last_period = models.DateField(null=True, blank=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["instructor", "currency"], name="instructor_balance_uniq"),
+        ]
+
+    def __str__(self):
+        return f"{self.instructor_id} • {self.balance}{self.currency}"
@@ -0,0 +1,318 @@
+"""
+Moteur de revenus formateurs.
+
+1. compute_earnings() : agrège (Decimal) les ventes des journées closes pas encore créditées
+   (CreditedSale, une ligne par commande / paiement) par cours / jour / devise, applique
+   InstructorProfile.payout_percent et écrit des InstructorEarning immuables. Vente validée après
+   le cumul de sa journée (COMMIT tardif, paid_at antidaté) : écriture "late:..." de la même journée.
+2. Chaque écriture met à jour InstructorBalance dans la même transaction (solde O(1)).
+3. record_refund_adjustment() : remboursement (signal REFUNDED, comme le grand livre) -> écriture
+   négative datée du remboursement, débitée du solde ; l'historique n'est jamais réécrit.
+4. create_payouts() : versement (InstructorPayout) du solde disponible au-delà d'un minimum.
+
+Sources : lignes de commandes commerce payées, nettes de la remise (net_amounts, comme le grand
+livre) + paiements catalog.Payment payés qui n'ont pas
+de transaction commerce (même référence PSP) — une vente n'est jamais comptée deux fois.
+Une vente remboursée reste comptée à sa journée : son remboursement est une écriture à part
+(comme vente + contre-passation dans ledger), quel que soit l'ordre entre cumul et remboursement.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from itertools import groupby
+from datetime import date, datetime, time, timedelta
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, F, OuterRef, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from catalog.models import Course, Payment
+from compte.models import InstructorProfile
+from .models import (
+    CreditedSale, InstructorBalance, InstructorEarning, InstructorPayout, Order, OrderItem, PaymentTransaction,
+)
+
+CENT = Decimal("0.01")
+DEFAULT_PAYOUT_PERCENT = Decimal("70.00")  # = défaut de InstructorProfile.payout_percent
+
+
+def _bounds(start: date, end: date) -> tuple:
+    tz = timezone.get_current_timezone()
+    return (
+        timezone.make_aware(datetime.combine(start, time.min), tz),
+        timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min), tz),
+    )
+
+
+SOLD_ORDER = [Order.Status.PAID, Order.Status.REFUNDED]
+SOLD_PAYMENT = [Payment.Status.PAID, Payment.Status.REFUNDED]
+
+
+def net_amounts(total: Decimal, amounts: list) -> list:
+    """
+    Remise de la commande (Order.discount_total) répartie au prorata des lignes : montants nets au
+    centime ; le reste d'arrondi revient à la plateforme. Partagé par gains, remboursements et ledger.
+    """
+    subtotal = sum(amounts, Decimal("0"))
+    if not subtotal:
+        return [Decimal("0")] * len(amounts)
+    return [(amount * total / subtotal).quantize(CENT) for amount in amounts]
+
+
+def _order_sales():
+    return OrderItem.objects.filter(
+        order__status__in=SOLD_ORDER, order__paid_at__isnull=False,
+        item_type=OrderItem.ItemType.COURSE, course__isnull=False,
+    )
+
+
+def _order_lines(orders):
+    """Commandes -> (order_id, course_id, devise, paid_at, net) par ligne de cours."""
+    rows = OrderItem.objects.filter(order__in=orders).order_by("order_id", "id").values_list(
+        "order_id", "item_type", "course_id", "line_total", "order__total", "order__currency", "order__paid_at",
+    )
+    for order_id, group in groupby(rows.iterator(chunk_size=2000), key=lambda r: r[0]):
+        group = list(group)  # toutes les lignes : la remise porte aussi sur les sièges entreprise
+        nets = net_amounts(group[0][4] or Decimal("0"), [r[3] or Decimal("0") for r in group])
+        for (_, item_type, course_id, _, _, currency, paid_at), net in zip(group, nets):
+            if item_type == OrderItem.ItemType.COURSE and course_id is not None:
+                yield order_id, course_id, currency or "XOF", paid_at, net
+
+
+def _payment_sales():
+    # ✅ un Payment déjà couvert par une transaction commerce (même référence PSP) n'est pas recompté
+    # (commande payée ou remboursée : cf. ledger.services.mirrored_refs)
+    mirrored = PaymentTransaction.objects.filter(
+        reference=OuterRef("provider_ref"), order__status__in=SOLD_ORDER,
+    ).exclude(reference="")
+    return Payment.objects.filter(
+        status__in=SOLD_PAYMENT, kind=Payment.Kind.COURSE, course_id__isnull=False, paid_at__isnull=False,
+    ).filter(~Exists(mirrored))
+
+
+def pending_sales(until: date) -> tuple:
+    """
+    Ventes des journées closes (<= until) pas encore créditées (cf. CreditedSale), quelle que soit
+    leur journée -> ({(course_id, jour, devise): [nombre, net]}, [CreditedSale à écrire]).
+    """
+    hi = _bounds(until, until)[1]
+    out, credits = defaultdict(lambda: [0, Decimal("0")]), {}
+
+    def credited(kind):
+        return CreditedSale.objects.filter(kind=kind, object_id=OuterRef("id"))
+
+    orders = Order.objects.filter(status__in=SOLD_ORDER, paid_at__lt=hi).filter(
+        Exists(_order_sales().filter(order=OuterRef("id"))), ~Exists(credited(CreditedSale.Kind.ORDER)),
+    )
+    for order_id, course_id, currency, paid_at, net in _order_lines(orders):
+        day = timezone.localdate(paid_at)
+        acc = out[(course_id, day, currency)]
+        acc[0] += 1
+        acc[1] += net
+        credits[(CreditedSale.Kind.ORDER, order_id)] = day
+
+    payments = _payment_sales().filter(paid_at__lt=hi).filter(~Exists(credited(CreditedSale.Kind.PAYMENT)))
+    for payment_id, course_id, currency, paid_at, amount in payments.values_list(
+        "id", "course_id", "currency", "paid_at", "amount",
+    ).iterator(chunk_size=2000):
+        day = timezone.localdate(paid_at)
+        acc = out[(course_id, day, currency or "XOF")]
+        acc[0] += 1
+        acc[1] += amount or Decimal("0")
+        credits[(CreditedSale.Kind.PAYMENT, payment_id)] = day
+
+    return out, [CreditedSale(kind=k, object_id=i, period=day) for (k, i), day in credits.items()]
+
+
+def instructor_share(gross: Decimal, percent: Decimal) -> Decimal:
+    return (gross * percent / Decimal("100")).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def _credit_balances(earnings: list, rollup: bool = True) -> None:
+    """Montants signés (ajustement < 0 : débit) ; last_period ne suit que les cumuls (jamais en arrière)."""
+    totals = defaultdict(lambda: [Decimal("0"), None])
+    for e in earnings:
+        acc = totals[(e.instructor_id, e.currency)]
+        acc[0] += e.amount
+        acc[1] = max(acc[1], e.period) if acc[1] else e.period
+
+    InstructorBalance.objects.bulk_create(
+        [InstructorBalance(instructor_id=i, currency=c) for i, c in totals], ignore_conflicts=True,
+    )
+    for (instructor_id, currency), (amount, period) in totals.items():
+        last = Greatest(Coalesce("last_period", Value(period)), Value(period))  # vente tardive : journée passée
+        InstructorBalance.objects.filter(instructor_id=instructor_id, currency=currency).update(
+            earned_total=F("earned_total") + amount,
+            balance=F("balance") + amount,
+            **({"last_period": last} if rollup else {}),
+        )
+
+
+def compute_earnings(until: date | None = None) -> int:
+    """
+    Ventes non créditées des journées closes <= until (hier par défaut).
+    Idempotent : une vente n'est créditée qu'une fois (CreditedSale, même transaction que les écritures).
+    """
+    until = until or timezone.localdate() - timedelta(days=1)
+    sales, credits = pending_sales(until)
+    if not credits:
+        return 0
+
+    instructors = dict(
+        Course.objects.filter(id__in={cid for cid, _, _ in sales}).values_list("id", "instructor_id")
+    )
+    written = set(  # journées déjà cumulées : les ventes tardives vont dans une écriture à part
+        InstructorEarning.objects.filter(
+            source="", course_id__in=instructors, period__in={day for _, day, _ in sales},
+        ).values_list("course_id", "period", "currency")
+    )
+    run = timezone.now().strftime("%Y%m%d%H%M%S%f")
+    percents = dict(
+        InstructorProfile.objects.filter(user_id__in=set(instructors.values()))
+        .values_list("user_id", "payout_percent")
+    )
+
+    earnings = []
+    for (course_id, day, currency), (count, gross) in sorted(sales.items(), key=lambda kv: kv[0][1]):
+        instructor_id = instructors.get(course_id)
+        if instructor_id is None:
+            continue  # cours supprimé (Payment.course_id n'est pas une FK)
+        percent = percents.get(instructor_id, DEFAULT_PAYOUT_PERCENT)
+        late = (course_id, day, currency) in written
+        earnings.append(InstructorEarning(
+            instructor_id=instructor_id, course_id=course_id, period=day, currency=currency,
+            source=f"late:{day:%Y%m%d}:{currency}:{run}" if late else "",
+            sales_count=count, gross=gross, payout_percent=percent, amount=instructor_share(gross, percent),
+        ))
+
+    try:
+        with transaction.atomic():
+            CreditedSale.objects.bulk_create(credits, batch_size=1000)  # cours supprimé : marqué quand même
+            InstructorEarning.objects.bulk_create(earnings, batch_size=1000)
+            _credit_balances(earnings)
+    except IntegrityError:
+        return 0  # exécution concurrente : ces ventes viennent d'être créditées
+    return len(earnings)
+
+
+# ------------------------------------------------------------------
+# Remboursements
+# ------------------------------------------------------------------
+def _refunded_lines(kind: str, object_id) -> list:
+    """-> [(course_id, jour de vente, devise, brut)] de la vente remboursée (vide si rien à reprendre)."""
+    if kind == "order":
+        orders = Order.objects.filter(id=object_id, status=Order.Status.REFUNDED, paid_at__isnull=False)
+        return [
+            (course_id, timezone.localdate(paid_at), currency, net)
+            for _, course_id, currency, paid_at, net in _order_lines(orders)
+        ]
+    payment = _payment_sales().filter(id=object_id, status=Payment.Status.REFUNDED).first()
+    if payment is None:
+        return []  # pas une vente de cours, ou déjà portée par une commande
+    return [(payment.course_id, timezone.localdate(payment.paid_at), payment.currency or "XOF", payment.amount)]
+
+
+def record_refund_adjustment(kind: str, object_id) -> int:
+    """
+    kind = "order" | "payment" : écritures négatives (une par cours) au taux figé de la journée de
+    vente, débitées du solde. Idempotent (source unique) : le signal peut se répéter.
+    """
+    source = f"refund:{kind}:{object_id}"
+    if InstructorEarning.objects.filter(source=source).exists():
+        return 0
+    lines = _refunded_lines(kind, object_id)
+    instructors = dict(
+        Course.objects.filter(id__in={cid for cid, _, _, _ in lines}).values_list("id", "instructor_id")
+    )
+    lines = [line for line in lines if line[0] in instructors]  # cours supprimé : jamais crédité
+    if not lines:
+        return 0
+    frozen = {
+        (e["course_id"], e["period"], e["currency"]): e["payout_percent"]
+        for e in InstructorEarning.objects.filter(
+            source="", course_id__in=instructors, period__in={day for _, day, _, _ in lines},
+        ).values("course_id", "period", "currency", "payout_percent")
+    }
+    percents = dict(
+        InstructorProfile.objects.filter(user_id__in=set(instructors.values()))
+        .values_list("user_id", "payout_percent")
+    )
+
+    today, earnings = timezone.localdate(), []
+    for course_id, day, currency, gross in lines:
+        instructor_id = instructors[course_id]
+        # journée pas encore cumulée : taux courant, celui que le cumul figera
+        percent = frozen.get((course_id, day, currency)) or percents.get(instructor_id, DEFAULT_PAYOUT_PERCENT)
+        gross = gross or Decimal("0")
+        earnings.append(InstructorEarning(
+            instructor_id=instructor_id, course_id=course_id, period=today, currency=currency, source=source,
+            sales_count=0, gross=-gross, payout_percent=percent, amount=-instructor_share(gross, percent),
+        ))
+
+    try:
+        with transaction.atomic():
+            InstructorEarning.objects.bulk_create(earnings)
+            _credit_balances(earnings, rollup=False)
+    except IntegrityError:
+        return 0  # signal concurrent : ajustement déjà écrit
+    return len(earnings)
+
+
+# ------------------------------------------------------------------
+# Versements
+# ------------------------------------------------------------------
+def create_payouts(period_end: date | None = None, minimum: Decimal | None = None) -> list:
+    """Un versement PENDING par solde >= minimum ; le solde est débité dans la même transaction."""
+    period_end = period_end or timezone.localdate() - timedelta(days=1)
+    if minimum is None:
+        minimum = Decimal(str(getattr(settings, "INSTRUCTOR_PAYOUT_MINIMUM", "5000")))
+
+    created = []
+    for balance_id in InstructorBalance.objects.filter(balance__gte=minimum).values_list("id", flat=True):
+        with transaction.atomic():
+            b = InstructorBalance.objects.select_for_update().get(id=balance_id)
+            if b.balance < minimum:
+                continue
+            reference = f"PO-{period_end:%Y%m%d}-{b.instructor_id}-{b.currency}"
+            if InstructorPayout.objects.filter(reference=reference).exists():
+                continue
+            payout = InstructorPayout.objects.create(
+                instructor_id=b.instructor_id, reference=reference, amount=b.balance, currency=b.currency,
+                period_end=period_end,
+            )
+            InstructorBalance.objects.filter(id=b.id).update(
+                paid_out_total=F("paid_out_total") + payout.amount,
+                balance=F("balance") - payout.amount,
+            )
+            created.append(payout)
+    return created
+
+
+def mark_payout_paid(payout: InstructorPayout) -> bool:
+    from ledger.services import record_payout_paid  # ledger dépend de commerce
+
+    with transaction.atomic():
+        changed = InstructorPayout.objects.filter(id=payout.id, status=InstructorPayout.Status.PENDING).update(
+            status=InstructorPayout.Status.PAID, paid_at=timezone.now(),
+        )
+        if changed:
+            payout.refresh_from_db()
+            record_payout_paid(payout)
+    return bool(changed)
+
+
+def cancel_payout(payout: InstructorPayout) -> bool:
+    """Versement annulé : le montant revient au solde."""
+    with transaction.atomic():
+        changed = InstructorPayout.objects.filter(id=payout.id, status=InstructorPayout.Status.PENDING).update(
+            status=InstructorPayout.Status.CANCELED,
+        )
+        if changed:
+            InstructorBalance.objects.filter(instructor_id=payout.instructor_id, currency=payout.currency).update(
+                paid_out_total=F("paid_out_total") - payout.amount,
+                balance=F("balance") + payout.amount,
+            )
+    return bool(changed)
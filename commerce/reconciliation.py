@@ -0,0 +1,211 @@
+"""
+Rapprochement catalog.Payment / commerce.Order / commerce.PaymentTransaction.
+
+Deux passes en flux (curseurs serveur via .iterator(), mémoire constante) :
+
+1. Référence PSP : transactions (jointes à leur commande) et paiements triés par référence,
+   fusionnés en Python (merge-join) -> statuts et montants incohérents, doublons.
+2. Droits d'accès : couples (user, cours) payés (lignes de commande + paiements) contre les
+   inscriptions, triés par (user_id, course_id) -> inscriptions manquantes,
+   créées en masse avec heal=True.
+
+⚠️ Le tri SQL des références doit être celui de Python : collation binaire forcée ("C").
+"""
+from __future__ import annotations
+
+import heapq
+from collections import Counter, namedtuple
+from itertools import groupby
+from operator import itemgetter
+
+from django.db import connection
+from django.db.models import Exists, OuterRef
+from django.db.models.functions import Collate
+
+from catalog.models import Course, Payment
+from catalog.versioning import bump_learner
+from enrollments.models import Enrollment
+from .models import Order, OrderItem, PaymentTransaction
+
+CHUNK_SIZE = 2000
+
+Discrepancy = namedtuple("Discrepancy", "kind reference detail")
+
+# types de divergence
+TX_PAID_ORDER_UNPAID = "tx_paid_order_unpaid"
+TX_AMOUNT_MISMATCH = "tx_amount_mismatch"
+PAYMENT_PAID_TX_UNPAID = "payment_paid_tx_unpaid"
+TX_PAID_PAYMENT_UNPAID = "tx_paid_payment_unpaid"
+PAYMENT_AMOUNT_MISMATCH = "payment_amount_mismatch"
+DUPLICATE_PAYMENT = "duplicate_payment"
+ORDER_PAID_WITHOUT_TX = "order_paid_without_tx"
+MISSING_ENROLLMENT = "missing_enrollment"
+
+SETTLED_ORDER = (Order.Status.PAID, Order.Status.REFUNDED)
+SETTLED_PAYMENT = (Payment.Status.PAID, Payment.Status.REFUNDED)
+
+
+def _binary(field: str):
+    return Collate(field, "C" if connection.vendor == "postgresql" else "BINARY")
+
+
+def merge_join(left, right, key=itemgetter(0)):
+    """
+    Jointure externe de deux flux triés sur `key` -> (clé, lignes gauche, lignes droite).
+    Seuls les groupes d'une même clé sont matérialisés.
+    """
+    left, right = groupby(left, key), groupby(right, key)
+    lk, lg = next(left, (None, None))
+    rk, rg = next(right, (None, None))
+    while lg is not None or rg is not None:
+        if rg is None or (lg is not None and lk < rk):
+            yield lk, list(lg), []
+            lk, lg = next(left, (None, None))
+        elif lg is None or rk < lk:
+            yield rk, [], list(rg)
+            rk, rg = next(right, (None, None))
+        else:
+            yield lk, list(lg), list(rg)
+            lk, lg = next(left, (None, None))
+            rk, rg = next(right, (None, None))
+
+
+# ------------------------------------------------------------------
+# Flux
+# ------------------------------------------------------------------
+def _transactions(chunk_size: int):
+    # (ref, tx_id, statut, montant, order_id, statut commande, total commande)
+    return (
+        PaymentTransaction.objects.exclude(reference="")
+        .order_by(_binary("reference"), "id")
+        .values_list("reference", "id", "status", "amount", "order_id", "order__status", "order__total")
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def _payments(chunk_size: int):
+    # (ref, payment_id, statut, montant, référence interne)
+    return (
+        Payment.objects.exclude(provider_ref="")
+        .order_by(_binary("provider_ref"), "id")
+        .values_list("provider_ref", "id", "status", "amount", "reference")
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def _paid_without_tx(chunk_size: int):
+    success = PaymentTransaction.objects.filter(order=OuterRef("pk"), status=PaymentTransaction.Status.SUCCESS)
+    return (
+        Order.objects.filter(status=Order.Status.PAID, total__gt=0).filter(~Exists(success))
+        .order_by("id").values_list("id", "total").iterator(chunk_size=chunk_size)
+    )
+
+
+def _entitlements(chunk_size: int):
+    """Couples (user_id, course_id, source) payés, triés par (user_id, course_id)."""
+    items = (
+        OrderItem.objects.filter(
+            order__status=Order.Status.PAID, item_type=OrderItem.ItemType.COURSE,
+            course__isnull=False, order__user__isnull=False,
+        )
+        .order_by("order__user_id", "course_id", "order_id")
+        .values_list("order__user_id", "course_id", "order_id")
+        .iterator(chunk_size=chunk_size)
+    )
+    # Payment.course_id n'est pas une FK : cours supprimés ignorés
+    payments = (
+        Payment.objects.filter(status=Payment.Status.PAID, kind=Payment.Kind.COURSE, course_id__isnull=False)
+        .filter(Exists(Course.objects.filter(id=OuterRef("course_id"))))
+        .order_by("user_id", "course_id", "id")
+        .values_list("user_id", "course_id", "reference")
+        .iterator(chunk_size=chunk_size)
+    )
+    return heapq.merge(
+        ((u, c, f"order:{o}") for u, c, o in items),
+        ((u, c, f"payment:{r}") for u, c, r in payments),
+        key=itemgetter(0, 1),
+    )
+
+
+def _enrollments(chunk_size: int):
+    return (
+        Enrollment.objects.order_by("user_id", "course_id")
+        .values_list("user_id", "course_id").iterator(chunk_size=chunk_size)
+    )
+
+
+# ------------------------------------------------------------------
+# Contrôles
+# ------------------------------------------------------------------
+def _check_reference(reference: str, txs: list, payments: list):
+    for _, tx_id, status, amount, order_id, order_status, order_total in txs:
+        if status != PaymentTransaction.Status.SUCCESS:
+            continue
+        if order_status not in SETTLED_ORDER:
+            yield Discrepancy(TX_PAID_ORDER_UNPAID, reference,
+                              {"transaction": tx_id, "order": order_id, "order_status": order_status})
+        if amount != order_total:
+            yield Discrepancy(TX_AMOUNT_MISMATCH, reference,
+                              {"transaction": tx_id, "order": order_id, "amount": amount, "order_total": order_total})
+
+    if len(payments) > 1:
+        yield Discrepancy(DUPLICATE_PAYMENT, reference, {"payments": [p[4] for p in payments]})
+    if not txs:
+        return  # paiement catalogue sans commande : cas nominal
+
+    paid_tx = [t for t in txs if t[2] == PaymentTransaction.Status.SUCCESS]
+    for _, payment_id, status, amount, payment_ref in payments:
+        if status in SETTLED_PAYMENT and not paid_tx:
+            yield Discrepancy(PAYMENT_PAID_TX_UNPAID, reference, {"payment": payment_ref, "status": status})
+        elif status not in SETTLED_PAYMENT and paid_tx:
+            yield Discrepancy(TX_PAID_PAYMENT_UNPAID, reference, {"payment": payment_ref, "status": status})
+        elif paid_tx and amount != paid_tx[0][3]:
+            yield Discrepancy(PAYMENT_AMOUNT_MISMATCH, reference,
+                              {"payment": payment_ref, "amount": amount, "transaction_amount": paid_tx[0][3]})
+
+
+def _heal(missing: list) -> int:
+    created = Enrollment.objects.bulk_create(
+        [Enrollment(user_id=u, course_id=c, source=Enrollment.Source.B2C) for u, c in missing],
+        ignore_conflicts=True,
+    )
+    # bulk_create contourne les signaux : versions apprenant invalidées ici
+    for user_id in {u for u, _ in missing}:
+        bump_learner(user_id)
+    return len(created)
+
+
+def reconcile(emit=None, heal: bool = False, chunk_size: int = CHUNK_SIZE) -> Counter:
+    """
+    Parcourt les trois tables ; `emit(Discrepancy)` reçoit chaque divergence au fil de l'eau.
+    heal=True : inscriptions manquantes créées par lots de chunk_size.
+    -> Counter {type: nombre} (+ "healed").
+    """
+    counts = Counter()
+
+    def report(d: Discrepancy):
+        counts[d.kind] += 1
+        if emit is not None:
+            emit(d)
+
+    for reference, txs, payments in merge_join(_transactions(chunk_size), _payments(chunk_size)):
+        for d in _check_reference(reference, txs, payments):
+            report(d)
+
+    for order_id, total in _paid_without_tx(chunk_size):
+        report(Discrepancy(ORDER_PAID_WITHOUT_TX, f"order:{order_id}", {"order": order_id, "total": total}))
+
+    pending = []
+    for (user_id, course_id), paid, enrolled in merge_join(
+        _entitlements(chunk_size), _enrollments(chunk_size), key=itemgetter(0, 1),
+    ):
+        if paid and not enrolled:
+            report(Discrepancy(MISSING_ENROLLMENT, paid[0][2], {"user": user_id, "course": course_id}))
+            if heal:
+                pending.append((user_id, course_id))
+                if len(pending) >= chunk_size:
+                    counts["healed"] += _heal(pending)
+                    pending = []
+    if pending:
+        counts["healed"] += _heal(pending)
+    return counts
@@ -8,6 +8,16 @@ from catalog.models import Course
 from .models import Order, OrderItem, PaymentTransaction, CompanyLicense
 
 
+def coupon_discount(coupon, subtotal: Decimal) -> Decimal:
+    if not coupon or not coupon.is_active:
+        return Decimal("0")
+    if coupon.percent_off:
+        return (subtotal * Decimal(coupon.percent_off) / Decimal("100")).quantize(Decimal("0.01"))
+    if coupon.amount_off:
+        return min(subtotal, coupon.amount_off)
+    return Decimal("0")
+
+
 def recalc_order_totals(order: Order) -> Order:
     subtotal = Decimal("0")
     for it in order.items.all():
@@ -15,13 +25,7 @@ def recalc_order_totals(order: Order) -> Order:
         it.save(update_fields=["line_total"])
         subtotal += it.line_total
 
-    discount_total = Decimal("0")
-    if order.coupon and order.coupon.is_active:
-        c = order.coupon
-        if c.percent_off:
-            discount_total = (subtotal * Decimal(c.percent_off) / Decimal("100")).quantize(Decimal("0.01"))
-        elif c.amount_off:
-            discount_total = min(subtotal, c.amount_off)
+    discount_total = coupon_discount(order.coupon, subtotal)
 
     order.subtotal = subtotal
     order.discount_total = discount_total
@@ -0,0 +1,41 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from catalog.models import Course, Payment
+from .checkout import count_paid_coupon, invalidate_price, release_coupon
+from .models import Order
+from .payouts import record_refund_adjustment
+
+
+# ✅ snapshot de prix du checkout (cf. commerce/checkout.py) : après commit, sinon un checkout
+# concurrent remettrait l'ancien prix en cache pour CHECKOUT_PRICE_TTL
+@receiver([post_save, post_delete], sender=Course, dispatch_uid="commerce_course_price")
+def course_price_changed(sender, instance, **kwargs):
+    course_id = instance.id
+    transaction.on_commit(lambda: invalidate_price(course_id))
+
+
+# ✅ coupon réservé au checkout : rendu si la commande échoue, recompté si payée après expiration
+@receiver(post_save, sender=Order, dispatch_uid="commerce_order_coupon_usage")
+def order_coupon_usage(sender, instance, raw=False, **kwargs):
+    if raw or not instance.coupon_id:
+        return
+    order_id = instance.id
+    if instance.status in (Order.Status.FAILED, Order.Status.CANCELED):
+        transaction.on_commit(lambda: release_coupon(order_id))
+    elif instance.status == Order.Status.PAID:
+        transaction.on_commit(lambda: count_paid_coupon(order_id))
+
+
+# ✅ remboursement : part formateur reprise (mêmes signaux que ledger/signals.py), après commit
+@receiver(post_save, sender=Order, dispatch_uid="commerce_order_refund_earning")
+def order_refunded(sender, instance, raw=False, **kwargs):
+    if not raw and instance.status == Order.Status.REFUNDED:
+        transaction.on_commit(lambda: record_refund_adjustment("order", instance.id))
+
+
+@receiver(post_save, sender=Payment, dispatch_uid="commerce_payment_refund_earning")
+def payment_refunded(sender, instance, raw=False, **kwargs):
+    if not raw and instance.status == Payment.Status.REFUNDED:
+        transaction.on_commit(lambda: record_refund_adjustment("payment", instance.id))
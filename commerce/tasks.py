@@ -0,0 +1,38 @@
+import logging
+
+from celery import shared_task
+from django.conf import settings
+
+from .checkout import expire_coupon_reservations
+from .payouts import compute_earnings, create_payouts
+from .reconciliation import reconcile
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name="commerce.compute_instructor_earnings", ignore_result=True)
+def compute_instructor_earnings() -> int:
+    """Celery beat : écritures de gains des ventes non créditées (journées closes)."""
+    return compute_earnings()
+
+
+@shared_task(name="commerce.create_instructor_payouts", ignore_result=True)
+def create_instructor_payouts() -> int:
+    """Celery beat (mensuel) : gains à jour puis un versement par solde disponible."""
+    compute_earnings()
+    return len(create_payouts())
+
+
+@shared_task(name="commerce.reconcile_payments", ignore_result=True)
+def reconcile_payments() -> dict:
+    """Celery beat (nuit) : rapprochement paiements / commandes / transactions, résumé dans les logs."""
+    counts = reconcile(heal=getattr(settings, "RECONCILE_AUTO_HEAL", False))
+    if counts:
+        logger.warning("rapprochement paiements : %s", dict(counts))
+    return dict(counts)
+
+
+@shared_task(name="commerce.expire_coupon_reservations", ignore_result=True)
+def expire_coupons() -> int:
+    """Celery beat : coupons des commandes restées PENDING au-delà de CHECKOUT_COUPON_HOLD rendus."""
+    return expire_coupon_reservations()
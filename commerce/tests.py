@@ -1,3 +1,177 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase
+from django.utils import timezone
+
+from catalog.models import Course, Payment
+from compte.models import InstructorProfile
+from .checkout import CheckoutError, create_checkout, expire_coupon_reservations, price_snapshots
+from .models import Coupon, InstructorBalance, InstructorEarning, Order, OrderItem, PaymentTransaction
+from .payouts import _payment_sales, compute_earnings, record_refund_adjustment
+
+User = get_user_model()
+
+
+class InstructorEarningsTests(TestCase):
+    def setUp(self):
+        self.instructor = User.objects.create_user("prof@example.com", "x", role=User.Role.INSTRUCTOR)
+        InstructorProfile.objects.create(user=self.instructor, payout_percent=Decimal("70.00"))
+        self.buyer = User.objects.create_user("buyer@example.com", "x")
+        self.course = Course.objects.create(title="Épargne", instructor=self.instructor, price=Decimal("1000"))
+        self.yesterday = timezone.now() - timedelta(days=1)
+
+    def _order(self, status=Order.Status.PAID, reference=""):
+        order = Order.objects.create(user=self.buyer, status=status, total=Decimal("1000"), paid_at=self.yesterday)
+        OrderItem.objects.create(order=order, item_type=OrderItem.ItemType.COURSE, course=self.course,
+                                 unit_price=Decimal("1000"), line_total=Decimal("1000"))
+        if reference:
+            PaymentTransaction.objects.create(order=order, provider="cinetpay", reference=reference,
+                                              amount=Decimal("1000"))
+        return order
+
+    def _refund(self, order):
+        with self.captureOnCommitCallbacks(execute=True):
+            order.status = Order.Status.REFUNDED
+            order.save()
+
+    def _balance(self):
+        return InstructorBalance.objects.get(instructor=self.instructor).balance
+
+    def test_rollup_credits_balance(self):
+        self._order()
+        self.assertEqual(compute_earnings(), 1)
+        self.assertEqual(self._balance(), Decimal("700.00"))
+        self.assertEqual(compute_earnings(), 0)  # journée déjà écrite
+
+    def test_late_sale_on_processed_day_is_credited(self):
+        self._order()
+        compute_earnings()
+        self._order()  # COMMIT après le cumul de la journée
+        Payment.objects.create(user=self.buyer, course_id=self.course.id, status=Payment.Status.PAID,
+                               reference="PAY-OLD", amount=Decimal("500"),
+                               paid_at=self.yesterday - timedelta(days=3))  # paid_at antidaté
+        self.assertEqual(compute_earnings(), 2)
+        late = InstructorEarning.objects.get(source__startswith="late:")  # journée déjà cumulée
+        self.assertEqual((late.period, late.amount), (timezone.localdate(self.yesterday), Decimal("700.00")))
+        backdated = InstructorEarning.objects.get(source="", period=timezone.localdate(self.yesterday - timedelta(days=3)))
+        self.assertEqual(backdated.amount, Decimal("350.00"))
+        self.assertEqual(self._balance(), Decimal("1750.00"))
+        self.assertEqual(compute_earnings(), 0)
+        self.assertEqual(
+            InstructorBalance.objects.get(instructor=self.instructor).last_period, timezone.localdate(self.yesterday),
+        )
+
+    def test_refund_after_rollup_is_debited(self):
+        order = self._order()
+        compute_earnings()
+        self._refund(order)
+        adjustment = InstructorEarning.objects.get(source=f"refund:order:{order.id}")
+        self.assertEqual(adjustment.amount, Decimal("-700.00"))
+        self.assertEqual(adjustment.period, timezone.localdate())
+        self.assertEqual(self._balance(), Decimal("0.00"))
+        # signal répété (nouvelle sauvegarde) : pas de second débit
+        self._refund(order)
+        self.assertEqual(record_refund_adjustment("order", order.id), 0)
+        self.assertEqual(self._balance(), Decimal("0.00"))
+
+    def test_refund_before_rollup_nets_to_zero(self):
+        order = self._order()
+        self._refund(order)
+        self.assertEqual(compute_earnings(), 1)  # la vente reste comptée à sa journée
+        self.assertEqual(self._balance(), Decimal("0.00"))
+        # un ajustement daté d'aujourd'hui ne fait pas sauter les journées suivantes
+        self.assertEqual(
+            InstructorEarning.objects.filter(source="").get().period, timezone.localdate(self.yesterday),
+        )
+
+    def test_coupon_discount_is_netted_like_the_ledger(self):
+        from ledger.services import AccountBook, balance_as_of
+
+        coupon = Coupon.objects.create(code="MOINS10", percent_off=10)
+        with self.captureOnCommitCallbacks(execute=True):
+            order = Order.objects.create(user=self.buyer, coupon=coupon, subtotal=Decimal("1000"),
+                                         discount_total=Decimal("100"), total=Decimal("900"))
+            OrderItem.objects.create(order=order, item_type=OrderItem.ItemType.COURSE, course=self.course,
+                                     unit_price=Decimal("1000"), line_total=Decimal("1000"))
+            order.status, order.paid_at = Order.Status.PAID, self.yesterday
+            order.save()
+        compute_earnings()
+        self.assertEqual(self._balance(), Decimal("630.00"))
+        ledger_account = AccountBook().instructor(self.instructor.id, "XOF")
+        self.assertEqual(balance_as_of(ledger_account), -self._balance())  # versement sans découvert
+
+        self._refund(order)
+        self.assertEqual(InstructorEarning.objects.get(source=f"refund:order:{order.id}").amount, Decimal("-630.00"))
+        self.assertEqual(self._balance(), Decimal("0.00"))
+
+    def test_payment_mirrored_by_refunded_order_is_not_counted(self):
+        self._order(status=Order.Status.REFUNDED, reference="PSP-1")
+        payment = Payment.objects.create(user=self.buyer, course_id=self.course.id, status=Payment.Status.PAID,
+                                         reference="PAY-1", provider_ref="PSP-1", amount=Decimal("1000"),
+                                         paid_at=self.yesterday)
+        self.assertFalse(_payment_sales().filter(id=payment.id).exists())
+
+
+class CheckoutTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        instructor = User.objects.create_user("prof@example.com", "x", role=User.Role.INSTRUCTOR)
+        self.buyer = User.objects.create_user("buyer@example.com", "x")
+        self.course = Course.objects.create(title="Épargne", instructor=instructor, price=Decimal("1000"),
+                                            status=Course.Status.PUBLISHED)
+
+    def _checkout(self, user, coupon_code=""):
+        return create_checkout(user, {
+            "provider": "cinetpay", "coupon_code": coupon_code,
+            "items": [{"item_type": OrderItem.ItemType.COURSE, "course_id": self.course.id, "seats_qty": 0}],
+        })
+
+    def test_coupon_usage_limit_is_enforced(self):
+        Coupon.objects.create(code="BIENVENUE", percent_off=10, usage_limit=1)
+        order, _, _ = self._checkout(self.buyer, "bienvenue")
+        self.assertEqual(order.total, Decimal("900.00"))
+        self.assertEqual(Coupon.objects.get(code="BIENVENUE").used_count, 1)
+        other = User.objects.create_user("other@example.com", "x")
+        with self.assertRaises(CheckoutError):
+            self._checkout(other, "BIENVENUE")
+        self.assertEqual(Coupon.objects.get(code="BIENVENUE").used_count, 1)
+
+    def _set_status(self, order, status):
+        with self.captureOnCommitCallbacks(execute=True):
+            order.status = status
+            order.save()
+
+    def test_failed_order_releases_coupon(self):
+        Coupon.objects.create(code="BIENVENUE", percent_off=10, usage_limit=1)
+        order, _, _ = self._checkout(self.buyer, "BIENVENUE")
+        self._set_status(order, Order.Status.FAILED)
+        self._set_status(order, Order.Status.CANCELED)  # rendu une seule fois
+        self.assertEqual(Coupon.objects.get(code="BIENVENUE").used_count, 0)
+        other = User.objects.create_user("other@example.com", "x")
+        self.assertEqual(self._checkout(other, "BIENVENUE")[0].total, Decimal("900.00"))
+
+    def test_abandoned_checkout_releases_coupon_until_paid(self):
+        coupon = Coupon.objects.create(code="BIENVENUE", percent_off=10, usage_limit=1)
+        order, _, _ = self._checkout(self.buyer, "BIENVENUE")
+        self.assertEqual(expire_coupon_reservations(), 0)  # encore dans le délai
+        Order.objects.filter(id=order.id).update(created_at=timezone.now() - timedelta(days=1))
+        self.assertEqual(expire_coupon_reservations(), 1)
+        coupon.refresh_from_db()
+        self.assertEqual(coupon.used_count, 0)
+
+        order.refresh_from_db()
+        self._set_status(order, Order.Status.PAID)  # paiement tardif : le coupon est bien consommé
+        coupon.refresh_from_db()
+        self.assertEqual(coupon.used_count, 1)
 
-# Create your tests here.
+    def test_price_snapshot_invalidated_after_commit(self):
+        self.assertEqual(price_snapshots([self.course.id])[self.course.id]["price"], "1000.00")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.course.price = Decimal("1500")
+            self.course.save()
+            # avant COMMIT : l'ancien prix reste servi, le snapshot est supprimé au COMMIT
+            self.assertEqual(price_snapshots([self.course.id])[self.course.id]["price"], "1000.00")
+        self.assertEqual(price_snapshots([self.course.id])[self.course.id]["price"], "1500.00")
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.27 on 2026-10-19 05:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("enrollments", "0003_alter_lessonprogress_progress_percent"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="lessonprogress",
+            name="position_client_ts",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="lessonprogress",
+            index=models.Index(
+                fields=["enrollment", "updated_at"], name="lesson_progress_sync_idx"
+            ),
+        ),
+    ]
@@ -43,6 +43,8 @@ class LessonProgress(models.Model):
     progress_percent = models.PositiveSmallIntegerField(default=0)  # ✅ plus de null
 
     last_position_sec = models.PositiveIntegerField(default=0)
+    # horodatage client de last_position_sec : la position la plus récente gagne (cf. enrollments/sync.py)
+    position_client_ts = models.DateTimeField(null=True, blank=True)
     completed = models.BooleanField(default=False)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -53,3 +55,4 @@ class LessonProgress(models.Model):
 
     class Meta:
         unique_together = ("enrollment", "lesson")
+        indexes = [models.Index(fields=["enrollment", "updated_at"], name="lesson_progress_sync_idx")]
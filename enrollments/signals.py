@@ -0,0 +1,28 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from best_epargne.apis.events import EVENT_ENROLLMENT, enrollment_payload, publish_user_event
+from catalog.versioning import bump_learner
+from .models import Enrollment, LessonProgress
+
+
+@receiver(post_save, sender=Enrollment, dispatch_uid="enrollments_enrollment_sse")
+def push_enrollment_confirmation(sender, instance, created, **kwargs):
+    if created:
+        publish_user_event(instance.user_id, EVENT_ENROLLMENT, enrollment_payload(instance))
+
+
+# ✅ version apprenant (ETag explore / sommaire / lecteur) : cf. catalog/versioning.py
+@receiver([post_save, post_delete], sender=Enrollment, dispatch_uid="enrollments_enrollment_version")
+def enrollment_changed(sender, instance, **kwargs):
+    bump_learner(instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=LessonProgress, dispatch_uid="enrollments_progress_version")
+def progress_changed(sender, instance, **kwargs):
+    enrollment = instance._state.fields_cache.get("enrollment")
+    if enrollment is not None:
+        user_id = enrollment.user_id
+    else:
+        user_id = Enrollment.objects.filter(id=instance.enrollment_id).values_list("user_id", flat=True).first()
+    bump_learner(user_id)
@@ -0,0 +1,194 @@
+"""
+Synchronisation de la progression enregistrée hors ligne (application mobile).
+
+Évènements : {"lesson_id", "percent", "position", "completed", "client_ts"} (client_ts : ISO 8601 ou epoch ms).
+Fusion sans conflit, quel que soit l'ordre d'arrivée des lots :
+- percent   : maximum (jamais de recul) ;
+- completed : définitif (percent forcé à 100) ;
+- position  : celle du client_ts le plus récent (comparé à LessonProgress.position_client_ts) ;
+  horodatages futurs ramenés à l'heure serveur (horloge du téléphone déréglée).
+Écriture : un upsert en masse (INSERT ... ON CONFLICT) des seules lignes modifiées.
+Delta : lignes de l'apprenant modifiées depuis le jeton du client (+ SYNC_OVERLAP contre les
+transactions concurrentes : le client applique la réponse de façon idempotente).
+"""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from catalog.models import Lesson
+from catalog.versioning import bump_learner
+from .models import Enrollment, LessonProgress
+
+MAX_EVENTS = 1000
+SYNC_OVERLAP = timedelta(seconds=5)
+
+
+class SyncError(ValueError):
+    pass
+
+
+def _int(value, default=None):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _from_epoch(seconds):
+    try:
+        return datetime.fromtimestamp(seconds, tz=dt_timezone.utc)
+    except (OverflowError, OSError, ValueError):  # hors plage / NaN : valeur invalide
+        return None
+
+
+def _client_ts(value, now):
+    if value in (None, ""):
+        return None
+    if isinstance(value, (int, float)):
+        ts = _from_epoch(value / 1000)
+        if ts is None:
+            return None
+    else:
+        ts = parse_datetime(str(value))
+        if ts is None:
+            return None
+        if timezone.is_naive(ts):
+            ts = timezone.make_aware(ts, dt_timezone.utc)
+    return min(ts, now)
+
+
+def encode_token(moment) -> str:
+    return str(int(moment.timestamp() * 1_000_000))
+
+
+def decode_token(token):
+    micros = _int(token)
+    if micros is None:
+        return None
+    return _from_epoch(micros / 1_000_000)
+
+
+def _collapse(events: list, now) -> dict:
+    """Évènements -> un état par leçon (mêmes règles que la fusion avec la base)."""
+    merged = {}
+    for i, ev in enumerate(events):
+        if not isinstance(ev, dict):
+            raise SyncError(f"events[{i}] : objet attendu.")
+        lesson_id = _int(ev.get("lesson_id"))
+        if not lesson_id:
+            raise SyncError(f"events[{i}] : lesson_id requis.")
+        state = merged.setdefault(lesson_id, {"percent": 0, "completed": False, "position": None, "ts": None})
+        state["percent"] = max(state["percent"], max(0, min(100, _int(ev.get("percent"), 0))))
+        state["completed"] = state["completed"] or ev.get("completed") in (True, 1, "1", "true")
+        position, ts = _int(ev.get("position")), _client_ts(ev.get("client_ts"), now)
+        if position is not None and ts is not None and (state["ts"] is None or ts >= state["ts"]):
+            state["position"], state["ts"] = max(0, position), ts
+    return merged
+
+
+def _merge(row: LessonProgress, state: dict) -> bool:
+    """Applique `state` à `row` ; True si la ligne change."""
+    before = (row.progress_percent, row.completed, row.last_position_sec, row.position_client_ts)
+    row.completed = row.completed or state["completed"]
+    row.progress_percent = 100 if row.completed else max(row.progress_percent, state["percent"])
+    if state["ts"] is not None and (row.position_client_ts is None or state["ts"] > row.position_client_ts):
+        row.last_position_sec, row.position_client_ts = state["position"], state["ts"]
+    return before != (row.progress_percent, row.completed, row.last_position_sec, row.position_client_ts)
+
+
+def course_totals(enrollments: dict) -> list:
+    """
+    {course_id: Enrollment} -> % par cours : somme des % / nombre de leçons du cours (leçon sans
+    ligne = 0 %), deux requêtes groupées. Même formule pour la synchro et la mise à jour d'une leçon.
+    """
+    if not enrollments:
+        return []
+    totals = dict(
+        Lesson.objects.filter(section__course_id__in=enrollments).values("section__course_id")
+        .annotate(n=Count("id")).values_list("section__course_id", "n")
+    )
+    rows = {
+        r["enrollment_id"]: r
+        for r in LessonProgress.objects.filter(enrollment_id__in=[e.id for e in enrollments.values()])
+        .values("enrollment_id").annotate(done=Count("id", filter=Q(completed=True)), pct=Sum("progress_percent"))
+    }
+    out = []
+    for course_id, enrollment in enrollments.items():
+        row, total = rows.get(enrollment.id, {}), totals.get(course_id, 0)
+        out.append({
+            "course_id": course_id,
+            "progress_percent": int(round((row.get("pct") or 0) / total)) if total else 0,
+            "completed_lessons": row.get("done", 0),
+            "total_lessons": total,
+        })
+    return out
+
+
+def sync_progress(user, events, since=None) -> dict:
+    """Applique les évènements hors ligne puis renvoie le delta serveur depuis `since` (jeton)."""
+    if not isinstance(events, list):
+        raise SyncError("events : liste attendue.")
+    if len(events) > MAX_EVENTS:
+        raise SyncError(f"{MAX_EVENTS} évènements maximum par synchronisation.")
+    now = timezone.now()
+    merged = _collapse(events, now)
+
+    # leçon -> cours -> inscription de l'apprenant (deux requêtes)
+    lesson_courses = dict(
+        Lesson.objects.filter(id__in=merged).values_list("id", "section__course_id")
+    )
+    enrollments = {
+        e.course_id: e for e in Enrollment.objects.filter(user=user, course_id__in=set(lesson_courses.values()))
+        .only("id", "course_id")
+    }
+    accepted = {lid: state for lid, state in merged.items() if lesson_courses.get(lid) in enrollments}
+    rejected = sorted(set(merged) - set(accepted))
+
+    changed = []
+    with transaction.atomic():
+        existing = {
+            (p.enrollment_id, p.lesson_id): p
+            for p in LessonProgress.objects.select_for_update().filter(
+                enrollment_id__in=[e.id for e in enrollments.values()], lesson_id__in=accepted,
+            )
+        }
+        for lesson_id, state in accepted.items():
+            enrollment = enrollments[lesson_courses[lesson_id]]
+            row = existing.get((enrollment.id, lesson_id)) or LessonProgress(
+                enrollment_id=enrollment.id, lesson_id=lesson_id,
+            )
+            if _merge(row, state):  # sans pk : le conflit porte sur (enrollment, lesson)
+                changed.append(LessonProgress(
+                    enrollment_id=row.enrollment_id, lesson_id=lesson_id, progress_percent=row.progress_percent,
+                    completed=row.completed, last_position_sec=row.last_position_sec,
+                    position_client_ts=row.position_client_ts,
+                ))
+        if changed:
+            LessonProgress.objects.bulk_create(
+                changed, update_conflicts=True, unique_fields=["enrollment", "lesson"],
+                update_fields=["progress_percent", "completed", "last_position_sec", "position_client_ts", "updated_at"],
+            )
+            transaction.on_commit(lambda: bump_learner(user.id))  # bulk_create : pas de signaux
+
+    delta = LessonProgress.objects.filter(enrollment__user=user)
+    since_at = decode_token(since)
+    if since_at is not None:
+        delta = delta.filter(updated_at__gt=since_at - SYNC_OVERLAP)
+    return {
+        "token": encode_token(now),
+        "applied": len(changed),
+        "rejected": rejected,
+        "progress": [
+            {"lesson_id": lid, "percent": pct, "position": pos, "completed": done,
+             "position_ts": ts.isoformat() if ts else None}
+            for lid, pct, pos, done, ts in delta.order_by("lesson_id").values_list(
+                "lesson_id", "progress_percent", "last_position_sec", "completed", "position_client_ts",
+            )
+        ],
+        "courses": course_totals({lesson_courses[lid]: enrollments[lesson_courses[lid]] for lid in accepted}),
+    }
@@ -7,8 +7,9 @@ python manage.py migrate --noinput
 echo "==> Collect static"
 python manage.py collectstatic --noinput
 
-echo "==> Start gunicorn"
-exec gunicorn best_epargne.wsgi:application \
+echo "==> Start gunicorn (ASGI / uvicorn workers)"
+exec gunicorn best_epargne.asgi:application \
+  -k uvicorn.workers.UvicornWorker \
   --bind 0.0.0.0:${APP_PORT:-8000} \
   --workers ${GUNICORN_WORKERS:-3} \
   --timeout ${GUNICORN_TIMEOUT:-120}
\ No newline at end of file
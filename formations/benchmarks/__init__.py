@@ -0,0 +1,6 @@
+"""
+Benchmarks des endpoints /api/ : nombre de requêtes SQL, temps DB, latence (p50/p95/p99)
+et taille des réponses, comparés aux budgets versionnés (budgets.json).
+
+Lancement : python manage.py run_api_benchmarks (cf. generate_test_data pour le jeu de données).
+"""
@@ -0,0 +1,94 @@
+"""
+Micro-benchmark des cartes de cours : chemin historique (instances + `_course_to_dict` /
+`PublicCourseSerializer`) contre les cartes compilées de best_epargne.apis.cards.
+
+Seule la sérialisation est chronométrée (lignes chargées une fois en amont) ; les deux
+sorties sont comparées après rendu JSON pour garantir un format identique.
+"""
+from __future__ import annotations
+
+import json
+import time
+
+from rest_framework.renderers import JSONRenderer
+
+from best_epargne.apis.cards import CARD_FIELDS, PUBLIC_CARD_FIELDS, course_cards, public_course_cards
+from best_epargne.apis.serializers import PublicCourseSerializer
+from best_epargne.apis.views import _course_to_dict
+from catalog.models import Course
+from reviews.services import rating_annotations
+
+
+def _best_of(fn, iterations: int, repeat: int) -> float:
+    """Meilleur temps (ms) par appel, façon timeit."""
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        per_call = (time.perf_counter() - t0) * 1000 / iterations
+        best = per_call if best is None else min(best, per_call)
+    return best
+
+
+def _rendered(data):
+    return json.loads(JSONRenderer().render(data))
+
+
+def _first_diff(old: list, new: list):
+    if len(old) != len(new):
+        return f"{len(old)} cartes vs {len(new)}"
+    for a, b in zip(old, new):
+        for key in a.keys() | b.keys():
+            if a.get(key) != b.get(key):
+                return f"course {a.get('id')} • {key}: {a.get(key)!r} != {b.get(key)!r}"
+        if list(a) != list(b):
+            return f"course {a.get('id')} • ordre des clés différent"
+    return None
+
+
+def run(cards: int = 50, iterations: int = 200, repeat: int = 5) -> dict:
+    qs = Course.objects.filter(status=Course.Status.PUBLISHED).order_by("-updated_at", "-id")
+    objects = list(qs.select_related("category", "instructor").annotate(**rating_annotations())[:cards])
+    if not objects:
+        raise LookupError("Aucun cours publié : lancer generate_test_data d'abord.")
+    ids = [c.id for c in objects]
+
+    rows = list(qs.filter(id__in=ids).values(*CARD_FIELDS, **rating_annotations()))
+    rows.sort(key=lambda r: ids.index(r["id"]))
+    public_rows = list(qs.filter(id__in=ids).values(*PUBLIC_CARD_FIELDS))
+    public_rows.sort(key=lambda r: ids.index(r["id"]))
+
+    # une carte sur deux "inscrite" pour couvrir continue_url / enrolled_at
+    enrolled = {c.id: c.updated_at for c in objects[::2]}
+
+    def learner_old():
+        return [
+            _course_to_dict(c, is_enrolled=c.id in enrolled, enrolled_at=enrolled.get(c.id))
+            for c in objects
+        ]
+
+    def learner_new():
+        return course_cards(rows, enrolled=enrolled)
+
+    def public_old():
+        return PublicCourseSerializer(objects, many=True).data
+
+    def public_new():
+        return public_course_cards(public_rows)
+
+    report = {"cards": len(objects), "iterations": iterations, "repeat": repeat, "results": []}
+    for name, old, new in (
+        ("learner (_course_to_dict)", learner_old, learner_new),
+        ("public (PublicCourseSerializer)", public_old, public_new),
+    ):
+        old_ms = _best_of(old, iterations, repeat)
+        new_ms = _best_of(new, iterations, repeat)
+        report["results"].append({
+            "name": name,
+            "old_ms": round(old_ms, 3),
+            "new_ms": round(new_ms, 3),
+            "speedup": round(old_ms / new_ms, 1) if new_ms else None,
+            "diff": _first_diff(_rendered(old()), _rendered(new())),
+        })
+    return report
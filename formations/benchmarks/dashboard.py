@@ -0,0 +1,84 @@
+"""
+Chargement du tableau de bord apprenant : 5 requêtes (me, kpis, enrollments, notifications,
+payments) contre l'agrégat /api/learner/dashboard/, à froid (sans cache) et à chaud.
+
+Chaque section de l'agrégat doit être identique (JSON) à la réponse de son endpoint.
+Les requêtes SQL comptées sont celles du thread de la requête : à froid, on les mesure
+avec LEARNER_DASHBOARD_WORKERS=0 pour avoir le total réel. Les threads ne servent qu'avec
+des connexions persistantes (CONN_MAX_AGE) ; sinon les deux mesures à froid sont identiques.
+"""
+from __future__ import annotations
+
+import statistics
+import time
+
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from best_epargne.apis.dashboard import SECTIONS
+
+from .runner import Fixtures
+
+NO_CACHE = {s: 0 for s in SECTIONS}
+
+
+def _load(client, urls: list) -> tuple:
+    """-> (ms, requêtes SQL, réponses JSON) pour une séquence de GET."""
+    with CaptureQueriesContext(connection) as cq:
+        t0 = time.perf_counter()
+        responses = [client.get(url) for url in urls]
+        ms = (time.perf_counter() - t0) * 1000
+    for url, response in zip(urls, responses):
+        if response.status_code != 200:
+            raise LookupError(f"GET {url} -> {response.status_code}")
+    return ms, len(cq.captured_queries), [r.json() for r in responses]
+
+
+def _median_ms(client, urls: list, iterations: int) -> float:
+    return statistics.median(_load(client, urls)[0] for _ in range(iterations))
+
+
+def run(iterations: int = 30, log=print) -> dict:
+    fixtures = Fixtures()
+    if fixtures.learner is None:
+        raise LookupError("Aucun apprenant : lancez generate_test_data.")
+
+    client = Client()
+    client.force_login(fixtures.learner)
+    section_urls = [reverse(f"api_learner_{s}") for s in SECTIONS]
+    dashboard_url = reverse("api_learner_dashboard")
+
+    with override_settings(ALLOWED_HOSTS=["*"]):
+        _, split_queries, split = _load(client, section_urls)
+        with override_settings(LEARNER_DASHBOARD_TTLS=NO_CACHE, LEARNER_DASHBOARD_WORKERS=0):
+            _, cold_queries, (aggregate,) = _load(client, [dashboard_url])
+        client.get(dashboard_url)  # remplit le cache
+        _, warm_queries, _ = _load(client, [dashboard_url])
+
+        diffs = [s for s, data in zip(SECTIONS, split) if aggregate.get(s) != data]
+
+        split_ms = _median_ms(client, section_urls, iterations)
+        with override_settings(LEARNER_DASHBOARD_TTLS=NO_CACHE, LEARNER_DASHBOARD_WORKERS=0):
+            sequential_ms = _median_ms(client, [dashboard_url], iterations)
+        with override_settings(LEARNER_DASHBOARD_TTLS=NO_CACHE):
+            cold_ms = _median_ms(client, [dashboard_url], iterations)
+        warm_ms = _median_ms(client, [dashboard_url], iterations)
+
+    report = {
+        "learner_id": fixtures.learner.id,
+        "iterations": iterations,
+        "results": [
+            {"name": "5 endpoints", "requests": len(section_urls), "ms": split_ms, "queries": split_queries},
+            {"name": "dashboard (froid, séquentiel)", "requests": 1, "ms": sequential_ms, "queries": cold_queries},
+            {"name": "dashboard (froid, threads)", "requests": 1, "ms": cold_ms, "queries": None},
+            {"name": "dashboard (cache)", "requests": 1, "ms": warm_ms, "queries": warm_queries},
+        ],
+        "mismatches": diffs,
+    }
+    for r in report["results"]:
+        r["ms"] = round(r["ms"], 2)
+        r["speedup"] = round(split_ms / r["ms"], 1) if r["ms"] else None
+    log(f"apprenant {fixtures.learner.id} : {len(SECTIONS)} sections")
+    return report
@@ -0,0 +1,89 @@
+"""
+Benchmark du rendu JSON : JSONRenderer DRF contre ORJSONRenderer sur les réponses réelles
+des routes GET de l'API (progression, sommaire, cartes, médias...).
+
+Les `response.data` sont capturées une fois via le client de test, puis seul le rendu est
+chronométré ; les octets produits par les deux renderers doivent être identiques.
+"""
+from __future__ import annotations
+
+import logging
+import time
+
+from django.test import Client
+from django.test.utils import override_settings
+from rest_framework.renderers import JSONRenderer
+
+from best_epargne.apis.renderers import ORJSONRenderer
+
+from .runner import Fixtures, iter_api_routes
+
+
+def collect_payloads(only=None, log=print) -> list:
+    """-> [(route, data)] pour chaque route GET qui répond 200 avec une Response DRF."""
+    fixtures = Fixtures()
+    payloads, clients = [], {}
+
+    request_logger = logging.getLogger("django.request")
+    previous_level = request_logger.level
+    request_logger.setLevel(logging.CRITICAL)
+    try:
+        with override_settings(ALLOWED_HOSTS=["*"]):
+            for route in iter_api_routes():
+                if only and not any(o in route.key or o in route.pattern for o in only):
+                    continue
+                user, url = fixtures.user_for(route), fixtures.url_for(route)
+                if user is None or url is None:
+                    continue
+                client = clients.get(user.pk)
+                if client is None:
+                    client = clients[user.pk] = Client(raise_request_exception=False)
+                    client.force_login(user)
+                response = client.get(url)
+                data = getattr(response, "data", None)
+                if response.status_code == 200 and data is not None and not response.streaming:
+                    payloads.append((route.key, data))
+    finally:
+        request_logger.setLevel(previous_level)
+    log(f"{len(payloads)} réponses capturées")
+    return payloads
+
+
+def _best_of(fn, iterations: int, repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        per_call = (time.perf_counter() - t0) * 1000 / iterations
+        best = per_call if best is None else min(best, per_call)
+    return best
+
+
+def run(iterations: int = 200, repeat: int = 5, only=None, log=print) -> dict:
+    drf, fast = JSONRenderer(), ORJSONRenderer()
+    results = []
+    for route, data in collect_payloads(only=only, log=log):
+        expected, actual = drf.render(data), fast.render(data)
+        old_ms = _best_of(lambda: drf.render(data), iterations, repeat)
+        new_ms = _best_of(lambda: fast.render(data), iterations, repeat)
+        results.append({
+            "route": route,
+            "bytes": len(expected),
+            "drf_ms": round(old_ms, 4),
+            "orjson_ms": round(new_ms, 4),
+            "speedup": round(old_ms / new_ms, 1) if new_ms else None,
+            "identical": expected == actual,
+        })
+
+    total_old = sum(r["drf_ms"] for r in results)
+    total_new = sum(r["orjson_ms"] for r in results)
+    return {
+        "iterations": iterations,
+        "repeat": repeat,
+        "results": results,
+        "total_drf_ms": round(total_old, 3),
+        "total_orjson_ms": round(total_new, 3),
+        "speedup": round(total_old / total_new, 1) if total_new else None,
+        "mismatches": [r["route"] for r in results if not r["identical"]],
+    }
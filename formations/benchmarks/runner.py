@@ -0,0 +1,372 @@
+"""
+Exécution des benchmarks : énumère les routes GET de best_epargne.apis.api_urls,
+résout leurs paramètres à partir du jeu de données présent en base, puis mesure
+chaque route via le client de test Django (session forcée, middlewares complets).
+"""
+from __future__ import annotations
+
+import json
+import logging
+import re
+import statistics
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import URLPattern, URLResolver, get_resolver
+
+from catalog.models import Category, Course, CourseSection, Lesson, MediaAsset
+from enrollments.models import Enrollment, LessonProgress
+from organizations.models import CompanyMember
+
+User = get_user_model()
+
+API_URLCONF = "best_epargne.apis.api_urls"
+API_PREFIX = "/api/"
+BUDGETS_PATH = Path(__file__).with_name("budgets.json")
+
+_ROUTE_PARAM = re.compile(r"<(?:(?P<conv>[^>:]+):)?(?P<name>[^>]+)>")
+_REGEX_PARAM = re.compile(r"\(\?P<(?P<name>\w+)>[^)]*\)")
+
+
+# ------------------------------------------------------------------
+# Routes
+# ------------------------------------------------------------------
+@dataclass
+class Route:
+    key: str          # nom d'URL, sinon motif normalisé
+    pattern: str      # ex: learner/courses/<course_id>/
+    params: list
+    callback: object = field(repr=False)
+
+
+def _pattern_str(p) -> str:
+    raw = str(p.pattern)
+    if raw.startswith("^") or raw.endswith("$"):
+        # RegexPattern (routeur DRF) -> forme <name>
+        raw = _REGEX_PARAM.sub(lambda m: f"<{m.group('name')}>", raw.lstrip("^").rstrip("$"))
+        raw = raw.replace("\\.", ".").replace("/?", "/")
+    return _ROUTE_PARAM.sub(lambda m: f"<{m.group('name')}>", raw)
+
+
+def _supports_get(callback) -> bool:
+    actions = getattr(callback, "actions", None)
+    if actions is not None:
+        return "get" in actions
+    view_class = getattr(callback, "view_class", None) or getattr(callback, "cls", None)
+    if view_class is not None:
+        return hasattr(view_class, "get")
+    return True  # vue fonction
+
+
+def iter_api_routes():
+    def walk(patterns, prefix):
+        for p in patterns:
+            if isinstance(p, URLResolver):
+                yield from walk(p.url_patterns, prefix + _pattern_str(p))
+            elif isinstance(p, URLPattern):
+                pattern = prefix + _pattern_str(p)
+                params = [m.group("name") for m in _ROUTE_PARAM.finditer(pattern)]
+                if "format" in params or not _supports_get(p.callback):
+                    continue  # suffixes .json du routeur / routes en écriture seule
+                yield Route(key=p.name or pattern, pattern=pattern, params=params, callback=p.callback)
+
+    seen = set()
+    for r in walk(get_resolver(API_URLCONF).url_patterns, ""):
+        if r.pattern not in seen:
+            seen.add(r.pattern)
+            yield r
+
+
+# ------------------------------------------------------------------
+# Jeu de données -> paramètres
+# ------------------------------------------------------------------
+class Fixtures:
+    """
+    Cas le plus chargé : le cours publié le plus suivi, son formateur
+    et l'apprenant inscrit qui a le plus d'inscriptions.
+    """
+
+    def __init__(self):
+        course = (
+            Course.objects.filter(status=Course.Status.PUBLISHED, sections__lessons__isnull=False)
+            .annotate(n=Count("enrollments", distinct=True))
+            .order_by("-n", "id")
+            .first()
+        )
+        if course is None:
+            raise LookupError("Aucun cours publié avec des leçons : lancez generate_test_data.")
+        self.course = course
+        self.instructor = course.instructor
+
+        enr = (
+            Enrollment.objects.filter(course=course)
+            .annotate(n=Count("user__enrollments"))
+            .select_related("user")
+            .order_by("-n", "id")
+            .first()
+        )
+        self.enrollment = enr
+        self.learner = enr.user if enr else User.objects.filter(role=User.Role.LEARNER).first()
+
+        self.section = CourseSection.objects.filter(course=course, lessons__isnull=False).order_by("rank", "id").first()
+        self.lesson = Lesson.objects.filter(section=self.section).order_by("rank", "id").first()
+        self.asset = (
+            Lesson.objects.filter(section__course=course, media_asset__isnull=False)
+            .values_list("media_asset_id", flat=True).first()
+        )
+        self.own_asset = MediaAsset.objects.filter(owner=self.instructor).values_list("id", flat=True).first()
+        self.progress_id = (
+            LessonProgress.objects.filter(enrollment=enr).values_list("id", flat=True).first() if enr else None
+        )
+        self.category_id = course.category_id or Category.objects.values_list("id", flat=True).first()
+        self.member = CompanyMember.objects.select_related("user").first()
+
+    def summary(self) -> dict:
+        return {
+            "course_id": self.course.id,
+            "course_enrollments": getattr(self.course, "n", None),
+            "sections": CourseSection.objects.filter(course=self.course).count(),
+            "lessons": Lesson.objects.filter(section__course=self.course).count(),
+            "learner_id": self.learner.id if self.learner else None,
+            "learner_enrollments": Enrollment.objects.filter(user=self.learner).count() if self.learner else 0,
+            "instructor_id": self.instructor.id,
+            "instructor_courses": Course.objects.filter(instructor=self.instructor).count(),
+        }
+
+    def user_for(self, route: Route):
+        if route.pattern.startswith(("instructor/", "media/", "apis/courses/my/")):
+            return self.instructor
+        if route.pattern.startswith("apis/company/"):
+            return self.member.user if self.member else None
+        return self.learner
+
+    def value(self, route: Route, name: str):
+        if name in ("course_id",):
+            return self.course.id
+        if name == "section_id":
+            return self.section.id if self.section else None
+        if name == "lesson_id":
+            return self.lesson.id if self.lesson else None
+        if name == "asset_id":
+            return self.own_asset if route.pattern.startswith("media/") else self.asset
+        if name == "pk":
+            base = route.pattern.split("<", 1)[0]
+            return {
+                "apis/courses/": self.course.id,
+                "apis/categories/": self.category_id,
+                "apis/enrollments/": self.enrollment.id if self.enrollment else None,
+                "apis/progress/": self.progress_id,
+                "apis/company/members/": self.member.id if self.member else None,
+            }.get(base, self.course.id)
+        return None
+
+    def url_for(self, route: Route):
+        url = route.pattern
+        for name in route.params:
+            v = self.value(route, name)
+            if v is None:
+                return None
+            url = url.replace(f"<{name}>", str(v))
+        return API_PREFIX + url
+
+
+# ------------------------------------------------------------------
+# Mesure
+# ------------------------------------------------------------------
+class QueryRecorder:
+    def __init__(self):
+        self.count = 0
+        self.time = 0.0
+        self.sql = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        t0 = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.time += time.perf_counter() - t0
+            self.count += 1
+            self.sql[sql] += 1
+
+
+def percentile(values, p: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    k = (len(ordered) - 1) * p / 100.0
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def load_budgets(path=None) -> dict:
+    with open(path or BUDGETS_PATH, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def budget_for(budgets: dict, key: str) -> dict:
+    return {**budgets.get("defaults", {}), **budgets.get("routes", {}).get(key, {})}
+
+
+def check_budget(result: dict, budget: dict) -> list:
+    violations = []
+    checks = (
+        ("max_queries", "queries"),
+        ("max_db_ms", "db_ms"),
+        ("p95_ms", "p95_ms"),
+        ("max_bytes", "bytes"),
+        ("max_repeated_sql", "repeated_sql"),
+        ("max_bytes_ratio", "bytes_ratio"),
+    )
+    for limit_key, metric in checks:
+        limit = budget.get(limit_key)
+        if limit is not None and metric in result and result[metric] > limit:
+            violations.append(f"{metric}={result[metric]} > {limit_key}={limit}")
+    if result["status"] >= 500:
+        violations.append(f"status={result['status']}")
+    return violations
+
+
+def measure(client: Client, url: str, iterations: int, warmup: int) -> dict:
+    for _ in range(warmup):
+        client.get(url)
+
+    latencies, db_times = [], []
+    last = None
+    for _ in range(iterations):
+        rec = QueryRecorder()
+        t0 = time.perf_counter()
+        with connection.execute_wrapper(rec):
+            response = client.get(url)
+            if response.streaming:
+                body = b""
+            else:
+                body = response.content
+        latencies.append((time.perf_counter() - t0) * 1000)
+        db_times.append(rec.time * 1000)
+        last = (response, body, rec)
+
+    response, body, rec = last
+    result = {
+        "status": response.status_code,
+        "queries": rec.count,
+        "repeated_sql": max(rec.sql.values(), default=0),
+        "db_ms": round(statistics.median(db_times), 2),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "bytes": len(body),
+    }
+    if response.streaming:
+        return result
+
+    # taille sur le réseau (gzip/brotli négocié)
+    wire = client.get(url, HTTP_ACCEPT_ENCODING="br, gzip")
+    result["wire_bytes"] = len(wire.content)
+    result["encoding"] = wire.get("Content-Encoding")
+
+    # revalidation : If-None-Match -> 304 attendu, sans travail DB métier
+    etag = response.get("ETag")
+    if etag:
+        rec = QueryRecorder()
+        t0 = time.perf_counter()
+        with connection.execute_wrapper(rec):
+            revalidated = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        result["revalidate"] = {
+            "status": revalidated.status_code,
+            "queries": rec.count,
+            "ms": round((time.perf_counter() - t0) * 1000, 2),
+        }
+    return result
+
+
+def _with_query(url: str, query: str) -> str:
+    return f"{url}{'&' if '?' in url else '?'}{query}"
+
+
+def _targets(budgets: dict, fixtures: Fixtures, log):
+    """
+    -> (clé, url, utilisateur) : routes GET de l'API, routes hors /api/ déclarées dans
+    "extra_routes", puis leurs variantes de paramètres ("variants", ex: view=card).
+    """
+    skip = set(budgets.get("skip", []))
+    variants = budgets.get("variants", {})
+
+    base = []
+    for route in iter_api_routes():
+        if route.key in skip:
+            continue
+        user = fixtures.user_for(route)
+        url = fixtures.url_for(route)
+        if user is None or url is None:
+            log(f"⚠️  {route.key}: paramètres introuvables dans le jeu de données, ignorée")
+            continue
+        base.append((route.key, route.pattern, url, user))
+    for key, url in budgets.get("extra_routes", {}).items():
+        base.append((key, url, url, fixtures.learner))
+
+    for key, pattern, url, user in base:
+        yield key, pattern, url, user, None
+        for query in variants.get(key, []):
+            yield f"{key}?{query}", pattern, _with_query(url, query), user, key
+
+
+def run(budgets: dict, iterations: int = 20, warmup: int = 2, only=None, log=print) -> dict:
+    fixtures = Fixtures()
+    results = []
+    base_bytes = {}
+
+    # les 4xx/5xx attendus sont reportés dans le JSON, pas dans les logs
+    request_logger = logging.getLogger("django.request")
+    previous_level = request_logger.level
+    request_logger.setLevel(logging.CRITICAL)
+
+    try:
+        with override_settings(ALLOWED_HOSTS=["*"]):
+            clients = {}
+            for key, pattern, url, user, parent in _targets(budgets, fixtures, log):
+                if only and not any(o in key or o in pattern for o in only):
+                    continue
+
+                client = clients.get(user.pk)
+                if client is None:
+                    client = clients[user.pk] = Client(raise_request_exception=False)
+                    client.force_login(user)
+
+                result = {"route": key, "url": url, "method": "GET", **measure(client, url, iterations, warmup)}
+                if parent is None:
+                    base_bytes[key] = result["bytes"]
+                elif base_bytes.get(parent):
+                    # taille relative à la réponse complète (sparse fieldsets)
+                    result["bytes_ratio"] = round(result["bytes"] / base_bytes[parent], 3)
+                budget = {**budget_for(budgets, parent), **budgets.get("routes", {}).get(key, {})} if parent \
+                    else budget_for(budgets, key)
+                result["budget"] = budget
+                result["violations"] = check_budget(result, budget)
+                results.append(result)
+
+                flag = "❌" if result["violations"] else "✅"
+                ratio = f" ({result['bytes_ratio']:.0%})" if "bytes_ratio" in result else ""
+                wire = f" {result['encoding']}={result['wire_bytes']}B" if result.get("encoding") else ""
+                reval = f" 304:q={result['revalidate']['queries']}" if result.get("revalidate", {}).get(
+                    "status") == 304 else ""
+                log(f"{flag} {key:<45} {result['status']} q={result['queries']:<4} "
+                    f"db={result['db_ms']:>7}ms p95={result['p95_ms']:>7}ms {result['bytes']}B{ratio}{wire}{reval}")
+    finally:
+        request_logger.setLevel(previous_level)
+
+    return {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "database": connection.vendor,
+        "iterations": iterations,
+        "warmup": warmup,
+        "fixtures": fixtures.summary(),
+        "results": results,
+        "failures": sum(1 for r in results if r["violations"]),
+    }
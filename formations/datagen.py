@@ -0,0 +1,508 @@
+"""
+Générateur de jeux de données synthétiques (benchmarks / tests de charge).
+
+- popularité des cours en loi de Zipf (quelques best-sellers, longue traîne)
+- insertions en masse : bulk_create par lots, COPY (PostgreSQL) pour LessonProgress
+- apprenants traités par blocs, en parallèle (multiprocessing, fork)
+- déterministe pour un --seed donné : chaque bloc a son propre RNG dérivé du seed
+"""
+from __future__ import annotations
+
+import bisect
+import csv
+import io
+import random
+from dataclasses import dataclass, replace
+from datetime import timedelta
+from decimal import Decimal
+from multiprocessing import get_context
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, connections, transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+from assessments.models import Choice, Question, Quiz
+from catalog.models import Category, Course, CourseSection, Lesson, MediaAsset, Notification, Payment
+from catalog.ranking import spread
+from commerce.models import Order, OrderItem, PaymentTransaction
+from compte.models import InstructorProfile
+from enrollments.models import Enrollment, LessonProgress
+from organizations.models import Company, CompanyMember
+from reviews.models import Review
+
+User = get_user_model()
+
+BATCH = 5000
+COPY_FLUSH_ROWS = 100_000
+
+FIRST_NAMES = ["Awa", "Koffi", "Serge", "Fatou", "Jean", "Mariam", "Yao", "Nadia", "Ismael", "Ruth",
+               "Adjoua", "Moussa", "Aya", "Kouadio", "Salimata", "Didier", "Aminata", "Franck", "Mireille", "Bakary"]
+LAST_NAMES = ["Koné", "Traoré", "Kouassi", "Diabaté", "Ouattara", "N'Guessan", "Diallo", "Touré", "Yapi", "Doumbia",
+              "Bamba", "Coulibaly", "Konan", "Kacou", "Soro", "Cissé", "Aka", "Gbagbo", "Brou", "Fofana"]
+COURSE_TITLES = [
+    "Budget personnel & épargne",
+    "Gestion financière pour entrepreneurs",
+    "Comptabilité simplifiée",
+    "Investissement & diversification",
+    "Finance d’entreprise - fondamentaux",
+    "Conformité & procédures internes",
+    "Analyse financière - ratios clés",
+    "Planification retraite",
+    "Trésorerie & cashflow",
+    "Introduction aux marchés financiers",
+]
+REAL_CATEGORIES = [
+    "Épargne & finances personnelles",
+    "Investissement",
+    "Entrepreneuriat",
+    "Comptabilité",
+    "Gestion de trésorerie",
+    "Fiscalité ivoirienne",
+    "Gestion de patrimoine",
+    "Marchés financiers",
+    "Conformité d’entreprise",
+    "Finance pour PME",
+    "Microfinance",
+    "Assurances",
+    "Retraite & prévoyance",
+    "Éducation bancaire",
+    "Gestion budgétaire",
+    "Analyse des coûts",
+    "Finance publique",
+    "Audit interne",
+    "Leadership financier",
+    "Digitalisation des finances",
+]
+CONTENT_TYPES = {"video": "video/mp4", "audio": "audio/mpeg", "doc": "application/pdf"}
+PROVIDERS = ["CinetPay", "OrangeMoney", "MTNMoney", "MoovMoney"]
+REVIEW_COMMENTS = [
+    "Très clair, exemples concrets.",
+    "Bon cours mais un peu rapide sur la fin.",
+    "Excellent formateur, je recommande.",
+    "Contenu utile pour mon activité.",
+    "Les quiz aident vraiment à retenir.",
+    "Trop théorique à mon goût.",
+    "",
+]
+
+
+@dataclass(frozen=True)
+class Profile:
+    learners: int
+    instructors: int
+    courses: int
+    companies: int
+    sections: tuple = (3, 6)
+    lessons_per_section: tuple = (2, 5)
+    enrollments_per_learner: float = 3.0
+    review_rate: float = 0.15
+    order_rate: float = 0.5
+    notifications_per_learner: float = 2.0
+    company_member_rate: float = 0.05
+    quiz_rate: float = 0.5
+    zipf_s: float = 1.07
+
+
+PROFILES = {
+    "small": Profile(learners=2_000, instructors=40, courses=150, companies=5),
+    "medium": Profile(learners=100_000, instructors=800, courses=4_000, companies=50,
+                      sections=(4, 8), lessons_per_section=(3, 6), enrollments_per_learner=4.0),
+    # ≈ 5M inscriptions, ≈ 50M+ lignes LessonProgress
+    "prod": Profile(learners=1_000_000, instructors=5_000, courses=20_000, companies=300,
+                    sections=(5, 10), lessons_per_section=(3, 7), enrollments_per_learner=5.0,
+                    review_rate=0.08, order_rate=0.35, notifications_per_learner=3.0),
+}
+
+
+def build_profile(name: str, **overrides) -> Profile:
+    return replace(PROFILES[name], **{k: v for k, v in overrides.items() if v is not None})
+
+
+def rng_for(seed: int, *parts) -> random.Random:
+    # graine str -> hash sha512 stable (indépendant de PYTHONHASHSEED)
+    return random.Random(":".join(str(p) for p in (seed, *parts)))
+
+
+class ZipfSampler:
+    """
+    Tirage pondéré 1/rang^s sur une permutation (déterministe) des éléments.
+    """
+
+    def __init__(self, items, s: float, rng: random.Random):
+        self.items = list(items)
+        rng.shuffle(self.items)
+        self.cum = []
+        acc = 0.0
+        for rank in range(1, len(self.items) + 1):
+            acc += 1.0 / rank ** s
+            self.cum.append(acc)
+        self.total = acc
+
+    def sample(self, rng: random.Random):
+        return self.items[bisect.bisect_left(self.cum, rng.random() * self.total)]
+
+    def sample_distinct(self, rng: random.Random, k: int) -> list:
+        k = min(k, len(self.items))
+        out, seen = [], set()
+        for _ in range(k * 10):
+            if len(out) >= k:
+                break
+            it = self.sample(rng)
+            if it not in seen:
+                seen.add(it)
+                out.append(it)
+        return out
+
+
+def copy_rows(model, columns, rows) -> int:
+    """
+    COPY ... FROM STDIN (PostgreSQL) ; repli bulk_create sur les autres moteurs.
+    """
+    if not rows:
+        return 0
+    if connection.vendor != "postgresql":
+        model.objects.bulk_create([model(**dict(zip(columns, r))) for r in rows], batch_size=BATCH)
+        return len(rows)
+
+    buf = io.StringIO()
+    csv.writer(buf).writerows(rows)
+    buf.seek(0)
+    with connection.cursor() as cur:
+        cur.copy_expert(
+            f'COPY {model._meta.db_table} ({", ".join(columns)}) FROM STDIN WITH (FORMAT csv)', buf
+        )
+    return len(rows)
+
+
+def _full_name(rng):
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def _phone(rng):
+    return "07" + "".join(str(rng.randint(0, 9)) for _ in range(8))
+
+
+def learner_email(seed: int, i: int) -> str:
+    return f"learner{i}.s{seed}@gen.bestep.test"
+
+
+# État partagé avec les workers (hérité par fork, copy-on-write)
+_CTX: dict = {}
+
+
+# ------------------------------------------------------------------
+# Phase 1 : catalogue (processus principal)
+# ------------------------------------------------------------------
+@transaction.atomic
+def generate_catalog(profile: Profile, seed: int, password_hash: str, log=print) -> dict:
+    rng = rng_for(seed, "catalog")
+    now = timezone.now()
+
+    categories = []
+    for name in REAL_CATEGORIES:
+        cat, _ = Category.objects.get_or_create(name=name, defaults={"slug": slugify(name)[:140]})
+        categories.append(cat)
+
+    instructors = User.objects.bulk_create([
+        User(email=f"instructor{i}.s{seed}@gen.bestep.test", full_name=_full_name(rng), phone=_phone(rng),
+             role=User.Role.INSTRUCTOR, password=password_hash, is_active=True,
+             created_at=now - timedelta(days=rng.randint(200, 900)))
+        for i in range(profile.instructors)
+    ], batch_size=BATCH)
+    InstructorProfile.objects.bulk_create([
+        InstructorProfile(user_id=u.id, headline="Formateur certifié", is_verified=rng.random() < 0.8,
+                          payout_percent=Decimal(rng.choice(["60.00", "70.00", "75.00", "80.00"])))
+        for u in instructors
+    ], batch_size=BATCH)
+    log(f"✅ Formateurs: {len(instructors)}")
+
+    companies = Company.objects.bulk_create([
+        Company(name=f"Entreprise {seed}-{i}", slug=f"entreprise-{seed}-{i}", email=f"rh{i}.s{seed}@gen.bestep.test")
+        for i in range(profile.companies)
+    ], batch_size=BATCH)
+
+    assets = MediaAsset.objects.bulk_create([
+        MediaAsset(
+            owner_id=rng.choice(instructors).id,
+            kind=kind,
+            title=f"{kind.upper()} Asset {i + 1}",
+            object_key=f"gen/s{seed}/{kind}/{i}",
+            content_type=CONTENT_TYPES[kind],
+            size=rng.randint(50_000, 50_000_000),
+            duration_seconds=rng.randint(30, 3600) if kind == MediaAsset.Kind.VIDEO else None,
+        )
+        for i, kind in enumerate(rng.choice(MediaAsset.Kind.values) for _ in range(profile.courses * 2))
+    ], batch_size=BATCH)
+    log(f"✅ MediaAssets: {len(assets)}")
+
+    courses = []
+    for i in range(profile.courses):
+        title = f"{rng.choice(COURSE_TITLES)} ({i + 1})"
+        pricing = rng.choices(Course.PricingType.values, weights=[3, 6, 1])[0]
+        company = rng.choice(companies) if companies and rng.random() < 0.03 else None
+        created = now - timedelta(days=rng.randint(30, 720))
+        status = Course.Status.PUBLISHED if rng.random() < 0.9 else rng.choice(
+            [Course.Status.DRAFT, Course.Status.REVIEW, Course.Status.ARCHIVED])
+        courses.append(Course(
+            title=title,
+            slug=f"{slugify(title)[:180]}-s{seed}-{i}",
+            subtitle="Formation pratique + cas réels",
+            description="Contenu de démonstration généré automatiquement. " * rng.randint(5, 40),
+            category=rng.choice(categories),
+            instructor_id=rng.choice(instructors).id,
+            course_type=rng.choice(Course.CourseType.values),
+            pricing_type=pricing,
+            price=Decimal(0) if pricing == Course.PricingType.FREE else Decimal(rng.randint(10, 300) * 500),
+            currency="XOF",
+            status=status,
+            published_at=created + timedelta(days=rng.randint(0, 20)) if status == Course.Status.PUBLISHED else None,
+            company_only=company is not None,
+            company=company,
+            created_at=created,
+        ))
+    courses = Course.objects.bulk_create(courses, batch_size=BATCH)
+    log(f"✅ Cours: {len(courses)}")
+
+    sections = []
+    for c in courses:
+        n = rng.randint(*profile.sections)
+        for j, rank in enumerate(spread(n)):
+            sections.append(CourseSection(course_id=c.id, title=f"Section {j + 1}", order=j + 1, rank=rank))
+    sections = CourseSection.objects.bulk_create(sections, batch_size=BATCH)
+    log(f"✅ Sections: {len(sections)}")
+
+    lessons = []
+    for s in sections:
+        for k, rank in enumerate(spread(rng.randint(*profile.lessons_per_section))):
+            lt = rng.choices(Lesson.LessonType.values, weights=[6, 2, 1, 1, 0])[0]
+            lessons.append(Lesson(
+                section_id=s.id,
+                title=f"Leçon {s.order}.{k + 1}",
+                order=k + 1,
+                rank=rank,
+                lesson_type=lt,
+                is_preview=(s.order == 1 and k == 0),
+                duration_sec=rng.randint(60, 1800),
+                content="Contenu texte de la leçon. " * rng.randint(5, 60) if lt == Lesson.LessonType.TEXT else "",
+                media_asset_id=rng.choice(assets).id if lt in (Lesson.LessonType.VIDEO, Lesson.LessonType.FILE) else None,
+            ))
+    lessons = Lesson.objects.bulk_create(lessons, batch_size=BATCH)
+    log(f"✅ Leçons: {len(lessons)}")
+
+    # ordre de lecture (sections puis leçons) : c'est l'ordre de création
+    section_course = {s.id: s.course_id for s in sections}
+    course_lessons = {c.id: [] for c in courses}
+    for lesson in lessons:
+        course_lessons[section_course[lesson.section_id]].append((lesson.id, lesson.duration_sec))
+
+    quizzes = Quiz.objects.bulk_create([
+        Quiz(title=f"Évaluation finale — {c.title}", course_id=c.id, passing_score=70, max_attempts=3)
+        for c in courses if rng.random() < profile.quiz_rate
+    ], batch_size=BATCH)
+    questions = Question.objects.bulk_create([
+        Question(quiz_id=q.id, prompt=f"Question {n + 1} ?", order=n + 1) for q in quizzes for n in range(5)
+    ], batch_size=BATCH)
+    Choice.objects.bulk_create([
+        Choice(question_id=q.id, text=f"Réponse {n + 1}", is_correct=(n == 0)) for q in questions for n in range(4)
+    ], batch_size=BATCH)
+    log(f"✅ Quiz: {len(quizzes)} ({len(questions)} questions)")
+
+    published = [c for c in courses if c.status == Course.Status.PUBLISHED and not c.company_only]
+    return {
+        "course_lessons": course_lessons,
+        "course_meta": {c.id: (c.pricing_type, c.price, c.currency) for c in courses},
+        "published_ids": [c.id for c in published],
+        "company_ids": [c.id for c in companies],
+    }
+
+
+# ------------------------------------------------------------------
+# Phase 2 : apprenants (blocs parallèles)
+# ------------------------------------------------------------------
+def _chunk_worker(job):
+    idx, start, stop = job
+    return generate_learner_chunk(idx, start, stop)
+
+
+def generate_learner_chunk(idx: int, start: int, stop: int) -> dict:
+    ctx = _CTX
+    profile, seed, now = ctx["profile"], ctx["seed"], ctx["now"]
+    sampler, course_lessons, course_meta = ctx["sampler"], ctx["course_lessons"], ctx["course_meta"]
+    rng = rng_for(seed, "learners", idx)
+    counts = dict.fromkeys(["learners", "enrollments", "progress", "reviews", "orders", "notifications"], 0)
+
+    with transaction.atomic():
+        users = User.objects.bulk_create([
+            User(email=learner_email(seed, i), full_name=_full_name(rng), phone=_phone(rng),
+                 role=User.Role.LEARNER, password=ctx["password_hash"], is_active=True,
+                 created_at=now - timedelta(seconds=rng.randint(0, 730 * 86400)))
+            for i in range(start, stop)
+        ], batch_size=BATCH)
+        counts["learners"] = len(users)
+
+        if ctx["company_ids"]:
+            CompanyMember.objects.bulk_create([
+                CompanyMember(company_id=rng.choice(ctx["company_ids"]), user_id=u.id)
+                for u in users if rng.random() < profile.company_member_rate
+            ], batch_size=BATCH, ignore_conflicts=True)
+
+        # --- plan des inscriptions (statut connu avant insertion)
+        plans = []
+        for u in users:
+            n = 1 + int(rng.expovariate(1.0 / max(profile.enrollments_per_learner - 1, 0.1)))
+            for course_id in sampler.sample_distinct(rng, n):
+                lessons = course_lessons.get(course_id) or []
+                enrolled_at = now - timedelta(seconds=rng.randint(3600, 365 * 86400))
+                done = int(rng.betavariate(0.6, 1.2) * (len(lessons) + 1))
+                done = min(done, len(lessons))
+                completed = bool(lessons) and done == len(lessons)
+                plans.append((u.id, course_id, enrolled_at, done, completed))
+
+        enrollments = Enrollment.objects.bulk_create([
+            Enrollment(
+                user_id=uid, course_id=cid, source=Enrollment.Source.B2C, enrolled_at=at,
+                status=Enrollment.Status.COMPLETED if completed else Enrollment.Status.ACTIVE,
+                completed_at=at + timedelta(days=rng.randint(1, 60)) if completed else None,
+            )
+            for uid, cid, at, done, completed in plans
+        ], batch_size=BATCH)
+        counts["enrollments"] = len(enrollments)
+
+        # --- progression (COPY par paquets)
+        columns = ["enrollment_id", "lesson_id", "progress_percent", "last_position_sec", "completed", "updated_at"]
+        rows = []
+        for e, (uid, cid, at, done, completed) in zip(enrollments, plans):
+            lessons = course_lessons.get(cid) or []
+            t = at
+            for pos, (lesson_id, duration) in enumerate(lessons[:done + 1]):
+                t = t + timedelta(minutes=rng.randint(5, 600))
+                if pos < done:
+                    rows.append((e.id, lesson_id, 100, duration, True, t.isoformat()))
+                else:
+                    pct = rng.randint(1, 99)
+                    rows.append((e.id, lesson_id, pct, duration * pct // 100, False, t.isoformat()))
+            if len(rows) >= COPY_FLUSH_ROWS:
+                counts["progress"] += copy_rows(LessonProgress, columns, rows)
+                rows = []
+        counts["progress"] += copy_rows(LessonProgress, columns, rows)
+
+        # --- avis (apprenants avancés uniquement)
+        reviews = []
+        for uid, cid, at, done, completed in plans:
+            lessons = course_lessons.get(cid) or []
+            if lessons and done >= len(lessons) // 3 and rng.random() < profile.review_rate:
+                reviews.append(Review(
+                    course_id=cid, user_id=uid,
+                    rating=rng.choices([1, 2, 3, 4, 5], weights=[3, 4, 10, 30, 53])[0],
+                    comment=rng.choice(REVIEW_COMMENTS),
+                    created_at=at + timedelta(days=rng.randint(1, 90)),
+                ))
+        Review.objects.bulk_create(reviews, batch_size=BATCH, ignore_conflicts=True)
+        counts["reviews"] = len(reviews)
+
+        # --- commandes / transactions / paiements (cours payants)
+        purchases = []
+        for uid, cid, at, done, completed in plans:
+            pricing, price, currency = course_meta[cid]
+            if pricing != Course.PricingType.FREE and price and rng.random() < profile.order_rate:
+                paid = rng.random() < 0.93
+                purchases.append((uid, cid, at, price, currency, paid))
+
+        orders = Order.objects.bulk_create([
+            Order(user_id=uid, status=Order.Status.PAID if paid else Order.Status.PENDING, currency=currency,
+                  subtotal=price, total=price, created_at=at - timedelta(minutes=5), paid_at=at if paid else None)
+            for uid, cid, at, price, currency, paid in purchases
+        ], batch_size=BATCH)
+        OrderItem.objects.bulk_create([
+            OrderItem(order_id=o.id, item_type=OrderItem.ItemType.COURSE, course_id=cid, unit_price=price,
+                      line_total=price)
+            for o, (uid, cid, at, price, currency, paid) in zip(orders, purchases)
+        ], batch_size=BATCH)
+        refs = [f"TX-{seed}-{idx}-{n}" for n in range(len(orders))]
+        PaymentTransaction.objects.bulk_create([
+            PaymentTransaction(
+                order_id=o.id, provider=rng.choice(PROVIDERS), reference=ref,
+                status=PaymentTransaction.Status.SUCCESS if paid else PaymentTransaction.Status.FAILED,
+                amount=price, currency=currency, created_at=at,
+            )
+            for o, ref, (uid, cid, at, price, currency, paid) in zip(orders, refs, purchases)
+        ], batch_size=BATCH)
+        Payment.objects.bulk_create([
+            Payment(
+                user_id=uid, course_id=cid, kind=Payment.Kind.COURSE,
+                status=Payment.Status.PAID if paid else Payment.Status.FAILED,
+                reference=f"PAY-{seed}-{idx}-{n}", provider=rng.choice(PROVIDERS), provider_ref=ref,
+                amount=price, currency=currency, description="Achat du cours", meta={"seed": seed},
+                paid_at=at if paid else None,
+            )
+            for n, (ref, (uid, cid, at, price, currency, paid)) in enumerate(zip(refs, purchases))
+        ], batch_size=BATCH)
+        counts["orders"] = len(orders)
+
+        # --- notifications
+        notifications = []
+        for u in users:
+            for k in range(int(rng.expovariate(1.0 / max(profile.notifications_per_learner, 0.1)))):
+                notifications.append(Notification(
+                    user_id=u.id, title=f"Notification #{k + 1}",
+                    body="Ceci est une notification de test générée automatiquement.",
+                    level=rng.choice(Notification.Level.values), is_read=rng.random() < 0.6,
+                    action_url=rng.choice(["", "/dashboard/learner/", "/dashboard/learner/explore/"]),
+                ))
+        Notification.objects.bulk_create(notifications, batch_size=BATCH)
+        counts["notifications"] = len(notifications)
+
+    return counts
+
+
+def generate_learners(profile: Profile, seed: int, catalog: dict, password_hash: str,
+                      workers: int = 1, chunk_size: int = 2000, log=print) -> dict:
+    sampler_rng = rng_for(seed, "popularity")
+    _CTX.update({
+        "profile": profile,
+        "seed": seed,
+        "now": timezone.now(),
+        "password_hash": password_hash,
+        "sampler": ZipfSampler(catalog["published_ids"], profile.zipf_s, sampler_rng),
+        "course_lessons": catalog["course_lessons"],
+        "course_meta": catalog["course_meta"],
+        "company_ids": catalog["company_ids"],
+    })
+
+    jobs = [(idx, start, min(start + chunk_size, profile.learners))
+            for idx, start in enumerate(range(0, profile.learners, chunk_size))]
+    totals = {}
+
+    def _add(counts):
+        for k, v in counts.items():
+            totals[k] = totals.get(k, 0) + v
+
+    if workers <= 1:
+        for job in jobs:
+            _add(generate_learner_chunk(*job))
+            log(f"   … bloc {job[0] + 1}/{len(jobs)}")
+        return totals
+
+    # ✅ jamais de connexion DB partagée entre processus : les workers ouvrent la leur
+    connections.close_all()
+    with get_context("fork").Pool(processes=workers) as pool:
+        for n, counts in enumerate(pool.imap_unordered(_chunk_worker, jobs), start=1):
+            _add(counts)
+            log(f"   … bloc {n}/{len(jobs)}")
+    return totals
+
+
+def analyze_tables() -> None:
+    if connection.vendor != "postgresql":
+        return
+    with connection.cursor() as cur:
+        for model in (User, Course, CourseSection, Lesson, Enrollment, LessonProgress, Review, Order, OrderItem,
+                      PaymentTransaction, Payment, Notification):
+            cur.execute(f"ANALYZE {model._meta.db_table}")
+
+
+def default_password_hash() -> str:
+    # un seul hachage (coûteux) réutilisé pour tous les comptes générés
+    return make_password("Test@12345")
@@ -0,0 +1,51 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from formations.benchmarks.cards import run
+
+
+class Command(BaseCommand):
+    help = (
+        "Micro-benchmark de la sérialisation des cartes de cours (page de 50 cartes) : "
+        "_course_to_dict / PublicCourseSerializer contre best_epargne.apis.cards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--cards", type=int, default=50)
+        parser.add_argument("--iterations", type=int, default=200)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--min-speedup", type=float, default=5.0,
+                            help="Échec si le gain est inférieur (0 = pas de seuil)")
+        parser.add_argument("--json", action="store_true", help="Rapport JSON sur stdout")
+
+    def handle(self, *args, **options):
+        try:
+            report = run(
+                cards=max(1, options["cards"]),
+                iterations=max(1, options["iterations"]),
+                repeat=max(1, options["repeat"]),
+            )
+        except LookupError as exc:
+            raise CommandError(str(exc))
+
+        if options["json"]:
+            sys.stdout.write(json.dumps(report, ensure_ascii=False, indent=2) + "\n")
+        else:
+            for r in report["results"]:
+                self.stdout.write(
+                    f"{r['name']:<34} {r['old_ms']:>9.3f} ms -> {r['new_ms']:>8.3f} ms  "
+                    f"x{r['speedup']}  ({report['cards']} cartes)"
+                )
+
+        errors = [f"{r['name']}: sortie différente ({r['diff']})" for r in report["results"] if r["diff"]]
+        min_speedup = options["min_speedup"]
+        if min_speedup:
+            errors += [
+                f"{r['name']}: gain x{r['speedup']} < x{min_speedup}"
+                for r in report["results"] if (r["speedup"] or 0) < min_speedup
+            ]
+        if errors:
+            raise CommandError("\n".join(errors))
+        self.stdout.write(self.style.SUCCESS("✅ Cartes identiques, gain conforme."))
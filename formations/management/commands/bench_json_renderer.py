@@ -0,0 +1,47 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from formations.benchmarks.renderers import run
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark du rendu JSON (JSONRenderer DRF vs ORJSONRenderer) sur les réponses réelles "
+        "des routes GET /api/. Échec si les octets produits diffèrent."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=200)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--only", action="append", help="Filtre sur le nom/motif de route (répétable)")
+        parser.add_argument("--json", action="store_true", help="Rapport JSON sur stdout")
+
+    def handle(self, *args, **options):
+        log = self.stderr.write if options["json"] else self.stdout.write
+        try:
+            report = run(
+                iterations=max(1, options["iterations"]),
+                repeat=max(1, options["repeat"]),
+                only=options["only"],
+                log=log,
+            )
+        except LookupError as exc:
+            raise CommandError(str(exc))
+
+        if options["json"]:
+            sys.stdout.write(json.dumps(report, ensure_ascii=False, indent=2) + "\n")
+        else:
+            for r in sorted(report["results"], key=lambda r: r["bytes"], reverse=True):
+                flag = "✅" if r["identical"] else "❌"
+                self.stdout.write(
+                    f"{flag} {r['route']:<45} {r['bytes']:>8}B  {r['drf_ms']:>8.3f} ms -> "
+                    f"{r['orjson_ms']:>7.3f} ms  x{r['speedup']}"
+                )
+            self.stdout.write(
+                f"Total : {report['total_drf_ms']} ms -> {report['total_orjson_ms']} ms (x{report['speedup']})"
+            )
+
+        if report["mismatches"]:
+            raise CommandError(f"Sortie différente pour : {', '.join(report['mismatches'])}")
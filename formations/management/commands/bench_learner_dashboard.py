@@ -0,0 +1,44 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from formations.benchmarks.dashboard import run
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark du chargement du tableau de bord apprenant : 5 endpoints contre "
+        "/api/learner/dashboard/ (froid / cache). Échec si une section diffère."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=30)
+        parser.add_argument("--min-speedup", type=float, default=1.5,
+                            help="Gain minimal de l'agrégat à froid (0 = pas de seuil)")
+        parser.add_argument("--json", action="store_true", help="Rapport JSON sur stdout")
+
+    def handle(self, *args, **options):
+        log = self.stderr.write if options["json"] else self.stdout.write
+        try:
+            report = run(iterations=max(1, options["iterations"]), log=log)
+        except LookupError as exc:
+            raise CommandError(str(exc))
+
+        if options["json"]:
+            sys.stdout.write(json.dumps(report, ensure_ascii=False, indent=2) + "\n")
+        else:
+            for r in report["results"]:
+                queries = "-" if r["queries"] is None else r["queries"]
+                self.stdout.write(
+                    f"{r['name']:<32} {r['requests']} req  q={queries:<4} {r['ms']:>8.2f} ms  x{r['speedup']}"
+                )
+
+        errors = [f"Section différente : {s}" for s in report["mismatches"]]
+        min_speedup = options["min_speedup"]
+        cold = report["results"][1]
+        if min_speedup and (cold["speedup"] or 0) < min_speedup:
+            errors.append(f"dashboard à froid : gain x{cold['speedup']} < x{min_speedup}")
+        if errors:
+            raise CommandError("\n".join(errors))
+        self.stdout.write(self.style.SUCCESS("✅ Sections identiques, gain conforme."))
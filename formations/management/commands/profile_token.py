@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from best_epargne.metrics.profiling import HEADER, make_token
+
+
+class Command(BaseCommand):
+    help = "Génère un jeton signé pour profiler des requêtes (en-tête X-Profile-Token)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--issued-by", default="admin")
+
+    def handle(self, *args, **options):
+        token = make_token(options["issued_by"])
+        max_age = getattr(settings, "PROFILING_TOKEN_MAX_AGE", 3600)
+        self.stdout.write(token)
+        self.stderr.write(f"Valide {max_age}s. Exemple : curl -H '{HEADER}: {token}' https://…/api/learner/courses/")
@@ -0,0 +1,45 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from formations.benchmarks.runner import BUDGETS_PATH, load_budgets, run
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks des routes GET /api/ (requêtes SQL, temps DB, latence p50/p95/p99, octets) "
+        "comparés à formations/benchmarks/budgets.json. Code retour non nul si un budget est dépassé."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument("--warmup", type=int, default=2)
+        parser.add_argument("--budgets", default=str(BUDGETS_PATH))
+        parser.add_argument("--output", "-o", help="Fichier JSON de résultats ('-' = stdout)")
+        parser.add_argument("--only", action="append", help="Filtre sur le nom/motif de route (répétable)")
+        parser.add_argument("--no-fail", action="store_true", help="Ne pas échouer sur dépassement de budget")
+
+    def handle(self, *args, **options):
+        budgets = load_budgets(options["budgets"])
+        try:
+            report = run(
+                budgets,
+                iterations=max(1, options["iterations"]),
+                warmup=max(0, options["warmup"]),
+                only=options["only"],
+                log=self.stderr.write if options["output"] == "-" else self.stdout.write,
+            )
+        except LookupError as exc:
+            raise CommandError(str(exc))
+
+        payload = json.dumps(report, ensure_ascii=False, indent=2)
+        if options["output"] == "-":
+            sys.stdout.write(payload + "\n")
+        elif options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as fh:
+                fh.write(payload)
+
+        if report["failures"] and not options["no_fail"]:
+            raise CommandError(f"{report['failures']} route(s) hors budget.")
+        self.stdout.write(self.style.SUCCESS(f"🎉 {len(report['results'])} routes dans les budgets."))
@@ -3,6 +3,7 @@ from django.contrib.auth import login
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib.auth.views import LoginView
 from django.db.models import Q
+from django.http import Http404
 from django.shortcuts import render, redirect, get_object_or_404
 from django.urls import reverse_lazy, reverse
 from django.views.generic import TemplateView
@@ -12,7 +13,14 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from best_epargne.apis.serializers import PublicCourseSerializer
+from best_epargne.apis.cards import (
+    CARD_VIEWS, PUBLIC_CARD_VIEWS, card_values, course_cards, public_card_values, public_course_cards,
+)
+from best_epargne.apis.conditional import (
+    catalog_parts, conditional, course_parts, learner_catalog_parts, learner_course_parts,
+)
+from best_epargne.apis.fieldsets import parse_fieldset
+from best_epargne.metrics.profiling import get_profile, recent_profiles
 from best_epargne.apis.views import _course_to_dict
 from catalog.models import Course
 from enrollments.models import Enrollment
@@ -73,6 +81,7 @@ class StudentDashboard(LoginRequiredMixin, RoleRequiredMixin, TemplateView):
         ctx = super().get_context_data(**kwargs)
         # endpoints côté template (pratique pour Alpine)
         ctx["learner_endpoints"] = {
+            "dashboard": "/api/learner/dashboard/",  # ✅ toutes les sections en une requête
             "me": "/api/learner/me/",
             "kpis": "/api/learner/kpis/",
             "enrollments": "/api/learner/enrollments/",
@@ -110,6 +119,24 @@ class AdminDashboard(LoginRequiredMixin,RoleRequiredMixin, TemplateView):
             return redirect(_redirect_by_role(request.user))
         return super().dispatch(request, *args, **kwargs)
 
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        # profils des requêtes lentes (tampon circulaire Redis)
+        ctx["profiles"] = recent_profiles(limit=20)
+        return ctx
+
+
+class AdminProfileDetailView(LoginRequiredMixin, RoleRequiredMixin, TemplateView):
+    template_name = "home/admin_profile.html"  # RoleRequiredMixin sans rôle : staff uniquement
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        profile = get_profile(self.kwargs["profile_id"])
+        if profile is None:
+            raise Http404("Profil introuvable (sorti du tampon ?)")
+        ctx["profile"] = profile
+        return ctx
+
 
 class HomeView(TemplateView):
     template_name = "home/index.html"
@@ -120,9 +147,11 @@ class PublicExploreCoursesView(APIView):
     GET /api/public/courses/
     Filtres: q, type, pricing
     Pagination: limit, offset
+    Champs: fields=a,b,c ou view=card|detail (-> sans les clés compat total/courses)
     """
     permission_classes = [AllowAny]
 
+    @conditional(catalog_parts, private=False)
     def get(self, request):
         q = (request.query_params.get("q") or "").strip()
         course_type = (request.query_params.get("type") or "").strip()
@@ -141,7 +170,7 @@ class PublicExploreCoursesView(APIView):
         limit = max(1, min(limit, 50))
         offset = max(0, offset)
 
-        qs = Course.objects.all().select_related('category')
+        qs = Course.objects.all()
 
         # ✅ uniquement cours publiés
         qs = qs.filter(status=Course.Status.PUBLISHED)
@@ -164,19 +193,21 @@ class PublicExploreCoursesView(APIView):
         # ✅ ordering
         qs = qs.order_by("-updated_at", "-id")
 
-        items = qs[offset:offset + limit]
-
-        serializer = PublicCourseSerializer(items, many=True, context={"request": request})
+        # ✅ lignes values() + cartes compilées (même sortie que PublicCourseSerializer)
+        fieldset = parse_fieldset(request, PUBLIC_CARD_VIEWS)
+        results = public_course_cards(public_card_values(qs, fieldset)[offset:offset + limit], fieldset=fieldset)
 
-        return Response({
+        payload = {
             "success": True,
             "count": total,  # standard
-            "total": total,  # compat
             "limit": limit,
             "offset": offset,
-            "results": serializer.data,  # standard
-            "courses": serializer.data,  # compat front actuel
-        })
+            "results": results,  # standard
+        }
+        if not fieldset.explicit:
+            payload["total"] = total  # compat
+            payload["courses"] = results  # compat front actuel
+        return Response(payload)
 
 class CourseDetailPageView(TemplateView):
     template_name = "home/course_detail.html"
@@ -187,6 +218,7 @@ class PublicCourseDetailView(APIView):
     """
     permission_classes = [AllowAny]
 
+    @conditional(course_parts, private=False)
     def get(self, request, course_id: int):
         course = (
             Course.objects
@@ -209,6 +241,7 @@ class PublicCourseDetailView(APIView):
 class PublicCourseRelatedView(APIView):
     permission_classes = [AllowAny]
 
+    @conditional(catalog_parts, private=False)
     def get(self, request, course_id: int):
         try:
             limit = int(request.query_params.get("limit") or 6)
@@ -224,7 +257,7 @@ class PublicCourseRelatedView(APIView):
         if not course:
             return Response({"detail": "Cours introuvable."}, status=status.HTTP_404_NOT_FOUND)
 
-        qs = Course.objects.select_related("category", "instructor").filter(status=Course.Status.PUBLISHED).exclude(id=course.id)
+        qs = Course.objects.filter(status=Course.Status.PUBLISHED).exclude(id=course.id)
 
         # ✅ similarité: même catégorie si possible, sinon même type
         if course.category_id:
@@ -233,9 +266,10 @@ class PublicCourseRelatedView(APIView):
             qs = qs.filter(course_type=course.course_type)
 
         # ✅ tri Udemy-like: plus récents d'abord
-        qs = qs.order_by("-updated_at", "-id")[:limit]
+        fieldset = parse_fieldset(request, CARD_VIEWS)
+        rows = card_values(qs.order_by("-updated_at", "-id"), fieldset)[:limit]
 
-        data = [ _course_to_dict(c, request=request) for c in qs ]
+        data = course_cards(rows, fieldset=fieldset)
         return Response({"count": len(data), "results": data})
 
 
@@ -248,12 +282,14 @@ class LearnerExploreCoursesView(APIView):
     - pricing: pricing_type (FREE/PAID/HYBRID)
     - level: level (beginner/intermediate/advanced)
     - mine=1 -> seulement les cours où l'apprenant est inscrit
+    - fields=a,b,c ou view=card|detail (défaut: detail)
     Pagination:
     - limit (default 20)
     - offset (default 0)
     """
     permission_classes = [IsAuthenticated]
 
+    @conditional(learner_catalog_parts)
     def get(self, request):
         q = (request.query_params.get("q") or "").strip()
         course_type = (request.query_params.get("type") or "").strip()
@@ -287,24 +323,16 @@ class LearnerExploreCoursesView(APIView):
             qs = qs.filter(level=level)
 
         # enroll map
-        enroll_qs = Enrollment.objects.filter(user=request.user).select_related("course")
-        enrolled_map = {e.course_id: e for e in enroll_qs}
+        # enroll map {course_id: enrolled_at}
+        enrolled_map = dict(Enrollment.objects.filter(user=request.user).values_list("course_id", "enrolled_at"))
 
         if mine:
             qs = qs.filter(id__in=enrolled_map.keys())
 
         total = qs.count()
-        items = list(qs.order_by("-updated_at")[offset:offset + limit])
-
-        results = []
-        for c in items:
-            e = enrolled_map.get(c.id)
-            results.append(_course_to_dict(
-                c,
-                request=request,
-                is_enrolled=bool(e),
-                enrolled_at=getattr(e, "created_at", None) if e else None
-            ))
+        fieldset = parse_fieldset(request, CARD_VIEWS)
+        rows = card_values(qs.order_by("-updated_at"), fieldset)[offset:offset + limit]
+        results = course_cards(rows, enrolled=enrolled_map, fieldset=fieldset)
 
         return Response({
             "count": total,
@@ -320,6 +348,7 @@ class LearnerCourseDetailView(APIView):
     """
     permission_classes = [AllowAny]
 
+    @conditional(learner_course_parts)
     def get(self, request, course_id: int):
         course = (
             Course.objects
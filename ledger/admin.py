@@ -0,0 +1,48 @@
+from django.contrib import admin
+
+from .models import BalanceSnapshot, JournalEntry, JournalLine, LedgerAccount
+
+
+class ReadOnlyAdmin(admin.ModelAdmin):
+    # grand livre append-only : aucune modification depuis l'admin
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(LedgerAccount)
+class LedgerAccountAdmin(ReadOnlyAdmin):
+    list_display = ("code", "kind", "name", "currency", "user", "company", "created_at")
+    list_filter = ("kind", "currency")
+    search_fields = ("code", "name", "user__email", "company__name")
+
+
+class JournalLineInline(admin.TabularInline):
+    model = JournalLine
+    extra = 0
+    fields = ("account", "amount", "occurred_at")
+    readonly_fields = fields
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(JournalEntry)
+class JournalEntryAdmin(ReadOnlyAdmin):
+    list_display = ("id", "kind", "source", "description", "occurred_at", "created_at")
+    list_filter = ("kind",)
+    search_fields = ("source", "description")
+    date_hierarchy = "occurred_at"
+    inlines = [JournalLineInline]
+
+
+@admin.register(BalanceSnapshot)
+class BalanceSnapshotAdmin(ReadOnlyAdmin):
+    list_display = ("account", "as_of", "balance", "created_at")
+    list_filter = ("as_of",)
+    search_fields = ("account__code",)
@@ -0,0 +1,74 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Prefetch
+
+from catalog.models import Payment
+from commerce.models import InstructorPayout, Order, OrderItem
+from ledger.services import AccountBook, course_instructors, mirrored_refs, order_entry, payment_entry, \
+    payout_entry, payout_percents, post_entries, rebuild_snapshots, refund_drafts
+
+
+def _chunks(qs, size: int):
+    """Keyset sur l'id : mémoire bornée, pas d'OFFSET."""
+    last = 0
+    while True:
+        rows = list(qs.filter(id__gt=last).order_by("id")[:size])
+        if not rows:
+            return
+        yield rows
+        last = rows[-1].id
+
+
+class Command(BaseCommand):
+    help = (
+        "Reprend l'historique dans le grand livre : commandes et paiements payés / remboursés, "
+        "versements formateurs payés, par lots. Idempotent. Reconstruit ensuite les snapshots mensuels."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk", type=int, default=1000)
+        parser.add_argument("--no-snapshots", action="store_true", help="Ne pas reconstruire les snapshots")
+
+    def handle(self, *args, **options):
+        size = max(1, options["chunk"])
+        book = AccountBook(preload=True)
+        refunded = 0
+
+        orders = Order.objects.filter(
+            status__in=[Order.Status.PAID, Order.Status.REFUNDED], paid_at__isnull=False,
+        ).prefetch_related(Prefetch("items", queryset=OrderItem.objects.order_by("id")))
+        n = 0
+        for rows in _chunks(orders, size):
+            instructors = course_instructors(it.course_id for o in rows for it in o.items.all() if it.course_id)
+            percents = payout_percents(instructors.values())
+            n += post_entries([order_entry(o, list(o.items.all()), book, instructors, percents) for o in rows])
+            # contre-passations du lot juste après ses ventes (date de remboursement inconnue : reprise)
+            refunded += post_entries(
+                refund_drafts("order", [o.id for o in rows if o.status == Order.Status.REFUNDED])
+            )
+        self.stdout.write(f"commandes : {n} écritures")
+
+        payments = Payment.objects.filter(
+            status__in=[Payment.Status.PAID, Payment.Status.REFUNDED], kind=Payment.Kind.COURSE,
+        )
+        n = 0
+        for rows in _chunks(payments, size):
+            mirrored = mirrored_refs(p.provider_ref for p in rows)
+            rows = [p for p in rows if p.provider_ref not in mirrored]
+            instructors = course_instructors(p.course_id for p in rows if p.course_id)
+            percents = payout_percents(instructors.values())
+            n += post_entries([payment_entry(p, book, instructors, percents) for p in rows])
+            refunded += post_entries(
+                refund_drafts("payment", [p.id for p in rows if p.status == Payment.Status.REFUNDED])
+            )
+        self.stdout.write(f"paiements : {n} écritures")
+
+        n = 0
+        for rows in _chunks(InstructorPayout.objects.filter(status=InstructorPayout.Status.PAID), size):
+            n += post_entries([payout_entry(p, book) for p in rows])
+        self.stdout.write(f"versements : {n} écritures")
+
+        self.stdout.write(f"remboursements : {refunded} écritures")
+
+        if not options["no_snapshots"]:
+            self.stdout.write(f"snapshots : {rebuild_snapshots()}")
+        self.stdout.write(self.style.SUCCESS("✅ Grand livre à jour"))
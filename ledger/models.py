@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+class LedgerAccount(models.Model):
+    """
+    Compte du grand livre, un par titulaire et par devise.
+    Codes : platform:cash:XOF, platform:revenue:XOF, instructor:<id>:XOF, company:<id>:XOF
+    """
+    class Kind(models.TextChoices):
+        PLATFORM = "PLATFORM", "Plateforme"
+        INSTRUCTOR = "INSTRUCTOR", "Formateur"
+        COMPANY = "COMPANY", "Entreprise"
+
+    code = models.CharField(max_length=80, unique=True)
+    kind = models.CharField(max_length=12, choices=Kind.choices)
+    name = models.CharField(max_length=160, blank=True, default="")
+    currency = models.CharField(max_length=8, default="XOF")
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.PROTECT, null=True, blank=True,
+                             related_name="ledger_accounts")
+    company = models.ForeignKey("organizations.Company", on_delete=models.PROTECT, null=True, blank=True,
+                                related_name="ledger_accounts")
+
+    created_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return self.code
+
+
+class JournalEntry(models.Model):
+    """Écriture comptable (append-only) : la somme de ses lignes est nulle."""
+    class Kind(models.TextChoices):
+        SALE = "SALE", "Vente"
+        REFUND = "REFUND", "Remboursement"
+        PAYOUT = "PAYOUT", "Versement formateur"
+
+    kind = models.CharField(max_length=12, choices=Kind.choices)
+    # clé d'idempotence : "order:42", "payment:17", "refund:order:42", "payout:9"
+    source = models.CharField(max_length=80, unique=True)
+    description = models.CharField(max_length=255, blank=True, default="")
+    occurred_at = models.DateTimeField()  # date métier (paid_at...)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["occurred_at"], name="journal_entry_occurred_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} • {self.source}"
+
+
+class JournalLine(models.Model):
+    """Montant signé : > 0 débit, < 0 crédit."""
+    entry = models.ForeignKey("ledger.JournalEntry", on_delete=models.PROTECT, related_name="lines")
+    account = models.ForeignKey("ledger.LedgerAccount", on_delete=models.PROTECT, related_name="lines")
+    amount = models.DecimalField(max_digits=14, decimal_places=2)
+    occurred_at = models.DateTimeField()  # = entry.occurred_at (solde à date sans jointure)
+
+    class Meta:
+        indexes = [
+            # solde à date : snapshot + WHERE account=? AND occurred_at >= ?
+            models.Index(fields=["account", "occurred_at"], name="journal_line_account_idx"),
+        ]
+
+
+class BalanceSnapshot(models.Model):
+    """Solde d'un compte = somme de ses lignes avec occurred_at < as_of."""
+    account = models.ForeignKey("ledger.LedgerAccount", on_delete=models.CASCADE, related_name="snapshots")
+    as_of = models.DateTimeField()
+    balance = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["account", "as_of"], name="balance_snapshot_uniq"),
+        ]
+        indexes = [
+            models.Index(fields=["account", "-as_of"], name="balance_snapshot_latest_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.account_id} • {self.as_of} • {self.balance}"
@@ -0,0 +1,324 @@
+"""
+Grand livre en partie double (append-only).
+
+Plan de comptes (par devise) :
+- platform:cash     encaissements PSP (débit à la vente, crédit au remboursement / versement)
+- platform:revenue  commission plateforme
+- instructor:<id>   part formateur due (payout_percent), débitée au versement
+- company:<id>      sièges entreprise prépayés (produit constaté d'avance)
+
+Montants signés : > 0 débit, < 0 crédit ; chaque écriture est équilibrée.
+Solde à date = dernier BalanceSnapshot (as_of <= date) + lignes postérieures (cf. take_snapshots).
+"""
+from __future__ import annotations
+
+from collections import defaultdict, namedtuple
+from datetime import datetime, time
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Max, Sum
+from django.utils import timezone
+
+from catalog.models import Course, Payment
+from commerce.models import InstructorPayout, Order, OrderItem, PaymentTransaction
+from commerce.payouts import DEFAULT_PAYOUT_PERCENT, instructor_share, net_amounts
+from compte.models import InstructorProfile
+from .models import BalanceSnapshot, JournalEntry, JournalLine, LedgerAccount
+
+ZERO = Decimal("0")
+
+EntryDraft = namedtuple("EntryDraft", "kind source occurred_at lines description")
+
+
+class UnbalancedEntry(ValueError):
+    pass
+
+
+# ------------------------------------------------------------------
+# Comptes
+# ------------------------------------------------------------------
+class AccountBook:
+    """Résolution code -> id de compte (créé à la demande), avec cache local."""
+
+    def __init__(self, preload: bool = False):
+        self._ids = dict(LedgerAccount.objects.values_list("code", "id")) if preload else {}
+
+    def _get(self, code: str, **defaults) -> int:
+        account_id = self._ids.get(code)
+        if account_id is None:
+            account_id = LedgerAccount.objects.get_or_create(code=code, defaults=defaults)[0].id
+            self._ids[code] = account_id
+        return account_id
+
+    def cash(self, currency: str) -> int:
+        return self._get(f"platform:cash:{currency}", kind=LedgerAccount.Kind.PLATFORM,
+                         name="Encaissements", currency=currency)
+
+    def revenue(self, currency: str) -> int:
+        return self._get(f"platform:revenue:{currency}", kind=LedgerAccount.Kind.PLATFORM,
+                         name="Commission plateforme", currency=currency)
+
+    def instructor(self, user_id, currency: str) -> int:
+        return self._get(f"instructor:{user_id}:{currency}", kind=LedgerAccount.Kind.INSTRUCTOR,
+                         user_id=user_id, currency=currency)
+
+    def company(self, company_id, currency: str) -> int:
+        return self._get(f"company:{company_id}:{currency}", kind=LedgerAccount.Kind.COMPANY,
+                         company_id=company_id, currency=currency)
+
+
+def payout_percents(instructor_ids) -> dict:
+    return dict(
+        InstructorProfile.objects.filter(user_id__in=set(instructor_ids)).values_list("user_id", "payout_percent")
+    )
+
+
+# ------------------------------------------------------------------
+# Écritures
+# ------------------------------------------------------------------
+def _balanced(lines) -> list:
+    merged = defaultdict(lambda: ZERO)
+    for account_id, amount in lines:
+        merged[account_id] += amount
+    out = [(a, v) for a, v in merged.items() if v]
+    if sum(v for _, v in out) != ZERO:
+        raise UnbalancedEntry(f"écriture déséquilibrée : {out}")
+    return out
+
+
+def _sale_lines(book: AccountBook, currency: str, amount: Decimal, instructor_id, percent) -> list:
+    """Vente d'un cours : encaissement = part formateur + commission."""
+    share = instructor_share(amount, percent) if instructor_id else ZERO
+    lines = [(book.cash(currency), amount), (book.revenue(currency), -(amount - share))]
+    if share:
+        lines.append((book.instructor(instructor_id, currency), -share))
+    return lines
+
+
+def order_entry(order: Order, items: list, book: AccountBook, instructors: dict, percents: dict):
+    """Commande payée -> EntryDraft ; remise répartie au prorata des lignes (net_amounts), arrondi en commission."""
+    total, currency = order.total or ZERO, order.currency
+    if not total:
+        return None
+
+    lines, allocated = [], ZERO
+    for it, base in zip(items, net_amounts(total, [it.line_total or ZERO for it in items])):
+        allocated += base
+        if it.item_type == OrderItem.ItemType.COMPANY_SEATS and order.company_id:
+            lines += [(book.cash(currency), base), (book.company(order.company_id, currency), -base)]
+        else:
+            instructor_id = instructors.get(it.course_id)
+            lines += _sale_lines(book, currency, base, instructor_id,
+                                 percents.get(instructor_id, DEFAULT_PAYOUT_PERCENT))
+    rest = total - allocated
+    if rest:
+        lines += [(book.cash(currency), rest), (book.revenue(currency), -rest)]
+
+    return EntryDraft(JournalEntry.Kind.SALE, f"order:{order.id}", order.paid_at or order.created_at,
+                      lines, f"Commande #{order.id}")
+
+
+def payment_entry(payment: Payment, book: AccountBook, instructors: dict, percents: dict):
+    if not payment.amount:
+        return None
+    instructor_id = instructors.get(payment.course_id)
+    lines = _sale_lines(book, payment.currency, payment.amount, instructor_id,
+                        percents.get(instructor_id, DEFAULT_PAYOUT_PERCENT))
+    return EntryDraft(JournalEntry.Kind.SALE, f"payment:{payment.id}", payment.paid_at or payment.created_at,
+                      lines, f"Paiement {payment.reference}")
+
+
+def payout_entry(payout: InstructorPayout, book: AccountBook):
+    lines = [
+        (book.instructor(payout.instructor_id, payout.currency), payout.amount),
+        (book.cash(payout.currency), -payout.amount),
+    ]
+    return EntryDraft(JournalEntry.Kind.PAYOUT, f"payout:{payout.id}", payout.paid_at or timezone.now(),
+                      lines, f"Versement {payout.reference}")
+
+
+def _adjust_snapshots(lines, occurred_at) -> None:
+    # écriture antidatée : les snapshots postérieurs intègrent la ligne
+    for account_id, amount in lines:
+        BalanceSnapshot.objects.filter(account_id=account_id, as_of__gt=occurred_at).update(
+            balance=F("balance") + amount,
+        )
+
+
+def post_entry(draft: EntryDraft):
+    """Écriture unitaire idempotente (clé `source`) -> JournalEntry, ou None si déjà passée."""
+    if draft is None:
+        return None
+    lines = _balanced(draft.lines)
+    try:
+        with transaction.atomic():
+            entry = JournalEntry.objects.create(
+                kind=draft.kind, source=draft.source, occurred_at=draft.occurred_at,
+                description=draft.description[:255],
+            )
+            JournalLine.objects.bulk_create([
+                JournalLine(entry=entry, account_id=a, amount=v, occurred_at=draft.occurred_at) for a, v in lines
+            ])
+            _adjust_snapshots(lines, draft.occurred_at)
+    except IntegrityError:
+        return None
+    return entry
+
+
+def post_entries(drafts: list) -> int:
+    """
+    Écritures en masse (backfill) : les sources déjà passées sont ignorées.
+    ⚠️ pas d'ajustement des snapshots : le backfill les reconstruit ensuite.
+    """
+    drafts = [d for d in drafts if d is not None]
+    done = set(JournalEntry.objects.filter(source__in=[d.source for d in drafts]).values_list("source", flat=True))
+    drafts = [d for d in drafts if d.source not in done]
+    if not drafts:
+        return 0
+
+    balanced = [_balanced(d.lines) for d in drafts]
+    with transaction.atomic():
+        entries = JournalEntry.objects.bulk_create([
+            JournalEntry(kind=d.kind, source=d.source, occurred_at=d.occurred_at, description=d.description[:255])
+            for d in drafts
+        ])
+        JournalLine.objects.bulk_create([
+            JournalLine(entry_id=e.id, account_id=a, amount=v, occurred_at=e.occurred_at)
+            for e, lines in zip(entries, balanced) for a, v in lines
+        ], batch_size=2000)
+    return len(drafts)
+
+
+def reverse_entry(source: str, refund_source: str, occurred_at=None, description: str = ""):
+    """Remboursement : contre-passation des lignes de l'écriture d'origine."""
+    original = JournalEntry.objects.filter(source=source).first()
+    if original is None:
+        return None
+    lines = [(a, -v) for a, v in original.lines.values_list("account_id", "amount")]
+    return post_entry(EntryDraft(JournalEntry.Kind.REFUND, refund_source, occurred_at or timezone.now(), lines,
+                                 description or f"Remboursement {source}"))
+
+
+def refund_drafts(kind: str, object_ids, occurred_at=None) -> list:
+    """Contre-passations en masse (backfill, cf. post_entries) : lignes d'origine lues en une requête."""
+    sources = [f"{kind}:{object_id}" for object_id in object_ids]
+    if not sources:
+        return []
+    lines = defaultdict(list)
+    for source, account_id, amount in JournalLine.objects.filter(entry__source__in=sources).values_list(
+            "entry__source", "account_id", "amount"):
+        lines[source].append((account_id, -amount))
+    occurred_at = occurred_at or timezone.now()
+    return [
+        EntryDraft(JournalEntry.Kind.REFUND, f"refund:{source}", occurred_at, lines[source], f"Remboursement {source}")
+        for source in sources if lines[source]
+    ]
+
+
+# ------------------------------------------------------------------
+# Événements (signaux / services)
+# ------------------------------------------------------------------
+def course_instructors(course_ids) -> dict:
+    return dict(Course.objects.filter(id__in=set(course_ids)).values_list("id", "instructor_id"))
+
+
+def mirrored_refs(refs) -> set:
+    """Références PSP déjà portées par une transaction commerce payée : la commande fait foi."""
+    refs = [r for r in refs if r]
+    if not refs:
+        return set()
+    return set(PaymentTransaction.objects.filter(
+        reference__in=refs, order__status__in=[Order.Status.PAID, Order.Status.REFUNDED],
+    ).values_list("reference", flat=True))
+
+
+def record_order_paid(order_id) -> None:
+    if JournalEntry.objects.filter(source=f"order:{order_id}").exists():
+        return
+    order = Order.objects.get(id=order_id)
+    items = list(order.items.all())
+    instructors = course_instructors(it.course_id for it in items if it.course_id)
+    post_entry(order_entry(order, items, AccountBook(), instructors, payout_percents(instructors.values())))
+
+
+def record_payment_paid(payment_id) -> None:
+    if JournalEntry.objects.filter(source=f"payment:{payment_id}").exists():
+        return
+    payment = Payment.objects.get(id=payment_id)
+    if payment.kind != Payment.Kind.COURSE or mirrored_refs([payment.provider_ref]):
+        return
+    instructors = course_instructors([payment.course_id]) if payment.course_id else {}
+    post_entry(payment_entry(payment, AccountBook(), instructors, payout_percents(instructors.values())))
+
+
+def record_refund(kind: str, object_id) -> None:
+    reverse_entry(f"{kind}:{object_id}", f"refund:{kind}:{object_id}")
+
+
+def record_payout_paid(payout: InstructorPayout) -> None:
+    post_entry(payout_entry(payout, AccountBook()))
+
+
+# ------------------------------------------------------------------
+# Snapshots / soldes
+# ------------------------------------------------------------------
+def day_cutoff(day) -> datetime:
+    return timezone.make_aware(datetime.combine(day, time.min), timezone.get_current_timezone())
+
+
+def take_snapshots(cutoff: datetime | None = None) -> int:
+    """
+    Snapshot de tous les comptes à `cutoff` (minuit local par défaut) :
+    solde au snapshot précédent + lignes de [précédent, cutoff) — une requête GROUP BY.
+    """
+    cutoff = cutoff or day_cutoff(timezone.localdate())
+    last = BalanceSnapshot.objects.filter(as_of__lt=cutoff).aggregate(m=Max("as_of"))["m"]
+    if BalanceSnapshot.objects.filter(as_of=cutoff).exists():
+        return 0
+
+    balances = defaultdict(lambda: ZERO)
+    lines = JournalLine.objects.filter(occurred_at__lt=cutoff)
+    if last is not None:
+        for account_id, balance in BalanceSnapshot.objects.filter(as_of=last).values_list("account_id", "balance"):
+            balances[account_id] = balance
+        # comptes sans snapshot au précédent cutoff (créés depuis) : tout leur historique
+        fresh = lines.exclude(account_id__in=list(balances))
+        lines = lines.filter(occurred_at__gte=last, account_id__in=list(balances))
+        for row in fresh.values("account_id").annotate(s=Sum("amount")).order_by():
+            balances[row["account_id"]] += row["s"]
+
+    for row in lines.values("account_id").annotate(s=Sum("amount")).order_by():
+        balances[row["account_id"]] += row["s"]
+
+    BalanceSnapshot.objects.bulk_create(
+        [BalanceSnapshot(account_id=a, as_of=cutoff, balance=b) for a, b in balances.items()],
+        batch_size=1000, ignore_conflicts=True,
+    )
+    return len(balances)
+
+
+def rebuild_snapshots(step_months: int = 1) -> int:
+    """Snapshots mensuels depuis la première écriture (après un backfill)."""
+    BalanceSnapshot.objects.all().delete()
+    first = JournalEntry.objects.order_by("occurred_at").values_list("occurred_at", flat=True).first()
+    if first is None:
+        return 0
+    today = timezone.localdate()
+    day, n = timezone.localdate(first).replace(day=1), 0
+    while day < today:
+        month = day.month - 1 + step_months
+        day = day.replace(year=day.year + month // 12, month=month % 12 + 1)
+        n += take_snapshots(day_cutoff(min(day, today)))
+    return n
+
+
+def balance_as_of(account_id, at: datetime | None = None) -> Decimal:
+    """Solde (lignes occurred_at <= at) : un snapshot + la queue de lignes postérieures."""
+    at = at or timezone.now()
+    snap = BalanceSnapshot.objects.filter(account_id=account_id, as_of__lte=at).order_by("-as_of").first()
+    tail = JournalLine.objects.filter(account_id=account_id, occurred_at__lte=at)
+    if snap is not None:
+        tail = tail.filter(occurred_at__gte=snap.as_of)
+    total = tail.aggregate(s=Sum("amount"))["s"] or ZERO
+    return (snap.balance if snap else ZERO) + total
@@ -0,0 +1,28 @@
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from catalog.models import Payment
+from commerce.models import Order
+from .services import record_order_paid, record_payment_paid, record_refund
+
+
+# ✅ après commit : les lignes de commande / transactions sont visibles, et un rollback n'écrit rien
+@receiver(post_save, sender=Order, dispatch_uid="ledger_order_saved")
+def order_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    if instance.status == Order.Status.PAID:
+        transaction.on_commit(lambda: record_order_paid(instance.id))
+    elif instance.status == Order.Status.REFUNDED:
+        transaction.on_commit(lambda: record_refund("order", instance.id))
+
+
+@receiver(post_save, sender=Payment, dispatch_uid="ledger_payment_saved")
+def payment_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    if instance.status == Payment.Status.PAID:
+        transaction.on_commit(lambda: record_payment_paid(instance.id))
+    elif instance.status == Payment.Status.REFUNDED:
+        transaction.on_commit(lambda: record_refund("payment", instance.id))
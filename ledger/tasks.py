@@ -0,0 +1,9 @@
+from celery import shared_task
+
+from .services import take_snapshots
+
+
+@shared_task(name="ledger.take_balance_snapshots", ignore_result=True)
+def take_balance_snapshots() -> int:
+    """Celery beat (quotidien) : snapshot de solde de chaque compte à minuit."""
+    return take_snapshots()
@@ -0,0 +1,95 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db.models import Sum
+from django.test import TestCase
+from django.utils import timezone
+
+from catalog.models import Course
+from commerce.models import Order, OrderItem
+from compte.models import InstructorProfile
+from .models import JournalEntry, JournalLine
+from .services import AccountBook, EntryDraft, UnbalancedEntry, balance_as_of, post_entry, take_snapshots
+
+User = get_user_model()
+
+
+class LedgerTests(TestCase):
+    def setUp(self):
+        self.instructor = User.objects.create_user("prof@example.com", "x", role=User.Role.INSTRUCTOR)
+        InstructorProfile.objects.create(user=self.instructor, payout_percent=Decimal("70.00"))
+        self.buyer = User.objects.create_user("buyer@example.com", "x")
+        self.course = Course.objects.create(title="Épargne", instructor=self.instructor, price=Decimal("1000"))
+        self.book = AccountBook()
+
+    def _order(self, total="1000", status=Order.Status.PAID, paid_at=None):
+        order = Order(user=self.buyer, status=status, subtotal=Decimal(total), total=Decimal(total),
+                      paid_at=paid_at or timezone.now() - timedelta(days=1))
+        with self.captureOnCommitCallbacks(execute=True):
+            order.save()
+            OrderItem.objects.create(order=order, item_type=OrderItem.ItemType.COURSE, course=self.course,
+                                     unit_price=Decimal(total), line_total=Decimal(total))
+            order.save()  # PAID après les lignes, comme le checkout
+        return order
+
+    def _instructor_account(self):
+        return self.book.instructor(self.instructor.id, "XOF")
+
+    def test_unbalanced_entry_is_rejected(self):
+        draft = EntryDraft(JournalEntry.Kind.SALE, "manual:1", timezone.now(),
+                           [(self.book.cash("XOF"), Decimal("10")), (self.book.revenue("XOF"), Decimal("-9"))], "")
+        with self.assertRaises(UnbalancedEntry):
+            post_entry(draft)
+        self.assertFalse(JournalEntry.objects.exists())
+
+    def test_sale_entry_is_balanced_and_idempotent(self):
+        order = self._order(total="999.99")
+        entry = JournalEntry.objects.get(source=f"order:{order.id}")
+        self.assertEqual(entry.lines.aggregate(s=Sum("amount"))["s"], Decimal("0"))
+        self.assertEqual(balance_as_of(self._instructor_account()), Decimal("-699.99"))
+        with self.captureOnCommitCallbacks(execute=True):
+            order.save()
+        self.assertEqual(JournalEntry.objects.filter(source=f"order:{order.id}").count(), 1)
+
+    def test_refund_reverses_every_line(self):
+        order = self._order()
+        with self.captureOnCommitCallbacks(execute=True):
+            order.status = Order.Status.REFUNDED
+            order.save()
+        refund = JournalEntry.objects.get(source=f"refund:order:{order.id}")
+        self.assertEqual(refund.kind, JournalEntry.Kind.REFUND)
+        per_account = JournalLine.objects.values("account_id").annotate(s=Sum("amount"))
+        self.assertTrue(all(row["s"] == 0 for row in per_account))
+
+    def test_balance_is_snapshot_plus_tail(self):
+        account = self._instructor_account()
+        self._order(paid_at=timezone.now() - timedelta(days=3))
+        cutoff = timezone.now() - timedelta(days=2)
+        self.assertEqual(take_snapshots(cutoff), 3)
+        self._order(paid_at=timezone.now() - timedelta(days=1))
+        # ligne antidatée avant le snapshot : intégrée au snapshot par post_entry
+        self._order(paid_at=timezone.now() - timedelta(days=4))
+
+        expected = JournalLine.objects.filter(account_id=account).aggregate(s=Sum("amount"))["s"]
+        self.assertEqual(expected, Decimal("-2100.00"))
+        self.assertEqual(balance_as_of(account), expected)
+        self.assertEqual(balance_as_of(account, cutoff), Decimal("-1400.00"))
+
+    def test_backfill_reverses_refunds_per_chunk(self):
+        orders = [self._order(), self._order(status=Order.Status.REFUNDED), self._order(status=Order.Status.REFUNDED)]
+        JournalLine.objects.all().delete()  # historique antérieur au grand livre
+        JournalEntry.objects.all().delete()
+
+        call_command("backfill_ledger", "--chunk", "1", "--no-snapshots", stdout=StringIO())
+        self.assertEqual(JournalEntry.objects.filter(kind=JournalEntry.Kind.SALE).count(), 3)
+        self.assertEqual(
+            set(JournalEntry.objects.filter(kind=JournalEntry.Kind.REFUND).values_list("source", flat=True)),
+            {f"refund:order:{o.id}" for o in orders[1:]},
+        )
+        self.assertEqual(balance_as_of(self._instructor_account()), Decimal("-700.00"))
+
+        call_command("backfill_ledger", "--chunk", "1", "--no-snapshots", stdout=StringIO())  # idempotent
+        self.assertEqual(JournalEntry.objects.count(), 5)
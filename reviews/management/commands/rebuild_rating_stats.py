@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from reviews.services import rebuild_course_rating_stats
+
+
+class Command(BaseCommand):
+    help = "Recalcule reviews.CourseRatingStats (après imports / écritures en masse qui contournent les signaux)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--course", type=int, action="append", dest="courses",
+                            help="Limiter à un ou plusieurs cours (répétable)")
+
+    def handle(self, *args, **options):
+        n = rebuild_course_rating_stats(options["courses"])
+        self.stdout.write(self.style.SUCCESS(f"✅ Agrégats recalculés pour {n} cours"))
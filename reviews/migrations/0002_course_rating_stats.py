@@ -0,0 +1,76 @@
+# Generated by Django 4.2.27 on 2026-10-19 04:25
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, Q, Sum
+
+
+def backfill_rating_stats(apps, schema_editor):
+    Review = apps.get_model("reviews", "Review")
+    CourseRatingStats = apps.get_model("reviews", "CourseRatingStats")
+    rows = Review.objects.values("course_id").annotate(
+        s=Sum("rating"),
+        c=Count("id"),
+        **{f"c{i}": Count("id", filter=Q(rating=i)) for i in range(1, 6)},
+    )
+    CourseRatingStats.objects.bulk_create(
+        [
+            CourseRatingStats(
+                course_id=r["course_id"], rating_sum=r["s"] or 0, rating_count=r["c"] or 0,
+                **{f"count_{i}": r[f"c{i}"] for i in range(1, 6)},
+            )
+            for r in rows.iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0004_payment_notification"),
+        ("reviews", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CourseRatingStats",
+            fields=[
+                (
+                    "course",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="rating_stats",
+                        serialize=False,
+                        to="catalog.course",
+                    ),
+                ),
+                ("rating_sum", models.IntegerField(default=0)),
+                ("rating_count", models.IntegerField(default=0)),
+                ("count_1", models.IntegerField(default=0)),
+                ("count_2", models.IntegerField(default=0)),
+                ("count_3", models.IntegerField(default=0)),
+                ("count_4", models.IntegerField(default=0)),
+                ("count_5", models.IntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="review",
+            index=models.Index(
+                fields=["course", "-created_at", "-id"],
+                name="review_course_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="review",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.search.SearchVector("comment", config="french"),
+                name="review_comment_search_idx",
+            ),
+        ),
+        migrations.RunPython(backfill_rating_stats, migrations.RunPython.noop),
+    ]
@@ -3,10 +3,19 @@ from __future__ import annotations
 from django.db import models
 
 # Create your models here.
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
 from django.db import models
 from django.utils import timezone
 from django.conf import settings
 
+# ✅ même expression dans l'index et dans la recherche (sinon Postgres n'utilise pas l'index)
+REVIEW_SEARCH_CONFIG = "french"
+
+
+def review_search_vector():
+    return SearchVector("comment", config=REVIEW_SEARCH_CONFIG)
+
 
 class Review(models.Model):
     course = models.ForeignKey("catalog.Course", on_delete=models.CASCADE, related_name="reviews")
@@ -17,3 +26,49 @@ class Review(models.Model):
 
     class Meta:
         unique_together = ("course", "user")
+        indexes = [
+            # pagination keyset: WHERE course=? AND (created_at, id) < (?, ?) ORDER BY created_at DESC, id DESC
+            models.Index(fields=["course", "-created_at", "-id"], name="review_course_created_idx"),
+            GinIndex(review_search_vector(), name="review_comment_search_idx"),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        obj = super().from_db(db, field_names, values)
+        # état chargé -> permet aux signaux de calculer le delta (ancienne note / ancien cours)
+        obj._loaded_rating = obj.__dict__.get("rating")
+        obj._loaded_course_id = obj.__dict__.get("course_id")
+        return obj
+
+
+class CourseRatingStats(models.Model):
+    """
+    Agrégats de notes par cours, maintenus incrémentalement à chaque create/update/delete de Review.
+    Les listes de cours lisent cette ligne au lieu d'un Avg/Count sur toutes les reviews.
+    """
+    course = models.OneToOneField("catalog.Course", on_delete=models.CASCADE, primary_key=True,
+                                  related_name="rating_stats")
+    rating_sum = models.IntegerField(default=0)
+    rating_count = models.IntegerField(default=0)
+
+    # histogramme 1..5
+    count_1 = models.IntegerField(default=0)
+    count_2 = models.IntegerField(default=0)
+    count_3 = models.IntegerField(default=0)
+    count_4 = models.IntegerField(default=0)
+    count_5 = models.IntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def rating_avg(self):
+        if not self.rating_count:
+            return None
+        return round(self.rating_sum / self.rating_count, 2)
+
+    @property
+    def histogram(self) -> dict:
+        return {str(i): getattr(self, f"count_{i}") for i in range(1, 6)}
+
+    def __str__(self):
+        return f"{self.course_id} • {self.rating_avg} ({self.rating_count})"
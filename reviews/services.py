@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from django.db import transaction
+from django.db.models import Case, Count, F, FloatField, IntegerField, Q, Sum, Value, When
+from django.db.models.functions import Cast, Coalesce
+
+from catalog.versioning import bump_catalog
+from .models import CourseRatingStats, Review
+
+
+def clamp_rating(r) -> int:
+    try:
+        return min(5, max(1, int(r)))
+    except (TypeError, ValueError):
+        return 5
+
+
+def apply_rating_delta(course_id, add=None, remove=None) -> None:
+    """
+    Applique +1 (add) / -1 (remove) sur les agrégats du cours, en une seule requête UPDATE (F expressions).
+    """
+    if not course_id or (add is None and remove is None):
+        return
+
+    updates = {"rating_sum": F("rating_sum"), "rating_count": F("rating_count")}
+    buckets = {}
+    if add is not None:
+        r = clamp_rating(add)
+        updates["rating_sum"] += r
+        updates["rating_count"] += 1
+        buckets[r] = buckets.get(r, 0) + 1
+    if remove is not None:
+        r = clamp_rating(remove)
+        updates["rating_sum"] -= r
+        updates["rating_count"] -= 1
+        buckets[r] = buckets.get(r, 0) - 1
+    for r, d in buckets.items():
+        if d:
+            updates[f"count_{r}"] = F(f"count_{r}") + d
+
+    with transaction.atomic():
+        if add is not None:
+            # ✅ garantit l'existence de la ligne sans lecture préalable
+            # (jamais sur un retrait seul : le cours est peut-être en cours de suppression en cascade)
+            CourseRatingStats.objects.bulk_create([CourseRatingStats(course_id=course_id)], ignore_conflicts=True)
+        CourseRatingStats.objects.filter(course_id=course_id).update(**updates)
+
+
+def rebuild_course_rating_stats(course_ids=None) -> int:
+    """
+    Recalcul complet (set-based) : backfill, ou après des écritures en masse qui contournent les signaux.
+    """
+    qs = Review.objects.all()
+    if course_ids is not None:
+        qs = qs.filter(course_id__in=list(course_ids))
+
+    rows = qs.values("course_id").annotate(
+        s=Sum("rating"),
+        c=Count("id"),
+        **{f"c{i}": Count("id", filter=Q(rating=i)) for i in range(1, 6)},
+    )
+    objs = [
+        CourseRatingStats(
+            course_id=r["course_id"], rating_sum=r["s"] or 0, rating_count=r["c"] or 0,
+            **{f"count_{i}": r[f"c{i}"] for i in range(1, 6)},
+        )
+        for r in rows
+    ]
+
+    with transaction.atomic():
+        stale = CourseRatingStats.objects.all()
+        if course_ids is not None:
+            stale = stale.filter(course_id__in=list(course_ids))
+        stale.exclude(course_id__in=[o.course_id for o in objs]).delete()
+        CourseRatingStats.objects.bulk_create(
+            objs,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=["course"],
+            update_fields=["rating_sum", "rating_count", "count_1", "count_2", "count_3", "count_4", "count_5"],
+        )
+    bump_catalog()  # écriture en masse : pas de signal par cours
+    return len(objs)
+
+
+def rating_annotations(prefix: str = "") -> dict:
+    """
+    Annotations rating_avg / rating_count lues depuis CourseRatingStats (jointure 1-1, pas d'agrégat).
+    `prefix` permet de partir d'une autre table (ex: "course__").
+    """
+    count = f"{prefix}rating_stats__rating_count"
+    total = f"{prefix}rating_stats__rating_sum"
+    return {
+        "rating_count": Coalesce(F(count), Value(0), output_field=IntegerField()),
+        "rating_avg": Case(
+            When(**{f"{count}__gt": 0}, then=Cast(F(total), FloatField()) / Cast(F(count), FloatField())),
+            default=None,
+            output_field=FloatField(),
+        ),
+    }
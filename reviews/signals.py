@@ -0,0 +1,41 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from catalog.versioning import bump_course, bump_learner
+from .models import Review
+from .services import apply_rating_delta, rebuild_course_rating_stats
+
+
+def _remember_state(instance):
+    instance._loaded_rating = instance.rating
+    instance._loaded_course_id = instance.course_id
+
+
+@receiver(post_save, sender=Review, dispatch_uid="reviews_rating_stats_save")
+def review_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        apply_rating_delta(instance.course_id, add=instance.rating)
+    elif not hasattr(instance, "_loaded_rating"):
+        # instance construite à la main (pas de from_db) : ancien état inconnu -> recalcul ciblé
+        rebuild_course_rating_stats([instance.course_id])
+    elif instance._loaded_course_id != instance.course_id:
+        apply_rating_delta(instance._loaded_course_id, remove=instance._loaded_rating)
+        apply_rating_delta(instance.course_id, add=instance.rating)
+    elif instance._loaded_rating != instance.rating:
+        apply_rating_delta(instance.course_id, add=instance.rating, remove=instance._loaded_rating)
+    if getattr(instance, "_loaded_course_id", None) not in (None, instance.course_id):
+        bump_course(instance._loaded_course_id)
+    bump_course(instance.course_id)  # ✅ notes affichées sur les cartes -> ETag
+    bump_learner(instance.user_id)  # note moyenne donnée (kpis apprenant)
+    _remember_state(instance)
+
+
+@receiver(post_delete, sender=Review, dispatch_uid="reviews_rating_stats_delete")
+def review_deleted(sender, instance, **kwargs):
+    course_id = getattr(instance, "_loaded_course_id", None) or instance.course_id
+    rating = getattr(instance, "_loaded_rating", None)
+    apply_rating_delta(course_id, remove=rating if rating is not None else instance.rating)
+    bump_course(course_id)
+    bump_learner(instance.user_id)